@@ -0,0 +1,23 @@
+-- 生成動画の派生アセット列を追加
+-- 実行日: 2026-10-19
+-- 目的: シーン・動画の生成完了直後に1回のデコードで作成した派生アセット
+--       （最初/最終フレーム・ポスター・サムネイル・スプライト・プローブ結果）を保存し、
+--       後続処理（サブシーンの入力画像、一覧のサムネイル等）が動画を再ダウンロードせずに参照できるようにする
+
+ALTER TABLE storyboard_scenes
+ADD COLUMN IF NOT EXISTS first_frame_url TEXT,
+ADD COLUMN IF NOT EXISTS last_frame_url TEXT,
+ADD COLUMN IF NOT EXISTS poster_url TEXT,
+ADD COLUMN IF NOT EXISTS thumbnail_url TEXT,
+ADD COLUMN IF NOT EXISTS sprite_url TEXT,
+ADD COLUMN IF NOT EXISTS media_metadata JSONB;
+
+ALTER TABLE video_generations
+ADD COLUMN IF NOT EXISTS first_frame_url TEXT,
+ADD COLUMN IF NOT EXISTS last_frame_url TEXT,
+ADD COLUMN IF NOT EXISTS poster_url TEXT,
+ADD COLUMN IF NOT EXISTS thumbnail_url TEXT,
+ADD COLUMN IF NOT EXISTS sprite_url TEXT,
+ADD COLUMN IF NOT EXISTS media_metadata JSONB;
+
+-- コメント: 既存レコードはNULL（サブシーン追加時等は従来どおり動画からフレームを抽出する）
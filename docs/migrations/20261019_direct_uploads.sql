@@ -0,0 +1,63 @@
+-- direct_uploads テーブル作成
+-- クライアントからR2への直接アップロード（署名付きPUT URL）と取り込み処理の管理
+CREATE TABLE direct_uploads (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    user_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+
+    -- アップロード情報
+    kind TEXT NOT NULL CHECK (kind IN ('user_video', 'image', 'bgm')),
+    r2_key TEXT NOT NULL UNIQUE,
+    filename TEXT NOT NULL,
+    content_type TEXT NOT NULL,
+    file_size BIGINT NOT NULL,
+    title TEXT,
+
+    -- ステータス管理
+    status TEXT NOT NULL DEFAULT 'awaiting_upload'
+        CHECK (status IN ('awaiting_upload', 'processing', 'completed', 'failed')),
+    error_message TEXT,
+    result JSONB,
+
+    -- タイムスタンプ
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- updated_at 自動更新トリガー
+CREATE OR REPLACE FUNCTION update_direct_uploads_updated_at()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = NOW();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trigger_direct_uploads_updated_at
+    BEFORE UPDATE ON direct_uploads
+    FOR EACH ROW
+    EXECUTE FUNCTION update_direct_uploads_updated_at();
+
+-- RLSポリシー
+ALTER TABLE direct_uploads ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view own direct uploads"
+    ON direct_uploads FOR SELECT
+    USING (auth.uid() = user_id);
+
+CREATE POLICY "Users can insert own direct uploads"
+    ON direct_uploads FOR INSERT
+    WITH CHECK (auth.uid() = user_id);
+
+CREATE POLICY "Service role full access on direct_uploads"
+    ON direct_uploads FOR ALL
+    USING (auth.role() = 'service_role');
+
+-- インデックス
+CREATE INDEX idx_direct_uploads_user_id ON direct_uploads(user_id);
+CREATE INDEX idx_direct_uploads_status ON direct_uploads(status);
+
+-- テーブル・カラムコメント
+COMMENT ON TABLE direct_uploads IS 'R2直接アップロード（署名付きPUT URL）と取り込み処理の管理テーブル';
+COMMENT ON COLUMN direct_uploads.kind IS 'アップロードの種類 (user_video, image, bgm)';
+COMMENT ON COLUMN direct_uploads.file_size IS '申告されたファイルサイズ（署名付きURLのContent-Lengthに使用）';
+COMMENT ON COLUMN direct_uploads.result IS '取り込み完了時の結果（通常アップロードAPIのレスポンスと同じ形式）';
@@ -0,0 +1,68 @@
+-- export_jobs テーブル作成
+-- ProRes素材エクスポート・ProRes変換の非同期ジョブと成果物（artifact）の管理
+CREATE TABLE export_jobs (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    user_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+
+    -- リクエスト
+    kind TEXT NOT NULL CHECK (kind IN ('materials', 'prores')),
+    request_hash TEXT NOT NULL,
+    params JSONB NOT NULL DEFAULT '{}'::jsonb,
+
+    -- ステータス管理
+    status TEXT NOT NULL DEFAULT 'pending'
+        CHECK (status IN ('pending', 'processing', 'completed', 'failed', 'expired')),
+    progress INT DEFAULT 0,
+    error_message TEXT,
+
+    -- 成果物
+    filename TEXT,
+    file_size BIGINT,
+    artifact_storage TEXT CHECK (artifact_storage IN ('local', 'r2')),
+    artifact_key TEXT,
+    expires_at TIMESTAMPTZ,
+
+    -- タイムスタンプ
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- updated_at 自動更新トリガー
+CREATE OR REPLACE FUNCTION update_export_jobs_updated_at()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = NOW();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trigger_export_jobs_updated_at
+    BEFORE UPDATE ON export_jobs
+    FOR EACH ROW
+    EXECUTE FUNCTION update_export_jobs_updated_at();
+
+-- RLSポリシー
+ALTER TABLE export_jobs ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view own export jobs"
+    ON export_jobs FOR SELECT
+    USING (auth.uid() = user_id);
+
+CREATE POLICY "Users can insert own export jobs"
+    ON export_jobs FOR INSERT
+    WITH CHECK (auth.uid() = user_id);
+
+CREATE POLICY "Service role full access on export_jobs"
+    ON export_jobs FOR ALL
+    USING (auth.role() = 'service_role');
+
+-- インデックス
+CREATE INDEX idx_export_jobs_user_request ON export_jobs(user_id, kind, request_hash, created_at DESC);
+CREATE INDEX idx_export_jobs_expires_at ON export_jobs(expires_at) WHERE status = 'completed';
+
+-- テーブル・カラムコメント
+COMMENT ON TABLE export_jobs IS 'エクスポートジョブ（ProRes素材ZIP・ProRes変換）と成果物の管理テーブル';
+COMMENT ON COLUMN export_jobs.request_hash IS '種別とパラメータの正規化ハッシュ（同一リクエストの再利用判定用）';
+COMMENT ON COLUMN export_jobs.artifact_storage IS '成果物の保存先 (local: APIサーバーのディスク, r2: Cloudflare R2)';
+COMMENT ON COLUMN export_jobs.artifact_key IS '成果物キー（local: 保存先ディレクトリからの相対パス, r2: オブジェクトキー）';
+COMMENT ON COLUMN export_jobs.expires_at IS '成果物の保持期限（期限後は削除され status=expired）';
@@ -0,0 +1,29 @@
+-- 一覧APIのキーセットページネーション用インデックス
+-- 実行日: 2026-10-19
+-- 目的: 一覧を (created_at, id) の降順でカーソル以降だけ取得するため、
+--       ユーザーごとの複合インデックスを作成する（深いページでも1ページ目と同じコスト）
+
+CREATE INDEX IF NOT EXISTS idx_video_generations_user_keyset
+    ON video_generations (user_id, created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_storyboards_user_keyset
+    ON storyboards (user_id, created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_video_concatenations_user_keyset
+    ON video_concatenations (user_id, created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_user_videos_user_keyset
+    ON user_videos (user_id, created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_video_screenshots_user_keyset
+    ON video_screenshots (user_id, created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_ad_creator_projects_user_keyset
+    ON ad_creator_projects (user_id, created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_user_image_library_user_keyset
+    ON user_image_library (user_id, created_at DESC, id DESC);
+
+-- ストーリーボード一覧のシーンを1回のクエリでまとめて取得するため
+CREATE INDEX IF NOT EXISTS idx_storyboard_scenes_storyboard_order
+    ON storyboard_scenes (storyboard_id, display_order);
@@ -0,0 +1,21 @@
+-- 一覧用プレビュー列を追加
+-- 実行日: 2026-10-19
+-- 目的: 一覧のグリッドでフル解像度のMP4を読み込まないよう、
+--       2秒・240pのループ（音声なしH.264 またはアニメーションWebP）のURLを保存する
+
+ALTER TABLE video_generations
+ADD COLUMN IF NOT EXISTS preview_url TEXT;
+
+ALTER TABLE storyboard_scenes
+ADD COLUMN IF NOT EXISTS preview_url TEXT;
+
+ALTER TABLE storyboards
+ADD COLUMN IF NOT EXISTS preview_url TEXT;
+
+ALTER TABLE video_concatenations
+ADD COLUMN IF NOT EXISTS preview_url TEXT;
+
+ALTER TABLE user_videos
+ADD COLUMN IF NOT EXISTS preview_url TEXT;
+
+-- コメント: 既存レコードはNULL（フロントエンドはサムネイル/ポスターを表示する）
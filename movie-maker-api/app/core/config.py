@@ -26,6 +26,42 @@ class Settings(BaseSettings):
 
     # Google Gemini
     GOOGLE_API_KEY: str = ""
+    # モデルごとの同時実行数の上限（画像生成モデルは別枠）
+    GEMINI_MAX_CONCURRENCY: int = 8
+    GEMINI_IMAGE_MAX_CONCURRENCY: int = 2
+    # 1回の呼び出しの期限（秒、リトライを含む）
+    GEMINI_TIMEOUT_SECONDS: float = 60.0
+    GEMINI_IMAGE_TIMEOUT_SECONDS: float = 180.0
+    # レート制限・一時的なサーバーエラーの再試行回数
+    GEMINI_MAX_RETRIES: int = 2
+
+    # LLM応答キャッシュ（翻訳・プロンプト変換等、同じ入力で繰り返し呼ばれる処理）
+    LLM_CACHE_ENABLED: bool = True
+    # 有効期限（秒）
+    LLM_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+    # メモリに保持する応答数（LRU）
+    LLM_CACHE_MEMORY_ENTRIES: int = 2000
+    # R2にも保存してワーカー間・再起動後に共有する
+    LLM_CACHE_PERSISTENT: bool = True
+
+    # 画像分析（ストーリー提案・ベースプロンプト解析）の結果キャッシュ
+    VISION_CACHE_ENABLED: bool = True
+    # 有効期限（秒）
+    VISION_CACHE_TTL_SECONDS: int = 30 * 24 * 3600
+    # メモリに保持する結果数（LRU）
+    VISION_CACHE_MEMORY_ENTRIES: int = 1000
+    # 再エンコードされた同じ画像とみなす知覚ハッシュ（dHash）のハミング距離（64bit中、平均色も一致が必要）
+    VISION_CACHE_PHASH_DISTANCE: int = 4
+    # R2にも保存してワーカー間・再起動後に共有する
+    VISION_CACHE_PERSISTENT: bool = True
+
+    # LLMに送る画像を用途ごとの大きさに縮小してから送る
+    LLM_MEDIA_SHRINK_ENABLED: bool = True
+
+    # プロンプトテンプレート（docs/prompt）の変更を監視して読み直す（開発時のテンプレート調整用）
+    PROMPT_TEMPLATE_HOT_RELOAD: bool = False
+    # 変更確認の間隔（秒）
+    PROMPT_TEMPLATE_RELOAD_INTERVAL_SECONDS: float = 2.0
 
     # KlingAI (deprecated)
     KLING_ACCESS_KEY: str = ""
@@ -57,6 +93,60 @@ class Settings(BaseSettings):
     # "runway", "veo", "domoai", "piapi_kling", or "hailuo" - 動画生成に使用するプロバイダー
     VIDEO_PROVIDER: str = "runway"
 
+    # FFmpeg 同時実行制御
+    # CPUスロット数（0の場合は os.cpu_count() を使用）
+    FFMPEG_CPU_SLOTS: int = 0
+    # interactive（スクリーンショット等）ジョブのスレッド数
+    FFMPEG_INTERACTIVE_THREADS: int = 1
+    # batch（レンダリング）ジョブのスレッド数（0の場合はCPUスロット数の半分）
+    FFMPEG_BATCH_THREADS: int = 0
+    # interactiveジョブ用に常に空けておくスロット数
+    FFMPEG_INTERACTIVE_RESERVED_SLOTS: int = 1
+    # 連続する映像処理ステージをパイプで連結する（中間ファイルを書かない）
+    FFMPEG_PIPE_STAGES: bool = True
+
+    # レンダリング結果キャッシュ（同一入力・同一パラメータの再エンコードを省略）
+    RENDER_CACHE_ENABLED: bool = True
+
+    # スクラッチ領域（中間ファイル）
+    # ディスク層のベースディレクトリ（空の場合はOSの一時ディレクトリ）
+    SCRATCH_DIR: str = ""
+    # RAM層（tmpfs）のベースディレクトリ（空または存在しない場合は無効）
+    SCRATCH_TMPFS_DIR: str = "/dev/shm"
+    SCRATCH_TMPFS_MAX_MB: int = 256
+    # ワークスペースごとの容量上限
+    SCRATCH_WORKSPACE_QUOTA_MB: int = 4096
+
+    # リモートメディア（フレーム抽出等でFFmpegにURLを直接渡し、Rangeリクエストで必要な範囲だけ読む）
+    REMOTE_MEDIA_RANGE_ENABLED: bool = True
+
+    # 生成完了後の派生アセット取り込み（最初/最終フレーム・ポスター・サムネイル・メタデータ）
+    MEDIA_INGEST_ENABLED: bool = True
+    # プレビュー用スプライトも生成する
+    MEDIA_INGEST_SPRITE_ENABLED: bool = False
+    # 一覧用プレビューの形式（"mp4": 音声なしH.264 / "webp": アニメーションWebP）
+    MEDIA_PREVIEW_FORMAT: str = "mp4"
+
+    # 画像処理（サムネイル生成・画像バリアント変換）のワーカープロセス数
+    # 0の場合はプロセスプールを使わずスレッドで実行する
+    IMAGE_PROCESS_WORKERS: int = 2
+
+    # 一覧APIの件数キャッシュの有効期間（秒）
+    # 同じワーカーでの追加・削除は即時に反映し、他のワーカーでの変更はこの期間で反映される
+    LIST_COUNT_CACHE_TTL_SECONDS: int = 300
+    # 件数キャッシュの最大件数（(テーブル, ユーザー, 条件) ごと、超えた分は古いものから破棄）
+    LIST_COUNT_CACHE_MAX_ENTRIES: int = 10000
+
+    # エクスポートジョブの成果物
+    # 保存先（"local" または "r2"）
+    EXPORT_ARTIFACT_STORAGE: str = "local"
+    # ローカル保存先ディレクトリ（空の場合はOSの一時ディレクトリ）
+    EXPORT_ARTIFACT_DIR: str = ""
+    # 保持期限（時間）
+    EXPORT_ARTIFACT_TTL_HOURS: int = 24
+    # 実行中のジョブをこの時間（分）更新がなければ停止したとみなす（再利用せず失敗にする）
+    EXPORT_JOB_STALE_MINUTES: int = 60
+
     # Topaz Video API (for 60fps frame interpolation)
     TOPAZ_API_KEY: str = ""
 
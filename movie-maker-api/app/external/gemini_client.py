@@ -1,19 +1,19 @@
-from google import genai
 from google.genai import types
 from PIL import Image
+import asyncio
 import io
 import json
-import httpx
 import logging
-from pathlib import Path
+from typing import Any, AsyncIterator
 
-from app.core.config import settings
+from app.external.gemini_gateway import get_gemini_gateway
+from app.services.llm_media import MediaPurpose, get_llm_media
+from app.services.json_stream import IncrementalJsonParser
+from app.services.prompt_templates import animation_template_path, get_prompt_templates, provider_template_path
+from app.services.vision_cache import fetch_image_bytes, get_vision_cache
 
 logger = logging.getLogger(__name__)
 
-# プロジェクトルートディレクトリ（movie-maker-api の親 = movie-project）
-PROJECT_ROOT = Path(__file__).parent.parent.parent.parent  # movie-project/
-
 
 def load_prompt_template(
     provider: str,
@@ -23,7 +23,9 @@ def load_prompt_template(
     animation_template: str | None = None
 ) -> dict:
     """
-    動画生成プロバイダーとモードに応じたプロンプトテンプレートを読み込む
+    動画生成プロバイダーとモードに応じたプロンプトテンプレートを取得
+
+    テンプレートは起動時に解析済み（app.services.prompt_templates）のため、ファイルは読まない。
 
     Args:
         provider: "runway", "veo", "domoai", または "piapi_kling"
@@ -48,29 +50,13 @@ def load_prompt_template(
     if mode not in ("story", "scene"):
         mode = "story"  # デフォルトはstory
 
-    # sceneモードの場合、subject_typeに応じたサブディレクトリを使用
-    if mode == "scene":
-        if subject_type in ("person", "object"):
-            template_dir = PROJECT_ROOT / "docs" / "prompt" / mode / subject_type
-        elif subject_type == "animation":
-            # animation選択でテンプレート未指定の場合はpersonをフォールバック
-            template_dir = PROJECT_ROOT / "docs" / "prompt" / mode / "person"
-            logger.info(f"Animation without template, falling back to person template")
-        else:
-            template_dir = PROJECT_ROOT / "docs" / "prompt" / mode / "person"
-    else:
-        template_dir = PROJECT_ROOT / "docs" / "prompt" / mode
+    if mode == "scene" and subject_type == "animation":
+        # animation選択でテンプレート未指定の場合はpersonをフォールバック
+        logger.info(f"Animation without template, falling back to person template")
 
-    # プロバイダー別テンプレートファイル名
-    provider_template_map = {
-        "veo": "veo_api_template.md",
-        "domoai": "domoai_api_template.md",
-        "piapi_kling": "kling_api_template.md",
-    }
-    template_filename = provider_template_map.get(provider, "runway_api_template.md")
-    template_path = template_dir / template_filename
-
-    if not template_path.exists():
+    template_path = provider_template_path(provider, mode, subject_type)
+    template = get_prompt_templates().get(template_path)
+    if template is None:
         logger.warning(f"Template file not found: {template_path}, using default")
         return {
             "reference_rule": "",
@@ -80,59 +66,13 @@ def load_prompt_template(
             "quality_boosters": None
         }
 
-    content = template_path.read_text(encoding="utf-8")
-
-    result = {
-        "reference_rule": "",
-        "clip_specific_template": "",
-        "negative_prompt": None,
-        "style_keywords": None,
-        "quality_boosters": None
-    }
-
-    # REFERENCE RULE または SINGLE IMAGE RULE セクションを抽出
-    if "REFERENCE RULE" in content:
-        start = content.find("REFERENCE RULE")
-        end = content.find("CLIP SPECIFIC", start)
-        if end > start:
-            result["reference_rule"] = content[start:end].strip()
-    elif "SINGLE IMAGE RULE" in content:
-        # シーン用テンプレート（1枚の画像用）
-        start = content.find("SINGLE IMAGE RULE")
-        end = content.find("CLIP SPECIFIC", start)
-        if end > start:
-            result["reference_rule"] = content[start:end].strip()
-
-    # CLIP SPECIFIC テンプレートを抽出
-    if "CLIP SPECIFIC" in content:
-        start = content.find("CLIP SPECIFIC (edit only this block):")
-        if start != -1:
-            # 次のセクション（---）まで取得
-            end = content.find("---", start)
-            if end == -1:
-                end = content.find("## NEGATIVE PROMPT", start)
-            if end == -1:
-                end = content.find("## 例", start)
-            if end > start:
-                result["clip_specific_template"] = content[start:end].strip()
-
-    # NEGATIVE PROMPT を抽出（Runwayのみ）
-    if "NEGATIVE PROMPT" in content:
-        start = content.find("## NEGATIVE PROMPT")
-        if start != -1:
-            # セクション内容を取得
-            lines_start = content.find("\n", start) + 1
-            end = content.find("---", lines_start)
-            if end > lines_start:
-                result["negative_prompt"] = content[lines_start:end].strip()
-
     logger.info(f"Loaded prompt template for provider: {provider}, mode: {mode}, subject_type: {subject_type}")
-    return result
+    return template
 
 
 def _load_animation_template(category: str, template_id: str, provider: str = "runway") -> dict:
     """
-    アニメーションスタイルテンプレートを読み込む
+    アニメーションスタイルテンプレートを取得
 
     Args:
         category: "2d" または "3d"
@@ -147,66 +87,8 @@ def _load_animation_template(category: str, template_id: str, provider: str = "r
             "style_keywords": str
         }
     """
-    import re
-
-    # プロバイダー別ファイル名マッピング
-    template_file_maps = {
-        "runway": {
-            "A-1": "A-1_modern_tv_anime.md",
-            "A-2": "A-2_ghibli_style.md",
-            "A-3": "A-3_90s_retro.md",
-            "A-4": "A-4_flat_design.md",
-            "B-1": "B-1_photorealistic.md",
-            "B-2": "B-2_game_ue5.md",
-            "B-3": "B-3_pixar_style.md",
-            "B-4": "B-4_low_poly_ps1.md",
-        },
-        "veo": {
-            "A-1": "A-1_modern_vtuber.md",
-            "A-2": "A-2_ghibli.md",
-            "A-3": "A-3_90s_retro.md",
-            "A-4": "A-4_flat_simple.md",
-            "B-1": "B-1_photorealistic.md",
-            "B-2": "B-2_ue5_game.md",
-            "B-3": "B-3_pixar.md",
-            "B-4": "B-4_low_poly_ps1.md",
-        },
-        "domoai": {
-            "A-1": "A-1_japanese_anime.md",
-            "A-2": "A-2_flat_color_anime.md",
-            "A-3": "A-3_90s_retro.md",
-            "A-4": "A-4_pixel_art.md",
-            "B-1": "B-1_realistic.md",
-            "B-2": "B-2_cartoon_game.md",
-            "B-3": "B-3_3d_anime.md",
-            "B-4": "B-4_chibi_deformed.md",
-        },
-        "piapi_kling": {
-            "A-1": "A-1_modern_tv_anime.md",
-            "A-2": "A-2_ghibli_style.md",
-            "A-3": "A-3_90s_retro.md",
-            "A-4": "A-4_flat_design.md",
-            "B-1": "B-1_photorealistic.md",
-            "B-2": "B-2_game_ue5.md",
-            "B-3": "B-3_pixar_style.md",
-            "B-4": "B-4_low_poly_ps1.md",
-        },
-    }
-
-    # プロバイダー別のディレクトリ名マッピング（フォルダ名が異なる場合）
-    provider_folder_map = {
-        "runway": "runway",
-        "veo": "veo",
-        "domoai": "domo",  # DomoAIはdomoフォルダを使用
-        "piapi_kling": "kling",  # PiAPI Klingはklingフォルダを使用
-    }
-
-    # プロバイダーに応じたマッピングを取得（不明な場合はrunway）
-    file_map = template_file_maps.get(provider, template_file_maps["runway"])
-    filename = file_map.get(template_id)
-    folder_name = provider_folder_map.get(provider, provider)
-
-    if not filename:
+    template_path = animation_template_path(category, template_id, provider)
+    if template_path is None:
         logger.warning(f"Unknown animation template ID: {template_id}")
         return {
             "reference_rule": "",
@@ -215,9 +97,8 @@ def _load_animation_template(category: str, template_id: str, provider: str = "r
             "style_keywords": ""
         }
 
-    template_path = PROJECT_ROOT / "docs" / "prompt" / "scene" / "anime" / category / folder_name / filename
-
-    if not template_path.exists():
+    template = get_prompt_templates().get(template_path)
+    if template is None:
         logger.warning(f"Animation template file not found: {template_path}")
         return {
             "reference_rule": "",
@@ -226,130 +107,22 @@ def _load_animation_template(category: str, template_id: str, provider: str = "r
             "style_keywords": ""
         }
 
-    content = template_path.read_text(encoding="utf-8")
-
-    result = {
-        "reference_rule": "",
-        "clip_specific_template": "",
-        "negative_prompt": None,
-        "style_keywords": "",
-        "quality_boosters": ""  # DomoAI用の品質向上ブースター
-    }
-
-    # 品質向上ブースター（Magic Words）を抽出（DomoAI用）
-    if "## 品質向上ブースター" in content:
-        start = content.find("## 品質向上ブースター")
-        end = content.find("---", start)
-        if end > start:
-            booster_section = content[start:end]
-            # コードブロック内のキーワードを抽出
-            code_blocks = re.findall(r'```\n?(.*?)\n?```', booster_section, re.DOTALL)
-            if code_blocks:
-                # 最初の2つのコードブロックを結合（一般 + スタイル特化）
-                boosters = []
-                for block in code_blocks[:2]:
-                    boosters.append(block.strip())
-                result["quality_boosters"] = ", ".join(boosters)
-
-    # スタイルキーワードを抽出
-    if "## スタイルキーワード" in content:
-        start = content.find("## スタイルキーワード")
-        end = content.find("---", start)
-        if end > start:
-            keywords_section = content[start:end]
-            # バッククォート内のキーワードを抽出
-            keywords = re.findall(r'`([^`]+)`', keywords_section)
-            result["style_keywords"] = ", ".join(keywords)
-
-    # TEXT PROMPT セクションから SINGLE IMAGE RULE と CLIP SPECIFIC を抽出
-    if "## TEXT PROMPT" in content:
-        start = content.find("## TEXT PROMPT")
-        end = content.find("---", start)
-        if end > start:
-            template_section = content[start:end]
-
-            # SINGLE IMAGE RULE を抽出
-            if "SINGLE IMAGE RULE" in template_section:
-                rule_start = template_section.find("SINGLE IMAGE RULE")
-                rule_end = template_section.find("CLIP SPECIFIC", rule_start)
-                if rule_end > rule_start:
-                    result["reference_rule"] = template_section[rule_start:rule_end].strip()
-
-            # CLIP SPECIFIC テンプレートを抽出
-            if "CLIP SPECIFIC" in template_section:
-                clip_start = template_section.find("CLIP SPECIFIC (edit only this block):")
-                if clip_start != -1:
-                    # Final note: の行まで取得（セクション終了）
-                    clip_section = template_section[clip_start:]
-                    # Final note で終わる行を見つける
-                    final_note_match = re.search(r'Final note:.*', clip_section)
-                    if final_note_match:
-                        clip_end = final_note_match.end()
-                        result["clip_specific_template"] = clip_section[:clip_end].strip()
-                    else:
-                        result["clip_specific_template"] = clip_section.strip()
-
-    # 旧フォーマット対応（フォールバック）
-    elif "## プロンプトテンプレート" in content:
-        start = content.find("## プロンプトテンプレート")
-        end = content.find("---", start)
-        if end > start:
-            template_section = content[start:end]
-            # コードブロック内のテンプレートを抽出
-            code_start = template_section.find("```")
-            code_end = template_section.rfind("```")
-            if code_start != -1 and code_end > code_start:
-                template_text = template_section[code_start+3:code_end].strip()
-                if template_text.startswith("\n"):
-                    template_text = template_text[1:]
-                result["clip_specific_template"] = template_text
-
-    # ネガティブキーワードを抽出
-    if "## ネガティブキーワード" in content:
-        start = content.find("## ネガティブキーワード")
-        end = content.find("---", start)
-        if end == -1:
-            end = content.find("## 注意事項", start)
-        if end == -1:
-            end = content.find("## 実例", start)
-        if end > start:
-            neg_section = content[start:end]
-            # ❌で始まる行を抽出
-            negatives = re.findall(r'❌\s*(.+)', neg_section)
-            if negatives:
-                result["negative_prompt"] = "Avoid: " + ", ".join(negatives)
-
-    # reference_rule が空の場合のフォールバック
-    if not result["reference_rule"]:
-        result["reference_rule"] = f"""SINGLE IMAGE RULE (do not remove):
-Use the source image as the foundation for the video.
-Preserve the character design, art style, and color palette from the input image.
-Focus on motion and camera work only - do NOT describe character appearance.
-Animation style: {template_id} ({category.upper()})
-Style keywords: {result["style_keywords"]}"""
-
-    logger.info(f"Loaded animation template: {template_id} (category: {category}, provider: {provider}, folder: {folder_name}, quality_boosters: {bool(result['quality_boosters'])})")
-    return result
-
-
-def get_gemini_client() -> genai.Client:
-    """Initialize Gemini client."""
-    return genai.Client(api_key=settings.GOOGLE_API_KEY)
+    logger.info(f"Loaded animation template: {template_id} (category: {category}, provider: {provider}, path: {template_path}, quality_boosters: {bool(template['quality_boosters'])})")
+    return template
 
 
-async def optimize_prompt(prompt: str, template_id: str | None = None) -> str:
+async def optimize_prompt(prompt: str, template_id: str | None = None, use_cache: bool = True) -> str:
     """
     Optimize prompt for video generation using Gemini 3 Flash.
     
     Args:
         prompt (str): User input prompt.
         template_id (str | None): Template ID to add context (optional).
+        use_cache (bool): Reuse the response for an identical prompt (False for a fresh variation).
         
     Returns:
         str: Optimized prompt.
     """
-    client = get_gemini_client()
-    
     system_instruction = (
         "You are an expert prompt engineer for video generation AI (like KlingAI, Sora). "
         "Your task is to expand the user's input into a detailed, descriptive prompt suitable for generating a high-quality 5-second video. "
@@ -359,13 +132,14 @@ async def optimize_prompt(prompt: str, template_id: str | None = None) -> str:
     )
 
     try:
-        response = client.models.generate_content(
+        response = await get_gemini_gateway().generate_content(
             model="gemini-3-flash-preview",
             contents=prompt,
             config=types.GenerateContentConfig(
                 system_instruction=system_instruction,
                 temperature=0.7,
-            )
+            ),
+            cache=use_cache,
         )
         
         return response.text
@@ -390,28 +164,20 @@ async def generate_image(
     Returns:
         Image.Image | None: Generated PIL Image or None if failed.
     """
-    client = get_gemini_client()
-
     try:
         # コンテンツを構築
         contents = []
 
         # 参照画像がある場合はマルチモーダル入力として渡す（最大3枚）
         if reference_image_urls and len(reference_image_urls) > 0:
+            # 参照画像を並行してダウンロードし、画像生成で使う大きさに縮小（最大3枚）
+            logger.info(f"Downloading {len(reference_image_urls[:3])} reference image(s) for image generation")
+            parts = await get_llm_media().fetch_image_parts(reference_image_urls[:3], MediaPurpose.REFERENCE)
             loaded_images = []
-            for i, img_url in enumerate(reference_image_urls[:3]):  # 最大3枚
-                logger.info(f"Downloading reference image {i+1} for image generation: {img_url}")
-                try:
-                    async with httpx.AsyncClient() as http_client:
-                        img_response = await http_client.get(img_url, timeout=30.0)
-                        img_response.raise_for_status()
-                        image_data = img_response.content
-
-                    # 参照画像をコンテンツに追加
-                    contents.append(types.Part.from_bytes(data=image_data, mime_type="image/jpeg"))
+            for i, part in enumerate(parts):
+                if part is not None:
+                    contents.append(part)
                     loaded_images.append(i + 1)
-                except Exception as e:
-                    logger.warning(f"Failed to download reference image {i+1}: {e}")
 
             if loaded_images:
                 # 参照画像の枚数に応じてプロンプトを調整
@@ -451,7 +217,7 @@ IMPORTANT:
             contents = [prompt]
 
         # Use Gemini 3 Pro Image (Nano Banana Pro) model
-        response = client.models.generate_content(
+        response = await get_gemini_gateway().generate_content(
             model="gemini-3-pro-image-preview",
             contents=contents,
             config=types.GenerateContentConfig(
@@ -472,19 +238,7 @@ IMPORTANT:
 
 # ===== AI主導ストーリーテリング用関数 =====
 
-async def suggest_stories_from_image(image_url: str) -> list[str]:
-    """
-    画像からストーリー候補を5つ生成
-
-    Args:
-        image_url: 分析対象の画像URL
-
-    Returns:
-        list[str]: 日本語のストーリー候補リスト
-    """
-    client = get_gemini_client()
-
-    system_prompt = """
+_STORY_SUGGESTION_PROMPT = """
 この画像を分析して、5秒間の短い動画にできそうなストーリーを5つ提案してください。
 
 ルール:
@@ -497,43 +251,114 @@ JSON配列形式で出力（説明や前置きは不要）:
 ["ストーリー1", "ストーリー2", "ストーリー3", "ストーリー4", "ストーリー5"]
 """
 
-    try:
-        # 画像をダウンロード
-        async with httpx.AsyncClient() as http_client:
-            img_response = await http_client.get(image_url, timeout=30.0)
-            img_response.raise_for_status()
-            image_data = img_response.content
+# ストーリー提案のキャッシュの種類（プロンプトを変更したらバージョンを上げる）
+_STORY_SUGGESTION_KIND = "story_suggestions:v1"
+
+
+async def suggest_stories_from_image(image_url: str, use_cache: bool = True) -> list[str]:
+    """
+    画像からストーリー候補を5つ生成
+
+    Args:
+        image_url: 分析対象の画像URL
+        use_cache: 同じ画像の提案結果を再利用する（Falseの場合は毎回生成）
 
+    Returns:
+        list[str]: 日本語のストーリー候補リスト
+    """
+    async def suggest(image_data: bytes) -> list[str]:
         # Geminiに送信
-        response = client.models.generate_content(
+        response = await get_gemini_gateway().generate_content(
             model="gemini-2.0-flash",
             contents=[
-                types.Part.from_bytes(data=image_data, mime_type="image/jpeg"),
-                system_prompt
+                await get_llm_media().image_part(image_data),
+                _STORY_SUGGESTION_PROMPT
             ],
             config=types.GenerateContentConfig(temperature=0.8)
         )
+        return _parse_story_suggestions(response.text)
 
-        # JSONをパース
-        result_text = response.text.strip()
-        # ```json ... ``` を除去
-        if result_text.startswith("```"):
-            result_text = result_text.split("```")[1]
-            if result_text.startswith("json"):
-                result_text = result_text[4:]
-
-        return json.loads(result_text)
+    try:
+        if use_cache:
+            # 同じ画像（再エンコードされたコピーを含む）は画像を送らずに前回の提案を返す
+            return await get_vision_cache().get_or_analyze(_STORY_SUGGESTION_KIND, image_url, suggest)
+        return await suggest(await fetch_image_bytes(image_url))
 
     except Exception as e:
         logger.exception(f"Story suggestion failed: {e}")
         # フォールバック
-        return [
-            "ゆっくりとカメラ目線になる",
-            "風で髪がなびく",
-            "微笑みから驚いた表情に変わる",
-            "手を振る動作をする",
-            "深呼吸してリラックスする"
-        ]
+        return _fallback_story_suggestions()
+
+
+async def stream_story_suggestions(image_url: str, use_cache: bool = True) -> AsyncIterator[tuple[str, Any]]:
+    """
+    suggest_stories_from_image のストリーミング版
+
+    候補が1件完成するたびに返す。キャッシュにある場合は生成せずにまとめて返す。
+
+    Yields:
+        tuple[str, Any]:
+            ("suggestion", str)     # 候補が完成するたびに
+            ("done", list[str])     # 全体（失敗時はフォールバック）
+    """
+    cache = get_vision_cache()
+    try:
+        image_data = await fetch_image_bytes(image_url)
+        cached = await cache.lookup(_STORY_SUGGESTION_KIND, image_data) if use_cache else None
+        if cached is not None:
+            for suggestion in cached:
+                yield "suggestion", suggestion
+            yield "done", cached
+            return
+
+        parser = IncrementalJsonParser()
+        suggestions: list[str] = []
+        async for chunk in get_gemini_gateway().generate_content_stream(
+            model="gemini-2.0-flash",
+            contents=[
+                await get_llm_media().image_part(image_data),
+                _STORY_SUGGESTION_PROMPT
+            ],
+            config=types.GenerateContentConfig(temperature=0.8)
+        ):
+            for item in parser.feed(chunk):
+                if isinstance(item, str):
+                    suggestions.append(item)
+                    yield "suggestion", item
+
+        result = _parse_story_suggestions(parser.text)
+        if use_cache:
+            await cache.store(_STORY_SUGGESTION_KIND, image_data, result)
+
+    except Exception as e:
+        logger.exception(f"Story suggestion streaming failed: {e}")
+        result = _fallback_story_suggestions()
+
+    yield "done", result
+
+
+def _parse_story_suggestions(text: str) -> list[str]:
+    """ストーリー提案の応答をパース"""
+    # JSONをパース
+    result_text = text.strip()
+    # ```json ... ``` を除去
+    if result_text.startswith("```"):
+        result_text = result_text.split("```")[1]
+        if result_text.startswith("json"):
+            result_text = result_text[4:]
+
+    return json.loads(result_text)
+
+
+def _fallback_story_suggestions() -> list[str]:
+    """ストーリー提案に失敗した場合の候補"""
+    return [
+        "ゆっくりとカメラ目線になる",
+        "風で髪がなびく",
+        "微笑みから驚いた表情に変わる",
+        "手を振る動作をする",
+        "深呼吸してリラックスする"
+    ]
 
 
 async def analyze_image_for_base_prompt(image_url: str) -> str:
@@ -547,8 +372,6 @@ async def analyze_image_for_base_prompt(image_url: str) -> str:
         str: キャラクター、背景、画風を含む詳細な説明（英語）
               Identity Anchor（絶対変更禁止項目）を含む
     """
-    client = get_gemini_client()
-
     system_prompt = """
 Analyze this image with EXTREME PRECISION for use as an "Identity Anchor" in AI video generation.
 
@@ -603,16 +426,11 @@ WARNING: Any AI-generated frames MUST preserve EVERY detail listed above.
 The subject's identity, appearance, and all visual elements are LOCKED and IMMUTABLE.
 """
 
-    try:
-        async with httpx.AsyncClient() as http_client:
-            img_response = await http_client.get(image_url, timeout=30.0)
-            img_response.raise_for_status()
-            image_data = img_response.content
-
-        response = client.models.generate_content(
+    async def analyze(image_data: bytes) -> str:
+        response = await get_gemini_gateway().generate_content(
             model="gemini-2.0-flash",
             contents=[
-                types.Part.from_bytes(data=image_data, mime_type="image/jpeg"),
+                await get_llm_media().image_part(image_data),
                 system_prompt
             ],
             config=types.GenerateContentConfig(temperature=0.2)  # 低めで精度重視
@@ -620,6 +438,12 @@ The subject's identity, appearance, and all visual elements are LOCKED and IMMUT
 
         return response.text.strip()
 
+    try:
+        # 同じ画像は前回の解析結果を返す（色・細部を正確に記述するため、似た画像の結果は使わない）
+        return await get_vision_cache().get_or_analyze(
+            "base_prompt:v1", image_url, analyze, near_duplicates=False
+        )
+
     except Exception as e:
         logger.exception(f"Image analysis failed: {e}")
         raise
@@ -636,8 +460,6 @@ async def generate_storyboard_prompts(base_prompt: str, story_text: str) -> list
     Returns:
         list[dict]: 3つの構造化プロンプト（各フレーム）
     """
-    client = get_gemini_client()
-
     system_prompt = f"""
 You are an expert prompt engineer for AI image generation with STRICT identity preservation requirements.
 
@@ -716,7 +538,7 @@ Output JSON only.
 """
 
     try:
-        response = client.models.generate_content(
+        response = await get_gemini_gateway().generate_content(
             model="gemini-2.0-flash",
             contents=system_prompt,
             config=types.GenerateContentConfig(temperature=0.7)
@@ -773,8 +595,81 @@ async def generate_4scene_storyboard(
             ]
         }
     """
-    client = get_gemini_client()
+    system_prompt = _build_storyboard_prompt(mood, video_provider)
+
+    try:
+        # 画像をダウンロードして解析用の大きさに縮小
+        image_part = await get_llm_media().fetch_image_part(image_url)
+
+        # Geminiに送信
+        response = await get_gemini_gateway().generate_content(
+            model="gemini-2.0-flash",
+            contents=[
+                image_part,
+                system_prompt
+            ],
+            config=types.GenerateContentConfig(temperature=0.8)
+        )
+
+        return _parse_storyboard(response.text)
+
+    except Exception as e:
+        logger.exception(f"4-scene storyboard generation failed: {e}")
+        # フォールバック：基本的なストーリーボードを返す
+        return _fallback_storyboard()
+
+
+async def stream_4scene_storyboard(
+    image_url: str,
+    mood: str | None = None,
+    video_provider: str = "runway"
+) -> AsyncIterator[tuple[str, dict]]:
+    """
+    generate_4scene_storyboard のストリーミング版
 
+    Geminiのストリーミング応答を逐次パースし、シーンが完成するたびに返す。
+    最後に generate_4scene_storyboard と同じ検証・フォールバックを通した全体を返す。
+
+    Yields:
+        tuple[str, dict]:
+            ("meta", {"title": str, "theme": str})  # タイトル・テーマが確定した時点
+            ("scene", scene)                        # シーンが完成するたびに
+            ("done", storyboard)                    # 全体（失敗時はフォールバック）
+    """
+    system_prompt = _build_storyboard_prompt(mood, video_provider)
+    parser = IncrementalJsonParser("scenes")
+    meta_sent = False
+
+    try:
+        image_part = await get_llm_media().fetch_image_part(image_url)
+
+        async for chunk in get_gemini_gateway().generate_content_stream(
+            model="gemini-2.0-flash",
+            contents=[
+                image_part,
+                system_prompt
+            ],
+            config=types.GenerateContentConfig(temperature=0.8)
+        ):
+            scenes = parser.feed(chunk)
+            if not meta_sent and (scenes or {"title", "theme"} <= parser.fields.keys()):
+                meta_sent = True
+                yield "meta", {"title": parser.fields.get("title"), "theme": parser.fields.get("theme")}
+            for scene in scenes:
+                if isinstance(scene, dict):
+                    yield "scene", scene
+
+        storyboard = _parse_storyboard(parser.text)
+
+    except Exception as e:
+        logger.exception(f"4-scene storyboard streaming failed: {e}")
+        storyboard = _fallback_storyboard()
+
+    yield "done", storyboard
+
+
+def _build_storyboard_prompt(mood: str | None, video_provider: str) -> str:
+    """4シーンストーリーボード生成のプロンプトを組み立てる"""
     # プロバイダー別テンプレートを読み込み
     template = load_prompt_template(video_provider)
     provider_name = "Google Veo 2" if video_provider == "veo" else "Runway Gen-3 Alpha"
@@ -974,84 +869,76 @@ Include phrase: "maintaining exact appearance from scene 1" in scenes 2-4
 
 Output ONLY valid JSON. No explanations, no markdown code blocks.
 """
+    return system_prompt
 
-    try:
-        # 画像をダウンロード
-        async with httpx.AsyncClient() as http_client:
-            img_response = await http_client.get(image_url, timeout=30.0)
-            img_response.raise_for_status()
-            image_data = img_response.content
 
-        # Geminiに送信
-        response = client.models.generate_content(
-            model="gemini-2.0-flash",
-            contents=[
-                types.Part.from_bytes(data=image_data, mime_type="image/jpeg"),
-                system_prompt
-            ],
-            config=types.GenerateContentConfig(temperature=0.8)
-        )
-
-        # JSONをパース
-        result_text = response.text.strip()
-        # ```json ... ``` を除去
-        if result_text.startswith("```"):
-            lines = result_text.split("\n")
-            result_text = "\n".join(lines[1:-1])
-
-        storyboard = json.loads(result_text)
-
-        # バリデーション
-        if "scenes" not in storyboard or len(storyboard["scenes"]) != 4:
-            raise ValueError(f"Expected 4 scenes, got {len(storyboard.get('scenes', []))}")
-
-        return storyboard
+def _parse_storyboard(text: str) -> dict:
+    """
+    ストーリーボードの応答をパースして検証
 
-    except Exception as e:
-        logger.exception(f"4-scene storyboard generation failed: {e}")
-        # フォールバック：基本的なストーリーボードを返す
-        return {
-            "title": "物語",
-            "theme": "静かな瞬間の美しさ",
-            "scenes": [
-                {
-                    "scene_number": 1,
-                    "act": "起",
-                    "description_ja": "静かに佇む姿。カメラがゆっくりと近づいていく。",
-                    "runway_prompt": "A person standing still, peaceful expression, soft natural lighting, camera slowly zooms in, cinematic, photorealistic, 5 seconds",
-                    "camera_work": "slow_zoom_in",
-                    "mood": "calm",
-                    "duration_seconds": 5
-                },
-                {
-                    "scene_number": 2,
-                    "act": "承",
-                    "description_ja": "わずかに動き始める。視線が動き、何かに気づいたような表情。",
-                    "runway_prompt": "Same person from scene 1, slight head turn, eyes looking to the side, subtle movement, tracking shot, cinematic, 5 seconds",
-                    "camera_work": "tracking",
-                    "mood": "building",
-                    "duration_seconds": 5
-                },
-                {
-                    "scene_number": 3,
-                    "act": "転",
-                    "description_ja": "表情が変わる瞬間。感情が表に出る。",
-                    "runway_prompt": "Same person from scene 1, emotional expression change, dynamic camera movement, dramatic lighting, cinematic moment, 5 seconds",
-                    "camera_work": "dynamic_pan",
-                    "mood": "intense",
-                    "duration_seconds": 5
-                },
-                {
-                    "scene_number": 4,
-                    "act": "結",
-                    "description_ja": "穏やかな表情に戻り、カメラが引いていく。余韻を残す。",
-                    "runway_prompt": "Same person from scene 1, peaceful resolution, soft smile, camera slowly zooms out, lingering shot, cinematic, 5 seconds",
-                    "camera_work": "slow_zoom_out",
-                    "mood": "reflective",
-                    "duration_seconds": 5
-                }
-            ]
-        }
+    Raises:
+        ValueError: JSONでない・4シーンでない場合
+    """
+    # JSONをパース
+    result_text = text.strip()
+    # ```json ... ``` を除去
+    if result_text.startswith("```"):
+        lines = result_text.split("\n")
+        result_text = "\n".join(lines[1:-1])
+
+    storyboard = json.loads(result_text)
+
+    # バリデーション
+    if "scenes" not in storyboard or len(storyboard["scenes"]) != 4:
+        raise ValueError(f"Expected 4 scenes, got {len(storyboard.get('scenes', []))}")
+
+    return storyboard
+
+
+def _fallback_storyboard() -> dict:
+    """生成に失敗した場合の基本的なストーリーボード"""
+    return {
+        "title": "物語",
+        "theme": "静かな瞬間の美しさ",
+        "scenes": [
+            {
+                "scene_number": 1,
+                "act": "起",
+                "description_ja": "静かに佇む姿。カメラがゆっくりと近づいていく。",
+                "runway_prompt": "A person standing still, peaceful expression, soft natural lighting, camera slowly zooms in, cinematic, photorealistic, 5 seconds",
+                "camera_work": "slow_zoom_in",
+                "mood": "calm",
+                "duration_seconds": 5
+            },
+            {
+                "scene_number": 2,
+                "act": "承",
+                "description_ja": "わずかに動き始める。視線が動き、何かに気づいたような表情。",
+                "runway_prompt": "Same person from scene 1, slight head turn, eyes looking to the side, subtle movement, tracking shot, cinematic, 5 seconds",
+                "camera_work": "tracking",
+                "mood": "building",
+                "duration_seconds": 5
+            },
+            {
+                "scene_number": 3,
+                "act": "転",
+                "description_ja": "表情が変わる瞬間。感情が表に出る。",
+                "runway_prompt": "Same person from scene 1, emotional expression change, dynamic camera movement, dramatic lighting, cinematic moment, 5 seconds",
+                "camera_work": "dynamic_pan",
+                "mood": "intense",
+                "duration_seconds": 5
+            },
+            {
+                "scene_number": 4,
+                "act": "結",
+                "description_ja": "穏やかな表情に戻り、カメラが引いていく。余韻を残す。",
+                "runway_prompt": "Same person from scene 1, peaceful resolution, soft smile, camera slowly zooms out, lingering shot, cinematic, 5 seconds",
+                "camera_work": "slow_zoom_out",
+                "mood": "reflective",
+                "duration_seconds": 5
+            }
+        ]
+    }
 
 
 async def generate_story_frame_image(
@@ -1073,29 +960,19 @@ async def generate_story_frame_image(
     Returns:
         bytes: 生成された画像のバイトデータ、失敗時はNone
     """
-    client = get_gemini_client()
-
     try:
         contents = []
 
-        # 元画像がある場合は参照として渡す（Image 1: Identity Anchor）
-        if reference_image_url:
-            async with httpx.AsyncClient() as http_client:
-                img_response = await http_client.get(reference_image_url, timeout=30.0)
-                img_response.raise_for_status()
-                image_data = img_response.content
-
-            contents.append(types.Part.from_bytes(data=image_data, mime_type="image/jpeg"))
+        # 元画像（Image 1: Identity Anchor）と直前のシーン画像（Image 2: Previous Scene）を
+        # 並行してダウンロードし、参照として渡す
+        reference_urls = [url for url in (reference_image_url, previous_scene_image_url) if url]
+        if reference_urls:
+            parts = await get_llm_media().fetch_image_parts(reference_urls, MediaPurpose.REFERENCE)
+            if any(part is None for part in parts):
+                raise ValueError("Failed to download reference image for story frame")
+            contents.extend(parts)
 
-        # 直前のシーン画像がある場合も参照として渡す（Image 2: Previous Scene）
         if previous_scene_image_url:
-            async with httpx.AsyncClient() as http_client:
-                img_response = await http_client.get(previous_scene_image_url, timeout=30.0)
-                img_response.raise_for_status()
-                prev_image_data = img_response.content
-
-            contents.append(types.Part.from_bytes(data=prev_image_data, mime_type="image/jpeg"))
-
             # 2枚の参照画像がある場合のプロンプト
             if previous_scene_image_url:
                 enhanced_prompt = f"""
@@ -1220,7 +1097,7 @@ CRITICAL IMAGE FORMAT REQUIREMENT:
 """
             contents.append(aspect_prompt)
 
-        response = client.models.generate_content(
+        response = await get_gemini_gateway().generate_content(
             model="gemini-2.0-flash-exp",
             contents=contents,
             config=types.GenerateContentConfig(
@@ -1250,6 +1127,7 @@ async def translate_scene_to_runway_prompt(
     camera_work: str | None = None,
     animation_category: str | None = None,
     animation_template: str | None = None,
+    use_cache: bool = True,
 ) -> str:
     """
     日本語のシーン説明をAPI用の英語プロンプトに変換（テンプレート構造を維持）
@@ -1265,12 +1143,11 @@ async def translate_scene_to_runway_prompt(
         camera_work: ユーザー選択のカメラワーク（例: "slow zoom in", "pan left"）
         animation_category: アニメーションカテゴリ（"2d"/"3d"）- animation選択時のみ
         animation_template: アニメーションテンプレートID（"A-1"〜"B-4"）- animation選択時のみ
+        use_cache: 同じ入力の変換結果を再利用する（Falseの場合は毎回生成）
 
     Returns:
         str: API用の英語プロンプト（テンプレート構造付き）
     """
-    client = get_gemini_client()
-
     # テンプレートを読み込み（モードと被写体タイプに応じて異なるテンプレートを使用）
     template = load_prompt_template(
         video_provider,
@@ -1403,10 +1280,11 @@ No additional explanations or quotes.
 """
 
     try:
-        response = client.models.generate_content(
+        response = await get_gemini_gateway().generate_content(
             model="gemini-2.0-flash",
             contents=system_prompt,
-            config=types.GenerateContentConfig(temperature=0.7)
+            config=types.GenerateContentConfig(temperature=0.7),
+            cache=use_cache,
         )
 
         result = response.text.strip()
@@ -1458,8 +1336,6 @@ async def generate_sub_scene_prompt(
             "runway_prompt": "英語プロンプト（連続性付き）"
         }
     """
-    client = get_gemini_client()
-
     # テンプレートを読み込み
     template = load_prompt_template(video_provider)
     provider_name = "Google Veo 2" if video_provider == "veo" else "Runway Gen-3 Alpha"
@@ -1517,7 +1393,7 @@ IMPORTANT:
 """
 
     try:
-        response = client.models.generate_content(
+        response = await get_gemini_gateway().generate_content(
             model="gemini-2.0-flash",
             contents=system_prompt,
             config=types.GenerateContentConfig(temperature=0.7)
@@ -1615,10 +1491,81 @@ async def generate_ad_script(
             ]
         }
     """
-    import uuid
+    system_prompt = _build_ad_script_prompt(description, target_duration, aspect_ratio)
+
+    try:
+        response = await get_gemini_gateway().generate_content(
+            model="gemini-2.0-flash",
+            contents=system_prompt,
+            config=types.GenerateContentConfig(temperature=0.8)
+        )
+
+        script_data = _parse_ad_script(response.text)
+        cuts = [_normalize_ad_cut(cut, i) for i, cut in enumerate(script_data.get("cuts", []))]
+        return _finalize_ad_script(script_data, cuts)
+
+    except Exception as e:
+        logger.exception(f"Ad script generation failed: {e}")
+        # フォールバック: 基本的なAIDA構成を返す
+        return _fallback_ad_script(target_duration)
 
-    client = get_gemini_client()
 
+async def stream_ad_script(
+    description: str,
+    target_duration: int | None = None,
+    aspect_ratio: str = "9:16"
+) -> AsyncIterator[tuple[str, dict]]:
+    """
+    generate_ad_script のストリーミング版
+
+    Geminiのストリーミング応答を逐次パースし、カットが完成するたびにIDを付与して返す。
+    最後に generate_ad_script と同じ正規化・フォールバックを通した全体を返す
+    （途中で返したカットのIDはそのまま使う）。
+
+    Yields:
+        tuple[str, dict]:
+            ("meta", {"theory": str, "theory_label": str})  # 広告理論が確定した時点
+            ("cut", cut)                                    # カットが完成するたびに
+            ("done", script)                                # 全体（失敗時はフォールバック）
+    """
+    system_prompt = _build_ad_script_prompt(description, target_duration, aspect_ratio)
+    parser = IncrementalJsonParser("cuts")
+    cuts: list[dict] = []
+    meta_sent = False
+
+    try:
+        async for chunk in get_gemini_gateway().generate_content_stream(
+            model="gemini-2.0-flash",
+            contents=system_prompt,
+            config=types.GenerateContentConfig(temperature=0.8)
+        ):
+            items = parser.feed(chunk)
+            if not meta_sent and (items or {"theory", "theory_label"} <= parser.fields.keys()):
+                meta_sent = True
+                yield "meta", {
+                    "theory": _normalize_ad_theory(parser.fields.get("theory", "aida")),
+                    "theory_label": parser.fields.get("theory_label", "AIDA法"),
+                }
+            for item in items:
+                if isinstance(item, dict):
+                    cut = _normalize_ad_cut(item, len(cuts))
+                    cuts.append(cut)
+                    yield "cut", cut
+
+        script_data = _parse_ad_script(parser.text)
+        if len(cuts) != len(script_data.get("cuts", [])):
+            cuts = [_normalize_ad_cut(cut, i) for i, cut in enumerate(script_data.get("cuts", []))]
+        script = _finalize_ad_script(script_data, cuts)
+
+    except Exception as e:
+        logger.exception(f"Ad script streaming failed: {e}")
+        script = _fallback_ad_script(target_duration)
+
+    yield "done", script
+
+
+def _build_ad_script_prompt(description: str, target_duration: int | None, aspect_ratio: str) -> str:
+    """広告脚本生成のプロンプトを組み立てる"""
     # 尺の指示
     duration_instruction = ""
     if target_duration:
@@ -1723,111 +1670,111 @@ async def generate_ad_script(
 
 出力はJSONのみ。説明や前置きは不要。
 """
+    return system_prompt
 
-    try:
-        response = client.models.generate_content(
-            model="gemini-2.0-flash",
-            contents=system_prompt,
-            config=types.GenerateContentConfig(temperature=0.8)
-        )
 
-        result_text = response.text.strip()
+def _parse_ad_script(text: str) -> dict:
+    """広告脚本の応答をパース（```json ... ``` を除去）"""
+    result_text = text.strip()
 
-        # ```json ... ``` を除去
-        if result_text.startswith("```"):
-            lines = result_text.split("\n")
-            result_text = "\n".join(lines[1:-1])
+    # ```json ... ``` を除去
+    if result_text.startswith("```"):
+        lines = result_text.split("\n")
+        result_text = "\n".join(lines[1:-1])
 
-        script_data = json.loads(result_text)
+    return json.loads(result_text)
 
-        # IDを生成
-        script_id = f"script_{uuid.uuid4().hex[:12]}"
 
-        # カットにIDを付与
-        cuts_with_ids = []
-        for i, cut in enumerate(script_data.get("cuts", [])):
-            cut_with_id = {
-                "id": f"cut_{uuid.uuid4().hex[:8]}",
-                "cut_number": cut.get("cut_number", i + 1),
-                "scene_type": cut.get("scene_type", "unknown"),
-                "scene_type_label": cut.get("scene_type_label", "シーン"),
-                "description_ja": cut.get("description_ja", ""),
-                "description_en": cut.get("description_en", ""),
-                "duration": cut.get("duration", 5),
-            }
-            cuts_with_ids.append(cut_with_id)
+def _normalize_ad_cut(cut: dict, index: int) -> dict:
+    """カットにIDを付与し、欠けた項目を補う"""
+    import uuid
 
-        # 合計秒数を計算
-        total_duration = sum(cut["duration"] for cut in cuts_with_ids)
+    return {
+        "id": f"cut_{uuid.uuid4().hex[:8]}",
+        "cut_number": cut.get("cut_number", index + 1),
+        "scene_type": cut.get("scene_type", "unknown"),
+        "scene_type_label": cut.get("scene_type_label", "シーン"),
+        "description_ja": cut.get("description_ja", ""),
+        "description_en": cut.get("description_en", ""),
+        "duration": cut.get("duration", 5),
+    }
 
-        # theoryを小文字に正規化（Geminiが大文字で返す場合があるため）
-        theory_raw = script_data.get("theory", "aida")
-        theory = theory_raw.lower() if isinstance(theory_raw, str) else "aida"
 
-        # 有効な理論かチェック
-        valid_theories = ["aida", "pasona", "kishoutenketsu", "storytelling"]
-        if theory not in valid_theories:
-            theory = "aida"
+def _normalize_ad_theory(theory_raw) -> str:
+    """theoryを小文字に正規化（Geminiが大文字で返す場合があるため）し、不明な理論はaidaにする"""
+    theory = theory_raw.lower() if isinstance(theory_raw, str) else "aida"
 
-        return {
-            "id": script_id,
-            "theory": theory,
-            "theory_label": script_data.get("theory_label", "AIDA法"),
-            "total_duration": total_duration,
-            "cuts": cuts_with_ids,
-        }
+    # 有効な理論かチェック
+    valid_theories = ["aida", "pasona", "kishoutenketsu", "storytelling"]
+    if theory not in valid_theories:
+        theory = "aida"
+    return theory
 
-    except Exception as e:
-        logger.exception(f"Ad script generation failed: {e}")
-        # フォールバック: 基本的なAIDA構成を返す
-        import uuid
-        script_id = f"script_{uuid.uuid4().hex[:12]}"
-        fallback_duration = target_duration or 30
 
-        return {
-            "id": script_id,
-            "theory": "aida",
-            "theory_label": "AIDA法（注目→興味→欲求→行動）",
-            "total_duration": fallback_duration,
-            "cuts": [
-                {
-                    "id": f"cut_{uuid.uuid4().hex[:8]}",
-                    "cut_number": 1,
-                    "scene_type": "attention",
-                    "scene_type_label": "注目",
-                    "description_ja": "視聴者の注意を引くインパクトのあるシーン",
-                    "description_en": "Eye-catching opening scene that grabs viewer attention, dynamic camera movement",
-                    "duration": max(3, fallback_duration // 4),
-                },
-                {
-                    "id": f"cut_{uuid.uuid4().hex[:8]}",
-                    "cut_number": 2,
-                    "scene_type": "interest",
-                    "scene_type_label": "興味",
-                    "description_ja": "商品やサービスに興味を持たせるシーン",
-                    "description_en": "Scene showcasing the product or service features, building curiosity",
-                    "duration": max(4, fallback_duration // 4),
-                },
-                {
-                    "id": f"cut_{uuid.uuid4().hex[:8]}",
-                    "cut_number": 3,
-                    "scene_type": "desire",
-                    "scene_type_label": "欲求",
-                    "description_ja": "商品を欲しいと思わせるシーン",
-                    "description_en": "Scene creating desire, showing benefits and positive outcomes",
-                    "duration": max(4, fallback_duration // 4),
-                },
-                {
-                    "id": f"cut_{uuid.uuid4().hex[:8]}",
-                    "cut_number": 4,
-                    "scene_type": "action",
-                    "scene_type_label": "行動",
-                    "description_ja": "行動を促すCTA（コール・トゥ・アクション）",
-                    "description_en": "Call to action with product display and purchase prompt",
-                    "duration": max(3, fallback_duration - (fallback_duration // 4) * 3),
-                },
-            ],
-        }
+def _finalize_ad_script(script_data: dict, cuts: list[dict]) -> dict:
+    """IDを付与したカットから脚本全体を組み立てる"""
+    import uuid
+
+    return {
+        "id": f"script_{uuid.uuid4().hex[:12]}",
+        "theory": _normalize_ad_theory(script_data.get("theory", "aida")),
+        "theory_label": script_data.get("theory_label", "AIDA法"),
+        # 合計秒数を計算
+        "total_duration": sum(cut["duration"] for cut in cuts),
+        "cuts": cuts,
+    }
+
+
+def _fallback_ad_script(target_duration: int | None) -> dict:
+    """生成に失敗した場合の基本的なAIDA構成"""
+    import uuid
+    script_id = f"script_{uuid.uuid4().hex[:12]}"
+    fallback_duration = target_duration or 30
+
+    return {
+        "id": script_id,
+        "theory": "aida",
+        "theory_label": "AIDA法（注目→興味→欲求→行動）",
+        "total_duration": fallback_duration,
+        "cuts": [
+            {
+                "id": f"cut_{uuid.uuid4().hex[:8]}",
+                "cut_number": 1,
+                "scene_type": "attention",
+                "scene_type_label": "注目",
+                "description_ja": "視聴者の注意を引くインパクトのあるシーン",
+                "description_en": "Eye-catching opening scene that grabs viewer attention, dynamic camera movement",
+                "duration": max(3, fallback_duration // 4),
+            },
+            {
+                "id": f"cut_{uuid.uuid4().hex[:8]}",
+                "cut_number": 2,
+                "scene_type": "interest",
+                "scene_type_label": "興味",
+                "description_ja": "商品やサービスに興味を持たせるシーン",
+                "description_en": "Scene showcasing the product or service features, building curiosity",
+                "duration": max(4, fallback_duration // 4),
+            },
+            {
+                "id": f"cut_{uuid.uuid4().hex[:8]}",
+                "cut_number": 3,
+                "scene_type": "desire",
+                "scene_type_label": "欲求",
+                "description_ja": "商品を欲しいと思わせるシーン",
+                "description_en": "Scene creating desire, showing benefits and positive outcomes",
+                "duration": max(4, fallback_duration // 4),
+            },
+            {
+                "id": f"cut_{uuid.uuid4().hex[:8]}",
+                "cut_number": 4,
+                "scene_type": "action",
+                "scene_type_label": "行動",
+                "description_ja": "行動を促すCTA（コール・トゥ・アクション）",
+                "description_en": "Call to action with product display and purchase prompt",
+                "duration": max(3, fallback_duration - (fallback_duration // 4) * 3),
+            },
+        ],
+    }
 
 
 
@@ -1877,13 +1824,12 @@ async def _translate_text_to_english(text: str) -> str:
     """
     日本語テキストを英語に翻訳
     """
-    client = get_gemini_client()
-
     try:
-        response = client.models.generate_content(
+        response = await get_gemini_gateway().generate_content(
             model="gemini-2.0-flash",
             contents=f"Translate the following Japanese text to English. Return ONLY the English translation, nothing else:\n\n{text}",
-            config=types.GenerateContentConfig(temperature=0.3)
+            config=types.GenerateContentConfig(temperature=0.3),
+            cache=True,
         )
         result = response.text.strip()
         # クォートを除去
@@ -1894,11 +1840,87 @@ async def _translate_text_to_english(text: str) -> str:
         return text
 
 
+def _parse_batch_translation(text: str, count: int) -> dict[int, str]:
+    """
+    まとめて翻訳した応答（{"1": "...", "2": "..."}）を検証
+
+    英語の文字列として返ってきた番号のみを返す（欠けた・不正な番号は個別翻訳にフォールバック）
+    """
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return {}
+    if not isinstance(data, dict):
+        return {}
+
+    translations = {}
+    for index in range(count):
+        value = data.get(str(index + 1))
+        if isinstance(value, str):
+            value = value.strip().strip('"\'')
+            if value and _is_likely_english(value):
+                translations[index] = value
+    return translations
+
+
+async def translate_texts_to_english(texts: list[str]) -> list[str]:
+    """
+    複数の日本語テキストを1回のリクエストでまとめて英語に翻訳
+
+    - 既に英語のテキスト・重複するテキストはリクエストに含めない
+    - まとめた翻訳で得られなかったテキストは個別に翻訳（失敗時は元のテキスト）
+
+    Args:
+        texts: テキストのリスト
+
+    Returns:
+        list[str]: 英語に変換されたテキスト（入力と同じ順序）
+    """
+    pending = list(dict.fromkeys(text for text in texts if text and not _is_likely_english(text)))
+    if not pending:
+        return list(texts)
+
+    translated: dict[str, str] = {}
+    if len(pending) > 1:
+        numbered = {str(index + 1): text for index, text in enumerate(pending)}
+        try:
+            response = await get_gemini_gateway().generate_content(
+                model="gemini-2.0-flash",
+                contents=(
+                    "Translate each Japanese text in the following JSON object to English. "
+                    "Return a JSON object with the same keys, where each value is ONLY the English translation:\n\n"
+                    + json.dumps(numbered, ensure_ascii=False)
+                ),
+                config=types.GenerateContentConfig(
+                    temperature=0.3,
+                    response_mime_type="application/json",
+                ),
+                cache=True,
+            )
+            for index, value in _parse_batch_translation(response.text, len(pending)).items():
+                translated[pending[index]] = value
+        except Exception as e:
+            logger.warning(f"Batch translation failed, translating individually: {e}")
+
+    missing = [text for text in pending if text not in translated]
+    if missing:
+        if len(pending) > 1:
+            logger.warning(f"Batch translation missed {len(missing)}/{len(pending)} texts, translating individually")
+        for text, value in zip(missing, await asyncio.gather(*(_translate_text_to_english(t) for t in missing))):
+            translated[text] = value
+
+    return [translated.get(text, text) if text else text for text in texts]
+
+
+# 翻訳するテキストフィールド（ドロップダウン値は事前定義の英語に変換）
+_STRUCTURED_TEXT_FIELDS = ["subject", "background", "color_palette", "additional_notes"]
+
+
 async def translate_structured_input_to_english(structured_input: dict) -> dict:
     """
     構造化入力の日本語フィールドを英語に翻訳
 
-    - テキストフィールド（subject, background, color_palette, additional_notes）は翻訳
+    - テキストフィールド（subject, background, color_palette, additional_notes）はまとめて1回で翻訳
     - ドロップダウン値（subject_position, lighting, mood）は事前定義の英語値を使用
     - 既に英語の場合はそのまま返す
 
@@ -1908,6 +1930,41 @@ async def translate_structured_input_to_english(structured_input: dict) -> dict:
     Returns:
         dict: 英語に変換された構造化入力
     """
+    return (await translate_structured_inputs_to_english([structured_input]))[0]
+
+
+async def translate_structured_inputs_to_english(structured_inputs: list[dict]) -> list[dict]:
+    """
+    複数シーンの構造化入力をまとめて英語に翻訳
+
+    全シーンの未翻訳テキストフィールドを1回のリクエストで翻訳する。
+
+    Args:
+        structured_inputs: 構造化入力辞書のリスト
+
+    Returns:
+        list[dict]: 英語に変換された構造化入力（入力と同じ順序）
+    """
+    results = [_map_structured_options_to_english(structured_input) for structured_input in structured_inputs]
+
+    # テキストフィールドは翻訳（日本語の場合のみ）
+    fields = [
+        (result, field)
+        for result in results
+        for field in _STRUCTURED_TEXT_FIELDS
+        if result.get(field) and not _is_likely_english(result[field])
+    ]
+    if fields:
+        translations = await translate_texts_to_english([result[field] for result, field in fields])
+        for (result, field), value in zip(fields, translations):
+            logger.info(f"Translated {field}: {result[field]} -> {value}")
+            result[field] = value
+
+    return results
+
+
+def _map_structured_options_to_english(structured_input: dict) -> dict:
+    """構造化入力のドロップダウン値を事前定義の英語に変換（コピーを返す）"""
     result = structured_input.copy()
 
     # ドロップダウン値は事前定義の英語に変換
@@ -1929,15 +1986,6 @@ async def translate_structured_input_to_english(structured_input: dict) -> dict:
             result["mood"]
         )
 
-    # テキストフィールドは翻訳（日本語の場合のみ）
-    text_fields = ["subject", "background", "color_palette", "additional_notes"]
-
-    for field in text_fields:
-        value = result.get(field)
-        if value and not _is_likely_english(value):
-            result[field] = await _translate_text_to_english(value)
-            logger.info(f"Translated {field}: {value} -> {result[field]}")
-
     return result
 
 
@@ -1947,6 +1995,7 @@ async def generate_image_prompt_from_scene(
     aspect_ratio: str = "9:16",
     structured_input: dict | None = None,
     reference_image_url: str | None = None,
+    use_cache: bool = True,
 ) -> tuple[str, str]:
     """
     脚本または構造化入力から画像生成用プロンプトを生成
@@ -1957,33 +2006,32 @@ async def generate_image_prompt_from_scene(
         aspect_ratio: アスペクト比
         structured_input: 構造化入力（Text-to-Image用、英語に翻訳済み）
         reference_image_url: 参照画像URL（オプション、マルチモーダル入力用）
+        use_cache: 同じ入力の生成結果を再利用する（Falseの場合は毎回生成）
 
     Returns:
         tuple[str, str]: (日本語プロンプト, 英語プロンプト)
     """
-    client = get_gemini_client()
-
     # アスペクト比の説明
     aspect_desc = "縦長（9:16）" if aspect_ratio == "9:16" else "横長（16:9）"
 
     # 構造化入力がある場合は新しいモードを使用
     if structured_input:
         return await _generate_prompt_from_structured_input(
-            client, structured_input, aspect_ratio, aspect_desc, reference_image_url
+            structured_input, aspect_ratio, aspect_desc, reference_image_url, use_cache
         )
 
     # 従来モード: description_ja + dialogue
     return await _generate_prompt_from_description(
-        client, description_ja, dialogue, aspect_ratio, aspect_desc
+        description_ja, dialogue, aspect_ratio, aspect_desc, use_cache
     )
 
 
 async def _generate_prompt_from_structured_input(
-    client,
     structured_input: dict,
     aspect_ratio: str,
     aspect_desc: str,
     reference_image_url: str | None = None,
+    use_cache: bool = True,
 ) -> tuple[str, str]:
     """
     構造化入力からプロンプトを生成（Text-to-Image用）
@@ -2190,13 +2238,8 @@ Output in JSON format:
             # 参照画像をダウンロード
             logger.info(f"Downloading reference image for prompt generation: {reference_image_url}")
             try:
-                async with httpx.AsyncClient() as http_client:
-                    img_response = await http_client.get(reference_image_url, timeout=30.0)
-                    img_response.raise_for_status()
-                    image_data = img_response.content
-
-                # 画像をコンテンツに追加
-                contents.append(types.Part.from_bytes(data=image_data, mime_type="image/jpeg"))
+                # 画像を解析用の大きさに縮小してコンテンツに追加
+                contents.append(await get_llm_media().fetch_image_part(reference_image_url))
                 logger.info("Reference image added to prompt generation request")
             except Exception as e:
                 logger.warning(f"Failed to download reference image, proceeding without it: {e}")
@@ -2204,13 +2247,14 @@ Output in JSON format:
         # テキストプロンプトを追加
         contents.append(user_prompt)
 
-        response = client.models.generate_content(
+        response = await get_gemini_gateway().generate_content(
             model="gemini-2.0-flash",
             contents=contents,
             config=types.GenerateContentConfig(
                 system_instruction=system_prompt,
                 response_mime_type="application/json",
-            )
+            ),
+            cache=use_cache,
         )
 
         result_text = response.text.strip()
@@ -2263,11 +2307,11 @@ def _build_fallback_prompt_from_structured(structured_input: dict, aspect_ratio:
 
 
 async def _generate_prompt_from_description(
-    client,
     description_ja: str | None,
     dialogue: str | None,
     aspect_ratio: str,
     aspect_desc: str,
+    use_cache: bool = True,
 ) -> tuple[str, str]:
     """
     従来モード: 脚本とセリフからプロンプトを生成
@@ -2352,13 +2396,14 @@ JSON形式で出力:
 """
 
     try:
-        response = client.models.generate_content(
+        response = await get_gemini_gateway().generate_content(
             model="gemini-2.0-flash",
             contents=user_prompt,
             config=types.GenerateContentConfig(
                 system_instruction=system_prompt,
                 response_mime_type="application/json",
-            )
+            ),
+            cache=use_cache,
         )
 
         result_text = response.text.strip()
@@ -2410,7 +2455,8 @@ JSON形式で出力:
 async def convert_to_flux_json_prompt(
     description_ja: str,
     negative_prompt_ja: str | None = None,
-    aspect_ratio: str = "9:16"
+    aspect_ratio: str = "9:16",
+    use_cache: bool = True,
 ) -> dict:
     """
     日本語の説明文をFLUX.2用のJSON構造化プロンプト（英語）に変換
@@ -2419,6 +2465,7 @@ async def convert_to_flux_json_prompt(
         description_ja: 日本語の画像説明
         negative_prompt_ja: 日本語のネガティブプロンプト（オプション）
         aspect_ratio: アスペクト比 ("9:16" or "16:9")
+        use_cache: 同じ入力の変換結果を再利用する（Falseの場合は毎回生成）
 
     Returns:
         dict: {
@@ -2427,8 +2474,6 @@ async def convert_to_flux_json_prompt(
             "preview": dict  # パース済みのJSONオブジェクト（プレビュー用）
         }
     """
-    client = get_gemini_client()
-
     # アスペクト比に応じた構図ヒント
     composition_hint = "vertical portrait composition, 9:16 aspect ratio" if aspect_ratio == "9:16" else "horizontal landscape composition, 16:9 aspect ratio"
 
@@ -2468,10 +2513,11 @@ Example output:
 
     try:
         # メインプロンプトの変換
-        response = client.models.generate_content(
+        response = await get_gemini_gateway().generate_content(
             model="gemini-2.0-flash",
             contents=f"{system_prompt}\n\nJapanese description to convert:\n{description_ja}",
-            config=types.GenerateContentConfig(temperature=0.4)
+            config=types.GenerateContentConfig(temperature=0.4),
+            cache=use_cache,
         )
 
         json_text = response.text.strip()
@@ -2496,7 +2542,7 @@ Example output:
         # ネガティブプロンプトの変換（指定がある場合）
         negative_prompt_en = None
         if negative_prompt_ja and negative_prompt_ja.strip():
-            neg_response = client.models.generate_content(
+            neg_response = await get_gemini_gateway().generate_content(
                 model="gemini-2.0-flash",
                 contents=(
                     "Translate the following Japanese negative prompt to English. "
@@ -2504,7 +2550,8 @@ Example output:
                     "Keep it concise and technical.\n\n"
                     f"Japanese: {negative_prompt_ja}"
                 ),
-                config=types.GenerateContentConfig(temperature=0.2)
+                config=types.GenerateContentConfig(temperature=0.2),
+                cache=True,
             )
             negative_prompt_en = neg_response.text.strip()
             negative_prompt_en = negative_prompt_en.strip('"\'')
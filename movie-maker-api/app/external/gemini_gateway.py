@@ -0,0 +1,463 @@
+"""
+Gemini APIの非同期ゲートウェイ
+
+全てのGemini呼び出し（プロンプト最適化・ストーリーボード生成・画像生成・BGM分析等）はここを通す。
+
+- 非同期クライアント（client.aio）をイベントループごとに1つ共有し、HTTP接続を再利用する
+  （同期の generate_content はイベントループを数秒止めていた）。
+  バックグラウンドタスクは asyncio.run で別のイベントループを使うため、
+  クライアントはそのループの終了時（shutdown_asyncgens）に閉じる
+- モデルごとの同時実行数の上限（プロセス全体で共有、画像生成モデルは別枠で少なめ）
+- 呼び出し全体の期限（リトライを含む）と、一時的なエラーのジッター付き再試行
+- モデルごとのレイテンシ・エラー・再試行回数の統計（/health/gemini）
+- 決定的に使う呼び出し（cache=True）の応答キャッシュ（app.services.llm_cache）
+- ストリーミング（generate_content_stream）: 生成途中のテキストを順に受け取る
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Optional
+
+import aiohttp
+import httpx
+from google import genai
+from google.genai import errors, types
+
+from app.core.config import settings
+from app.services.llm_cache import get_llm_cache
+
+logger = logging.getLogger(__name__)
+
+# 再試行するHTTPステータス（レート制限・サーバー側の一時的なエラー）
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+# 再試行の待機時間（指数バックオフ + フルジッター）
+RETRY_BASE_SECONDS = 1.0
+RETRY_MAX_SECONDS = 8.0
+
+# パーセンタイル計算に使う直近のレイテンシの件数
+LATENCY_WINDOW = 200
+
+
+class GeminiTimeoutError(Exception):
+    """期限内にGeminiの応答が得られなかった"""
+    pass
+
+
+def is_image_model(model: str) -> bool:
+    """画像生成モデルか（同時実行数・期限を別に設定する）"""
+    return "image" in model
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, errors.APIError):
+        return error.code in RETRYABLE_STATUS_CODES
+    # 接続エラー等（google-genai は httpx、aiohttp がある場合は非同期側で aiohttp を使う）
+    return isinstance(
+        error,
+        (ConnectionError, OSError, httpx.TransportError, aiohttp.ClientError),
+    )
+
+
+class _Waiter:
+    """枠待ちの呼び出し（待っているイベントループとFuture）"""
+
+    __slots__ = ("loop", "future", "granted")
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.future: asyncio.Future = loop.create_future()
+        self.granted = False
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class _ConcurrencyLimiter:
+    """
+    イベントループをまたいで共有する同時実行数の上限
+
+    asyncio.Semaphore はループごとにしか効かないため、threading.Lock で枠を管理し、
+    待機中の呼び出しはそれぞれのイベントループ上で起こす（FIFO）。
+    """
+
+    def __init__(self, limit: int):
+        self.limit = max(1, limit)
+        self._lock = threading.Lock()
+        self._in_use = 0
+        self._waiters: deque[_Waiter] = deque()
+
+    async def acquire(self) -> None:
+        with self._lock:
+            if not self._waiters and self._in_use < self.limit:
+                self._in_use += 1
+                return
+            waiter = _Waiter(asyncio.get_running_loop())
+            self._waiters.append(waiter)
+
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            with self._lock:
+                granted = waiter.granted
+                if not granted:
+                    try:
+                        self._waiters.remove(waiter)
+                    except ValueError:
+                        pass
+            if granted:
+                # 割り当て直後にキャンセルされた場合は枠を返却
+                self.release()
+            raise
+
+    def release(self) -> None:
+        with self._lock:
+            self._in_use -= 1
+            while self._waiters and self._in_use < self.limit:
+                waiter = self._waiters.popleft()
+                self._in_use += 1
+                waiter.granted = True
+                try:
+                    waiter.loop.call_soon_threadsafe(_resolve, waiter.future)
+                except RuntimeError:
+                    # 待っていたイベントループが既に閉じている
+                    waiter.granted = False
+                    self._in_use -= 1
+
+    @property
+    def in_use(self) -> int:
+        return self._in_use
+
+
+async def _close_with_loop(client: genai.Client, on_close) -> AsyncIterator[None]:
+    """
+    イベントループの終了時にクライアントを閉じるための非同期ジェネレータ
+
+    開始したまま保持しておくと、asyncio.run の終了処理（shutdown_asyncgens）で
+    aclose され、finally でそのループ上のクライアントを閉じる。
+    """
+    try:
+        yield
+    finally:
+        on_close()
+        await client.aio.aclose()
+
+
+class _ModelStats:
+    """モデルごとの統計"""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.timeouts = 0
+        self.running = 0
+        self.waiting = 0
+        self.latencies: deque[float] = deque(maxlen=LATENCY_WINDOW)
+
+    def snapshot(self) -> dict:
+        latencies = sorted(self.latencies)
+
+        def percentile(p: float) -> float:
+            if not latencies:
+                return 0.0
+            return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))], 3)
+
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "retries": self.retries,
+            "timeouts": self.timeouts,
+            "running": self.running,
+            "waiting": self.waiting,
+            "p50_seconds": percentile(0.5),
+            "p95_seconds": percentile(0.95),
+            "max_seconds": round(latencies[-1], 3) if latencies else 0.0,
+        }
+
+
+class GeminiGateway:
+    """Gemini APIの非同期ゲートウェイ"""
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+        image_max_concurrency: Optional[int] = None,
+        timeout_seconds: Optional[float] = None,
+        image_timeout_seconds: Optional[float] = None,
+        max_retries: Optional[int] = None,
+    ):
+        self.api_key = api_key
+        self.max_concurrency = max_concurrency or settings.GEMINI_MAX_CONCURRENCY
+        self.image_max_concurrency = image_max_concurrency or settings.GEMINI_IMAGE_MAX_CONCURRENCY
+        self.timeout_seconds = timeout_seconds or settings.GEMINI_TIMEOUT_SECONDS
+        self.image_timeout_seconds = image_timeout_seconds or settings.GEMINI_IMAGE_TIMEOUT_SECONDS
+        self.max_retries = settings.GEMINI_MAX_RETRIES if max_retries is None else max_retries
+
+        # クライアントはイベントループごと、同時実行数の上限はプロセス全体で共有する
+        self._lock = threading.Lock()
+        self._clients: dict[asyncio.AbstractEventLoop, tuple[genai.Client, AsyncIterator[None]]] = {}
+        self._limiters: dict[str, _ConcurrencyLimiter] = {}
+        self._stats: dict[str, _ModelStats] = {}
+
+    async def _get_client(self) -> genai.Client:
+        """実行中のイベントループ用のクライアント（なければ作成し、ループの終了時に閉じる）"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            # 終了処理を経ずに閉じたループのクライアントは閉じられないため破棄のみ
+            for closed in [other for other in self._clients if other.is_closed()]:
+                del self._clients[closed]
+            entry = self._clients.get(loop)
+        if entry is not None:
+            return entry[0]
+
+        client = genai.Client(api_key=self.api_key or settings.GOOGLE_API_KEY)
+        guard = _close_with_loop(client, lambda: self._forget_client(loop, client))
+        with self._lock:
+            self._clients[loop] = (client, guard)
+        await guard.__anext__()
+        return client
+
+    def _forget_client(self, loop: asyncio.AbstractEventLoop, client: genai.Client) -> None:
+        with self._lock:
+            entry = self._clients.get(loop)
+            if entry is not None and entry[0] is client:
+                del self._clients[loop]
+
+    def _limiter(self, model: str) -> _ConcurrencyLimiter:
+        with self._lock:
+            if model not in self._limiters:
+                limit = self.image_max_concurrency if is_image_model(model) else self.max_concurrency
+                self._limiters[model] = _ConcurrencyLimiter(limit)
+            return self._limiters[model]
+
+    def _model_stats(self, model: str) -> _ModelStats:
+        return self._stats.setdefault(model, _ModelStats())
+
+    async def generate_content(
+        self,
+        model: str,
+        contents: Any,
+        config: Optional[types.GenerateContentConfig] = None,
+        timeout: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        cache: bool = False,
+    ) -> types.GenerateContentResponse:
+        """
+        generate_content を非同期で実行
+
+        Args:
+            model: モデル名
+            contents: 入力（文字列・Partのリスト等）
+            config: 生成設定
+            timeout: 期限（秒、同時実行数の待ち・リトライを含む。Noneの場合は設定値）
+            max_retries: 一時的なエラーの再試行回数（Noneの場合は設定値）
+            cache: 同じ入力・設定の応答を再利用する（翻訳等の決定的な呼び出し用。
+                毎回異なる出力が必要な呼び出しでは False）
+
+        Returns:
+            GenerateContentResponse: Geminiの応答
+
+        Raises:
+            GeminiTimeoutError: 期限内に応答が得られない場合
+            google.genai.errors.APIError: 再試行しないエラー・再試行回数を超えた場合
+        """
+        if cache:
+            return await get_llm_cache().get_or_generate(
+                model,
+                contents,
+                config,
+                lambda: self.generate_content(model, contents, config, timeout, max_retries),
+            )
+
+        if timeout is None:
+            timeout = self.image_timeout_seconds if is_image_model(model) else self.timeout_seconds
+        retries = self.max_retries if max_retries is None else max_retries
+        deadline = time.monotonic() + timeout
+        stats = self._model_stats(model)
+        stats.calls += 1
+
+        attempt = 0
+        while True:
+            started = time.monotonic()
+            try:
+                return await asyncio.wait_for(
+                    self._call(model, contents, config, stats),
+                    timeout=max(0.0, deadline - started),
+                )
+            except asyncio.TimeoutError:
+                stats.timeouts += 1
+                stats.errors += 1
+                raise GeminiTimeoutError(f"Gemini {model} did not respond within {timeout:.0f}s")
+            except Exception as e:
+                delay = random.uniform(0, min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** attempt))
+                if attempt >= retries or not _is_retryable(e) or time.monotonic() + delay >= deadline:
+                    stats.errors += 1
+                    raise
+                attempt += 1
+                stats.retries += 1
+                logger.warning(f"Gemini {model} failed ({e}), retrying in {delay:.1f}s ({attempt}/{retries})")
+                await asyncio.sleep(delay)
+
+    async def _call(
+        self,
+        model: str,
+        contents: Any,
+        config: Optional[types.GenerateContentConfig],
+        stats: _ModelStats,
+    ) -> types.GenerateContentResponse:
+        limiter = self._limiter(model)
+        stats.waiting += 1
+        try:
+            await limiter.acquire()
+        finally:
+            stats.waiting -= 1
+
+        stats.running += 1
+        started = time.monotonic()
+        try:
+            client = await self._get_client()
+            response = await client.aio.models.generate_content(
+                model=model,
+                contents=contents,
+                config=config,
+            )
+            stats.latencies.append(time.monotonic() - started)
+            return response
+        finally:
+            stats.running -= 1
+            limiter.release()
+
+    async def generate_content_stream(
+        self,
+        model: str,
+        contents: Any,
+        config: Optional[types.GenerateContentConfig] = None,
+        timeout: Optional[float] = None,
+        max_retries: Optional[int] = None,
+    ) -> AsyncIterator[str]:
+        """
+        generate_content をストリーミングで実行し、生成されたテキストを順に返す
+
+        再試行は最初のチャンクを受け取る前のエラーのみ（途中まで返したテキストと重複させない）。
+        同時実行数の枠はストリームを読み終えるまで保持する。
+
+        Args:
+            model: モデル名
+            contents: 入力（文字列・Partのリスト等）
+            config: 生成設定
+            timeout: 期限（秒、ストリーム全体。Noneの場合は設定値）
+            max_retries: 一時的なエラーの再試行回数（Noneの場合は設定値）
+
+        Yields:
+            str: 生成されたテキストの断片
+
+        Raises:
+            GeminiTimeoutError: 期限内にストリームが終わらない場合
+            google.genai.errors.APIError: 再試行しないエラー・再試行回数を超えた場合
+        """
+        if timeout is None:
+            timeout = self.image_timeout_seconds if is_image_model(model) else self.timeout_seconds
+        retries = self.max_retries if max_retries is None else max_retries
+        deadline = time.monotonic() + timeout
+        stats = self._model_stats(model)
+        stats.calls += 1
+
+        def remaining() -> float:
+            return max(0.0, deadline - time.monotonic())
+
+        limiter = self._limiter(model)
+        stats.waiting += 1
+        try:
+            await asyncio.wait_for(limiter.acquire(), timeout=remaining())
+        except asyncio.TimeoutError:
+            stats.timeouts += 1
+            stats.errors += 1
+            raise GeminiTimeoutError(f"Gemini {model} did not respond within {timeout:.0f}s")
+        finally:
+            stats.waiting -= 1
+
+        stats.running += 1
+        started = time.monotonic()
+        attempt = 0
+        received = False
+        try:
+            while True:
+                try:
+                    client = await self._get_client()
+                    stream = await asyncio.wait_for(
+                        client.aio.models.generate_content_stream(
+                            model=model,
+                            contents=contents,
+                            config=config,
+                        ),
+                        timeout=remaining(),
+                    )
+                    iterator = stream.__aiter__()
+                    while True:
+                        try:
+                            chunk = await asyncio.wait_for(iterator.__anext__(), timeout=remaining())
+                        except StopAsyncIteration:
+                            break
+                        text = chunk.text if chunk.candidates else None
+                        if text:
+                            received = True
+                            yield text
+                    stats.latencies.append(time.monotonic() - started)
+                    return
+                except asyncio.TimeoutError:
+                    stats.timeouts += 1
+                    stats.errors += 1
+                    raise GeminiTimeoutError(f"Gemini {model} did not finish streaming within {timeout:.0f}s")
+                except GeminiTimeoutError:
+                    raise
+                except Exception as e:
+                    delay = random.uniform(0, min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** attempt))
+                    if (
+                        received
+                        or attempt >= retries
+                        or not _is_retryable(e)
+                        or time.monotonic() + delay >= deadline
+                    ):
+                        stats.errors += 1
+                        raise
+                    attempt += 1
+                    stats.retries += 1
+                    logger.warning(f"Gemini {model} stream failed ({e}), retrying in {delay:.1f}s ({attempt}/{retries})")
+                    await asyncio.sleep(delay)
+        finally:
+            stats.running -= 1
+            limiter.release()
+
+    async def aclose(self) -> None:
+        """実行中のイベントループのクライアントを閉じる（シャットダウン時）"""
+        with self._lock:
+            entry = self._clients.get(asyncio.get_running_loop())
+        if entry is not None:
+            # finally でクライアントを閉じ、一覧から外す
+            await entry[1].aclose()
+
+    def stats(self) -> dict:
+        """モデルごとの呼び出し状況（監視用）"""
+        return {
+            "max_concurrency": self.max_concurrency,
+            "image_max_concurrency": self.image_max_concurrency,
+            "cache": get_llm_cache().stats(),
+            "models": {model: stats.snapshot() for model, stats in self._stats.items()},
+        }
+
+
+# シングルトンインスタンス
+gemini_gateway = GeminiGateway()
+
+
+def get_gemini_gateway() -> GeminiGateway:
+    """GeminiGatewayのインスタンスを取得"""
+    return gemini_gateway
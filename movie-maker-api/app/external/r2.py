@@ -1,24 +1,15 @@
 import asyncio
-import io
 import logging
 
 import boto3
 from botocore.config import Config
 from botocore.exceptions import ClientError
-from PIL import Image
-from PIL.Image import Image as PILImage
-from PIL import UnidentifiedImageError
 
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
 
-class WebPConversionError(Exception):
-    """WebP変換エラー"""
-    pass
-
-
 def get_r2_client():
     """Cloudflare R2クライアントを取得（S3互換）"""
     if not settings.R2_ACCOUNT_ID or not settings.R2_ACCESS_KEY_ID or not settings.R2_SECRET_ACCESS_KEY:
@@ -41,124 +32,72 @@ def get_public_url(key: str) -> str:
     return f"https://{settings.R2_BUCKET_NAME}.r2.dev/{key}"
 
 
-def convert_to_webp(
-    image_content: bytes,
-    quality: int = 85,
-    max_size: tuple[int, int] | None = None
-) -> bytes:
-    """
-    画像をWebP形式に変換（同期関数）
-    """
-    try:
-        img: PILImage = Image.open(io.BytesIO(image_content))
-    except UnidentifiedImageError as e:
-        logger.warning(f"Failed to identify image format: {e}")
-        raise WebPConversionError(f"Invalid or corrupted image: {e}") from e
-    except Exception as e:
-        logger.warning(f"Failed to open image: {e}")
-        raise WebPConversionError(f"Failed to open image: {e}") from e
-
-    try:
-        if img.mode == 'RGBA':
-            pass
-        elif img.mode == 'P' and 'transparency' in img.info:
-            img = img.convert('RGBA')
-        elif img.mode not in ('RGB', 'RGBA'):
-            img = img.convert('RGB')
-
-        if max_size:
-            img.thumbnail(max_size, Image.Resampling.LANCZOS)
-
-        output = io.BytesIO()
-        img.save(output, format='WEBP', quality=quality, method=6)
-        output.seek(0)
-        return output.read()
-    except Exception as e:
-        logger.warning(f"Failed to convert image to WebP: {e}")
-        raise WebPConversionError(f"Failed to convert image to WebP: {e}") from e
-
-
-def _get_base_filename(filename: str) -> str:
-    if '.' in filename:
-        return filename.rsplit('.', 1)[0]
-    return filename
+def key_from_public_url(url: str) -> str | None:
+    """公開URLからR2オブジェクトキーを取得（このバケットのURLでない場合はNone）"""
+    base = get_public_url("")
+    if url.startswith(base) and len(url) > len(base):
+        return url[len(base):].split("?", 1)[0]
+    return None
 
 
 def _upload_to_r2_sync(client, bucket: str, key: str, body: bytes, content_type: str, cache_control: str) -> None:
     client.put_object(Bucket=bucket, Key=key, Body=body, ContentType=content_type, CacheControl=cache_control)
 
 
-async def upload_image(file_content: bytes, filename: str) -> str:
-    """画像をR2にアップロード"""
-    client = get_r2_client()
-    key = f"images/{filename}"
+def _upload_file_to_r2_sync(client, bucket: str, key: str, path: str, content_type: str, cache_control: str) -> None:
+    # ファイルハンドルから送信（大きなファイルはマルチパートアップロード）
+    with open(path, "rb") as f:
+        client.upload_fileobj(
+            f, bucket, key,
+            ExtraArgs={"ContentType": content_type, "CacheControl": cache_control},
+        )
 
-    # Content-Typeを推測
-    content_type = "image/jpeg"
-    if filename.lower().endswith(".png"):
-        content_type = "image/png"
-    elif filename.lower().endswith(".webp"):
-        content_type = "image/webp"
 
-    client.put_object(
-        Bucket=settings.R2_BUCKET_NAME,
-        Key=key,
-        Body=file_content,
-        ContentType=content_type,
-        CacheControl="public, max-age=31536000, immutable",
+async def upload_local_file(path: str, key: str, content_type: str) -> str:
+    """ローカルファイルをメモリに読み込まずにR2へアップロード"""
+    client = get_r2_client()
+    await asyncio.to_thread(
+        _upload_file_to_r2_sync, client, settings.R2_BUCKET_NAME, key,
+        path, content_type, "public, max-age=31536000, immutable"
     )
-
     return get_public_url(key)
 
 
-async def upload_image_with_webp(file_content: bytes, filename: str) -> tuple[str, str]:
-    """画像をオリジナルとWebP両方でアップロード"""
+async def upload_image(file_content: bytes, filename: str) -> str:
+    """画像をR2にアップロード"""
     client = get_r2_client()
+    key = f"images/{filename}"
 
-    # Determine content type
-    original_key = f"images/{filename}"
+    # Content-Typeを推測
     content_type = "image/jpeg"
     if filename.lower().endswith(".png"):
         content_type = "image/png"
     elif filename.lower().endswith(".webp"):
         content_type = "image/webp"
-    elif filename.lower().endswith(".gif"):
-        content_type = "image/gif"
 
-    # Upload original
+    # イベントループをブロックしないようスレッドで送信（複数画像を並行してアップロードできる）
     await asyncio.to_thread(
-        _upload_to_r2_sync, client, settings.R2_BUCKET_NAME, original_key,
+        _upload_to_r2_sync, client, settings.R2_BUCKET_NAME, key,
         file_content, content_type, "public, max-age=31536000, immutable"
     )
-    original_url = get_public_url(original_key)
-
-    # Convert and upload WebP
-    webp_content = await asyncio.to_thread(convert_to_webp, file_content)
-    base_filename = _get_base_filename(filename)
-    webp_key = f"images/webp/{base_filename}.webp"
-    await asyncio.to_thread(
-        _upload_to_r2_sync, client, settings.R2_BUCKET_NAME, webp_key,
-        webp_content, "image/webp", "public, max-age=31536000, immutable"
-    )
-    webp_url = get_public_url(webp_key)
 
-    return original_url, webp_url
+    return get_public_url(key)
 
 
 async def upload_image_optional_webp(
     file_content: bytes, filename: str, generate_webp: bool = True
 ) -> tuple[str, str | None]:
-    """画像アップロード（WebP生成はオプション）"""
-    if generate_webp:
-        try:
-            return await upload_image_with_webp(file_content, filename)
-        except WebPConversionError as e:
-            logger.warning(f"WebP conversion failed, uploading original only: {e}")
-            original_url = await upload_image(file_content, filename)
-            return original_url, None
-    else:
-        original_url = await upload_image(file_content, filename)
+    """
+    画像アップロード（WebPはオンデマンド変換のURLを返す）
+
+    WebPはアップロード時には作らず、最初に表示されたときに画像バリアントAPIで作成する。
+    """
+    from app.services.image_variants import ImageFormat, variant_url
+
+    original_url = await upload_image(file_content, filename)
+    if not generate_webp:
         return original_url, None
+    return original_url, variant_url(f"images/{filename}", image_format=ImageFormat.WEBP)
 
 
 async def upload_video(file_content: bytes, filename: str) -> str:
@@ -177,12 +116,13 @@ async def upload_video(file_content: bytes, filename: str) -> str:
     return get_public_url(key)
 
 
-async def upload_audio(file_content: bytes, filename: str) -> str:
-    """音声ファイルをR2にアップロード"""
-    client = get_r2_client()
-    key = f"bgm/{filename}"
+async def upload_video_file(path: str, filename: str, content_type: str = "video/mp4") -> str:
+    """ローカルの動画ファイルをR2にアップロード"""
+    return await upload_local_file(path, f"videos/{filename}", content_type)
 
-    # Content-Typeを推測
+
+def _audio_content_type(filename: str) -> str:
+    """音声ファイル名からContent-Typeを推測"""
     content_type = "audio/mpeg"
     if filename.lower().endswith(".wav"):
         content_type = "audio/wav"
@@ -192,18 +132,30 @@ async def upload_audio(file_content: bytes, filename: str) -> str:
         content_type = "audio/mp4"
     elif filename.lower().endswith(".aac"):
         content_type = "audio/aac"
+    return content_type
+
+
+async def upload_audio(file_content: bytes, filename: str) -> str:
+    """音声ファイルをR2にアップロード"""
+    client = get_r2_client()
+    key = f"bgm/{filename}"
 
     client.put_object(
         Bucket=settings.R2_BUCKET_NAME,
         Key=key,
         Body=file_content,
-        ContentType=content_type,
+        ContentType=_audio_content_type(filename),
         CacheControl="public, max-age=31536000, immutable",
     )
 
     return get_public_url(key)
 
 
+async def upload_audio_file(path: str, filename: str) -> str:
+    """ローカルの音声ファイルをR2にアップロード"""
+    return await upload_local_file(path, f"bgm/{filename}", _audio_content_type(filename))
+
+
 async def download_file(url: str) -> bytes:
     """外部URLからファイルをダウンロード（リダイレクト対応）"""
     import httpx
@@ -240,6 +192,55 @@ def generate_presigned_url(key: str, expires_in: int = 3600) -> str:
     )
 
 
+def generate_presigned_put_url(
+    key: str,
+    content_type: str,
+    content_length: int,
+    expires_in: int = 3600,
+) -> str:
+    """
+    アップロード用の署名付きURLを生成（クライアントからR2へ直接PUT）
+
+    Content-Type と Content-Length を署名に含めるため、
+    申告と異なるサイズ・形式のファイルはR2側で拒否される。
+    """
+    client = get_r2_client()
+    return client.generate_presigned_url(
+        "put_object",
+        Params={
+            "Bucket": settings.R2_BUCKET_NAME,
+            "Key": key,
+            "ContentType": content_type,
+            "ContentLength": content_length,
+            "CacheControl": "public, max-age=31536000, immutable",
+        },
+        ExpiresIn=expires_in,
+    )
+
+
+async def head_object(key: str) -> dict | None:
+    """R2オブジェクトのメタデータを取得（存在しない場合はNone）"""
+    client = get_r2_client()
+    try:
+        return await asyncio.to_thread(
+            client.head_object, Bucket=settings.R2_BUCKET_NAME, Key=key
+        )
+    except ClientError:
+        return None
+
+
+async def copy_object(source_key: str, dest_key: str) -> str:
+    """R2内でオブジェクトをコピー（サーバー側コピーのため本体はAPIを経由しない）"""
+    client = get_r2_client()
+    await asyncio.to_thread(
+        client.copy_object,
+        Bucket=settings.R2_BUCKET_NAME,
+        Key=dest_key,
+        CopySource={"Bucket": settings.R2_BUCKET_NAME, "Key": source_key},
+    )
+    return get_public_url(dest_key)
+
+
 class R2Client:
     """R2クライアントクラス（video_processorから使用）"""
 
@@ -279,5 +280,10 @@ async def upload_user_video(file_content: bytes, key: str, content_type: str) ->
     return get_public_url(key)
 
 
+async def upload_user_video_file(path: str, key: str, content_type: str) -> str:
+    """ローカルのユーザー動画ファイルをR2にアップロード（keyを直接指定）"""
+    return await upload_local_file(path, key, content_type)
+
+
 # グローバルインスタンス
 r2_client = R2Client()
@@ -0,0 +1 @@
+"""Image Variant Domain"""
@@ -0,0 +1,55 @@
+"""
+画像バリアントAPIルーター
+
+<img src> から直接参照するため認証は不要（元画像・バリアントはどちらも公開バケット）。
+"""
+import logging
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import RedirectResponse
+from PIL import Image
+
+from app.services.image_variants import (
+    ImageFormat,
+    ImageSourceNotFoundError,
+    ImageVariantError,
+    get_image_variant_service,
+    negotiate_format,
+)
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/images", tags=["images"])
+
+
+@router.get("/variant")
+async def get_image_variant(
+    key: str = Query(..., min_length=1, description="元画像のR2キー"),
+    w: Optional[int] = Query(None, ge=16, le=4096, description="幅（段階に切り上げ）"),
+    format: Optional[ImageFormat] = Query(None, description="出力形式（省略時はAcceptヘッダーから選択）"),
+    q: Optional[int] = Query(None, ge=1, le=100, description="品質（段階に切り上げ）"),
+    accept: Optional[str] = Header(None),
+):
+    """
+    画像バリアントを取得
+
+    初回は元画像から作成してR2に保存し、R2の公開URLへリダイレクトする。
+    リダイレクト先は不変なので、リダイレクト自体もキャッシュさせる。
+    """
+    image_format = format or negotiate_format(accept)
+    try:
+        variant = await get_image_variant_service().get_variant(
+            key, width=w, image_format=image_format, quality=q
+        )
+    except ImageSourceNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ImageVariantError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Image.DecompressionBombError as e:
+        # ピクセル数が上限を超える画像（展開するとメモリを使い切る）
+        raise HTTPException(status_code=400, detail=str(e))
+
+    headers = {"Cache-Control": "public, max-age=31536000, immutable"}
+    if format is None:
+        headers["Vary"] = "Accept"
+    return RedirectResponse(variant.url, status_code=302, headers=headers)
@@ -266,19 +266,22 @@ async def list_all_images(
     per_page: int = Query(20, ge=1, le=100),
     source_filter: str = Query("all"),  # "all", "library", "screenshot"
     category: Optional[ImageCategory] = None,
+    cursor: Optional[str] = None,
     current_user: dict = Depends(get_current_user),
 ):
     """
     統合画像一覧を取得（ライブラリ + スクリーンショット）
 
     フロントエンドで画像選択UIを表示する際に使用。
-    ライブラリ保存画像とスクリーンショットを統合して返す。
+    ライブラリ保存画像とスクリーンショットを作成日時の新しい順に統合して返す。
+    次のページは next_cursor を cursor に指定して取得する。
 
     Args:
-        page: ページ番号
+        page: ページ番号（cursor 指定時は無視）
         per_page: 1ページあたりの件数
         source_filter: ソースフィルタ ("all", "library", "screenshot")
         category: カテゴリフィルタ
+        cursor: 前のページの next_cursor
         current_user: 現在のユーザー情報
 
     Returns:
@@ -302,8 +305,14 @@ async def list_all_images(
             category=category.value if category else None,
             page=page,
             per_page=per_page,
+            cursor=cursor,
         )
         return result
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         logger.error(f"Failed to list all images: {e}")
         raise HTTPException(
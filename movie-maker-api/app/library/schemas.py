@@ -126,3 +126,5 @@ class UnifiedImageListResponse(BaseModel):
     total_screenshots: int
     page: int
     per_page: int
+    has_next: bool = False
+    next_cursor: str | None = None  # 次のページの取得に使う（created_at, id のキーセット）
@@ -1,9 +1,10 @@
 """Image Library Service Layer"""
+import asyncio
 import io
 import logging
 from uuid import uuid4
 
-from PIL import Image
+from PIL import Image, ImageOps, UnidentifiedImageError
 from supabase import Client
 
 from app.library.schemas import (
@@ -18,9 +19,20 @@ from app.library.schemas import (
     ScreenshotItem,
     UnifiedImageListResponse,
 )
+from app.services.pagination import (
+    apply_keyset,
+    cached_count,
+    decode_cursor,
+    get_count_cache,
+    row_cursor,
+    sort_key,
+)
 
 logger = logging.getLogger(__name__)
 
+# EXIFのOrientationタグ（5〜8は90度回転で縦横が入れ替わる）
+_EXIF_ORIENTATION = 0x0112
+
 
 # ===== Helper Functions =====
 
@@ -64,52 +76,108 @@ def _format_library_image(data: dict) -> dict:
     }
 
 
+def read_image_size(image_content: bytes) -> tuple[int, int]:
+    """
+    画像のヘッダーだけを読んでサイズを取得（ピクセルはデコードしない）
+
+    EXIFの回転を考慮した表示サイズを返す。
+
+    Raises:
+        ValueError: 画像として読めない場合
+    """
+    try:
+        with Image.open(io.BytesIO(image_content)) as img:
+            width, height = img.size
+            orientation = img.getexif().get(_EXIF_ORIENTATION)
+    except (UnidentifiedImageError, OSError) as e:
+        raise ValueError(f"画像を読み込めません: {e}")
+
+    if orientation in (5, 6, 7, 8):
+        width, height = height, width
+    return width, height
+
+
 # ===== Thumbnail Generation =====
 
+def _render_thumbnail(image_content: bytes, max_size: tuple[int, int]) -> bytes:
+    """サムネイルを作成（同期関数、画像処理用プロセスプールで実行）"""
+    # 画像を開く
+    img = Image.open(io.BytesIO(image_content))
+
+    # JPEGはデコード時に縮小（DCTスケーリング）して処理量を減らす
+    if img.format == "JPEG":
+        img.draft("RGB", max_size)
+    img = ImageOps.exif_transpose(img)
+
+    # RGBAの場合はRGBに変換（JPEG保存のため）
+    if img.mode in ('RGBA', 'LA', 'P'):
+        # 白背景を作成
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        if img.mode == 'P':
+            img = img.convert('RGBA')
+        background.paste(img, mask=img.split()[-1] if img.mode in ('RGBA', 'LA') else None)
+        img = background
+    elif img.mode != 'RGB':
+        img = img.convert('RGB')
+
+    # サムネイル生成（アスペクト比維持）
+    img.thumbnail(max_size, Image.Resampling.LANCZOS)
+
+    # バイトデータに変換
+    buffer = io.BytesIO()
+    img.save(buffer, format='JPEG', quality=85, optimize=True)
+    return buffer.getvalue()
+
+
 async def generate_thumbnail(
     image_content: bytes,
     max_size: tuple[int, int] = (256, 256)
 ) -> bytes:
     """
     画像のサムネイルを生成
-    
+
+    デコード・リサイズはイベントループを止めないよう画像処理用プロセスプールで実行する。
+
     Args:
         image_content: 元画像のバイトデータ
         max_size: サムネイルの最大サイズ (width, height)
-    
+
     Returns:
         bytes: サムネイル画像のバイトデータ（JPEG形式）
     """
+    from app.services.image_executor import get_image_executor
+
     try:
-        # 画像を開く
-        img = Image.open(io.BytesIO(image_content))
-        
-        # RGBAの場合はRGBに変換（JPEG保存のため）
-        if img.mode in ('RGBA', 'LA', 'P'):
-            # 白背景を作成
-            background = Image.new('RGB', img.size, (255, 255, 255))
-            if img.mode == 'P':
-                img = img.convert('RGBA')
-            background.paste(img, mask=img.split()[-1] if img.mode in ('RGBA', 'LA') else None)
-            img = background
-        elif img.mode != 'RGB':
-            img = img.convert('RGB')
-        
-        # サムネイル生成（アスペクト比維持）
-        img.thumbnail(max_size, Image.Resampling.LANCZOS)
-        
-        # バイトデータに変換
-        buffer = io.BytesIO()
-        img.save(buffer, format='JPEG', quality=85, optimize=True)
-        buffer.seek(0)
-        
-        return buffer.read()
-    
+        return await get_image_executor().run(_render_thumbnail, image_content, max_size)
     except Exception as e:
         logger.error(f"Failed to generate thumbnail: {e}")
         raise ValueError(f"サムネイル生成に失敗しました: {e}")
 
 
+async def _upload_with_thumbnail(
+    image_content: bytes,
+    image_key: str,
+    thumb_key: str,
+) -> tuple[str, str]:
+    """
+    元画像のアップロードとサムネイル生成 → アップロードを並行して実行
+
+    Returns:
+        tuple[str, str]: (元画像URL, サムネイルURL)
+    """
+    from app.external.r2 import upload_image
+
+    async def upload_thumbnail() -> str:
+        thumbnail_content = await generate_thumbnail(image_content)
+        return await upload_image(thumbnail_content, thumb_key)
+
+    image_url, thumbnail_url = await asyncio.gather(
+        upload_image(image_content, image_key),
+        upload_thumbnail(),
+    )
+    return image_url, thumbnail_url
+
+
 # ===== CRUD Operations =====
 
 async def create_library_image(
@@ -132,28 +200,21 @@ async def create_library_image(
     Returns:
         ImageLibraryItem: 作成された画像情報
     """
-    from app.external.r2 import upload_image
-    
-    # 画像サイズを取得
-    img = Image.open(io.BytesIO(image_content))
-    width, height = img.size
+    # 画像サイズを取得（ヘッダーのみ）
+    width, height = read_image_size(image_content)
     file_size = len(image_content)
     
     # アスペクト比を判定
     aspect_ratio = _determine_aspect_ratio(width, height)
     
-    # サムネイル生成
-    thumbnail_content = await generate_thumbnail(image_content)
-    
-    # R2にアップロード
+    # サムネイル生成・R2にアップロード
     image_uuid = str(uuid4())
     ext = filename.split(".")[-1].lower() if "." in filename else "png"
     
     image_key = f"library/{user_id}/{image_uuid}.{ext}"
     thumb_key = f"library/{user_id}/{image_uuid}_thumb.jpg"
     
-    image_url = await upload_image(image_content, image_key)
-    thumbnail_url = await upload_image(thumbnail_content, thumb_key)
+    image_url, thumbnail_url = await _upload_with_thumbnail(image_content, image_key, thumb_key)
     
     # DBに保存
     record = {
@@ -172,6 +233,7 @@ async def create_library_image(
     }
     
     result = supabase.table("user_image_library").insert(record).execute()
+    get_count_cache().adjust("user_image_library", user_id, 1)
     
     return ImageLibraryItem(**_format_library_image(result.data[0]))
 
@@ -192,24 +254,20 @@ async def create_library_image_from_generation(
     Returns:
         ImageLibraryItem: 作成された画像情報
     """
-    from app.external.r2 import download_file, upload_image
+    from app.external.r2 import download_file
     
     # 生成画像をダウンロード
     image_content = await download_file(data.image_url)
     
-    # サムネイル生成
-    thumbnail_content = await generate_thumbnail(image_content)
-    
     # アスペクト比を判定
     aspect_ratio = _determine_aspect_ratio(data.width, data.height)
     
-    # R2にコピー（永続化）
+    # R2にコピー（永続化）・サムネイル生成
     image_uuid = str(uuid4())
     image_key = f"library/{user_id}/{image_uuid}.png"
     thumb_key = f"library/{user_id}/{image_uuid}_thumb.jpg"
     
-    image_url = await upload_image(image_content, image_key)
-    thumbnail_url = await upload_image(thumbnail_content, thumb_key)
+    image_url, thumbnail_url = await _upload_with_thumbnail(image_content, image_key, thumb_key)
     
     # DBに保存
     record = {
@@ -231,6 +289,7 @@ async def create_library_image_from_generation(
     }
     
     result = supabase.table("user_image_library").insert(record).execute()
+    get_count_cache().adjust("user_image_library", user_id, 1)
     
     return ImageLibraryItem(**_format_library_image(result.data[0]))
 
@@ -391,66 +450,103 @@ async def delete_library_image(
         .eq("id", image_id) \
         .eq("user_id", user_id) \
         .execute()
+    get_count_cache().adjust("user_image_library", user_id, -1)
     
     return True
 
 
 # ===== Unified Image Listing =====
 
+# 元画像のある動画だけを数えた件数のキャッシュ識別子
+_SCREENSHOT_COUNT_VARIANT = "with_original_image"
+
+
 async def get_all_images(
     supabase: Client,
     user_id: str,
     source_filter: str | None = None,
     category: str | None = None,
     page: int = 1,
-    per_page: int = 20
+    per_page: int = 20,
+    cursor: str | None = None,
 ) -> UnifiedImageListResponse:
     """
     すべての画像を取得（ライブラリ + スクリーンショット統合）
 
+    両テーブルを (created_at, id) の降順でキーセットページネーションし、
+    それぞれ最大 per_page + 1 行だけ取得してマージする。
+    カーソルを指定しない場合は page からオフセットを計算する（後方互換、深いページほど遅い）。
+
     Args:
         supabase: Supabaseクライアント
         user_id: ユーザーID
         source_filter: ソースフィルタ ("all", "library", "screenshot")
         category: カテゴリフィルタ
-        page: ページ番号
+        page: ページ番号（cursor 指定時は無視）
         per_page: 1ページあたりの件数
+        cursor: 前のページの next_cursor
 
     Returns:
         UnifiedImageListResponse: 統合画像一覧
+
+    Raises:
+        InvalidCursorError: 不正なカーソル
     """
-    library_images: list[ImageLibraryItem] = []
-    screenshots: list[ScreenshotItem] = []
+    position = decode_cursor(cursor) if cursor else None
+    offset = 0 if position else (page - 1) * per_page
+    limit = offset + per_page + 1
+
+    rows: list[tuple[str, dict]] = []
     total_library = 0
     total_screenshots = 0
 
     # ライブラリ画像を取得
     if source_filter in (None, "all", "library"):
         library_query = supabase.table("user_image_library") \
-            .select("*", count="exact") \
+            .select("*") \
             .eq("user_id", user_id)
 
         if category:
             library_query = library_query.eq("category", category)
 
-        library_result = library_query.order("created_at", desc=True).execute()
-        total_library = library_result.count or len(library_result.data)
-
-        for item in library_result.data:
-            library_images.append(ImageLibraryItem(**_format_library_image(item)))
+        library_result = apply_keyset(library_query, position, limit).execute()
+        rows.extend(("library", item) for item in library_result.data)
+        total_library = cached_count(
+            supabase,
+            "user_image_library",
+            user_id,
+            refine=(lambda query: query.eq("category", category)) if category else None,
+            variant=f"category:{category}" if category else None,
+        )
 
     # スクリーンショット画像を取得（video_generationsの元画像）
     if source_filter in (None, "all", "screenshot"):
         screenshot_query = supabase.table("video_generations") \
-            .select("id, user_id, original_image_url, created_at", count="exact") \
+            .select("id, user_id, original_image_url, created_at") \
             .eq("user_id", user_id) \
             .not_.is_("original_image_url", "null") \
             .neq("original_image_url", "")
 
-        screenshot_result = screenshot_query.order("created_at", desc=True).execute()
-        total_screenshots = screenshot_result.count or len(screenshot_result.data)
+        screenshot_result = apply_keyset(screenshot_query, position, limit).execute()
+        rows.extend(("screenshot", item) for item in screenshot_result.data)
+        total_screenshots = cached_count(
+            supabase,
+            "video_generations",
+            user_id,
+            refine=lambda query: query.not_.is_("original_image_url", "null").neq("original_image_url", ""),
+            variant=_SCREENSHOT_COUNT_VARIANT,
+        )
+
+    rows.sort(key=lambda row: sort_key(row[1]), reverse=True)
+    has_next = len(rows) > offset + per_page
+    page_rows = rows[offset:offset + per_page]
 
-        for item in screenshot_result.data:
+    library_images: list[ImageLibraryItem] = []
+    screenshots: list[ScreenshotItem] = []
+    for source, item in page_rows:
+        if source == "library":
+            library_images.append(ImageLibraryItem(**_format_library_image(item)))
+        else:
             screenshots.append(ScreenshotItem(
                 id=str(item["id"]),
                 user_id=str(item["user_id"]),
@@ -461,6 +557,10 @@ async def get_all_images(
                 created_at=item["created_at"],
             ))
 
+    next_cursor = None
+    if has_next and page_rows:
+        next_cursor = row_cursor(page_rows[-1][1])
+
     return UnifiedImageListResponse(
         library_images=library_images,
         screenshots=screenshots,
@@ -468,4 +568,6 @@ async def get_all_images(
         total_screenshots=total_screenshots,
         page=page,
         per_page=per_page,
+        has_next=has_next,
+        next_cursor=next_cursor,
     )
@@ -17,6 +17,19 @@ from app.webhooks.polar import router as webhooks_router
 from app.webhooks.suno import router as suno_webhooks_router
 from app.library.router import router as library_router
 from app.workflows.router import router as workflows_router
+from app.images.router import router as images_router
+from app.external.gemini_gateway import get_gemini_gateway
+from app.services.ffmpeg_scheduler import get_ffmpeg_scheduler
+from app.services.scratch_space import get_scratch_space
+from app.services.render_cache import get_render_cache
+from app.services.export_jobs import expire_export_jobs
+from app.services.remote_media import get_remote_media
+from app.services.frame_cache import get_frame_cache
+from app.services.image_executor import get_image_executor
+from app.services.image_variants import get_image_variant_service
+from app.services.vision_cache import get_vision_cache
+from app.services.llm_media import get_llm_media
+from app.services.prompt_templates import get_prompt_templates
 
 app = FastAPI(
     title="Movie Maker API",
@@ -45,15 +58,103 @@ app.include_router(videos_router, prefix="/api/v1")
 app.include_router(templates_router, prefix="/api/v1")
 app.include_router(library_router, prefix="/api/v1")
 app.include_router(workflows_router, prefix="/api/v1")
+app.include_router(images_router, prefix="/api/v1")
 app.include_router(webhooks_router, prefix="/api/v1")
 app.include_router(suno_webhooks_router, prefix="/api/v1")
 
 
+@app.on_event("startup")
+async def sweep_scratch_space():
+    """前回起動時に残った中間ファイルを削除"""
+    get_scratch_space().sweep_orphans()
+
+
+@app.on_event("startup")
+async def expire_export_artifacts():
+    """保持期限を過ぎたエクスポート成果物を削除"""
+    try:
+        expire_export_jobs()
+    except Exception as e:
+        logging.getLogger(__name__).warning(f"Failed to expire export jobs: {e}")
+
+
+@app.on_event("startup")
+async def load_prompt_templates():
+    """プロンプトテンプレートを読み込んで解析（リクエストごとにファイルを読まない）"""
+    registry = get_prompt_templates()
+    registry.load()
+    registry.start_watching()
+
+
+@app.on_event("shutdown")
+async def stop_prompt_template_watcher():
+    """プロンプトテンプレートの変更監視を停止"""
+    get_prompt_templates().stop_watching()
+
+
+@app.on_event("shutdown")
+async def shutdown_image_workers():
+    """画像処理のプロセスプールを停止"""
+    get_image_executor().shutdown()
+
+
+@app.on_event("shutdown")
+async def close_gemini_gateway():
+    """Geminiの共有クライアントを閉じる"""
+    await get_gemini_gateway().aclose()
+
+
 @app.get("/health")
 async def health_check():
     return {"status": "ok"}
 
 
+@app.get("/health/ffmpeg")
+async def ffmpeg_health_check():
+    """FFmpegスケジューラの状態（CPUスロット使用状況・キュー深度）を返す"""
+    return get_ffmpeg_scheduler().stats()
+
+
+@app.get("/health/scratch")
+async def scratch_health_check():
+    """スクラッチ領域の使用状況を返す"""
+    return get_scratch_space().stats()
+
+
+@app.get("/health/render-cache")
+async def render_cache_health_check():
+    """レンダリング結果キャッシュのヒット率等を返す"""
+    return get_render_cache().stats()
+
+
+@app.get("/health/remote-media")
+async def remote_media_health_check():
+    """リモートメディアアクセス（Range読み込み/ダウンロード）の統計を返す"""
+    return get_remote_media().stats()
+
+
+@app.get("/health/frame-cache")
+async def frame_cache_health_check():
+    """抽出フレームキャッシュのヒット率・抽出回数を返す"""
+    return get_frame_cache().stats()
+
+
+@app.get("/health/image-variants")
+async def image_variants_health_check():
+    """画像バリアントのヒット率・変換時間と、画像処理プロセスプールの実行状況を返す"""
+    return {**get_image_variant_service().stats(), "executor": get_image_executor().stats()}
+
+
+@app.get("/health/gemini")
+async def gemini_health_check():
+    """Gemini呼び出しのモデルごとのレイテンシ・エラー・再試行回数・同時実行数を返す"""
+    return {
+        **get_gemini_gateway().stats(),
+        "vision_cache": get_vision_cache().stats(),
+        "media": get_llm_media().stats(),
+    }
+
+
 @app.get("/api/v1/config/video-provider")
 async def get_video_provider():
     """現在の動画生成プロバイダーを返す"""
@@ -0,0 +1,87 @@
+"""
+R2直接アップロード
+
+クライアントは署名付きPUT URLでR2に直接アップロードし、完了後に finalize を呼ぶ。
+サーバーはファイル本体を中継せず、R2上のオブジェクトに対して検証・プローブ・
+サムネイル生成を行う（APIプロセスをデータ経路から外す）。
+"""
+
+from dataclasses import dataclass
+from uuid import uuid4
+
+from app.videos.schemas import DirectUploadKind
+from app.videos.service import USER_VIDEO_ALLOWED_TYPES, USER_VIDEO_MAX_SIZE_MB
+
+DIRECT_UPLOADS_TABLE = "direct_uploads"
+
+# 署名付きPUT URLの有効期限（秒）
+DIRECT_UPLOAD_URL_EXPIRES_IN = 3600
+
+
+class DirectUploadError(Exception):
+    """直接アップロードのリクエストエラー"""
+    pass
+
+
+@dataclass(frozen=True)
+class DirectUploadPolicy:
+    """種類ごとのアップロード制限"""
+    allowed_types: frozenset[str]
+    allowed_extensions: frozenset[str]
+    max_bytes: int
+    key_prefix: str
+
+
+DIRECT_UPLOAD_POLICIES: dict[DirectUploadKind, DirectUploadPolicy] = {
+    DirectUploadKind.USER_VIDEO: DirectUploadPolicy(
+        allowed_types=frozenset(USER_VIDEO_ALLOWED_TYPES),
+        allowed_extensions=frozenset({"mp4", "mov"}),
+        max_bytes=USER_VIDEO_MAX_SIZE_MB * 1024 * 1024,
+        key_prefix="user_videos",
+    ),
+    DirectUploadKind.IMAGE: DirectUploadPolicy(
+        allowed_types=frozenset({"image/jpeg", "image/png", "image/webp"}),
+        allowed_extensions=frozenset({"jpg", "jpeg", "png", "webp"}),
+        max_bytes=10 * 1024 * 1024,
+        key_prefix="images",
+    ),
+    DirectUploadKind.BGM: DirectUploadPolicy(
+        allowed_types=frozenset({"audio/mpeg", "audio/wav", "audio/x-wav", "audio/ogg", "audio/mp4", "audio/aac"}),
+        allowed_extensions=frozenset({"mp3", "wav", "ogg", "m4a", "aac"}),
+        max_bytes=20 * 1024 * 1024,
+        key_prefix="bgm",
+    ),
+}
+
+
+def validate_upload_request(kind: DirectUploadKind, filename: str, content_type: str, file_size: int) -> str:
+    """
+    申告されたファイル情報を検証し、拡張子を返す
+
+    Raises:
+        DirectUploadError: 形式・サイズが制限外の場合
+    """
+    policy = DIRECT_UPLOAD_POLICIES[kind]
+
+    if content_type not in policy.allowed_types:
+        raise DirectUploadError(
+            f"対応していないファイル形式です。対応形式: {', '.join(sorted(policy.allowed_types))}"
+        )
+
+    ext = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    if ext not in policy.allowed_extensions:
+        raise DirectUploadError(
+            f"対応していない拡張子です。対応形式: {', '.join(sorted(policy.allowed_extensions))}"
+        )
+
+    if file_size > policy.max_bytes:
+        raise DirectUploadError(
+            f"ファイルサイズが大きすぎます。最大{policy.max_bytes // (1024 * 1024)}MBまでアップロード可能です。"
+        )
+
+    return ext
+
+
+def build_object_key(kind: DirectUploadKind, user_id: str, ext: str) -> str:
+    """アップロード先のR2キー（通常アップロードAPIと同じ配置）"""
+    return f"{DIRECT_UPLOAD_POLICIES[kind].key_prefix}/{user_id}/{uuid4()}.{ext}"
@@ -0,0 +1,223 @@
+"""
+エクスポートジョブの成果物管理
+
+ProRes素材エクスポート等の成果物（artifact）をローカルディスクまたはR2に保存し、
+保持期限を過ぎたものを削除する。同じユーザーが同じカット構成・パラメータで
+再度エクスポートした場合は、実行中または期限内の既存ジョブを再利用する。
+ワーカーの停止・再起動で終わらなくなった実行中のジョブは再利用せず、失敗にする。
+"""
+
+import asyncio
+import logging
+import os
+import shutil
+import tempfile
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+from app.core.config import settings
+from app.core.supabase import get_supabase
+from app.external.r2 import generate_presigned_url, get_r2_client
+from app.services.render_cache import RENDER_CACHE_PREFIX, canonical_params_hash
+
+logger = logging.getLogger(__name__)
+
+EXPORT_JOBS_TABLE = "export_jobs"
+
+# R2上の保存先プレフィックス
+EXPORT_ARTIFACT_PREFIX = "exports"
+
+ARTIFACT_STORAGE_LOCAL = "local"
+ARTIFACT_STORAGE_R2 = "r2"
+
+# 再利用できるジョブのステータス（completed は期限内、実行中は停止していないもののみ）
+_IN_PROGRESS_STATUSES = ["pending", "processing"]
+_REUSABLE_STATUSES = [*_IN_PROGRESS_STATUSES, "completed"]
+
+
+def export_request_hash(kind: str, params: dict[str, Any]) -> str:
+    """エクスポート種別とパラメータの正規化ハッシュ（同一リクエストの判定用）"""
+    return canonical_params_hash(f"export_{kind}", params)
+
+
+def artifact_expires_at(now: Optional[datetime] = None) -> datetime:
+    """成果物の保持期限"""
+    now = now or datetime.now(timezone.utc)
+    return now + timedelta(hours=settings.EXPORT_ARTIFACT_TTL_HOURS)
+
+
+def _parse_timestamp(value: Any) -> Optional[datetime]:
+    if value is None or isinstance(value, datetime):
+        return value
+    parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def is_job_expired(job: dict, now: Optional[datetime] = None) -> bool:
+    """完了済みジョブの成果物が保持期限を過ぎているか"""
+    expires_at = _parse_timestamp(job.get("expires_at"))
+    if expires_at is None:
+        return False
+    return expires_at <= (now or datetime.now(timezone.utc))
+
+
+def is_job_stale(job: dict, now: Optional[datetime] = None) -> bool:
+    """実行中のジョブが一定時間更新されていない（ワーカーが停止した）か"""
+    last_update = _parse_timestamp(job.get("updated_at") or job.get("created_at"))
+    if last_update is None:
+        return False
+    stale_after = timedelta(minutes=settings.EXPORT_JOB_STALE_MINUTES)
+    return last_update + stale_after <= (now or datetime.now(timezone.utc))
+
+
+def artifact_root() -> str:
+    """ローカル成果物の保存先ディレクトリ"""
+    base = settings.EXPORT_ARTIFACT_DIR or os.path.join(tempfile.gettempdir(), "movie-maker-exports")
+    os.makedirs(base, exist_ok=True)
+    return base
+
+
+def local_artifact_path(artifact_key: str) -> str:
+    """ローカル成果物のキーから絶対パスを取得（保存先ディレクトリ外は拒否）"""
+    root = os.path.realpath(artifact_root())
+    path = os.path.realpath(os.path.join(root, artifact_key))
+    if os.path.commonpath([root, path]) != root:
+        raise ValueError(f"Invalid artifact key: {artifact_key}")
+    return path
+
+
+def find_reusable_job(user_id: str, kind: str, request_hash: str) -> Optional[dict]:
+    """
+    同一リクエストの再利用可能なジョブを取得
+
+    実行中のジョブ、または保持期限内の完了済みジョブを返す。
+    一定時間更新のない実行中のジョブは失敗にして返さない（新しいジョブを作成させる）。
+    """
+    supabase = get_supabase()
+    response = (
+        supabase.table(EXPORT_JOBS_TABLE)
+        .select("*")
+        .eq("user_id", user_id)
+        .eq("kind", kind)
+        .eq("request_hash", request_hash)
+        .in_("status", _REUSABLE_STATUSES)
+        .order("created_at", desc=True)
+        .limit(1)
+        .execute()
+    )
+    if not response.data:
+        return None
+
+    job = response.data[0]
+    if job["status"] == "completed" and is_job_expired(job):
+        return None
+    if job["status"] in _IN_PROGRESS_STATUSES and is_job_stale(job):
+        logger.warning(f"Export job {job['id']} stalled in {job['status']}, marking as failed")
+        (
+            supabase.table(EXPORT_JOBS_TABLE)
+            .update({"status": "failed", "error_message": "エクスポート処理が停止しました"})
+            .eq("id", job["id"])
+            .in_("status", _IN_PROGRESS_STATUSES)
+            .execute()
+        )
+        return None
+    return job
+
+
+async def store_artifact(
+    job_id: str,
+    user_id: str,
+    source_path: str,
+    filename: str,
+    content_type: str,
+) -> tuple[str, str, int]:
+    """
+    成果物を保存先に移動
+
+    Args:
+        job_id: エクスポートジョブID
+        user_id: ユーザーID
+        source_path: 成果物のローカルパス（保存後は存在しない）
+        filename: ダウンロード時のファイル名
+        content_type: R2に保存する際のContent-Type
+
+    Returns:
+        tuple[str, str, int]: (保存先種別, 成果物キー, バイト数)
+    """
+    size = os.path.getsize(source_path)
+
+    if settings.EXPORT_ARTIFACT_STORAGE == ARTIFACT_STORAGE_R2:
+        key = f"{EXPORT_ARTIFACT_PREFIX}/{user_id}/{job_id}/{filename}"
+
+        def upload() -> None:
+            get_r2_client().upload_file(
+                source_path,
+                settings.R2_BUCKET_NAME,
+                key,
+                ExtraArgs={
+                    "ContentType": content_type,
+                    "ContentDisposition": f'attachment; filename="{filename}"',
+                },
+            )
+
+        await asyncio.to_thread(upload)
+        os.remove(source_path)
+        return ARTIFACT_STORAGE_R2, key, size
+
+    key = f"{job_id}/{filename}"
+    destination = local_artifact_path(key)
+    os.makedirs(os.path.dirname(destination), exist_ok=True)
+    await asyncio.to_thread(shutil.move, source_path, destination)
+    return ARTIFACT_STORAGE_LOCAL, key, size
+
+
+def artifact_download_url(artifact_key: str) -> str:
+    """R2成果物の署名付きURL（Rangeリクエスト対応）"""
+    return generate_presigned_url(artifact_key, expires_in=3600)
+
+
+def delete_artifact(storage: Optional[str], artifact_key: Optional[str]) -> None:
+    """成果物を削除（レンダリングキャッシュのオブジェクトは共有のため削除しない）"""
+    if not artifact_key:
+        return
+
+    if storage == ARTIFACT_STORAGE_R2:
+        if artifact_key.startswith(f"{RENDER_CACHE_PREFIX}/"):
+            return
+        get_r2_client().delete_object(Bucket=settings.R2_BUCKET_NAME, Key=artifact_key)
+        return
+
+    path = local_artifact_path(artifact_key)
+    shutil.rmtree(os.path.dirname(path), ignore_errors=True)
+
+
+def expire_export_jobs() -> int:
+    """
+    保持期限を過ぎた成果物を削除し、ジョブを expired にする
+
+    Returns:
+        int: 期限切れにしたジョブ数
+    """
+    supabase = get_supabase()
+    now = datetime.now(timezone.utc)
+    response = (
+        supabase.table(EXPORT_JOBS_TABLE)
+        .select("id, artifact_storage, artifact_key")
+        .eq("status", "completed")
+        .lt("expires_at", now.isoformat())
+        .execute()
+    )
+
+    expired = 0
+    for job in response.data or []:
+        try:
+            delete_artifact(job.get("artifact_storage"), job.get("artifact_key"))
+        except Exception as e:
+            logger.warning(f"Failed to delete export artifact {job['id']}: {e}")
+            continue
+        supabase.table(EXPORT_JOBS_TABLE).update({"status": "expired"}).eq("id", job["id"]).execute()
+        expired += 1
+
+    if expired:
+        logger.info(f"Expired {expired} export jobs")
+    return expired
@@ -0,0 +1,444 @@
+"""
+FFmpegサブプロセスランナー
+
+FFmpegスケジューラでCPUスロットを確保した上でffmpegを起動し、
+`-progress pipe:1` の出力（out_time_us / speed）をパースして
+実際の進捗率とETAをコールバックで通知する。
+
+ジョブID（動画ID等）ごとに実行中のプロセスを登録しておき、
+ジョブのキャンセルや動画の削除時に子プロセスを強制終了できる。
+
+1つのフィルタグラフにまとめられない連続ステージは run_ffmpeg_pipeline で
+パイプ接続し、中間ファイルをディスクに書かずに処理する。
+"""
+
+import asyncio
+import inspect
+import logging
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional, Union
+
+from app.services.ffmpeg_scheduler import (
+    FFmpegJobClass,
+    apply_thread_limits,
+    get_ffmpeg_scheduler,
+)
+
+logger = logging.getLogger(__name__)
+
+# キャンセル済みジョブIDの保持上限（削除後に起動されるプロセスも即時中断するため）
+_CANCELLED_JOBS_MAX = 1000
+
+
+class FFmpegCancelledError(Exception):
+    """FFmpegジョブがキャンセルされた"""
+    pass
+
+
+@dataclass
+class FFmpegProgress:
+    """FFmpegの進捗情報"""
+    percent: float                 # 0.0-100.0
+    out_time: float                # 出力済みの長さ（秒）
+    speed: Optional[float] = None  # 処理速度（1.0 = 実時間）
+    eta_seconds: Optional[float] = None
+
+
+ProgressCallback = Callable[[FFmpegProgress], Union[None, Awaitable[None]]]
+
+
+# ジョブID → 実行中プロセス
+_running_processes: dict[str, set[asyncio.subprocess.Process]] = {}
+# キャンセル済みジョブID（挿入順で古いものから破棄）
+_cancelled_jobs: "OrderedDict[str, None]" = OrderedDict()
+
+
+def _register_process(job_id: Optional[str], process: asyncio.subprocess.Process) -> None:
+    if job_id is not None:
+        _running_processes.setdefault(job_id, set()).add(process)
+
+
+def _unregister_process(job_id: Optional[str], process: asyncio.subprocess.Process) -> None:
+    if job_id is None:
+        return
+    processes = _running_processes.get(job_id)
+    if processes is not None:
+        processes.discard(process)
+        if not processes:
+            del _running_processes[job_id]
+
+
+def is_ffmpeg_job_cancelled(job_id: Optional[str]) -> bool:
+    """ジョブがキャンセル済みか"""
+    return job_id is not None and job_id in _cancelled_jobs
+
+
+def cancel_ffmpeg_job(job_id: str) -> int:
+    """
+    ジョブに紐づく実行中のFFmpegプロセスを強制終了
+
+    以降に同じジョブIDで起動されるプロセスも FFmpegCancelledError で中断される。
+
+    Args:
+        job_id: ジョブID（動画ID等）
+
+    Returns:
+        int: 終了させたプロセス数
+    """
+    _cancelled_jobs[job_id] = None
+    _cancelled_jobs.move_to_end(job_id)
+    while len(_cancelled_jobs) > _CANCELLED_JOBS_MAX:
+        _cancelled_jobs.popitem(last=False)
+
+    killed = 0
+    for process in list(_running_processes.get(job_id, ())):
+        if process.returncode is None:
+            process.kill()
+            killed += 1
+
+    if killed:
+        logger.info(f"FFmpeg job cancelled: job_id={job_id}, killed={killed}")
+    return killed
+
+
+def parse_progress_block(block: dict[str, str], duration: Optional[float]) -> Optional[FFmpegProgress]:
+    """
+    `-progress` 出力の1ブロック（progress=行まで）を進捗情報に変換
+
+    Args:
+        block: key=value のペア
+        duration: 出力の想定長（秒）。不明な場合は進捗率0のまま
+
+    Returns:
+        FFmpegProgress | None: 時間情報がない場合はNone
+    """
+    # out_time_ms は歴史的経緯でマイクロ秒単位（out_time_us と同値）
+    raw_time = block.get("out_time_us") or block.get("out_time_ms")
+    if raw_time is None or raw_time == "N/A":
+        return None
+
+    try:
+        out_time = max(0.0, int(raw_time) / 1_000_000)
+    except ValueError:
+        return None
+
+    speed: Optional[float] = None
+    raw_speed = block.get("speed", "").rstrip("x").strip()
+    if raw_speed and raw_speed != "N/A":
+        try:
+            speed = float(raw_speed)
+        except ValueError:
+            speed = None
+
+    if block.get("progress") == "end":
+        return FFmpegProgress(percent=100.0, out_time=out_time, speed=speed, eta_seconds=0.0)
+
+    percent = 0.0
+    eta_seconds: Optional[float] = None
+    if duration and duration > 0:
+        percent = min(99.9, out_time / duration * 100)
+        if speed and speed > 0:
+            eta_seconds = max(0.0, (duration - out_time) / speed)
+
+    return FFmpegProgress(percent=percent, out_time=out_time, speed=speed, eta_seconds=eta_seconds)
+
+
+async def _notify(callback: ProgressCallback, progress: FFmpegProgress) -> None:
+    """同期・非同期どちらのコールバックにも対応して通知（失敗は処理を止めない）"""
+    try:
+        result = callback(progress)
+        if inspect.isawaitable(result):
+            await result
+    except Exception as e:
+        logger.warning(f"FFmpeg progress callback failed: {e}")
+
+
+async def _read_progress(
+    stream: asyncio.StreamReader,
+    duration: Optional[float],
+    on_progress: ProgressCallback,
+) -> None:
+    """stdoutの -progress 出力を読み取り、進捗率が1%以上進むごとに通知"""
+    block: dict[str, str] = {}
+    last_percent = -1.0
+
+    while True:
+        line = await stream.readline()
+        if not line:
+            break
+
+        key, sep, value = line.decode(errors="replace").strip().partition("=")
+        if not sep:
+            continue
+        block[key] = value
+
+        if key != "progress":
+            continue
+
+        progress = parse_progress_block(block, duration)
+        block = {}
+        if progress is None:
+            continue
+        if progress.percent >= 100.0 or progress.percent - last_percent >= 1.0:
+            last_percent = progress.percent
+            await _notify(on_progress, progress)
+
+
+async def run_ffmpeg(
+    cmd: list[str],
+    job_class: FFmpegJobClass = FFmpegJobClass.BATCH,
+    *,
+    job_id: Optional[str] = None,
+    duration: Optional[float] = None,
+    on_progress: Optional[ProgressCallback] = None,
+) -> tuple[int, bytes, bytes]:
+    """
+    スケジューラ経由でffmpegを実行（進捗通知・キャンセル対応）
+
+    Args:
+        cmd: ffmpeg / ffprobe コマンド
+        job_class: ジョブ種別
+        job_id: キャンセル用のジョブID（動画ID等）
+        duration: 出力の想定長（秒）。進捗率・ETAの算出に使用
+        on_progress: 進捗コールバック（同期・非同期どちらも可）
+
+    Returns:
+        tuple[int, bytes, bytes]: (returncode, stdout, stderr)
+            進捗通知を有効にした場合、stdoutは空
+
+    Raises:
+        FFmpegCancelledError: ジョブがキャンセルされた場合
+    """
+    if is_ffmpeg_job_cancelled(job_id):
+        raise FFmpegCancelledError(f"FFmpegジョブはキャンセル済みです: {job_id}")
+
+    track_progress = on_progress is not None and os.path.basename(cmd[0]) == "ffmpeg"
+
+    async with get_ffmpeg_scheduler().acquire(job_class) as threads:
+        full_cmd = apply_thread_limits(cmd, threads)
+        if track_progress:
+            full_cmd = [full_cmd[0], "-progress", "pipe:1", "-nostats", *full_cmd[1:]]
+
+        process = await asyncio.create_subprocess_exec(
+            *full_cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+
+        _register_process(job_id, process)
+
+        try:
+            if track_progress:
+                # stderrを並行して読み切らないとパイプが詰まってffmpegが停止する
+                stderr_task = asyncio.create_task(process.stderr.read())
+                try:
+                    await _read_progress(process.stdout, duration, on_progress)
+                    await process.wait()
+                    stderr = await stderr_task
+                finally:
+                    if not stderr_task.done():
+                        stderr_task.cancel()
+                stdout = b""
+            else:
+                stdout, stderr = await process.communicate()
+        except asyncio.CancelledError:
+            # 呼び出し元タスクのキャンセル（クライアント切断等）で子プロセスも終了
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+            raise
+        finally:
+            _unregister_process(job_id, process)
+
+    if is_ffmpeg_job_cancelled(job_id):
+        raise FFmpegCancelledError(f"FFmpegジョブがキャンセルされました: {job_id}")
+
+    return process.returncode, stdout, stderr
+
+
+async def run_ffmpeg_pipeline(
+    cmds: list[list[str]],
+    job_class: FFmpegJobClass = FFmpegJobClass.BATCH,
+    *,
+    job_id: Optional[str] = None,
+    duration: Optional[float] = None,
+    on_progress: Optional[ProgressCallback] = None,
+) -> tuple[int, bytes]:
+    """
+    複数のffmpegプロセスをパイプで連結して実行
+
+    前段の stdout（`pipe:1`）を次段の stdin（`pipe:0`）に直結するため、
+    中間データはディスクに書かれない。OSのパイプバッファが埋まると前段の書き込みが
+    ブロックされる（バックプレッシャー）ので、メモリ使用量は各段のバッファ分に収まる。
+
+    スケジューラのスロットは1つだけ確保し、そのスレッド数を各段で分け合う。
+    進捗は最終段の `-progress` 出力から算出する。
+
+    Args:
+        cmds: ffmpegコマンドのリスト（先頭以外は pipe:0 から、末尾以外は pipe:1 へ入出力すること）
+        job_class: ジョブ種別
+        job_id: キャンセル用のジョブID（動画ID等）
+        duration: 出力の想定長（秒）
+        on_progress: 進捗コールバック
+
+    Returns:
+        tuple[int, bytes]: (returncode, stderr)
+            いずれかの段が失敗した場合は最初に失敗した段の値
+
+    Raises:
+        FFmpegCancelledError: ジョブがキャンセルされた場合
+    """
+    if is_ffmpeg_job_cancelled(job_id):
+        raise FFmpegCancelledError(f"FFmpegジョブはキャンセル済みです: {job_id}")
+
+    async with get_ffmpeg_scheduler().acquire(job_class) as threads:
+        stage_threads = max(1, threads // len(cmds))
+        processes: list[asyncio.subprocess.Process] = []
+        stderr_tasks: list[asyncio.Task] = []
+        progress_task: Optional[asyncio.Task] = None
+        read_fd: Optional[int] = None
+        failed_index: Optional[int] = None
+
+        try:
+            for index, cmd in enumerate(cmds):
+                is_last = index == len(cmds) - 1
+                full_cmd = apply_thread_limits(cmd, stage_threads)
+                if is_last and on_progress is not None:
+                    full_cmd = [full_cmd[0], "-progress", "pipe:1", "-nostats", *full_cmd[1:]]
+
+                next_read_fd: Optional[int] = None
+                write_fd: Optional[int] = None
+                if not is_last:
+                    next_read_fd, write_fd = os.pipe()
+
+                try:
+                    process = await asyncio.create_subprocess_exec(
+                        *full_cmd,
+                        stdin=read_fd if read_fd is not None else asyncio.subprocess.DEVNULL,
+                        stdout=(
+                            write_fd if write_fd is not None
+                            else asyncio.subprocess.PIPE if on_progress is not None
+                            else asyncio.subprocess.DEVNULL
+                        ),
+                        stderr=asyncio.subprocess.PIPE,
+                    )
+                except BaseException:
+                    if next_read_fd is not None:
+                        os.close(next_read_fd)
+                    raise
+                finally:
+                    # 子プロセスに渡したfdは親側で閉じる（閉じないとEOFが伝わらない）
+                    if read_fd is not None:
+                        os.close(read_fd)
+                        read_fd = None
+                    if write_fd is not None:
+                        os.close(write_fd)
+                read_fd = next_read_fd
+
+                processes.append(process)
+                _register_process(job_id, process)
+                # 各段のstderrを並行して読み切らないとパイプが詰まって停止する
+                stderr_tasks.append(asyncio.create_task(process.stderr.read()))
+
+            if on_progress is not None:
+                progress_task = asyncio.create_task(
+                    _read_progress(processes[-1].stdout, duration, on_progress)
+                )
+
+            # いずれかの段が失敗したら残りの段も止める（前段が書き込み待ちのまま残らないように）
+            pending = {asyncio.create_task(p.wait()): i for i, p in enumerate(processes)}
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    index = pending.pop(task)
+                    if processes[index].returncode != 0 and failed_index is None:
+                        failed_index = index
+                        for process in processes:
+                            if process.returncode is None:
+                                process.kill()
+
+            if progress_task is not None:
+                await progress_task
+            stderrs = [await task for task in stderr_tasks]
+
+        except BaseException:
+            # 呼び出し元タスクのキャンセルや起動失敗で全段の子プロセスを終了
+            for process in processes:
+                if process.returncode is None:
+                    process.kill()
+            for process in processes:
+                await process.wait()
+            raise
+        finally:
+            if read_fd is not None:
+                os.close(read_fd)
+            for task in stderr_tasks:
+                if not task.done():
+                    task.cancel()
+            if progress_task is not None and not progress_task.done():
+                progress_task.cancel()
+            for process in processes:
+                _unregister_process(job_id, process)
+
+    if is_ffmpeg_job_cancelled(job_id):
+        raise FFmpegCancelledError(f"FFmpegジョブがキャンセルされました: {job_id}")
+
+    if failed_index is not None:
+        # 最初に失敗した段を返す（後から強制終了した段ではなく原因側）
+        return processes[failed_index].returncode, stderrs[failed_index]
+    return 0, stderrs[-1]
+
+
+def scale_progress(
+    callback: Optional[ProgressCallback],
+    start: float,
+    end: float,
+) -> Optional[ProgressCallback]:
+    """
+    0-100%の進捗を start-end の範囲にマッピングするコールバックを作成
+
+    複数ステージの処理全体の進捗や、タスク全体の進捗範囲への割り当てに使う。
+    """
+    if callback is None:
+        return None
+
+    async def scaled(progress: FFmpegProgress) -> None:
+        await _notify(callback, FFmpegProgress(
+            percent=start + (end - start) * progress.percent / 100,
+            out_time=progress.out_time,
+            speed=progress.speed,
+            eta_seconds=progress.eta_seconds,
+        ))
+
+    return scaled
+
+
+def progress_to_range(
+    update: Callable[[int], Awaitable[None]],
+    start: int,
+    end: int,
+) -> ProgressCallback:
+    """
+    FFmpegの進捗をタスク全体の進捗（start-endの整数）に変換して通知するコールバックを作成
+
+    DB更新の回数を抑えるため、整数値が増えた時のみ update を呼ぶ。
+
+    Args:
+        update: 進捗値（int）を受け取る非同期関数（ステータス更新等）
+        start: 範囲の開始値
+        end: 範囲の終了値
+    """
+    last_value = start
+
+    async def callback(progress: FFmpegProgress) -> None:
+        nonlocal last_value
+        value = start + int((end - start) * progress.percent / 100)
+        if value > last_value:
+            last_value = value
+            if progress.eta_seconds is not None:
+                logger.info(f"FFmpeg progress: {progress.percent:.0f}%, ETA {progress.eta_seconds:.0f}s")
+            await update(value)
+
+    return callback
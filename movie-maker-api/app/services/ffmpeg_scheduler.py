@@ -0,0 +1,290 @@
+"""
+FFmpeg同時実行スケジューラ
+
+全てのFFmpeg/FFprobeサブプロセス起動をこのスケジューラ経由で行い、
+CPUコア数に基づくスロット割り当てでオーバーサブスクリプションを防ぐ。
+
+- interactive: スクリーンショット・フレーム抽出・プローブ等の短時間ジョブ（優先）
+- batch: レンダリング・エンコード等の長時間ジョブ
+
+スロットが空いていないジョブはクラスごとのFIFOキューで待機する。
+バックグラウンドタスクはスレッドプール上で asyncio.run により別のイベントループで
+動くため、スロットの管理は threading.Lock で保護し、待機中のジョブはそれぞれの
+イベントループ上で起こす（プロセス全体で1つの上限にする）。
+"""
+
+import asyncio
+import logging
+import os
+import threading
+from collections import deque
+from contextlib import asynccontextmanager
+from enum import Enum
+from typing import AsyncIterator, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class FFmpegJobClass(str, Enum):
+    """FFmpegジョブの種別"""
+    INTERACTIVE = "interactive"  # スクリーンショット・サムネイル・プローブ
+    BATCH = "batch"              # レンダリング・エンコード
+
+
+# 値を取らないffmpegのオプション（それ以外のオプションは次の引数を値として取る）
+_FLAG_OPTIONS = {
+    "-y", "-n", "-an", "-vn", "-sn", "-dn", "-shortest", "-re", "-copyts",
+    "-stats", "-nostats", "-nostdin", "-stdin", "-hide_banner",
+}
+
+
+def _output_indices(cmd: list[str]) -> list[int]:
+    """出力パス（オプションの値でない位置引数）の位置"""
+    indices = []
+    index = 1
+    while index < len(cmd):
+        arg = cmd[index]
+        if arg.startswith("-") and arg != "-":
+            # -i の値は入力なので、値を取るオプションと同様に読み飛ばす
+            index += 1 if arg in _FLAG_OPTIONS else 2
+            continue
+        indices.append(index)
+        index += 1
+    return indices
+
+
+def apply_thread_limits(cmd: list[str], threads: int) -> list[str]:
+    """
+    ffmpegコマンドにスレッド数の上限を付与
+
+    -filter_threads / -filter_complex_threads はグローバルオプションとして先頭に、
+    -threads は出力オプションとして各出力パスの直前に挿入する。
+    ffprobe や既に -threads 指定のあるコマンドはそのまま返す。
+    """
+    if not cmd or os.path.basename(cmd[0]) != "ffmpeg" or "-threads" in cmd:
+        return list(cmd)
+
+    outputs = set(_output_indices(cmd)) or {len(cmd) - 1}
+    result = [
+        cmd[0],
+        "-filter_threads", str(threads),
+        "-filter_complex_threads", str(threads),
+    ]
+    for index, arg in enumerate(cmd[1:], start=1):
+        if index in outputs:
+            result.extend(["-threads", str(threads)])
+        result.append(arg)
+    return result
+
+
+class _Waiter:
+    """スロット待ちのジョブ（待っているイベントループとFuture）"""
+
+    __slots__ = ("loop", "future", "granted")
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.future: asyncio.Future = loop.create_future()
+        self.granted = False
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class FFmpegScheduler:
+    """CPUスロットを割り当ててFFmpegの同時実行数を制御するスケジューラ"""
+
+    def __init__(
+        self,
+        total_slots: Optional[int] = None,
+        interactive_threads: Optional[int] = None,
+        batch_threads: Optional[int] = None,
+        reserved_interactive_slots: Optional[int] = None,
+    ):
+        cpu_count = os.cpu_count() or 1
+        self.total_slots = max(1, total_slots or settings.FFMPEG_CPU_SLOTS or cpu_count)
+
+        if reserved_interactive_slots is None:
+            reserved_interactive_slots = settings.FFMPEG_INTERACTIVE_RESERVED_SLOTS
+        # 全スロットを予約してしまうとbatchが永久に動けないため上限を設ける
+        self.reserved_interactive_slots = max(
+            0, min(reserved_interactive_slots, self.total_slots - 1)
+        )
+
+        interactive_threads = interactive_threads or settings.FFMPEG_INTERACTIVE_THREADS
+        self.interactive_threads = max(1, min(interactive_threads, self.total_slots))
+
+        batch_capacity = self.total_slots - self.reserved_interactive_slots
+        batch_threads = batch_threads or settings.FFMPEG_BATCH_THREADS or max(1, self.total_slots // 2)
+        self.batch_threads = max(1, min(batch_threads, batch_capacity))
+
+        # スロットの管理はイベントループをまたいで共有する
+        self._lock = threading.Lock()
+        self._in_use = 0
+        self._running = {job_class: 0 for job_class in FFmpegJobClass}
+        self._waiters: dict[FFmpegJobClass, deque[_Waiter]] = {
+            job_class: deque() for job_class in FFmpegJobClass
+        }
+
+    def threads_for(self, job_class: FFmpegJobClass) -> int:
+        """ジョブ種別ごとのスレッド数（=消費スロット数）"""
+        if job_class == FFmpegJobClass.INTERACTIVE:
+            return self.interactive_threads
+        return self.batch_threads
+
+    def _fits(self, job_class: FFmpegJobClass) -> bool:
+        limit = self.total_slots
+        if job_class == FFmpegJobClass.BATCH:
+            limit -= self.reserved_interactive_slots
+        return self._in_use + self.threads_for(job_class) <= limit
+
+    def _can_start(self, job_class: FFmpegJobClass) -> bool:
+        """キュー待ちを追い越さずに即時開始できるか"""
+        if self._waiters[job_class]:
+            return False
+        # interactiveの待ちがある間はbatchを新規開始しない
+        if job_class == FFmpegJobClass.BATCH and self._waiters[FFmpegJobClass.INTERACTIVE]:
+            return False
+        return self._fits(job_class)
+
+    def _grant(self, job_class: FFmpegJobClass) -> None:
+        self._in_use += self.threads_for(job_class)
+        self._running[job_class] += 1
+
+    def _release(self, job_class: FFmpegJobClass) -> None:
+        with self._lock:
+            self._in_use -= self.threads_for(job_class)
+            self._running[job_class] -= 1
+            self._wake_waiters()
+
+    def _wake_waiters(self) -> None:
+        """空きスロットを待機中のジョブに割り当て（interactive優先、ロック内で呼ぶ）"""
+        for job_class in (FFmpegJobClass.INTERACTIVE, FFmpegJobClass.BATCH):
+            queue = self._waiters[job_class]
+            while queue and self._fits(job_class):
+                waiter = queue.popleft()
+                self._grant(job_class)
+                waiter.granted = True
+                try:
+                    waiter.loop.call_soon_threadsafe(_resolve, waiter.future)
+                except RuntimeError:
+                    # 待っていたイベントループが既に閉じている
+                    waiter.granted = False
+                    self._in_use -= self.threads_for(job_class)
+                    self._running[job_class] -= 1
+            if queue:
+                # 先頭が入らない場合は後続クラスも追い越させない
+                return
+
+    @asynccontextmanager
+    async def acquire(
+        self,
+        job_class: FFmpegJobClass = FFmpegJobClass.BATCH,
+    ) -> AsyncIterator[int]:
+        """
+        CPUスロットを確保する
+
+        Args:
+            job_class: ジョブ種別
+
+        Yields:
+            int: このジョブに割り当てられたスレッド数
+        """
+        waiter = None
+        with self._lock:
+            if self._can_start(job_class):
+                self._grant(job_class)
+            else:
+                waiter = _Waiter(asyncio.get_running_loop())
+                self._waiters[job_class].append(waiter)
+                queue_depth = self._queue_depth()
+
+        if waiter is not None:
+            logger.info(
+                f"FFmpeg job queued: class={job_class.value}, "
+                f"queue_depth={queue_depth}"
+            )
+            try:
+                await waiter.future
+            except asyncio.CancelledError:
+                with self._lock:
+                    granted = waiter.granted
+                    if not granted:
+                        try:
+                            self._waiters[job_class].remove(waiter)
+                        except ValueError:
+                            pass
+                if granted:
+                    # 割り当て直後にキャンセルされた場合はスロットを返却
+                    self._release(job_class)
+                raise
+
+        try:
+            yield self.threads_for(job_class)
+        finally:
+            self._release(job_class)
+
+    async def run(
+        self,
+        cmd: list[str],
+        job_class: FFmpegJobClass = FFmpegJobClass.BATCH,
+    ) -> tuple[int, bytes, bytes]:
+        """
+        スロットを確保してコマンドを実行し、終了まで待つ
+
+        Args:
+            cmd: ffmpeg / ffprobe コマンド
+            job_class: ジョブ種別
+
+        Returns:
+            tuple[int, bytes, bytes]: (returncode, stdout, stderr)
+        """
+        async with self.acquire(job_class) as threads:
+            process = await asyncio.create_subprocess_exec(
+                *apply_thread_limits(cmd, threads),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            try:
+                stdout, stderr = await process.communicate()
+            except asyncio.CancelledError:
+                if process.returncode is None:
+                    process.kill()
+                    await process.wait()
+                raise
+            return process.returncode, stdout, stderr
+
+    def _queue_depth(self) -> int:
+        return sum(len(queue) for queue in self._waiters.values())
+
+    @property
+    def queue_depth(self) -> int:
+        """待機中のジョブ数"""
+        with self._lock:
+            return self._queue_depth()
+
+    def stats(self) -> dict:
+        """スケジューラの状態（監視用）"""
+        with self._lock:
+            return {
+                "total_slots": self.total_slots,
+                "reserved_interactive_slots": self.reserved_interactive_slots,
+                "in_use_slots": self._in_use,
+                "threads": {job_class.value: self.threads_for(job_class) for job_class in FFmpegJobClass},
+                "running": {job_class.value: count for job_class, count in self._running.items()},
+                "queued": {job_class.value: len(queue) for job_class, queue in self._waiters.items()},
+                "queue_depth": self._queue_depth(),
+            }
+
+
+# シングルトンインスタンス
+ffmpeg_scheduler = FFmpegScheduler()
+
+
+def get_ffmpeg_scheduler() -> FFmpegScheduler:
+    """FFmpegSchedulerのインスタンスを取得"""
+    return ffmpeg_scheduler
@@ -4,14 +4,22 @@ FFmpeg動画処理サービス
 動画にテキストオーバーレイとBGMを合成する機能を提供する。
 """
 
-import asyncio
 import logging
 import os
 import subprocess
-import tempfile
 from pathlib import Path
 from typing import Optional
 
+from app.core.config import settings
+from app.services.ffmpeg_runner import (
+    ProgressCallback,
+    run_ffmpeg,
+    run_ffmpeg_pipeline,
+    scale_progress,
+)
+from app.services.ffmpeg_scheduler import FFmpegJobClass
+from app.services.scratch_space import get_scratch_space
+
 logger = logging.getLogger(__name__)
 
 
@@ -65,6 +73,32 @@ class FFmpegService:
         except FileNotFoundError:
             return False
 
+    async def _run(
+        self,
+        cmd: list[str],
+        job_class: FFmpegJobClass = FFmpegJobClass.BATCH,
+        *,
+        job_id: Optional[str] = None,
+        progress_callback: Optional[ProgressCallback] = None,
+        duration: Optional[float] = None,
+        input_path: Optional[str] = None,
+    ) -> tuple[int, bytes, bytes]:
+        """
+        FFmpegスケジューラ経由でコマンドを実行し (returncode, stdout, stderr) を返す
+
+        progress_callback 指定時に duration が不明な場合は input_path の長さを使う。
+        """
+        if progress_callback is not None and duration is None and input_path:
+            duration = await self._get_video_duration(input_path)
+
+        return await run_ffmpeg(
+            cmd,
+            job_class,
+            job_id=job_id,
+            duration=duration,
+            on_progress=progress_callback,
+        )
+
     def _escape_text(self, text: str) -> str:
         """FFmpegのdrawtextフィルター用にテキストをエスケープ"""
         # 特殊文字をエスケープ
@@ -75,6 +109,36 @@ class FFmpegService:
         text = text.replace("]", "\\]")
         return text
 
+    def _text_y_position(self, position: str) -> str:
+        """テキスト位置（top/center/bottom）をdrawtextのy式に変換"""
+        if position == "top":
+            return "h*0.1"
+        elif position == "center":
+            return "(h-text_h)/2"
+        else:  # bottom
+            return "h*0.85-text_h"
+
+    def _build_drawtext_filter(
+        self,
+        escaped_text: str,
+        font_path: str,
+        font_size: int,
+        color: str,
+        y_position: str,
+    ) -> str:
+        """drawtextフィルターを構築"""
+        return (
+            f"drawtext="
+            f"text='{escaped_text}':"
+            f"fontfile='{font_path}':"
+            f"fontsize={font_size}:"
+            f"fontcolor={color}:"
+            f"x=(w-text_w)/2:"
+            f"y={y_position}:"
+            f"borderw=2:"
+            f"bordercolor=black"
+        )
+
     async def add_text_overlay(
         self,
         video_path: str,
@@ -85,6 +149,8 @@ class FFmpegService:
         color: str = "#FFFFFF",
         font_size: int = 48,
         animation: str = "none",
+        job_id: Optional[str] = None,
+        progress_callback: Optional[ProgressCallback] = None,
     ) -> str:
         """
         動画にテキストオーバーレイを追加
@@ -98,6 +164,8 @@ class FFmpegService:
             color: テキスト色（#RRGGBB形式）
             font_size: フォントサイズ
             animation: アニメーション種類 ("none", "fade_in", "slide_up")
+            job_id: キャンセル用のジョブID（動画ID等）
+            progress_callback: 進捗コールバック
 
         Returns:
             str: 出力動画パス
@@ -112,12 +180,7 @@ class FFmpegService:
             raise FFmpegError(f"入力動画が見つかりません: {video_path}")
 
         # 位置の計算
-        if position == "top":
-            y_position = "h*0.1"
-        elif position == "center":
-            y_position = "(h-text_h)/2"
-        else:  # bottom
-            y_position = "h*0.85-text_h"
+        y_position = self._text_y_position(position)
 
         font_path = self.font_paths.get(font, self.default_font)
         if not font_path:
@@ -142,16 +205,8 @@ class FFmpegService:
                 y_expr = ""
 
             # 基本のdrawtextフィルター
-            drawtext_filter = (
-                f"drawtext="
-                f"text='{escaped_text}':"
-                f"fontfile='{font_path}':"
-                f"fontsize={font_size}:"
-                f"fontcolor={color}:"
-                f"x=(w-text_w)/2:"
-                f"y={y_position}:"
-                f"borderw=2:"
-                f"bordercolor=black"
+            drawtext_filter = self._build_drawtext_filter(
+                escaped_text, font_path, font_size, color, y_position
             )
 
             cmd = [
@@ -168,15 +223,14 @@ class FFmpegService:
 
         logger.info(f"FFmpegコマンド: {' '.join(cmd)}")
 
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
+        returncode, stdout, stderr = await self._run(
+            cmd,
+            job_id=job_id,
+            progress_callback=progress_callback,
+            input_path=video_path,
         )
 
-        stdout, stderr = await process.communicate()
-
-        if process.returncode != 0:
+        if returncode != 0:
             error_msg = stderr.decode() if stderr else "不明なエラー"
             logger.error(f"FFmpegエラー: {error_msg}")
             raise FFmpegError(f"テキストオーバーレイの追加に失敗: {error_msg}")
@@ -184,11 +238,17 @@ class FFmpegService:
         logger.info(f"テキストオーバーレイ完了: {output_path}")
         return output_path
 
+    def _build_film_grain_filter(self, intensity: int) -> str:
+        """フィルムグレイン（noise）フィルターを構築"""
+        return f"noise=alls={intensity}:allf=t+u"
+
     async def add_film_grain(
         self,
         video_path: str,
         output_path: str,
         intensity: int = 20,
+        job_id: Optional[str] = None,
+        progress_callback: Optional[ProgressCallback] = None,
     ) -> str:
         """
         動画にフィルムグレイン効果を追加（AI生成感を軽減）
@@ -197,6 +257,8 @@ class FFmpegService:
             video_path: 入力動画パス
             output_path: 出力動画パス
             intensity: グレイン強度（0-100、デフォルト20%）
+            job_id: キャンセル用のジョブID（動画ID等）
+            progress_callback: 進捗コールバック
 
         Returns:
             str: 出力動画パス
@@ -213,7 +275,7 @@ class FFmpegService:
         # noiseフィルターでフィルムグレインを追加
         # alls: 全チャンネルのノイズ強度
         # allf=t+u: temporal(時間的変化) + uniform(均一分布) でフィルムらしい粒子感
-        noise_filter = f"noise=alls={intensity}:allf=t+u"
+        noise_filter = self._build_film_grain_filter(intensity)
 
         cmd = [
             "ffmpeg", "-y",
@@ -229,15 +291,14 @@ class FFmpegService:
 
         logger.info(f"フィルムグレイン追加コマンド: {' '.join(cmd)}")
 
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
+        returncode, stdout, stderr = await self._run(
+            cmd,
+            job_id=job_id,
+            progress_callback=progress_callback,
+            input_path=video_path,
         )
 
-        stdout, stderr = await process.communicate()
-
-        if process.returncode != 0:
+        if returncode != 0:
             error_msg = stderr.decode() if stderr else "不明なエラー"
             logger.error(f"FFmpegエラー: {error_msg}")
             raise FFmpegError(f"フィルムグレインの追加に失敗: {error_msg}")
@@ -255,6 +316,8 @@ class FFmpegService:
         contrast: float = 0.9,
         saturation: float = 0.85,
         brightness: float = 0.03,
+        job_id: Optional[str] = None,
+        progress_callback: Optional[ProgressCallback] = None,
     ) -> str:
         """
         AI生成動画をデバンド処理してProRes 422 HQ (10bit)に変換
@@ -271,6 +334,8 @@ class FFmpegService:
             contrast: コントラスト調整（0.5-1.5、デフォルト0.9）
             saturation: 彩度調整（0.5-1.5、デフォルト0.85）
             brightness: 明るさ調整（-0.5-0.5、デフォルト0.03）
+            job_id: キャンセル用のジョブID（動画ID等）
+            progress_callback: 進捗コールバック
 
         Returns:
             str: 出力動画パス
@@ -314,15 +379,14 @@ class FFmpegService:
 
         logger.info(f"ProRes変換コマンド: {' '.join(cmd)}")
 
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
+        returncode, stdout, stderr = await self._run(
+            cmd,
+            job_id=job_id,
+            progress_callback=progress_callback,
+            input_path=video_path,
         )
 
-        stdout, stderr = await process.communicate()
-
-        if process.returncode != 0:
+        if returncode != 0:
             error_msg = stderr.decode() if stderr else "不明なエラー"
             logger.error(f"FFmpegエラー: {error_msg}")
             raise FFmpegError(f"ProRes変換に失敗: {error_msg}")
@@ -330,10 +394,26 @@ class FFmpegService:
         logger.info(f"ProRes変換完了: {output_path}")
         return output_path
 
+    def _build_color_grading_filter(self) -> str:
+        """カラーグレーディングのフィルターチェーンを構築"""
+        color_filters = [
+            # シャドウをリフト（黒を0.03まで持ち上げ）+ シャドウにブルー/シアンを追加（軽減版）
+            "curves=m='0/0.03 0.25/0.26 0.5/0.5 0.75/0.75 1/1':b='0/0.015 1/1'",
+            # ミッドトーンに暖色を追加（軽減版: 約半分）
+            "colorbalance=rm=0.03:gm=0.03:bm=-0.02",
+            # 彩度を少し下げる（0.95 = 95%、より控えめに）
+            "eq=saturation=0.95",
+            # ビネット効果（より緩やかに: PI/5）
+            "vignette=PI/5",
+        ]
+        return ",".join(color_filters)
+
     async def apply_color_grading(
         self,
         video_path: str,
         output_path: str,
+        job_id: Optional[str] = None,
+        progress_callback: Optional[ProgressCallback] = None,
     ) -> str:
         """
         動画にシネマティックなカラーグレーディングを適用（脱AI感）
@@ -347,6 +427,8 @@ class FFmpegService:
         Args:
             video_path: 入力動画パス
             output_path: 出力動画パス
+            job_id: キャンセル用のジョブID（動画ID等）
+            progress_callback: 進捗コールバック
 
         Returns:
             str: 出力動画パス
@@ -366,18 +448,7 @@ class FFmpegService:
         # 3. eq: 彩度を少し下げる
         # 4. vignette: 周辺減光
 
-        color_filters = [
-            # シャドウをリフト（黒を0.03まで持ち上げ）+ シャドウにブルー/シアンを追加（軽減版）
-            "curves=m='0/0.03 0.25/0.26 0.5/0.5 0.75/0.75 1/1':b='0/0.015 1/1'",
-            # ミッドトーンに暖色を追加（軽減版: 約半分）
-            "colorbalance=rm=0.03:gm=0.03:bm=-0.02",
-            # 彩度を少し下げる（0.95 = 95%、より控えめに）
-            "eq=saturation=0.95",
-            # ビネット効果（より緩やかに: PI/5）
-            "vignette=PI/5",
-        ]
-
-        filter_chain = ",".join(color_filters)
+        filter_chain = self._build_color_grading_filter()
 
         cmd = [
             "ffmpeg", "-y",
@@ -393,15 +464,14 @@ class FFmpegService:
 
         logger.info(f"カラーグレーディングコマンド: {' '.join(cmd)}")
 
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
+        returncode, stdout, stderr = await self._run(
+            cmd,
+            job_id=job_id,
+            progress_callback=progress_callback,
+            input_path=video_path,
         )
 
-        stdout, stderr = await process.communicate()
-
-        if process.returncode != 0:
+        if returncode != 0:
             error_msg = stderr.decode() if stderr else "不明なエラー"
             logger.error(f"FFmpegエラー: {error_msg}")
             raise FFmpegError(f"カラーグレーディングの適用に失敗: {error_msg}")
@@ -409,11 +479,29 @@ class FFmpegService:
         logger.info(f"カラーグレーディング完了: {output_path}")
         return output_path
 
+    def _build_promist_filter(self, intensity: float) -> str:
+        """Pro-Mist効果のフィルターグラフを構築"""
+        blur_amount = max(3, int(15 * intensity))  # ブラー量（最低3で視認可能なグロー）
+        bloom_opacity = intensity * 0.8 + 0.05     # ブルームの不透明度（ベース5%追加）
+        contrast_reduction = 1.0 - (intensity * 0.12)  # コントラスト軽減
+
+        # フィルターチェーン:
+        # split -> 片方をぼかしてハイライト抽出 -> screenブレンド -> コントラスト調整
+        return (
+            f"split[original][blur];"
+            f"[blur]gblur=sigma={blur_amount},"
+            f"curves=m='0/0 0.3/0 0.5/0.3 1/1'[bloom];"  # ハイライトのみ抽出
+            f"[original][bloom]blend=all_mode=screen:all_opacity={bloom_opacity},"
+            f"eq=contrast={contrast_reduction}:brightness=0.02"  # 少しコントラスト下げて明るく
+        )
+
     async def apply_promist_effect(
         self,
         video_path: str,
         output_path: str,
         intensity: float = 0.125,
+        job_id: Optional[str] = None,
+        progress_callback: Optional[ProgressCallback] = None,
     ) -> str:
         """
         ブラックプロミスト1/8効果を適用
@@ -426,6 +514,8 @@ class FFmpegService:
             video_path: 入力動画パス
             output_path: 出力動画パス
             intensity: 効果の強度（デフォルト0.125 = 1/8）
+            job_id: キャンセル用のジョブID（動画ID等）
+            progress_callback: 進捗コールバック
 
         Returns:
             str: 出力動画パス
@@ -444,19 +534,7 @@ class FFmpegService:
         # 2. オリジナルとブレンド
         # 3. コントラストを少し下げる
 
-        blur_amount = max(3, int(15 * intensity))  # ブラー量（最低3で視認可能なグロー）
-        bloom_opacity = intensity * 0.8 + 0.05     # ブルームの不透明度（ベース5%追加）
-        contrast_reduction = 1.0 - (intensity * 0.12)  # コントラスト軽減
-
-        # フィルターチェーン:
-        # split -> 片方をぼかしてハイライト抽出 -> screenブレンド -> コントラスト調整
-        promist_filter = (
-            f"split[original][blur];"
-            f"[blur]gblur=sigma={blur_amount},"
-            f"curves=m='0/0 0.3/0 0.5/0.3 1/1'[bloom];"  # ハイライトのみ抽出
-            f"[original][bloom]blend=all_mode=screen:all_opacity={bloom_opacity},"
-            f"eq=contrast={contrast_reduction}:brightness=0.02"  # 少しコントラスト下げて明るく
-        )
+        promist_filter = self._build_promist_filter(intensity)
 
         cmd = [
             "ffmpeg", "-y",
@@ -472,15 +550,14 @@ class FFmpegService:
 
         logger.info(f"Pro-Mist効果適用コマンド: {' '.join(cmd)}")
 
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
+        returncode, stdout, stderr = await self._run(
+            cmd,
+            job_id=job_id,
+            progress_callback=progress_callback,
+            input_path=video_path,
         )
 
-        stdout, stderr = await process.communicate()
-
-        if process.returncode != 0:
+        if returncode != 0:
             error_msg = stderr.decode() if stderr else "不明なエラー"
             logger.error(f"FFmpegエラー: {error_msg}")
             raise FFmpegError(f"Pro-Mist効果の適用に失敗: {error_msg}")
@@ -488,12 +565,31 @@ class FFmpegService:
         logger.info(f"Pro-Mist効果適用完了: {output_path}")
         return output_path
 
+    def _build_lut_filter(self, lut_path: str, intensity: float) -> str:
+        """LUTを指定の強度でブレンドするフィルターグラフを構築"""
+        # LUTを指定の強度で適用（split + lut3d + mix でブレンド）
+        # 元映像とLUT適用映像をmixでブレンド
+        intensity = max(0.0, min(1.0, intensity))
+        original_weight = 1.0 - intensity
+        lut_weight = intensity
+
+        # LUTパスのエスケープ（スペース対応）
+        escaped_lut_path = lut_path.replace("'", "'\\''")
+
+        return (
+            f"split[original][tolut];"
+            f"[tolut]lut3d='{escaped_lut_path}'[luted];"
+            f"[original][luted]mix=weights='{original_weight} {lut_weight}'"
+        )
+
     async def apply_lut(
         self,
         video_path: str,
         output_path: str,
         lut_path: str,
         intensity: float = 0.5,
+        job_id: Optional[str] = None,
+        progress_callback: Optional[ProgressCallback] = None,
     ) -> str:
         """
         動画にLUT（ルックアップテーブル）を適用
@@ -503,6 +599,8 @@ class FFmpegService:
             output_path: 出力動画パス
             lut_path: LUTファイルパス（.cube等）
             intensity: LUTの強度（0.0-1.0、デフォルト0.5=50%）
+            job_id: キャンセル用のジョブID（動画ID等）
+            progress_callback: 進捗コールバック
 
         Returns:
             str: 出力動画パス
@@ -522,19 +620,7 @@ class FFmpegService:
         # 強度を0-1の範囲にクランプ
         intensity = max(0.0, min(1.0, intensity))
 
-        # LUTを指定の強度で適用（split + lut3d + mix でブレンド）
-        # 元映像とLUT適用映像をmixでブレンド
-        original_weight = 1.0 - intensity
-        lut_weight = intensity
-
-        # LUTパスのエスケープ（スペース対応）
-        escaped_lut_path = lut_path.replace("'", "'\\''")
-
-        lut_filter = (
-            f"split[original][tolut];"
-            f"[tolut]lut3d='{escaped_lut_path}'[luted];"
-            f"[original][luted]mix=weights='{original_weight} {lut_weight}'"
-        )
+        lut_filter = self._build_lut_filter(lut_path, intensity)
 
         cmd = [
             "ffmpeg", "-y",
@@ -550,15 +636,14 @@ class FFmpegService:
 
         logger.info(f"LUT適用コマンド（強度{intensity*100:.0f}%）: {' '.join(cmd)}")
 
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
+        returncode, stdout, stderr = await self._run(
+            cmd,
+            job_id=job_id,
+            progress_callback=progress_callback,
+            input_path=video_path,
         )
 
-        stdout, stderr = await process.communicate()
-
-        if process.returncode != 0:
+        if returncode != 0:
             error_msg = stderr.decode() if stderr else "不明なエラー"
             logger.error(f"FFmpegエラー: {error_msg}")
             raise FFmpegError(f"LUTの適用に失敗: {error_msg}")
@@ -574,6 +659,8 @@ class FFmpegService:
         video_volume: float = 0.3,
         audio_volume: float = 0.7,
         fade_out_duration: float = 1.0,
+        job_id: Optional[str] = None,
+        progress_callback: Optional[ProgressCallback] = None,
     ) -> str:
         """
         動画にBGMを追加
@@ -585,6 +672,8 @@ class FFmpegService:
             video_volume: 動画の音声ボリューム（0.0-1.0）
             audio_volume: BGMのボリューム（0.0-1.0）
             fade_out_duration: フェードアウト時間（秒）
+            job_id: キャンセル用のジョブID（動画ID等）
+            progress_callback: 進捗コールバック
 
         Returns:
             str: 出力動画パス
@@ -658,15 +747,14 @@ class FFmpegService:
 
         logger.info(f"FFmpegコマンド: {' '.join(cmd)}")
 
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
+        returncode, stdout, stderr = await self._run(
+            cmd,
+            job_id=job_id,
+            progress_callback=progress_callback,
+            input_path=video_path,
         )
 
-        stdout, stderr = await process.communicate()
-
-        if process.returncode != 0:
+        if returncode != 0:
             error_msg = stderr.decode() if stderr else "不明なエラー"
             logger.error(f"FFmpegエラー: {error_msg}")
             raise FFmpegError(f"BGMの追加に失敗: {error_msg}")
@@ -679,6 +767,8 @@ class FFmpegService:
         video_path: str,
         output_path: str,
         target_fps: int = 24,
+        job_id: Optional[str] = None,
+        progress_callback: Optional[ProgressCallback] = None,
     ) -> str:
         """
         動画のフレームレートを変換（シネマティック24fps等）
@@ -687,6 +777,8 @@ class FFmpegService:
             video_path: 入力動画パス
             output_path: 出力動画パス
             target_fps: 目標フレームレート（デフォルト24fps）
+            job_id: キャンセル用のジョブID（動画ID等）
+            progress_callback: 進捗コールバック
 
         Returns:
             str: 出力動画パス
@@ -715,15 +807,14 @@ class FFmpegService:
 
         logger.info(f"FPS変換コマンド（{target_fps}fps）: {' '.join(cmd)}")
 
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
+        returncode, stdout, stderr = await self._run(
+            cmd,
+            job_id=job_id,
+            progress_callback=progress_callback,
+            input_path=video_path,
         )
 
-        stdout, stderr = await process.communicate()
-
-        if process.returncode != 0:
+        if returncode != 0:
             error_msg = stderr.decode() if stderr else "不明なエラー"
             logger.error(f"FFmpegエラー: {error_msg}")
             raise FFmpegError(f"FPS変換に失敗: {error_msg}")
@@ -731,6 +822,24 @@ class FFmpegService:
         logger.info(f"FPS変換完了（{target_fps}fps）: {output_path}")
         return output_path
 
+    def _build_logo_filter(self, position: str, opacity: float, scale: float) -> str:
+        """ロゴ（2番目の入力）を重ねるフィルターグラフを構築"""
+        # 位置の計算
+        positions = {
+            "top_left": "10:10",
+            "top_right": "main_w-overlay_w-10:10",
+            "bottom_left": "10:main_h-overlay_h-10",
+            "bottom_right": "main_w-overlay_w-10:main_h-overlay_h-10",
+        }
+        overlay_position = positions.get(position, positions["bottom_right"])
+
+        # フィルター構築
+        return (
+            f"[1:v]scale=iw*{scale}:-1,format=rgba,"
+            f"colorchannelmixer=aa={opacity}[logo];"
+            f"[0:v][logo]overlay={overlay_position}"
+        )
+
     async def add_logo_watermark(
         self,
         video_path: str,
@@ -739,6 +848,8 @@ class FFmpegService:
         position: str = "bottom_right",
         opacity: float = 0.7,
         scale: float = 0.15,
+        job_id: Optional[str] = None,
+        progress_callback: Optional[ProgressCallback] = None,
     ) -> str:
         """
         動画にロゴ（ウォーターマーク）を追加
@@ -750,6 +861,8 @@ class FFmpegService:
             position: "top_left", "top_right", "bottom_left", "bottom_right"
             opacity: 透明度（0.0-1.0）
             scale: ロゴのスケール（動画幅に対する比率）
+            job_id: キャンセル用のジョブID（動画ID等）
+            progress_callback: 進捗コールバック
 
         Returns:
             str: 出力動画パス
@@ -760,21 +873,7 @@ class FFmpegService:
         if not os.path.exists(logo_path):
             raise FFmpegError(f"ロゴファイルが見つかりません: {logo_path}")
 
-        # 位置の計算
-        positions = {
-            "top_left": "10:10",
-            "top_right": "main_w-overlay_w-10:10",
-            "bottom_left": "10:main_h-overlay_h-10",
-            "bottom_right": "main_w-overlay_w-10:main_h-overlay_h-10",
-        }
-        overlay_position = positions.get(position, positions["bottom_right"])
-
-        # フィルター構築
-        filter_complex = (
-            f"[1:v]scale=iw*{scale}:-1,format=rgba,"
-            f"colorchannelmixer=aa={opacity}[logo];"
-            f"[0:v][logo]overlay={overlay_position}"
-        )
+        filter_complex = self._build_logo_filter(position, opacity, scale)
 
         cmd = [
             "ffmpeg", "-y",
@@ -791,21 +890,151 @@ class FFmpegService:
 
         logger.info(f"FFmpegコマンド: {' '.join(cmd)}")
 
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
+        returncode, stdout, stderr = await self._run(
+            cmd,
+            job_id=job_id,
+            progress_callback=progress_callback,
+            input_path=video_path,
         )
 
-        stdout, stderr = await process.communicate()
-
-        if process.returncode != 0:
+        if returncode != 0:
             error_msg = stderr.decode() if stderr else "不明なエラー"
             raise FFmpegError(f"ロゴの追加に失敗: {error_msg}")
 
         logger.info(f"ロゴ追加完了: {output_path}")
         return output_path
 
+    def _build_video_stages(
+        self,
+        text: Optional[str],
+        text_position: str,
+        text_font: str,
+        text_color: str,
+        text_size: int,
+        logo_path: Optional[str],
+        logo_position: str,
+        film_grain_intensity: int,
+        lut_path: Optional[str],
+        lut_intensity: float,
+        promist_enabled: bool,
+        promist_intensity: float,
+        target_fps: Optional[int],
+    ) -> list[tuple[str, list[str]]]:
+        """
+        process_video の映像ステージを (ステージ名, フィルター引数) のリストで返す
+
+        フィルター引数は ["-vf", graph] または ["-i", 追加入力, ..., "-filter_complex", graph]。
+        適用順・条件は process_video のファイル経由モードと同じ。
+        """
+        stages: list[tuple[str, list[str]]] = []
+
+        if target_fps:
+            stages.append(("fps", ["-vf", f"fps={target_fps}"]))
+
+        if lut_path:
+            stages.append(("grading", ["-vf", self._build_color_grading_filter()]))
+
+        if lut_path and promist_enabled:
+            stages.append(("promist", ["-filter_complex", self._build_promist_filter(promist_intensity)]))
+
+        if lut_path and os.path.exists(lut_path):
+            stages.append(("lut", ["-filter_complex", self._build_lut_filter(lut_path, lut_intensity)]))
+
+        if film_grain_intensity > 0:
+            stages.append(("grain", ["-vf", self._build_film_grain_filter(film_grain_intensity)]))
+
+        if text:
+            font_path = self.font_paths.get(text_font, self.default_font)
+            if font_path:
+                drawtext_filter = self._build_drawtext_filter(
+                    self._escape_text(text),
+                    font_path,
+                    text_size,
+                    text_color,
+                    self._text_y_position(text_position),
+                )
+                stages.append(("text", ["-vf", drawtext_filter]))
+            else:
+                logger.warning(f"フォントが見つかりません: {text_font}、テキストなしで処理します")
+
+        if logo_path:
+            if not os.path.exists(logo_path):
+                raise FFmpegError(f"ロゴファイルが見つかりません: {logo_path}")
+            stages.append(("logo", [
+                "-i", logo_path,
+                "-filter_complex", self._build_logo_filter(logo_position, 0.7, 0.15),
+            ]))
+
+        return stages
+
+    async def _run_stage_pipeline(
+        self,
+        video_path: str,
+        output_path: str,
+        stages: list[tuple[str, list[str]]],
+        job_id: Optional[str] = None,
+        progress_callback: Optional[ProgressCallback] = None,
+    ) -> str:
+        """
+        映像ステージをパイプで連結して実行
+
+        中間段は非圧縮（rawvideo）のNUTで次段へ渡し、エンコードは最終段のみ行う。
+        音声は各段でそのままコピーする。
+
+        Returns:
+            str: 出力動画パス
+        """
+        if not os.path.exists(video_path):
+            raise FFmpegError(f"入力動画が見つかりません: {video_path}")
+
+        cmds = []
+        for index, (_name, filter_args) in enumerate(stages):
+            if index == 0:
+                input_args = ["-i", video_path]
+            else:
+                input_args = ["-f", "nut", "-i", "pipe:0"]
+
+            if index == len(stages) - 1:
+                output_args = [
+                    "-c:v", "libx264",
+                    "-preset", "fast",
+                    "-crf", "23",
+                    "-movflags", "+faststart",
+                    output_path,
+                ]
+            else:
+                output_args = ["-c:v", "rawvideo", "-f", "nut", "pipe:1"]
+
+            cmds.append([
+                "ffmpeg", "-y",
+                *input_args,
+                *filter_args,
+                "-c:a", "copy",
+                *output_args,
+            ])
+
+        stage_names = " | ".join(name for name, _ in stages)
+        logger.info(f"パイプ連結処理開始: {stage_names}")
+
+        duration = None
+        if progress_callback is not None:
+            duration = await self._get_video_duration(video_path)
+
+        returncode, stderr = await run_ffmpeg_pipeline(
+            cmds,
+            job_id=job_id,
+            duration=duration,
+            on_progress=progress_callback,
+        )
+
+        if returncode != 0:
+            error_msg = stderr.decode() if stderr else "不明なエラー"
+            logger.error(f"FFmpegエラー: {error_msg}")
+            raise FFmpegError(f"映像処理（パイプ連結）に失敗: {error_msg}")
+
+        logger.info(f"パイプ連結処理完了: {output_path}")
+        return output_path
+
     async def process_video(
         self,
         video_path: str,
@@ -825,10 +1054,16 @@ class FFmpegService:
         promist_enabled: bool = True,
         promist_intensity: float = 0.125,
         target_fps: Optional[int] = 24,
+        job_id: Optional[str] = None,
+        progress_callback: Optional[ProgressCallback] = None,
+        pipe_stages: Optional[bool] = None,
     ) -> str:
         """
         動画に複数の処理を一括で適用
 
+        パイプ連結モードでは映像ステージ（FPS変換〜ロゴ）のffmpegをパイプで繋ぎ、
+        中間ファイルを書かずにエンコードを最終段の1回だけにする。
+
         Args:
             video_path: 入力動画パス
             output_path: 最終出力パス
@@ -847,106 +1082,186 @@ class FFmpegService:
             promist_enabled: Pro-Mist効果を有効にするか（デフォルトTrue）
             promist_intensity: Pro-Mist強度（デフォルト0.125 = 1/8）
             target_fps: 目標フレームレート（デフォルト24fps、Noneで変換なし）
+            job_id: キャンセル用のジョブID（動画ID等）
+            progress_callback: 全ステージを通した進捗コールバック（0-100%）
+            pipe_stages: 映像ステージをパイプ連結するか（Noneの場合は設定値）
 
         Returns:
             str: 出力動画パス
         """
-        current_path = video_path
-        temp_files = []
-
-        try:
-            # FPS変換（シネマティック24fps）
-            if target_fps:
-                logger.info(f"Starting FPS conversion to {target_fps}fps")
-                with tempfile.NamedTemporaryFile(suffix=".mp4", delete=False) as f:
-                    temp_path = f.name
-                    temp_files.append(temp_path)
-
-                current_path = await self.convert_fps(
-                    video_path=current_path,
-                    output_path=temp_path,
-                    target_fps=target_fps,
-                )
-                logger.info(f"FPS conversion completed: {target_fps}fps")
-
-            # カラーグレーディング適用（脱AI感・シネマティックな色調）
-            # lut_pathがある場合のみ適用（use_lut=Falseの場合はスキップ）
-            if lut_path:
-                with tempfile.NamedTemporaryFile(suffix=".mp4", delete=False) as f:
-                    temp_path = f.name
-                    temp_files.append(temp_path)
-
-                current_path = await self.apply_color_grading(
-                    video_path=current_path,
-                    output_path=temp_path,
-                )
-
-            # Pro-Mist効果適用（ハイライトの滲み・コントラスト軽減）
-            # lut_pathがある場合のみ適用（use_lut=Falseの場合はスキップ）
-            if lut_path and promist_enabled:
-                with tempfile.NamedTemporaryFile(suffix=".mp4", delete=False) as f:
-                    temp_path = f.name
-                    temp_files.append(temp_path)
-
-                current_path = await self.apply_promist_effect(
-                    video_path=current_path,
-                    output_path=temp_path,
-                    intensity=promist_intensity,
-                )
+        if pipe_stages is None:
+            pipe_stages = settings.FFMPEG_PIPE_STAGES
 
-            # LUT適用（シネマティックルック）
-            if lut_path and os.path.exists(lut_path):
-                with tempfile.NamedTemporaryFile(suffix=".mp4", delete=False) as f:
-                    temp_path = f.name
-                    temp_files.append(temp_path)
-
-                current_path = await self.apply_lut(
-                    video_path=current_path,
-                    output_path=temp_path,
-                    lut_path=lut_path,
-                    intensity=lut_intensity,
-                )
-
-            # フィルムグレイン追加（AI生成感を軽減）
-            if film_grain_intensity > 0:
-                with tempfile.NamedTemporaryFile(suffix=".mp4", delete=False) as f:
-                    temp_path = f.name
-                    temp_files.append(temp_path)
-
-                current_path = await self.add_film_grain(
-                    video_path=current_path,
-                    output_path=temp_path,
-                    intensity=film_grain_intensity,
-                )
+        current_path = video_path
+        # 中間ファイルはジョブ単位のスクラッチワークスペースに置く
+        workspace = get_scratch_space().workspace(f"process_{job_id or 'video'}")
+        stage_index = 0
+
+        # 全体の進捗を有効なステージ数で等分する
+        total_stages = max(1, sum([
+            bool(target_fps),
+            bool(lut_path),
+            bool(lut_path and promist_enabled),
+            bool(lut_path and os.path.exists(lut_path)),
+            film_grain_intensity > 0,
+            bool(text),
+            bool(logo_path),
+            bool(bgm_path),
+        ]))
+        completed_stages = 0
+
+        def stage_progress() -> Optional[ProgressCallback]:
+            """現在のステージの進捗を全体の進捗範囲にマッピング"""
+            return scale_progress(
+                progress_callback,
+                completed_stages / total_stages * 100,
+                (completed_stages + 1) / total_stages * 100,
+            )
 
-            # テキストオーバーレイ
-            if text:
-                with tempfile.NamedTemporaryFile(suffix=".mp4", delete=False) as f:
-                    temp_path = f.name
-                    temp_files.append(temp_path)
+        def next_stage_path(stage: str) -> str:
+            """次のステージの出力パス（不要になった中間ファイルは削除してからクォータを確認）"""
+            nonlocal stage_index
+            for name in os.listdir(workspace.path):
+                path = workspace.file(name)
+                if path != current_path:
+                    os.unlink(path)
+            workspace.check_quota()
+            stage_index += 1
+            return workspace.file(f"{stage_index:02d}_{stage}.mp4")
 
-                current_path = await self.add_text_overlay(
-                    video_path=current_path,
-                    output_path=temp_path,
+        try:
+            video_stages: list[tuple[str, list[str]]] = []
+            if pipe_stages:
+                video_stages = self._build_video_stages(
                     text=text,
-                    position=text_position,
-                    font=text_font,
-                    color=text_color,
-                    font_size=text_size,
+                    text_position=text_position,
+                    text_font=text_font,
+                    text_color=text_color,
+                    text_size=text_size,
+                    logo_path=logo_path,
+                    logo_position=logo_position,
+                    film_grain_intensity=film_grain_intensity,
+                    lut_path=lut_path,
+                    lut_intensity=lut_intensity,
+                    promist_enabled=promist_enabled,
+                    promist_intensity=promist_intensity,
+                    target_fps=target_fps,
                 )
 
-            # ロゴ追加
-            if logo_path:
-                with tempfile.NamedTemporaryFile(suffix=".mp4", delete=False) as f:
-                    temp_path = f.name
-                    temp_files.append(temp_path)
-
-                current_path = await self.add_logo_watermark(
-                    video_path=current_path,
-                    logo_path=logo_path,
-                    output_path=temp_path,
-                    position=logo_position,
+            if len(video_stages) >= 2:
+                # 映像ステージをパイプ連結して1回で処理
+                stages_output = output_path if not bgm_path else workspace.file("stages.mp4")
+                current_path = await self._run_stage_pipeline(
+                    video_path=video_path,
+                    output_path=stages_output,
+                    stages=video_stages,
+                    job_id=job_id,
+                    progress_callback=scale_progress(
+                        progress_callback, 0, len(video_stages) / total_stages * 100
+                    ),
                 )
+                completed_stages += len(video_stages)
+                workspace.check_quota()
+            else:
+                # FPS変換（シネマティック24fps）
+                if target_fps:
+                    logger.info(f"Starting FPS conversion to {target_fps}fps")
+                    temp_path = next_stage_path("fps")
+
+                    current_path = await self.convert_fps(
+                        video_path=current_path,
+                        output_path=temp_path,
+                        target_fps=target_fps,
+                        job_id=job_id,
+                        progress_callback=stage_progress(),
+                    )
+                    completed_stages += 1
+                    logger.info(f"FPS conversion completed: {target_fps}fps")
+
+                # カラーグレーディング適用（脱AI感・シネマティックな色調）
+                # lut_pathがある場合のみ適用（use_lut=Falseの場合はスキップ）
+                if lut_path:
+                    temp_path = next_stage_path("grading")
+
+                    current_path = await self.apply_color_grading(
+                        video_path=current_path,
+                        output_path=temp_path,
+                        job_id=job_id,
+                        progress_callback=stage_progress(),
+                    )
+                    completed_stages += 1
+
+                # Pro-Mist効果適用（ハイライトの滲み・コントラスト軽減）
+                # lut_pathがある場合のみ適用（use_lut=Falseの場合はスキップ）
+                if lut_path and promist_enabled:
+                    temp_path = next_stage_path("promist")
+
+                    current_path = await self.apply_promist_effect(
+                        video_path=current_path,
+                        output_path=temp_path,
+                        intensity=promist_intensity,
+                        job_id=job_id,
+                        progress_callback=stage_progress(),
+                    )
+                    completed_stages += 1
+
+                # LUT適用（シネマティックルック）
+                if lut_path and os.path.exists(lut_path):
+                    temp_path = next_stage_path("lut")
+
+                    current_path = await self.apply_lut(
+                        video_path=current_path,
+                        output_path=temp_path,
+                        lut_path=lut_path,
+                        intensity=lut_intensity,
+                        job_id=job_id,
+                        progress_callback=stage_progress(),
+                    )
+                    completed_stages += 1
+
+                # フィルムグレイン追加（AI生成感を軽減）
+                if film_grain_intensity > 0:
+                    temp_path = next_stage_path("grain")
+
+                    current_path = await self.add_film_grain(
+                        video_path=current_path,
+                        output_path=temp_path,
+                        intensity=film_grain_intensity,
+                        job_id=job_id,
+                        progress_callback=stage_progress(),
+                    )
+                    completed_stages += 1
+
+                # テキストオーバーレイ
+                if text:
+                    temp_path = next_stage_path("text")
+
+                    current_path = await self.add_text_overlay(
+                        video_path=current_path,
+                        output_path=temp_path,
+                        text=text,
+                        position=text_position,
+                        font=text_font,
+                        color=text_color,
+                        font_size=text_size,
+                        job_id=job_id,
+                        progress_callback=stage_progress(),
+                    )
+                    completed_stages += 1
+
+                # ロゴ追加
+                if logo_path:
+                    temp_path = next_stage_path("logo")
+
+                    current_path = await self.add_logo_watermark(
+                        video_path=current_path,
+                        logo_path=logo_path,
+                        output_path=temp_path,
+                        position=logo_position,
+                        job_id=job_id,
+                        progress_callback=stage_progress(),
+                    )
+                    completed_stages += 1
 
             # BGM追加
             if bgm_path:
@@ -955,6 +1270,8 @@ class FFmpegService:
                     audio_path=bgm_path,
                     output_path=output_path,
                     audio_volume=bgm_volume,
+                    job_id=job_id,
+                    progress_callback=stage_progress(),
                 )
             else:
                 # BGMがない場合は最後のファイルをコピー
@@ -965,23 +1282,13 @@ class FFmpegService:
                         "-c", "copy",
                         output_path,
                     ]
-                    process = await asyncio.create_subprocess_exec(
-                        *cmd,
-                        stdout=asyncio.subprocess.PIPE,
-                        stderr=asyncio.subprocess.PIPE,
-                    )
-                    await process.communicate()
+                    await self._run(cmd, job_id=job_id)
 
             return output_path
 
         finally:
-            # 一時ファイルをクリーンアップ
-            for temp_file in temp_files:
-                try:
-                    if os.path.exists(temp_file):
-                        os.unlink(temp_file)
-                except Exception as e:
-                    logger.warning(f"一時ファイルの削除に失敗: {temp_file}, {e}")
+            # 中間ファイルをクリーンアップ
+            workspace.cleanup()
 
     async def _get_video_duration(self, video_path: str) -> Optional[float]:
         """動画の長さを取得（秒）"""
@@ -994,14 +1301,9 @@ class FFmpegService:
         ]
 
         try:
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-            )
-            stdout, stderr = await process.communicate()
+            returncode, stdout, stderr = await self._run(cmd, FFmpegJobClass.INTERACTIVE)
 
-            if process.returncode == 0 and stdout:
+            if returncode == 0 and stdout:
                 return float(stdout.decode().strip())
         except Exception as e:
             logger.warning(f"動画の長さ取得に失敗: {e}")
@@ -1020,14 +1322,9 @@ class FFmpegService:
         ]
 
         try:
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-            )
-            stdout, stderr = await process.communicate()
+            returncode, stdout, stderr = await self._run(cmd, FFmpegJobClass.INTERACTIVE)
 
-            if process.returncode == 0 and stdout:
+            if returncode == 0 and stdout:
                 import json
                 return json.loads(stdout.decode())
         except Exception as e:
@@ -1041,6 +1338,8 @@ class FFmpegService:
         output_path: str,
         start_time: float,
         end_time: float | None = None,
+        job_id: Optional[str] = None,
+        progress_callback: Optional[ProgressCallback] = None,
     ) -> str:
         """
         動画をトリミング
@@ -1050,6 +1349,8 @@ class FFmpegService:
             output_path: 出力動画パス
             start_time: 開始位置（秒）
             end_time: 終了位置（秒）、Noneの場合は最後まで
+            job_id: キャンセル用のジョブID（動画ID等）
+            progress_callback: 進捗コールバック
 
         Returns:
             str: 出力動画パス
@@ -1112,15 +1413,19 @@ class FFmpegService:
 
         logger.info(f"FFmpeg trim command: {' '.join(cmd)}")
 
+        # 進捗率算出用の出力長
+        trim_end = end_time if end_time is not None else duration
+        output_duration = trim_end - start_time if trim_end else None
+
         try:
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
+            returncode, stdout, stderr = await self._run(
+                cmd,
+                job_id=job_id,
+                progress_callback=progress_callback,
+                duration=output_duration,
             )
-            stdout, stderr = await process.communicate()
 
-            if process.returncode != 0:
+            if returncode != 0:
                 error_msg = stderr.decode() if stderr else "Unknown error"
                 logger.error(f"FFmpeg trim failed: {error_msg}")
                 raise FFmpegError(f"動画トリミングに失敗しました: {error_msg[:200]}")
@@ -1161,6 +1466,8 @@ class FFmpegService:
         output_path: str,
         transition: str = "none",
         transition_duration: float = 0.5,
+        job_id: Optional[str] = None,
+        progress_callback: Optional[ProgressCallback] = None,
     ) -> str:
         """
         複数の動画を結合して1本の動画を作成
@@ -1175,6 +1482,8 @@ class FFmpegService:
                 - "wipeleft", "wiperight": ワイプ
                 - "slideup", "slidedown": スライド
             transition_duration: トランジション時間（秒）
+            job_id: キャンセル用のジョブID（動画ID等）
+            progress_callback: 進捗コールバック
 
         Returns:
             str: 出力動画パス
@@ -1204,21 +1513,31 @@ class FFmpegService:
 
         if transition == "none":
             # シンプル結合（トランジションなし）
-            return await self._concat_simple(video_paths, output_path)
+            return await self._concat_simple(
+                video_paths, output_path, job_id, progress_callback
+            )
         else:
             # トランジション付き結合
             return await self._concat_with_transition(
-                video_paths, output_path, transition, transition_duration
+                video_paths, output_path, transition, transition_duration,
+                job_id, progress_callback,
             )
 
-    async def _concat_simple(self, video_paths: list[str], output_path: str) -> str:
+    async def _concat_simple(
+        self,
+        video_paths: list[str],
+        output_path: str,
+        job_id: Optional[str] = None,
+        progress_callback: Optional[ProgressCallback] = None,
+    ) -> str:
         """
         シンプル結合（トランジションなし）
         concat demuxerを使用して高速に結合
         """
-        # 一時的なファイルリストを作成
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".txt", delete=False) as f:
-            filelist_path = f.name
+        # 一時的なファイルリストを作成（小さいのでRAM層を優先）
+        workspace = get_scratch_space().workspace(f"concat_{job_id or 'video'}")
+        filelist_path = workspace.small_file("filelist.txt")
+        with open(filelist_path, "w") as f:
             for path in video_paths:
                 # パスをエスケープ
                 escaped_path = path.replace("'", "'\\''")
@@ -1236,14 +1555,13 @@ class FFmpegService:
 
             logger.debug(f"FFmpeg concat command: {' '.join(cmd)}")
 
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
+            returncode, stdout, stderr = await self._run(
+                cmd,
+                job_id=job_id,
+                progress_callback=progress_callback,
             )
-            stdout, stderr = await process.communicate()
 
-            if process.returncode != 0:
+            if returncode != 0:
                 error_msg = stderr.decode() if stderr else "Unknown error"
                 logger.error(f"FFmpeg concat failed: {error_msg}")
                 raise FFmpegError(f"動画結合に失敗しました: {error_msg}")
@@ -1253,8 +1571,7 @@ class FFmpegService:
 
         finally:
             # ファイルリストを削除
-            if os.path.exists(filelist_path):
-                os.unlink(filelist_path)
+            workspace.cleanup()
 
     async def _has_audio_stream(self, video_path: str) -> bool:
         """動画に音声トラックがあるかチェック"""
@@ -1268,12 +1585,7 @@ class FFmpegService:
         ]
 
         try:
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-            )
-            stdout, stderr = await process.communicate()
+            returncode, stdout, stderr = await self._run(cmd, FFmpegJobClass.INTERACTIVE)
 
             # 出力があれば音声トラックがある
             return bool(stdout.decode().strip())
@@ -1287,6 +1599,8 @@ class FFmpegService:
         output_path: str,
         transition: str,
         transition_duration: float,
+        job_id: Optional[str] = None,
+        progress_callback: Optional[ProgressCallback] = None,
     ) -> str:
         """
         トランジション付き結合
@@ -1363,14 +1677,17 @@ class FFmpegService:
 
         logger.debug(f"FFmpeg xfade command: {' '.join(cmd)}")
 
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
+        # xfadeで重なる分を差し引いた出力長
+        output_duration = sum(durations) - transition_duration * (n - 1)
+
+        returncode, stdout, stderr = await self._run(
+            cmd,
+            job_id=job_id,
+            progress_callback=progress_callback,
+            duration=output_duration,
         )
-        stdout, stderr = await process.communicate()
 
-        if process.returncode != 0:
+        if returncode != 0:
             error_msg = stderr.decode() if stderr else "Unknown error"
             logger.error(f"FFmpeg xfade failed: {error_msg}")
             raise FFmpegError(f"トランジション付き結合に失敗しました: {error_msg}")
@@ -1492,14 +1809,9 @@ class FFmpegService:
 
         logger.info(f"Extracting last frame: {' '.join(cmd)}")
 
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-        )
-        stdout, stderr = await process.communicate()
+        returncode, stdout, stderr = await self._run(cmd, FFmpegJobClass.INTERACTIVE)
 
-        if process.returncode != 0:
+        if returncode != 0:
             error_msg = stderr.decode() if stderr else "Unknown error"
             raise FFmpegError(f"Failed to extract last frame: {error_msg}")
 
@@ -1510,6 +1822,8 @@ class FFmpegService:
         self,
         video_path: str,
         output_path: str,
+        job_id: Optional[str] = None,
+        progress_callback: Optional[ProgressCallback] = None,
     ) -> str:
         """
         動画を1080p (FullHD) にダウンスケール
@@ -1520,6 +1834,8 @@ class FFmpegService:
         Args:
             video_path: 入力動画パス（4K: 2304x4096等）
             output_path: 出力動画パス（1080p: 1080x1920 or 1920x1080）
+            job_id: キャンセル用のジョブID（動画ID等）
+            progress_callback: 進捗コールバック
 
         Returns:
             str: 出力動画パス
@@ -1585,15 +1901,14 @@ class FFmpegService:
 
         logger.info(f"FFmpeg downscale command: {' '.join(cmd)}")
 
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
+        returncode, stdout, stderr = await self._run(
+            cmd,
+            job_id=job_id,
+            progress_callback=progress_callback,
+            input_path=video_path,
         )
 
-        stdout, stderr = await process.communicate()
-
-        if process.returncode != 0:
+        if returncode != 0:
             error_msg = stderr.decode() if stderr else "不明なエラー"
             logger.error(f"FFmpegエラー: {error_msg}")
             raise FFmpegError(f"HDダウンスケールに失敗: {error_msg}")
@@ -1631,20 +1946,304 @@ class FFmpegService:
 
         logger.info(f"Extracting first frame: {' '.join(cmd)}")
 
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-        )
-        stdout, stderr = await process.communicate()
+        returncode, stdout, stderr = await self._run(cmd, FFmpegJobClass.INTERACTIVE)
 
-        if process.returncode != 0:
+        if returncode != 0:
             error_msg = stderr.decode() if stderr else "Unknown error"
             raise FFmpegError(f"Failed to extract first frame: {error_msg}")
 
         logger.info(f"First frame extracted to: {output_path}")
         return output_path
 
+    async def extract_frames(
+        self,
+        video_path: str,
+        timestamps: list[float],
+        output_paths: list[str],
+        max_width: Optional[int] = None,
+    ) -> list[str]:
+        """
+        複数のタイムスタンプのフレームを1回のデコードでまとめて抽出
+
+        最初のタイムスタンプまでシークし、デコードしたフレームを split で分岐して
+        各タイムスタンプ以降の最初のフレームを出力する。全出力が揃った時点で終了する。
+
+        Args:
+            video_path: 入力動画パス（URL可）
+            timestamps: 抽出位置（秒）
+            output_paths: 出力画像パス（timestampsと同じ順序・JPG）
+            max_width: 最大幅（指定時はアスペクト比を維持して縮小）
+
+        Returns:
+            出力画像のパス
+        """
+        if not timestamps or len(timestamps) != len(output_paths):
+            raise ValueError("timestamps and output_paths must have the same non-zero length")
+
+        self._check_ffmpeg()
+
+        start = min(timestamps)
+        count = len(timestamps)
+
+        source_filters = []
+        if max_width:
+            source_filters.append(f"scale='min({max_width},iw)':-2")
+        source_filters.append(f"split={count}" + "".join(f"[s{i}]" for i in range(count)))
+
+        filter_parts = ["[0:v]" + ",".join(source_filters)]
+        for i, timestamp in enumerate(timestamps):
+            # シーク後のタイムラインは start を0とする
+            filter_parts.append(
+                f"[s{i}]trim=start={timestamp - start:.3f},setpts=PTS-STARTPTS[o{i}]"
+            )
+
+        cmd = [
+            "ffmpeg", "-y",
+            "-ss", str(start),
+            "-i", video_path,
+            "-filter_complex", ";".join(filter_parts),
+        ]
+        for i, output_path in enumerate(output_paths):
+            cmd.extend(["-map", f"[o{i}]", "-frames:v", "1", "-q:v", "2", output_path])
+
+        logger.info(f"Extracting {count} frames from {start:.3f}s")
+
+        returncode, stdout, stderr = await self._run(cmd, FFmpegJobClass.INTERACTIVE)
+
+        if returncode != 0:
+            error_msg = stderr.decode() if stderr else "Unknown error"
+            raise FFmpegError(f"Failed to extract frames: {error_msg}")
+
+        missing = [path for path in output_paths if not os.path.exists(path) or os.path.getsize(path) == 0]
+        if missing:
+            raise FFmpegError(f"Failed to extract frames: {len(missing)} frame(s) not produced")
+
+        return output_paths
+
+    async def extract_derived_images(
+        self,
+        video_path: str,
+        duration: float,
+        first_frame_path: str,
+        last_frame_path: str,
+        poster_path: str,
+        thumbnail_path: str,
+        poster_time: float = 0.0,
+        poster_max_width: int = 1280,
+        thumbnail_width: int = 320,
+        sprite_path: Optional[str] = None,
+        sprite_columns: int = 5,
+        sprite_rows: int = 2,
+        sprite_tile_width: int = 160,
+        preview_path: Optional[str] = None,
+        preview_start: float = 0.0,
+        preview_duration: float = 2.0,
+        preview_height: int = 240,
+        preview_fps: int = 12,
+    ) -> None:
+        """
+        1回のデコードで派生画像（最初/最終フレーム・ポスター・サムネイル・スプライト・プレビュー）をまとめて出力
+
+        デコードしたフレームを split で分岐し、出力ごとに必要なフレームだけをエンコードする。
+        最終フレームは終端付近のフレームを同じファイルに上書きし続ける（-update 1）ことで、
+        フレーム数を事前に知らなくても最後のフレームが残る。
+
+        Args:
+            video_path: 入力動画パス（URL可）
+            duration: 動画の長さ（秒）
+            first_frame_path: 最初のフレームの出力先
+            last_frame_path: 最終フレームの出力先
+            poster_path: ポスター画像の出力先
+            thumbnail_path: サムネイルの出力先
+            poster_time: ポスター・サムネイルに使う位置（秒）
+            poster_max_width: ポスターの最大幅
+            thumbnail_width: サムネイルの幅
+            sprite_path: スプライトの出力先（Noneの場合は生成しない）
+            sprite_columns: スプライトの列数
+            sprite_rows: スプライトの行数
+            sprite_tile_width: スプライト1コマの幅
+            preview_path: 一覧用プレビューの出力先（.mp4 または .webp、Noneの場合は生成しない）
+            preview_start: プレビューの開始位置（秒）
+            preview_duration: プレビューの長さ（秒）
+            preview_height: プレビューの高さ
+            preview_fps: プレビューのフレームレート
+        """
+        self._check_ffmpeg()
+
+        branches = ["first", "last", "poster"]
+        if sprite_path:
+            branches.append("sprite")
+        if preview_path:
+            branches.append("preview")
+        last_frame_start = max(0.0, duration - 0.5)
+
+        filter_parts = [
+            f"[0:v]split={len(branches)}" + "".join(f"[{name}_in]" for name in branches),
+            f"[last_in]trim=start={last_frame_start:.3f},setpts=PTS-STARTPTS[last]",
+            f"[poster_in]trim=start={poster_time:.3f},setpts=PTS-STARTPTS,"
+            f"scale='min({poster_max_width},iw)':-2,split=2[poster][thumb_in]",
+            f"[thumb_in]scale={thumbnail_width}:-2[thumb]",
+        ]
+        if sprite_path:
+            tiles = sprite_columns * sprite_rows
+            filter_parts.append(
+                f"[sprite_in]fps={tiles}/{max(duration, 0.001):.3f},scale={sprite_tile_width}:-2,"
+                f"tile={sprite_columns}x{sprite_rows}[sprite]"
+            )
+        if preview_path:
+            filter_parts.append(
+                "[preview_in]"
+                + self._build_preview_filter(preview_start, preview_duration, preview_height, preview_fps)
+                + "[preview]"
+            )
+
+        cmd = [
+            "ffmpeg", "-y",
+            "-i", video_path,
+            "-filter_complex", ";".join(filter_parts),
+            "-map", "[first_in]", "-frames:v", "1", "-q:v", "2", first_frame_path,
+            "-map", "[last]", "-update", "1", "-q:v", "2", last_frame_path,
+            "-map", "[poster]", "-frames:v", "1", "-q:v", "3", poster_path,
+            "-map", "[thumb]", "-frames:v", "1", "-q:v", "5", thumbnail_path,
+        ]
+        if sprite_path:
+            cmd.extend(["-map", "[sprite]", "-frames:v", "1", "-q:v", "5", sprite_path])
+        if preview_path:
+            cmd.extend(["-map", "[preview]", *self._preview_output_args(preview_path), preview_path])
+
+        logger.info(f"Extracting derived images ({len(branches) + 1} outputs) from {duration:.2f}s video")
+
+        returncode, stdout, stderr = await self._run(cmd, FFmpegJobClass.BATCH)
+
+        if returncode != 0:
+            error_msg = stderr.decode() if stderr else "Unknown error"
+            raise FFmpegError(f"Failed to extract derived images: {error_msg}")
+
+    def _build_preview_filter(self, start: float, duration: float, height: int, fps: int) -> str:
+        """一覧用プレビュー（短い低解像度ループ）のフィルター"""
+        return (
+            f"trim=start={start:.3f}:duration={duration:.3f},setpts=PTS-STARTPTS,"
+            f"fps={fps},scale=-2:{height}"
+        )
+
+    def _preview_output_args(self, output_path: str) -> list[str]:
+        """一覧用プレビューのエンコード設定（拡張子で H.264 / アニメーションWebP を切り替え）"""
+        if output_path.endswith(".webp"):
+            return ["-an", "-c:v", "libwebp_anim", "-lossless", "0", "-quality", "50", "-loop", "0"]
+        return [
+            "-an",
+            "-c:v", "libx264",
+            "-preset", "veryfast",
+            "-crf", "32",
+            "-pix_fmt", "yuv420p",
+            "-movflags", "+faststart",
+        ]
+
+    async def create_preview_clip(
+        self,
+        video_path: str,
+        output_path: str,
+        start: float = 0.0,
+        duration: float = 2.0,
+        height: int = 240,
+        fps: int = 12,
+    ) -> str:
+        """
+        一覧のグリッド表示用に短い低解像度のループ動画を作成
+
+        Args:
+            video_path: 入力動画パス（URL可）
+            output_path: 出力パス（.mp4 は音声なしH.264、.webp はアニメーションWebP）
+            start: 開始位置（秒）
+            duration: 長さ（秒）
+            height: 高さ（幅はアスペクト比を維持）
+            fps: フレームレート
+
+        Returns:
+            出力パス
+        """
+        self._check_ffmpeg()
+
+        cmd = [
+            "ffmpeg", "-y",
+            "-ss", str(start),
+            "-i", video_path,
+            "-vf", self._build_preview_filter(0.0, duration, height, fps),
+            *self._preview_output_args(output_path),
+            output_path,
+        ]
+
+        logger.info(f"Creating preview clip: {duration}s at {height}p")
+
+        returncode, stdout, stderr = await self._run(cmd, FFmpegJobClass.BATCH)
+
+        if returncode != 0:
+            error_msg = stderr.decode() if stderr else "Unknown error"
+            raise FFmpegError(f"Failed to create preview clip: {error_msg}")
+
+        return output_path
+
+    async def generate_sprite_sheets(
+        self,
+        video_path: str,
+        output_dir: str,
+        interval_seconds: float,
+        columns: int,
+        rows: int,
+        tile_width: int,
+        image_format: str = "jpg",
+    ) -> list[str]:
+        """
+        一定間隔のフレームを並べたスプライトシートを1回のデコードで作成
+
+        fps フィルターで interval_seconds ごとに1フレームを取り出し、
+        tile フィルターで columns x rows 枚ずつ1枚の画像にまとめる（最後のシートは余白あり）。
+
+        Args:
+            video_path: 入力動画パス（URL可）
+            output_dir: 出力ディレクトリ
+            interval_seconds: フレームの間隔（秒）
+            columns: 1シートの列数
+            rows: 1シートの行数
+            tile_width: 1コマの幅
+            image_format: "jpg" または "webp"
+
+        Returns:
+            list[str]: シート画像のパス（順番通り）
+        """
+        self._check_ffmpeg()
+
+        pattern = os.path.join(output_dir, f"sheet_%03d.{image_format}")
+        cmd = [
+            "ffmpeg", "-y",
+            "-i", video_path,
+            "-an",
+            "-vf", f"fps=1/{interval_seconds},scale={tile_width}:-2,tile={columns}x{rows}",
+            "-start_number", "0",
+        ]
+        if image_format == "webp":
+            cmd.extend(["-c:v", "libwebp", "-quality", "70"])
+        else:
+            cmd.extend(["-q:v", "5"])
+        cmd.append(pattern)
+
+        logger.info(f"Generating sprite sheets every {interval_seconds}s ({columns}x{rows})")
+
+        returncode, stdout, stderr = await self._run(cmd, FFmpegJobClass.BATCH)
+
+        if returncode != 0:
+            error_msg = stderr.decode() if stderr else "Unknown error"
+            raise FFmpegError(f"Failed to generate sprite sheets: {error_msg}")
+
+        sheets = sorted(
+            os.path.join(output_dir, name)
+            for name in os.listdir(output_dir)
+            if name.startswith("sheet_") and name.endswith(f".{image_format}")
+        )
+        if not sheets:
+            raise FFmpegError("Failed to generate sprite sheets: no output")
+        return sheets
+
     async def time_stretch_audio(
         self,
         input_path: str,
@@ -1701,15 +2300,9 @@ class FFmpegService:
 
         logger.info(f"Time stretch audio: ratio={ratio:.4f}, filter={filter_str}")
 
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-        )
+        returncode, stdout, stderr = await self._run(cmd)
 
-        stdout, stderr = await process.communicate()
-
-        if process.returncode != 0:
+        if returncode != 0:
             error_msg = stderr.decode() if stderr else "不明なエラー"
             logger.error(f"FFmpegエラー: {error_msg}")
             raise FFmpegError(f"タイムストレッチに失敗: {error_msg}")
@@ -1724,6 +2317,8 @@ class FFmpegService:
         trim_start: float = 0.0,
         trim_end: float | None = None,
         aspect_ratio: str = "16:9",
+        job_id: Optional[str] = None,
+        progress_callback: Optional[ProgressCallback] = None,
     ) -> str:
         """
         動画をFull HD ProRes 422 HQに変換
@@ -1745,6 +2340,8 @@ class FFmpegService:
             trim_start: トリム開始時間（秒）
             trim_end: トリム終了時間（秒）、Noneの場合は終端まで
             aspect_ratio: アスペクト比 ("16:9", "9:16", "1:1")
+            job_id: キャンセル用のジョブID（動画ID等）
+            progress_callback: 進捗コールバック
 
         Returns:
             str: 出力動画パス
@@ -1775,9 +2372,15 @@ class FFmpegService:
         cmd.extend(["-i", input_path])
 
         # 終了時間（duration指定）
+        output_duration = None
         if trim_end is not None:
             duration = trim_end - trim_start
             cmd.extend(["-t", str(duration)])
+            output_duration = duration
+        elif progress_callback is not None:
+            input_duration = await self._get_video_duration(input_path)
+            if input_duration is not None:
+                output_duration = max(0.0, input_duration - trim_start)
 
         # フィルター（リサイズ + インターレース解除 + デバンド）
         # scale: 指定サイズにリサイズ（lanczosで高品質）
@@ -1798,15 +2401,14 @@ class FFmpegService:
 
         logger.info(f"ProRes HD変換コマンド: {' '.join(cmd)}")
 
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
+        returncode, stdout, stderr = await self._run(
+            cmd,
+            job_id=job_id,
+            progress_callback=progress_callback,
+            duration=output_duration,
         )
 
-        stdout, stderr = await process.communicate()
-
-        if process.returncode != 0:
+        if returncode != 0:
             error_msg = stderr.decode() if stderr else "不明なエラー"
             logger.error(f"FFmpegエラー: {error_msg}")
             raise FFmpegError(f"ProRes HD変換に失敗: {error_msg}")
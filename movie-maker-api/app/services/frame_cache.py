@@ -0,0 +1,225 @@
+"""
+抽出フレームキャッシュ
+
+動画のスクリーンショット（フレーム抽出）結果を
+(動画のフィンガープリント, タイムスタンプ, サイズ) をキーにR2へ保存する。
+同じ位置を繰り返しスクラブしてもFFmpegを起動せずに既存の画像を返す。
+
+キャッシュにない複数のタイムスタンプは1回のFFmpeg実行（1回のシーク・デコード）で
+まとめて抽出し、R2へ並列にアップロードする。
+"""
+
+import asyncio
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from app.services.ffmpeg_service import get_ffmpeg_service
+from app.services.media_ingest import parse_media_metadata
+from app.services.remote_media import get_remote_media
+from app.services.render_cache import get_render_cache
+from app.services.scratch_space import get_scratch_space
+
+logger = logging.getLogger(__name__)
+
+FRAME_CACHE_OPERATION = "screenshot_frame"
+
+# タイムスタンプの丸め単位（ミリ秒）
+_TIMESTAMP_PRECISION = 3
+
+
+class FrameExtractionError(Exception):
+    """フレームを抽出できない（動画の長さが取得できない・範囲外等）"""
+    pass
+
+
+@dataclass
+class ExtractedFrame:
+    """抽出したフレーム"""
+    timestamp: float       # 抽出位置（秒）
+    key: str               # キャッシュのR2オブジェクトキー
+    url: str               # 公開URL
+    width: Optional[int]
+    height: Optional[int]
+    hit: bool              # キャッシュヒットか
+
+
+@dataclass
+class _VideoProbe:
+    duration: Optional[float]
+    width: Optional[int]
+    height: Optional[int]
+
+
+def _parse_probe(info: dict) -> _VideoProbe:
+    """ffprobeのJSONから長さと表示サイズ（回転を考慮）を取り出す"""
+    metadata = parse_media_metadata(info)
+    return _VideoProbe(duration=metadata["duration"], width=metadata["width"], height=metadata["height"])
+
+
+def _scaled_size(probe: _VideoProbe, max_width: Optional[int]) -> tuple[Optional[int], Optional[int]]:
+    """scale='min(W,iw)':-2 と同じ計算で出力サイズを求める"""
+    if probe.width is None or probe.height is None:
+        return None, None
+    if not max_width or max_width >= probe.width:
+        return probe.width, probe.height
+    height = round(probe.height * max_width / probe.width / 2) * 2
+    return max_width, height
+
+
+class FrameCache:
+    """抽出フレームキャッシュ"""
+
+    def __init__(self, max_probe_entries: int = 1000):
+        self.max_probe_entries = max_probe_entries
+
+        # フィンガープリント → プローブ結果（動画の長さ・サイズは内容で決まる）
+        self._probes: "OrderedDict[str, _VideoProbe]" = OrderedDict()
+        # キャッシュオブジェクト → 実際に抽出した画像のサイズ
+        self._dimensions: "OrderedDict[str, tuple[Optional[int], Optional[int]]]" = OrderedDict()
+
+        self._requests = 0
+        self._frames_requested = 0
+        self._frames_hit = 0
+        self._frames_extracted = 0
+        self._extraction_passes = 0
+
+    @staticmethod
+    def _remember(index: OrderedDict, key: str, value, limit: int) -> None:
+        index[key] = value
+        index.move_to_end(key)
+        while len(index) > limit:
+            index.popitem(last=False)
+
+    async def _probe(self, fingerprint: str, source: str) -> _VideoProbe:
+        cached = self._probes.get(fingerprint)
+        if cached is not None:
+            self._probes.move_to_end(fingerprint)
+            return cached
+
+        probe = _parse_probe(await get_ffmpeg_service().get_video_info(source))
+        if probe.duration is not None:
+            self._remember(self._probes, fingerprint, probe, self.max_probe_entries)
+        return probe
+
+    async def get_frames(
+        self,
+        video_url: str,
+        timestamps: list[float],
+        max_width: Optional[int] = None,
+    ) -> list[ExtractedFrame]:
+        """
+        複数のタイムスタンプのフレームを取得
+
+        Args:
+            video_url: 動画のURL（ローカルパス可）
+            timestamps: 抽出位置（秒、重複可）
+            max_width: 最大幅（Noneの場合は元のサイズ）
+
+        Returns:
+            list[ExtractedFrame]: timestamps と同じ順序のフレーム
+
+        Raises:
+            FrameExtractionError: 動画の長さが取得できない、またはタイムスタンプが範囲外の場合
+        """
+        cache = get_render_cache()
+        remote_media = get_remote_media()
+        self._requests += 1
+        self._frames_requested += len(timestamps)
+
+        fingerprint = await remote_media.fingerprint(video_url)
+        inputs = [fingerprint.encode()]
+        unique = sorted({round(t, _TIMESTAMP_PRECISION) for t in timestamps})
+
+        def params(timestamp: float) -> dict:
+            return {"t": timestamp, "max_width": max_width}
+
+        with get_scratch_space().workspace("frames") as workspace:
+            source: Optional[str] = None
+
+            async def get_source() -> str:
+                # 全フレームがヒットし、プローブ結果もある場合は動画にアクセスしない
+                nonlocal source
+                if source is None:
+                    source = await remote_media.media_source(video_url, workspace)
+                return source
+
+            probe = self._probes.get(fingerprint)
+            if probe is None:
+                probe = await self._probe(fingerprint, await get_source())
+            if probe.duration is None:
+                raise FrameExtractionError("Failed to get video duration")
+            for timestamp in timestamps:
+                if timestamp > probe.duration:
+                    raise FrameExtractionError(
+                        f"Timestamp ({timestamp}s) exceeds video duration ({probe.duration:.1f}s)"
+                    )
+
+            lookups = await asyncio.gather(*(
+                cache.lookup(FRAME_CACHE_OPERATION, params(t), inputs, ext="jpg") for t in unique
+            ))
+
+            default_size = _scaled_size(probe, max_width)
+            frames: dict[float, ExtractedFrame] = {}
+            misses: list[float] = []
+            for timestamp, cached in zip(unique, lookups):
+                if cached is None:
+                    misses.append(timestamp)
+                    continue
+                width, height = self._dimensions.get(cached.key, default_size)
+                frames[timestamp] = ExtractedFrame(
+                    timestamp=timestamp, key=cached.key, url=cached.url,
+                    width=width, height=height, hit=True,
+                )
+
+            if misses:
+                from app.videos.service import get_image_dimensions
+
+                paths = [workspace.small_file(f"frame_{i:03d}.jpg") for i in range(len(misses))]
+                await get_ffmpeg_service().extract_frames(await get_source(), misses, paths, max_width=max_width)
+                self._extraction_passes += 1
+                self._frames_extracted += len(misses)
+
+                # 同じ動画・同じ縮小設定のフレームは全て同じサイズ
+                width, height = await get_image_dimensions(paths[0])
+
+                stored = await asyncio.gather(*(
+                    cache.store(FRAME_CACHE_OPERATION, params(t), inputs, path, ext="jpg", content_type="image/jpeg")
+                    for t, path in zip(misses, paths)
+                ))
+                for timestamp, result in zip(misses, stored):
+                    self._remember(self._dimensions, result.key, (width, height), cache.max_index_entries)
+                    frames[timestamp] = ExtractedFrame(
+                        timestamp=timestamp, key=result.key, url=result.url,
+                        width=width, height=height, hit=False,
+                    )
+
+        self._frames_hit += len(unique) - len(misses)
+        logger.info(
+            f"Frames resolved: {len(unique)} unique, {len(misses)} extracted in "
+            f"{1 if misses else 0} pass(es)"
+        )
+        return [frames[round(t, _TIMESTAMP_PRECISION)] for t in timestamps]
+
+    def stats(self) -> dict:
+        """統計（監視用）"""
+        unique_lookups = self._frames_hit + self._frames_extracted
+        return {
+            "requests": self._requests,
+            "frames_requested": self._frames_requested,
+            "frames_hit": self._frames_hit,
+            "frames_extracted": self._frames_extracted,
+            "extraction_passes": self._extraction_passes,
+            "hit_rate": self._frames_hit / unique_lookups if unique_lookups else 0.0,
+            "probed_videos": len(self._probes),
+        }
+
+
+# シングルトンインスタンス
+frame_cache = FrameCache()
+
+
+def get_frame_cache() -> FrameCache:
+    """FrameCacheのインスタンスを取得"""
+    return frame_cache
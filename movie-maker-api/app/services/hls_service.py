@@ -6,7 +6,10 @@ HLS (HTTP Live Streaming) 変換サービス
 import asyncio
 import os
 import logging
-from typing import Any
+from typing import Any, Optional
+
+from app.services.ffmpeg_runner import ProgressCallback, run_ffmpeg, scale_progress
+from app.services.ffmpeg_scheduler import FFmpegJobClass, get_ffmpeg_scheduler
 
 logger = logging.getLogger(__name__)
 
@@ -46,6 +49,7 @@ async def convert_to_hls(
     input_path: str,
     output_dir: str,
     video_id: str,
+    progress_callback: Optional[ProgressCallback] = None,
 ) -> dict[str, str]:
     """
     動画をHLS形式に変換
@@ -53,7 +57,8 @@ async def convert_to_hls(
     Args:
         input_path: 入力動画パス
         output_dir: 出力ディレクトリ
-        video_id: 動画ID（ファイル名に使用）
+        video_id: 動画ID（ファイル名に使用、キャンセル用のジョブIDを兼ねる）
+        progress_callback: 全品質を通した進捗コールバック（0-100%）
 
     Returns:
         {
@@ -67,7 +72,13 @@ async def convert_to_hls(
     """
     results: dict[str, str] = {}
 
-    for quality in HLSConfig.QUALITIES:
+    duration = None
+    if progress_callback is not None:
+        duration = await _probe_duration(input_path)
+
+    total_qualities = len(HLSConfig.QUALITIES)
+
+    for index, quality in enumerate(HLSConfig.QUALITIES):
         quality_dir = os.path.join(output_dir, quality["name"])
         os.makedirs(quality_dir, exist_ok=True)
 
@@ -108,14 +119,18 @@ async def convert_to_hls(
             playlist_path,
         ]
 
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
+        returncode, stdout, stderr = await run_ffmpeg(
+            cmd,
+            job_id=video_id,
+            duration=duration,
+            on_progress=scale_progress(
+                progress_callback,
+                index / total_qualities * 100,
+                (index + 1) / total_qualities * 100,
+            ),
         )
-        stdout, stderr = await process.communicate()
 
-        if process.returncode != 0:
+        if returncode != 0:
             error_msg = stderr.decode() if stderr else "Unknown error"
             logger.error(f"HLS conversion failed for {quality['name']}: {error_msg}")
             raise HLSConversionError(f"HLS conversion failed for {quality['name']}: {error_msg}")
@@ -131,6 +146,24 @@ async def convert_to_hls(
     return results
 
 
+async def _probe_duration(input_path: str) -> Optional[float]:
+    """ffprobeで動画の長さ（秒）を取得"""
+    cmd = [
+        "ffprobe",
+        "-v", "error",
+        "-show_entries", "format=duration",
+        "-of", "default=noprint_wrappers=1:nokey=1",
+        input_path,
+    ]
+    try:
+        returncode, stdout, _ = await get_ffmpeg_scheduler().run(cmd, FFmpegJobClass.INTERACTIVE)
+        if returncode == 0 and stdout:
+            return float(stdout.decode().strip())
+    except Exception as e:
+        logger.warning(f"Failed to probe duration for HLS progress: {e}")
+    return None
+
+
 def _generate_master_playlist(
     output_path: str,
     qualities: list[dict[str, Any]],
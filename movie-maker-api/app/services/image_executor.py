@@ -0,0 +1,105 @@
+"""
+画像処理用のプロセスプール
+
+PILのデコード・リサイズ・エンコードはCPUを占有し、スレッドではGILを手放さない処理も多い。
+イベントループやAPIワーカーを止めないよう、画像処理は専用のプロセスプールで実行する
+（ライブラリのサムネイル生成・画像バリアント変換等）。
+
+実行する関数は pickle できるモジュールレベルの関数であること。
+ワーカーはスレッドを持つサーバープロセスから fork せず、forkserver で起動する。
+ワーカーが異常終了（巨大画像でのOOM等）してプールが壊れた場合は作り直して1回だけ再実行する。
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ImageExecutor:
+    """画像処理用のプロセスプール"""
+
+    def __init__(self, max_workers: Optional[int] = None):
+        # 0の場合はプロセスプールを使わずスレッドで実行する
+        self.max_workers = settings.IMAGE_PROCESS_WORKERS if max_workers is None else max_workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+        # 別スレッドのイベントループ（asyncio.run のタスク）からも呼ばれる
+        self._lock = threading.Lock()
+
+        self._jobs = 0
+        self._failures = 0
+        self._busy_seconds = 0.0
+        self._running = 0
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """関数をプロセスプールで実行して結果を返す"""
+        self._jobs += 1
+        self._running += 1
+        started = time.monotonic()
+        try:
+            if self.max_workers <= 0:
+                return await asyncio.to_thread(fn, *args)
+            loop = asyncio.get_running_loop()
+            pool = self._get_pool()
+            try:
+                return await loop.run_in_executor(pool, fn, *args)
+            except BrokenProcessPool:
+                logger.warning("Image process pool is broken, restarting it")
+                self._discard_pool(pool)
+                return await loop.run_in_executor(self._get_pool(), fn, *args)
+        except Exception:
+            self._failures += 1
+            raise
+        finally:
+            self._running -= 1
+            self._busy_seconds += time.monotonic() - started
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("forkserver"),
+                )
+            return self._pool
+
+    def _discard_pool(self, pool: ProcessPoolExecutor) -> None:
+        """壊れたプールを停止（他の呼び出しが既に作り直していればそのまま）"""
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self) -> None:
+        """プロセスプールを停止"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        """実行状況（監視用）"""
+        return {
+            "workers": self.max_workers,
+            "jobs": self._jobs,
+            "failures": self._failures,
+            "running": self._running,
+            "avg_seconds": self._busy_seconds / self._jobs if self._jobs else 0.0,
+        }
+
+
+# シングルトンインスタンス
+image_executor = ImageExecutor()
+
+
+def get_image_executor() -> ImageExecutor:
+    """ImageExecutorのインスタンスを取得"""
+    return image_executor
@@ -0,0 +1,405 @@
+"""
+画像バリアント（オンデマンド変換）
+
+R2上の元画像から、幅・形式（WebP / AVIF / JPEG）・品質を指定した派生画像を
+最初のリクエスト時に作成してR2に保存する。アップロード時にWebPを一括生成する代わりに、
+実際に表示されるサイズ・形式だけを作る。
+
+- デコード・リサイズ・エンコードはCPUを占有するため、画像処理用のプロセスプールで実行する
+- 保存先キーは元画像キー + パラメータから決まる（元画像キーは不変なので immutable で配信できる）
+- 幅・品質は固定の段階に切り上げ、キャッシュのバリエーションを抑える
+  （認証なしで呼べるため、任意の値で保存先オブジェクトを増やせないようにする）
+- AVIFはエンコードできるPillow（11.3以降）の場合のみ使う
+- 同一バリアントの同時リクエストは1回だけ変換する（single-flight）
+"""
+
+import asyncio
+import io
+import logging
+import time
+import warnings
+from collections import OrderedDict
+from dataclasses import dataclass
+from enum import Enum
+from functools import lru_cache
+from typing import Optional
+from urllib.parse import urlencode
+
+from botocore.exceptions import ClientError
+from PIL import ExifTags, Image, ImageOps, UnidentifiedImageError, features
+
+from app.core.config import settings
+from app.external.r2 import get_public_url, get_r2_client
+from app.services.image_executor import ImageExecutor, get_image_executor
+
+logger = logging.getLogger(__name__)
+
+# 変換内容を変更した場合はバージョンを上げて既存のバリアントを無効化する
+IMAGE_VARIANT_VERSION = 1
+
+# R2上の保存先プレフィックス（アプリからは削除しない）
+IMAGE_VARIANT_PREFIX = "images/variants"
+
+# 変換元として許可するキーのプレフィックス（画像を置くプレフィックスのみ）
+SOURCE_PREFIXES = ("images/", "library/", "screenshots/", "derived/")
+
+# 幅の段階（指定幅は次の段階に切り上げる）
+VARIANT_WIDTHS = (64, 128, 256, 384, 512, 768, 1024, 1280, 1600, 1920, 2560)
+
+# 品質の段階（指定品質は次の段階に切り上げる。形式ごとの既定値はそのまま使う）
+QUALITY_STEPS = (40, 60, 80, 90)
+
+# 元画像の最大サイズ（デコード時のメモリ使用量を抑える）
+MAX_SOURCE_BYTES = 30 * 1024 * 1024
+
+
+class ImageFormat(str, Enum):
+    """出力形式"""
+    WEBP = "webp"
+    AVIF = "avif"
+    JPEG = "jpeg"
+
+
+DEFAULT_QUALITY = {
+    ImageFormat.WEBP: 80,
+    ImageFormat.AVIF: 60,
+    ImageFormat.JPEG: 85,
+}
+
+_EXTENSIONS = {
+    ImageFormat.WEBP: "webp",
+    ImageFormat.AVIF: "avif",
+    ImageFormat.JPEG: "jpg",
+}
+
+CONTENT_TYPES = {
+    ImageFormat.WEBP: "image/webp",
+    ImageFormat.AVIF: "image/avif",
+    ImageFormat.JPEG: "image/jpeg",
+}
+
+
+class ImageVariantError(Exception):
+    """バリアントを作成できない（不正なキー・画像として読めない等）"""
+    pass
+
+
+class ImageSourceNotFoundError(ImageVariantError):
+    """元画像が存在しない"""
+    pass
+
+
+@dataclass
+class ImageVariant:
+    """画像バリアント"""
+    key: str       # R2オブジェクトキー
+    url: str       # 公開URL
+    format: ImageFormat
+    hit: bool      # 既存のバリアントか
+
+
+def snap_width(width: int) -> int:
+    """指定幅を段階に切り上げ（最大の段階を超える場合は最大）"""
+    for step in VARIANT_WIDTHS:
+        if width <= step:
+            return step
+    return VARIANT_WIDTHS[-1]
+
+
+def snap_quality(quality: int) -> int:
+    """指定品質を段階に切り上げ（最大の段階を超える場合は最大）"""
+    for step in QUALITY_STEPS:
+        if quality <= step:
+            return step
+    return QUALITY_STEPS[-1]
+
+
+@lru_cache(maxsize=1)
+def avif_supported() -> bool:
+    """AVIFをエンコードできるか（Pillow 11.3 未満は非対応）"""
+    with warnings.catch_warnings():
+        # 古いPillowでは未知の機能として警告が出る
+        warnings.simplefilter("ignore")
+        try:
+            return bool(features.check("avif"))
+        except Exception:
+            return False
+
+
+def negotiate_format(accept: Optional[str]) -> ImageFormat:
+    """Acceptヘッダーからブラウザが表示できる最も小さい形式を選ぶ（AVIFはエンコードできる場合のみ）"""
+    accept = accept or ""
+    if "image/avif" in accept and avif_supported():
+        return ImageFormat.AVIF
+    if "image/webp" in accept:
+        return ImageFormat.WEBP
+    return ImageFormat.JPEG
+
+
+def validate_source_key(source_key: str) -> str:
+    """変換元キーを検証（画像用プレフィックス以外・相対パス・バリアント自身は不可）"""
+    key = source_key.lstrip("/")
+    if (
+        not key.startswith(SOURCE_PREFIXES)
+        or key.startswith(f"{IMAGE_VARIANT_PREFIX}/")
+        or ".." in key.split("/")
+    ):
+        raise ImageVariantError(f"Unsupported image key: {source_key}")
+    return key
+
+
+def variant_key(source_key: str, width: Optional[int], image_format: ImageFormat, quality: int) -> str:
+    """バリアントのR2オブジェクトキー"""
+    size = f"{width}w" if width else "orig"
+    return (
+        f"{IMAGE_VARIANT_PREFIX}/v{IMAGE_VARIANT_VERSION}/{source_key}/"
+        f"{size}_q{quality}.{_EXTENSIONS[image_format]}"
+    )
+
+
+def variant_url(
+    source_key: str,
+    width: Optional[int] = None,
+    image_format: Optional[ImageFormat] = None,
+    quality: Optional[int] = None,
+) -> str:
+    """
+    バリアント取得APIのURL（クライアントに返す用）
+
+    形式を省略した場合はAPI側でAcceptヘッダーから選ぶ。
+    """
+    params = {"key": source_key}
+    if width:
+        params["w"] = str(width)
+    if image_format:
+        params["format"] = image_format.value
+    if quality:
+        params["q"] = str(quality)
+    return f"{settings.BACKEND_URL.rstrip('/')}/api/v1/images/variant?{urlencode(params)}"
+
+
+def render_variant(data: bytes, width: Optional[int], image_format: str, quality: int) -> bytes:
+    """
+    画像をリサイズ・エンコード（同期関数、プロセスプールで実行）
+
+    元画像より大きい幅は指定しても拡大しない。
+    """
+    image_format = ImageFormat(image_format)
+    try:
+        img = Image.open(io.BytesIO(data))
+        if width and img.format == "JPEG":
+            # JPEGはデコード時に縮小（DCTスケーリング）して処理量を減らす。
+            # EXIFで90度回転する画像（Orientation 5〜8）は回転後の幅が元の高さになる
+            rotated = img.getexif().get(ExifTags.Base.Orientation, 1) in (5, 6, 7, 8)
+            shown_width, shown_height = (img.height, img.width) if rotated else img.size
+            if shown_width > width:
+                box = (width, max(1, shown_height * width // shown_width))
+                img.draft("RGB", box[::-1] if rotated else box)
+        img = ImageOps.exif_transpose(img)
+    except (UnidentifiedImageError, OSError) as e:
+        raise ImageVariantError(f"Invalid or corrupted image: {e}") from e
+
+    has_alpha = img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+    if image_format == ImageFormat.JPEG:
+        if has_alpha:
+            rgba = img.convert("RGBA")
+            background = Image.new("RGB", rgba.size, (255, 255, 255))
+            background.paste(rgba, mask=rgba.split()[-1])
+            img = background
+        elif img.mode != "RGB":
+            img = img.convert("RGB")
+    elif img.mode not in ("RGB", "RGBA"):
+        img = img.convert("RGBA" if has_alpha else "RGB")
+
+    if width and img.width > width:
+        height = max(1, round(img.height * width / img.width))
+        img = img.resize((width, height), Image.Resampling.LANCZOS)
+
+    output = io.BytesIO()
+    if image_format == ImageFormat.WEBP:
+        img.save(output, format="WEBP", quality=quality, method=4)
+    elif image_format == ImageFormat.AVIF:
+        img.save(output, format="AVIF", quality=quality, speed=8)
+    else:
+        img.save(output, format="JPEG", quality=quality, optimize=True, progressive=True)
+    return output.getvalue()
+
+
+class ImageVariantService:
+    """画像バリアントの作成・キャッシュ"""
+
+    def __init__(self, executor: Optional[ImageExecutor] = None, max_index_entries: int = 10000):
+        self._executor = executor
+        self.max_index_entries = max_index_entries
+
+        # R2に存在を確認済みのバリアント（プレフィックス配下は削除しないため再確認不要）
+        self._index: "OrderedDict[str, None]" = OrderedDict()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._inflight: dict[str, asyncio.Future] = {}
+
+        self._requests = 0
+        self._hits = 0
+        self._renders = 0
+        self._coalesced = 0
+        self._errors = 0
+        self._render_seconds = 0.0
+        self._bytes_in = 0
+        self._bytes_out = 0
+
+    def _ensure_loop(self) -> None:
+        """イベントループが変わった場合は実行中の状態を作り直す"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._inflight = {}
+
+    def _remember(self, key: str) -> None:
+        self._index[key] = None
+        self._index.move_to_end(key)
+        while len(self._index) > self.max_index_entries:
+            self._index.popitem(last=False)
+
+    async def _exists(self, key: str) -> bool:
+        if key in self._index:
+            self._index.move_to_end(key)
+            return True
+
+        def head() -> bool:
+            try:
+                get_r2_client().head_object(Bucket=settings.R2_BUCKET_NAME, Key=key)
+            except ClientError:
+                return False
+            return True
+
+        exists = await asyncio.to_thread(head)
+        if exists:
+            self._remember(key)
+        return exists
+
+    def _download_source(self, source_key: str) -> bytes:
+        try:
+            response = get_r2_client().get_object(Bucket=settings.R2_BUCKET_NAME, Key=source_key)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey"):
+                raise ImageSourceNotFoundError(f"Image not found: {source_key}") from e
+            raise
+        if int(response.get("ContentLength") or 0) > MAX_SOURCE_BYTES:
+            raise ImageVariantError(f"Image is too large: {source_key}")
+        return response["Body"].read()
+
+    def _upload(self, key: str, body: bytes, image_format: ImageFormat) -> None:
+        get_r2_client().put_object(
+            Bucket=settings.R2_BUCKET_NAME,
+            Key=key,
+            Body=body,
+            ContentType=CONTENT_TYPES[image_format],
+            CacheControl="public, max-age=31536000, immutable",
+        )
+
+    async def _render(self, data: bytes, width: Optional[int], image_format: ImageFormat, quality: int) -> bytes:
+        executor = self._executor or get_image_executor()
+        return await executor.run(render_variant, data, width, image_format.value, quality)
+
+    async def get_variant(
+        self,
+        source_key: str,
+        width: Optional[int] = None,
+        image_format: ImageFormat = ImageFormat.WEBP,
+        quality: Optional[int] = None,
+    ) -> ImageVariant:
+        """
+        バリアントを取得（なければ作成してR2に保存）
+
+        Args:
+            source_key: 元画像のR2キー
+            width: 幅（段階に切り上げ、Noneの場合は元のサイズ）
+            image_format: 出力形式
+            quality: 品質（段階に切り上げ、Noneの場合は形式ごとの既定値）
+
+        Returns:
+            ImageVariant: バリアントの公開URL
+
+        Raises:
+            ImageSourceNotFoundError: 元画像が存在しない場合
+            ImageVariantError: キーが不正・画像として読めない・AVIFをエンコードできない場合
+        """
+        self._ensure_loop()
+        source_key = validate_source_key(source_key)
+        if image_format == ImageFormat.AVIF and not avif_supported():
+            raise ImageVariantError("AVIF encoding is not supported on this server")
+        width = snap_width(width) if width else None
+        quality = snap_quality(quality) if quality else DEFAULT_QUALITY[image_format]
+        key = variant_key(source_key, width, image_format, quality)
+        self._requests += 1
+
+        if await self._exists(key):
+            self._hits += 1
+            return ImageVariant(key=key, url=get_public_url(key), format=image_format, hit=True)
+
+        # 同一バリアントを作成中なら結果を待って共有
+        while (inflight := self._inflight.get(key)) is not None:
+            try:
+                variant: ImageVariant = await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if inflight.cancelled():
+                    continue
+                raise
+            self._hits += 1
+            self._coalesced += 1
+            return ImageVariant(key=variant.key, url=variant.url, format=image_format, hit=True)
+
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            data = await asyncio.to_thread(self._download_source, source_key)
+            started = time.monotonic()
+            body = await self._render(data, width, image_format, quality)
+            self._render_seconds += time.monotonic() - started
+            await asyncio.to_thread(self._upload, key, body, image_format)
+
+            self._remember(key)
+            self._renders += 1
+            self._bytes_in += len(data)
+            self._bytes_out += len(body)
+            logger.info(f"Image variant stored: {key} ({len(data)} -> {len(body)} bytes)")
+
+            variant = ImageVariant(key=key, url=get_public_url(key), format=image_format, hit=False)
+            future.set_result(variant)
+            return variant
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            self._errors += 1
+            future.set_exception(e)
+            # 待機者がいない場合の "exception was never retrieved" 警告を防ぐ
+            future.exception()
+            raise
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def stats(self) -> dict:
+        """変換の統計（監視用）"""
+        return {
+            "requests": self._requests,
+            "hits": self._hits,
+            "renders": self._renders,
+            "coalesced": self._coalesced,
+            "errors": self._errors,
+            "hit_rate": self._hits / self._requests if self._requests else 0.0,
+            "avg_render_seconds": self._render_seconds / self._renders if self._renders else 0.0,
+            "bytes_in": self._bytes_in,
+            "bytes_out": self._bytes_out,
+            "indexed_objects": len(self._index),
+            "inflight": len(self._inflight),
+        }
+
+
+# シングルトンインスタンス
+image_variant_service = ImageVariantService()
+
+
+def get_image_variant_service() -> ImageVariantService:
+    """ImageVariantServiceのインスタンスを取得"""
+    return image_variant_service
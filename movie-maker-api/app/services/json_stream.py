@@ -0,0 +1,198 @@
+"""
+ストリーミング中のJSONの逐次パース
+
+LLMがJSONを生成している途中のテキストを受け取り、配列の要素（ストーリーボードのシーン・
+広告脚本のカット・ストーリー候補等）が閉じた時点で1件ずつ取り出す。
+応答全体を待たずに、完成した要素から画面に表示するために使う。
+
+- 対象の配列: トップレベルのオブジェクトの指定キーの配列（例: "scenes"）、
+  またはキー未指定の場合はトップレベルの配列
+- トップレベルのオブジェクトのスカラー値（"title" 等）も確定した時点で fields に入る
+- 先頭の ```json 等、最初の { / [ より前のテキストは読み飛ばす
+
+応答全体のパース・検証は従来どおり完成したテキストで行う（text に全文を保持）。
+"""
+
+import json
+from typing import Any, Optional
+
+_WHITESPACE = " \t\r\n"
+
+
+class IncrementalJsonParser:
+    """配列の要素を完成した順に取り出す逐次パーサー"""
+
+    def __init__(self, array_key: Optional[str] = None):
+        self.array_key = array_key
+        # トップレベルのオブジェクトの確定したスカラー値
+        self.fields: dict[str, Any] = {}
+
+        self._text = ""
+        self._pos = 0
+        self._started = False
+        self._done = False
+
+        # 開いているコンテナ（"{" / "["）
+        self._stack: list[str] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = -1
+
+        # トップレベルのオブジェクトのキー・値の状態
+        self._expect_key = False
+        self._last_key: Optional[str] = None
+        self._field_key: Optional[str] = None
+        self._field_start = -1
+
+        # 対象の配列（要素を取り出す配列）の深さと、読み取り中の要素の開始位置
+        self._target_depth: Optional[int] = None
+        self._item_start = -1
+
+    @property
+    def text(self) -> str:
+        """受け取ったテキスト全文"""
+        return self._text
+
+    def feed(self, chunk: str) -> list[Any]:
+        """
+        テキストの断片を追加し、新たに完成した要素を返す
+
+        Returns:
+            list[Any]: 完成した配列要素（パースできなかった要素は含めない）
+        """
+        self._text += chunk
+        items: list[Any] = []
+        text = self._text
+        while self._pos < len(text) and not self._done:
+            char = text[self._pos]
+            self._step(char, self._pos, items)
+            self._pos += 1
+        return items
+
+    def _emit(self, start: int, end: int, items: list[Any]) -> None:
+        try:
+            items.append(json.loads(self._text[start:end]))
+        except ValueError:
+            pass
+
+    def _set_field(self, start: int, end: int) -> None:
+        try:
+            self.fields[self._field_key] = json.loads(self._text[start:end])
+        except ValueError:
+            pass
+        self._field_key = None
+        self._field_start = -1
+
+    def _value_starts(self, index: int) -> None:
+        """値の開始（コンテナの直下の深さで呼ばれる）"""
+        depth = len(self._stack)
+        if self._target_depth is not None and depth == self._target_depth and self._item_start < 0:
+            self._item_start = index
+        if depth == 1 and self._stack[0] == "{" and self._last_key is not None and self._field_start < 0:
+            self._field_key = self._last_key
+            self._field_start = index
+
+    def _scalar_ends(self, index: int, items: list[Any]) -> None:
+        """スカラー値（文字列以外）の終わり（, ] } の直前）"""
+        depth = len(self._stack)
+        if self._target_depth is not None and depth == self._target_depth and self._item_start >= 0:
+            self._emit(self._item_start, index, items)
+            self._item_start = -1
+        if depth == 1 and self._field_start >= 0:
+            self._set_field(self._field_start, index)
+
+    def _step(self, char: str, index: int, items: list[Any]) -> None:
+        if not self._started:
+            if char not in "{[":
+                return
+            self._started = True
+
+        if self._in_string:
+            if self._escape:
+                self._escape = False
+            elif char == "\\":
+                self._escape = True
+            elif char == '"':
+                self._in_string = False
+                self._string_closed(index, items)
+            return
+
+        depth = len(self._stack)
+        if char in _WHITESPACE:
+            return
+
+        if char == '"':
+            self._in_string = True
+            self._string_start = index
+            if not (depth == 1 and self._stack[0] == "{" and self._expect_key):
+                self._value_starts(index)
+            return
+
+        if char in "{[":
+            if depth > 0:
+                self._value_starts(index)
+            self._stack.append(char)
+            if char == "[" and self._is_target_array(depth):
+                self._target_depth = len(self._stack)
+            if char == "{" and len(self._stack) == 1:
+                self._expect_key = True
+            return
+
+        if char in "}]":
+            # 閉じる前に、直下のスカラー値を確定
+            self._scalar_ends(index, items)
+            self._stack.pop()
+            depth = len(self._stack)
+            if self._target_depth is not None and depth + 1 == self._target_depth and char == "]":
+                self._target_depth = None
+            elif self._target_depth is not None and depth == self._target_depth and self._item_start >= 0:
+                self._emit(self._item_start, index + 1, items)
+                self._item_start = -1
+            if depth == 1 and self._field_start >= 0:
+                # トップレベルのオブジェクトの値がコンテナの場合は fields に入れない
+                self._field_key = None
+                self._field_start = -1
+            if depth == 0:
+                self._done = True
+            return
+
+        if char == ",":
+            self._scalar_ends(index, items)
+            if depth == 1 and self._stack[0] == "{":
+                self._expect_key = True
+                self._last_key = None
+            return
+
+        if char == ":":
+            if depth == 1 and self._stack[0] == "{":
+                self._expect_key = False
+            return
+
+        # 数値・true/false/null の開始（続く文字は , ] } まで読み飛ばす）
+        if depth > 0 and self._previous_significant(index) in ":[,":
+            self._value_starts(index)
+
+    def _string_closed(self, index: int, items: list[Any]) -> None:
+        depth = len(self._stack)
+        if depth == 1 and self._stack[0] == "{" and self._expect_key:
+            try:
+                self._last_key = json.loads(self._text[self._string_start:index + 1])
+            except ValueError:
+                self._last_key = None
+            return
+        if self._target_depth is not None and depth == self._target_depth and self._item_start >= 0:
+            self._emit(self._item_start, index + 1, items)
+            self._item_start = -1
+        if depth == 1 and self._field_start >= 0:
+            self._set_field(self._field_start, index + 1)
+
+    def _is_target_array(self, depth_before: int) -> bool:
+        if self.array_key is None:
+            return depth_before == 0
+        return depth_before == 1 and self._stack[0] == "{" and self._last_key == self.array_key
+
+    def _previous_significant(self, index: int) -> str:
+        position = index - 1
+        while position >= 0 and self._text[position] in _WHITESPACE:
+            position -= 1
+        return self._text[position] if position >= 0 else ""
@@ -0,0 +1,314 @@
+"""
+LLM応答キャッシュ
+
+翻訳・プロンプト変換等の決定的に使う呼び出しは、同じ入力で繰り返し実行される
+（シーン編集後の再翻訳・リトライ等）。モデル・システムプロンプトのハッシュ・入力・温度等の
+生成設定からキーを作り、応答を再利用してLLMの往復を省く。
+
+- メモリ（LRU）: ワーカー内で直近の応答を保持
+- 永続（R2）: ワーカー間・再起動後も共有（JSONで保存）
+- どちらも有効期限（LLM_CACHE_TTL_SECONDS）を過ぎた応答は使わない
+
+同一キーの呼び出しが同時に要求された場合は1回だけ実行し、結果を共有する（single-flight）。
+創造的な出力が必要な呼び出しはキャッシュを使わない（ゲートウェイの cache=False）。
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional
+
+from botocore.exceptions import ClientError
+from google.genai import types
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.external.r2 import get_r2_client
+
+logger = logging.getLogger(__name__)
+
+# プロンプトの組み立て方・応答の保存形式を変更した場合はバージョンを上げて既存キャッシュを無効化する
+LLM_CACHE_VERSION = 1
+
+# R2上の保存先プレフィックス
+LLM_CACHE_PREFIX = "llm-cache"
+
+
+def _jsonable(value: Any) -> Any:
+    """入力（文字列・Part・リスト等）をJSON化できる値にする"""
+    if isinstance(value, BaseModel):
+        return value.model_dump(exclude_none=True, mode="json")
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(item) for item in value]
+    return value
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def build_llm_cache_key(
+    model: str,
+    contents: Any,
+    config: Optional[types.GenerateContentConfig] = None,
+) -> str:
+    """(モデル, システムプロンプトのハッシュ, 入力, 温度, その他の生成設定) のキャッシュキー"""
+    options = config.model_dump(exclude_none=True, mode="json") if config else {}
+    system_instruction = options.pop("system_instruction", None)
+    temperature = options.pop("temperature", None)
+    payload = json.dumps(
+        {
+            "v": LLM_CACHE_VERSION,
+            "model": model,
+            "system": _sha256(json.dumps(system_instruction, sort_keys=True, ensure_ascii=False))
+            if system_instruction is not None else None,
+            "temperature": temperature,
+            "config": options,
+            "contents": _jsonable(contents),
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=str,
+    )
+    return _sha256(payload)
+
+
+def is_cacheable(
+    response: types.GenerateContentResponse,
+    config: Optional[types.GenerateContentConfig] = None,
+) -> bool:
+    """
+    応答を保存してよいか
+
+    テキストがあり、最後まで生成された（途中で打ち切られていない）応答のみ保存する。
+    JSONで応答させる呼び出しは、パースできない応答を保存しない（同じ誤りを返し続けないため）。
+    """
+    try:
+        text = response.text
+    except ValueError:
+        return False
+    if not text:
+        return False
+    candidates = response.candidates or []
+    if not candidates or candidates[0].finish_reason not in (None, types.FinishReason.STOP):
+        return False
+    if config is not None and config.response_mime_type == "application/json":
+        try:
+            json.loads(text)
+        except ValueError:
+            return False
+    return True
+
+
+class LLMResponseCache:
+    """LLM応答キャッシュ（メモリLRU + R2）"""
+
+    def __init__(
+        self,
+        enabled: Optional[bool] = None,
+        ttl_seconds: Optional[int] = None,
+        max_memory_entries: Optional[int] = None,
+        persistent: Optional[bool] = None,
+    ):
+        self.enabled = settings.LLM_CACHE_ENABLED if enabled is None else enabled
+        self.ttl_seconds = settings.LLM_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self.max_memory_entries = (
+            settings.LLM_CACHE_MEMORY_ENTRIES if max_memory_entries is None else max_memory_entries
+        )
+        self.persistent = settings.LLM_CACHE_PERSISTENT if persistent is None else persistent
+
+        # キャッシュキー → (保存時刻（UNIX時間）, 応答)
+        self._memory: "OrderedDict[str, tuple[float, types.GenerateContentResponse]]" = OrderedDict()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._inflight: dict[str, asyncio.Future] = {}
+
+        self._lookups = 0
+        self._memory_hits = 0
+        self._persistent_hits = 0
+        self._misses = 0
+        self._coalesced = 0
+        self._stores = 0
+        self._persistent_errors = 0
+
+    def _ensure_loop(self) -> None:
+        """イベントループが変わった場合（asyncio.run で起動するタスク等）は実行中の状態を作り直す"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._inflight = {}
+
+    def object_key(self, cache_key: str) -> str:
+        """キャッシュキーに対応するR2オブジェクトキー"""
+        return f"{LLM_CACHE_PREFIX}/v{LLM_CACHE_VERSION}/{cache_key[:2]}/{cache_key}.json"
+
+    def _fresh(self, stored_at: float) -> bool:
+        return time.time() - stored_at < self.ttl_seconds
+
+    def _remember(self, cache_key: str, stored_at: float, response: types.GenerateContentResponse) -> None:
+        self._memory[cache_key] = (stored_at, response)
+        self._memory.move_to_end(cache_key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _from_memory(self, cache_key: str) -> Optional[types.GenerateContentResponse]:
+        entry = self._memory.get(cache_key)
+        if entry is None:
+            return None
+        stored_at, response = entry
+        if not self._fresh(stored_at):
+            del self._memory[cache_key]
+            return None
+        self._memory.move_to_end(cache_key)
+        return response
+
+    async def _load(self, cache_key: str) -> Optional[tuple[float, types.GenerateContentResponse]]:
+        """R2から応答を読み込む（存在しない・期限切れ・読めない場合はNone）"""
+        def load() -> Optional[bytes]:
+            try:
+                obj = get_r2_client().get_object(Bucket=settings.R2_BUCKET_NAME, Key=self.object_key(cache_key))
+            except ClientError:
+                return None
+            return obj["Body"].read()
+
+        try:
+            body = await asyncio.to_thread(load)
+            if body is None:
+                return None
+            payload = json.loads(body)
+            stored_at = float(payload["stored_at"])
+            if not self._fresh(stored_at):
+                return None
+            return stored_at, types.GenerateContentResponse.model_validate(payload["response"])
+        except Exception as e:
+            self._persistent_errors += 1
+            logger.warning(f"LLM cache load failed for {cache_key[:12]}: {e}")
+            return None
+
+    async def _save(self, cache_key: str, stored_at: float, response: types.GenerateContentResponse) -> None:
+        """R2に応答を保存（失敗しても呼び出し元には影響させない）"""
+        body = json.dumps(
+            {"stored_at": stored_at, "response": response.model_dump(exclude_none=True, mode="json")},
+            ensure_ascii=False,
+        ).encode()
+
+        def save() -> None:
+            get_r2_client().put_object(
+                Bucket=settings.R2_BUCKET_NAME,
+                Key=self.object_key(cache_key),
+                Body=body,
+                ContentType="application/json",
+            )
+
+        try:
+            await asyncio.to_thread(save)
+        except Exception as e:
+            self._persistent_errors += 1
+            logger.warning(f"LLM cache save failed for {cache_key[:12]}: {e}")
+
+    async def get_or_generate(
+        self,
+        model: str,
+        contents: Any,
+        config: Optional[types.GenerateContentConfig],
+        generate: Callable[[], Awaitable[types.GenerateContentResponse]],
+    ) -> types.GenerateContentResponse:
+        """
+        キャッシュにあればその応答を返し、なければ generate を実行して保存
+
+        Args:
+            model: モデル名
+            contents: 入力
+            config: 生成設定
+            generate: LLMを呼び出す非同期関数
+
+        Returns:
+            GenerateContentResponse: 応答
+        """
+        if not self.enabled:
+            return await generate()
+
+        self._ensure_loop()
+        cache_key = build_llm_cache_key(model, contents, config)
+        self._lookups += 1
+
+        response = self._from_memory(cache_key)
+        if response is not None:
+            self._memory_hits += 1
+            return response
+
+        # 同一キーの呼び出しが実行中なら結果を待って共有
+        inflight = self._inflight.get(cache_key)
+        if inflight is not None:
+            self._coalesced += 1
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[cache_key] = future
+        try:
+            response = await self._lookup_or_generate(cache_key, config, generate)
+            future.set_result(response)
+            return response
+        except BaseException as e:
+            future.set_exception(e)
+            # 待っている呼び出しがない場合に "exception was never retrieved" を出さない
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(cache_key, None)
+
+    async def _lookup_or_generate(
+        self,
+        cache_key: str,
+        config: Optional[types.GenerateContentConfig],
+        generate: Callable[[], Awaitable[types.GenerateContentResponse]],
+    ) -> types.GenerateContentResponse:
+        if self.persistent:
+            loaded = await self._load(cache_key)
+            if loaded is not None:
+                self._persistent_hits += 1
+                self._remember(cache_key, *loaded)
+                return loaded[1]
+
+        self._misses += 1
+        response = await generate()
+        if is_cacheable(response, config):
+            stored_at = time.time()
+            self._remember(cache_key, stored_at, response)
+            self._stores += 1
+            if self.persistent:
+                await self._save(cache_key, stored_at, response)
+        return response
+
+    def clear(self) -> None:
+        """メモリ上の応答を破棄"""
+        self._memory.clear()
+
+    def stats(self) -> dict:
+        """ヒット率等（監視用）"""
+        hits = self._memory_hits + self._persistent_hits
+        return {
+            "enabled": self.enabled,
+            "persistent": self.persistent,
+            "lookups": self._lookups,
+            "memory_hits": self._memory_hits,
+            "persistent_hits": self._persistent_hits,
+            "misses": self._misses,
+            "coalesced": self._coalesced,
+            "stores": self._stores,
+            "persistent_errors": self._persistent_errors,
+            "hit_rate": hits / self._lookups if self._lookups else 0.0,
+            "memory_entries": len(self._memory),
+        }
+
+
+# シングルトンインスタンス
+llm_cache = LLMResponseCache()
+
+
+def get_llm_cache() -> LLMResponseCache:
+    """LLMResponseCacheのインスタンスを取得"""
+    return llm_cache
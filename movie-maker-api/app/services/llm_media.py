@@ -0,0 +1,187 @@
+"""
+LLMに送る画像の縮小
+
+参照画像・解析対象の画像は、元の解像度のまま（数MBのPNG等）Geminiに送っていた。
+モデル側は一定のサイズに縮小・タイル分割してから扱うため、それ以上の解像度は
+転送量とレイテンシを増やすだけになる。用途ごとに実際に使われる大きさまで縮小し、
+JPEGに再エンコードしてから送る。
+
+- 解析（ストーリー提案・画像解析・プロンプト生成の参照）: 長辺 768px
+  （Geminiは 768x768 のタイル単位で画像を扱う）
+- 画像生成の参照（顔・質感の維持が必要）: 長辺 1536px
+- 動画フレーム（BGM選定等の大まかな解析）: 長辺 512px
+
+既に十分小さいJPEGは再エンコードせずにそのまま送る。
+デコード・リサイズ・エンコードは画像処理用のプロセスプールで実行する。
+"""
+
+import asyncio
+import io
+import logging
+from dataclasses import dataclass
+from enum import Enum
+from typing import Optional
+
+import httpx
+from google.genai import types
+from PIL import Image, ImageOps
+
+from app.core.config import settings
+from app.services.image_executor import get_image_executor
+
+logger = logging.getLogger(__name__)
+
+
+class MediaPurpose(str, Enum):
+    """画像の用途"""
+    ANALYSIS = "analysis"
+    REFERENCE = "reference"
+    FRAME = "frame"
+
+
+@dataclass(frozen=True)
+class MediaProfile:
+    """用途ごとの縮小設定"""
+    max_edge: int
+    quality: int
+
+
+MEDIA_PROFILES = {
+    MediaPurpose.ANALYSIS: MediaProfile(max_edge=768, quality=85),
+    MediaPurpose.REFERENCE: MediaProfile(max_edge=1536, quality=90),
+    MediaPurpose.FRAME: MediaProfile(max_edge=512, quality=80),
+}
+
+# 参照画像のダウンロード期限（秒）
+FETCH_TIMEOUT_SECONDS = 30.0
+
+
+def shrink_image(data: bytes, max_edge: int, quality: int) -> tuple[bytes, str]:
+    """
+    画像を長辺 max_edge 以下に縮小してJPEGにする
+
+    Returns:
+        tuple[bytes, str]: (画像バイト列, MIMEタイプ)
+    """
+    with Image.open(io.BytesIO(data)) as img:
+        original_mime = Image.MIME.get(img.format or "", "image/jpeg")
+        fits = max(img.size) <= max_edge
+        if fits and img.format == "JPEG":
+            return data, original_mime
+
+        # JPEGはデコード時に縮小して読み込む（大きな写真のデコードを軽くする）
+        img.draft("RGB", (max_edge, max_edge))
+        img = ImageOps.exif_transpose(img)
+        if img.mode in ("RGBA", "LA", "P"):
+            img = img.convert("RGBA")
+            background = Image.new("RGB", img.size, (255, 255, 255))
+            background.paste(img, mask=img.getchannel("A"))
+            img = background
+        elif img.mode != "RGB":
+            img = img.convert("RGB")
+        img.thumbnail((max_edge, max_edge), Image.Resampling.LANCZOS)
+
+        buffer = io.BytesIO()
+        img.save(buffer, format="JPEG", quality=quality, optimize=True)
+
+    shrunk = buffer.getvalue()
+    # 縮小不要な小さい画像（PNG等）は、再エンコードで大きくなる場合は元のまま送る
+    if fits and len(shrunk) >= len(data):
+        return data, original_mime
+    return shrunk, "image/jpeg"
+
+
+class LLMMediaShrinker:
+    """LLMに送る画像の縮小"""
+
+    def __init__(self, enabled: Optional[bool] = None):
+        self.enabled = settings.LLM_MEDIA_SHRINK_ENABLED if enabled is None else enabled
+
+        self._images = 0
+        self._failures = 0
+        self._bytes_in = 0
+        self._bytes_out = 0
+
+    async def image_part(self, data: bytes, purpose: MediaPurpose = MediaPurpose.ANALYSIS) -> types.Part:
+        """
+        画像を用途に応じて縮小したPartを作成
+
+        デコードできない画像は元のまま送る（判定はモデル側に任せる）。
+        """
+        self._images += 1
+        self._bytes_in += len(data)
+        if self.enabled:
+            profile = MEDIA_PROFILES[purpose]
+            try:
+                shrunk, mime_type = await get_image_executor().run(
+                    shrink_image, data, profile.max_edge, profile.quality
+                )
+                self._bytes_out += len(shrunk)
+                return types.Part.from_bytes(data=shrunk, mime_type=mime_type)
+            except Exception as e:
+                self._failures += 1
+                logger.warning(f"Failed to shrink image for LLM, sending original: {e}")
+        self._bytes_out += len(data)
+        return types.Part.from_bytes(data=data, mime_type="image/jpeg")
+
+    async def fetch_image_parts(
+        self,
+        urls: list[str],
+        purpose: MediaPurpose = MediaPurpose.ANALYSIS,
+    ) -> list[Optional[types.Part]]:
+        """
+        複数の画像を並行してダウンロード・縮小
+
+        Returns:
+            list[Optional[types.Part]]: URLと同じ順序のPart（取得できなかった画像はNone）
+        """
+        async with httpx.AsyncClient(timeout=FETCH_TIMEOUT_SECONDS) as http_client:
+            async def fetch(url: str) -> types.Part:
+                response = await http_client.get(url)
+                response.raise_for_status()
+                return await self.image_part(response.content, purpose)
+
+            results = await asyncio.gather(*(fetch(url) for url in urls), return_exceptions=True)
+
+        parts: list[Optional[types.Part]] = []
+        for url, result in zip(urls, results):
+            if isinstance(result, BaseException):
+                if not isinstance(result, Exception):
+                    raise result
+                logger.warning(f"Failed to fetch image for LLM: {url}: {result}")
+                parts.append(None)
+            else:
+                parts.append(result)
+        return parts
+
+    async def fetch_image_part(self, url: str, purpose: MediaPurpose = MediaPurpose.ANALYSIS) -> types.Part:
+        """
+        画像をダウンロード・縮小
+
+        Raises:
+            httpx.HTTPError: ダウンロードに失敗した場合
+        """
+        async with httpx.AsyncClient(timeout=FETCH_TIMEOUT_SECONDS) as http_client:
+            response = await http_client.get(url)
+            response.raise_for_status()
+        return await self.image_part(response.content, purpose)
+
+    def stats(self) -> dict:
+        """縮小前後の転送量（監視用）"""
+        return {
+            "enabled": self.enabled,
+            "images": self._images,
+            "failures": self._failures,
+            "bytes_in": self._bytes_in,
+            "bytes_out": self._bytes_out,
+            "saved_ratio": 1 - self._bytes_out / self._bytes_in if self._bytes_in else 0.0,
+        }
+
+
+# シングルトンインスタンス
+llm_media = LLMMediaShrinker()
+
+
+def get_llm_media() -> LLMMediaShrinker:
+    """LLMMediaShrinkerのインスタンスを取得"""
+    return llm_media
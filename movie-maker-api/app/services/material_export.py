@@ -0,0 +1,124 @@
+"""
+編集用素材（ProRes）エクスポート
+
+各カットのダウンロードとProRes変換を並行して実行し、
+変換が完了したカットから順に (ZIP内のファイル名, ローカルパス) を返す。
+変換の同時実行数はFFmpegスケジューラで制限される。
+"""
+
+import asyncio
+import logging
+import os
+from typing import AsyncIterator
+
+import aiohttp
+
+from app.services.ffmpeg_service import get_ffmpeg_service
+from app.services.scratch_space import ScratchWorkspace
+
+logger = logging.getLogger(__name__)
+
+# 同時ダウンロード数（変換待ちの入力をディスクに溜めすぎないため）
+MATERIAL_DOWNLOAD_CONCURRENCY = 4
+
+_DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+class MaterialExportError(Exception):
+    """素材エクスポートエラー"""
+
+    def __init__(self, cut_number: int, message: str):
+        super().__init__(message)
+        self.cut_number = cut_number
+
+
+def material_filename(cut) -> str:
+    """カットのZIP内ファイル名"""
+    # ラベルからファイル名に使えない文字を除去し、最大50文字に制限
+    safe_label = "".join(c for c in cut.label if c.isalnum() or c in "ぁ-んァ-ン一-龯_- ")
+    safe_label = safe_label[:50].rstrip()  # 50文字に制限
+    return f"{cut.cut_number:02d}_{safe_label}.mov"
+
+
+async def convert_materials(
+    cuts: list,
+    aspect_ratio: str,
+    workspace: ScratchWorkspace,
+    job_id: str | None = None,
+) -> AsyncIterator[tuple[str, str]]:
+    """
+    カットを並行してダウンロード・ProRes変換し、完了した順に返す
+
+    イテレータを途中で閉じた場合（クライアント切断等）は残りの変換をキャンセルする。
+
+    Args:
+        cuts: エクスポートするカット（cut_number, label, video_url, trim_start, trim_end）
+        aspect_ratio: アスペクト比
+        workspace: 入出力ファイルを置くスクラッチワークスペース
+        job_id: キャンセル用のジョブID
+
+    Yields:
+        tuple[str, str]: (ZIP内のファイル名, 変換済みファイルのパス)
+
+    Raises:
+        MaterialExportError: いずれかのカットのダウンロード・変換に失敗した場合
+    """
+    ffmpeg = get_ffmpeg_service()
+    download_semaphore = asyncio.Semaphore(MATERIAL_DOWNLOAD_CONCURRENCY)
+
+    async with aiohttp.ClientSession() as session:
+
+        async def convert_cut(cut) -> tuple[str, str]:
+            input_path = workspace.file(f"input_{cut.cut_number:02d}.mp4")
+            output_filename = material_filename(cut)
+            output_path = workspace.file(output_filename)
+
+            try:
+                # 1. 動画ダウンロード（メモリに全体を載せずファイルへ書き出す）
+                async with download_semaphore:
+                    async with session.get(cut.video_url) as resp:
+                        if resp.status != 200:
+                            raise MaterialExportError(
+                                cut.cut_number,
+                                f"動画ダウンロードに失敗しました: cut_{cut.cut_number:02d}",
+                            )
+                        with open(input_path, "wb") as f:
+                            async for chunk in resp.content.iter_chunked(_DOWNLOAD_CHUNK_SIZE):
+                                f.write(chunk)
+
+                # 2. ProRes変換（同時実行数はスケジューラが制御）
+                await ffmpeg.convert_to_prores_hd(
+                    input_path=input_path,
+                    output_path=output_path,
+                    trim_start=cut.trim_start,
+                    trim_end=cut.trim_end,
+                    aspect_ratio=aspect_ratio,
+                    job_id=job_id,
+                )
+            except MaterialExportError:
+                raise
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception(f"Failed to process cut {cut.cut_number}: {e}")
+                raise MaterialExportError(
+                    cut.cut_number,
+                    f"カット{cut.cut_number}の変換に失敗しました: {str(e)}",
+                ) from e
+            finally:
+                # 入力ファイル削除（ディスク節約）
+                if os.path.exists(input_path):
+                    os.remove(input_path)
+
+            workspace.check_quota()
+            logger.info(f"Converted: {output_filename}")
+            return output_filename, output_path
+
+        tasks = [asyncio.create_task(convert_cut(cut)) for cut in cuts]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
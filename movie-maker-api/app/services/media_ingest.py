@@ -0,0 +1,368 @@
+"""
+生成動画の派生アセット取り込み
+
+シーン・動画の生成完了直後に1回だけ実行し、後続処理が使う派生アセットを
+1回のプローブと1回のデコードでまとめて作成してR2に保存する。
+
+- 最初のフレーム / 最終フレーム（サブシーンの入力画像等）
+- ポスター / サムネイル
+- プローブ結果（長さ・サイズ・fps・コーデック・音声有無）
+- プレビュー用スプライト（任意）
+- 一覧用プレビュー（2秒・240pの音声なしH.264 またはアニメーションWebPのループ）
+
+結果は元の行（storyboard_scenes / video_generations）に保存し、
+後続処理は動画を再ダウンロード・再デコードせずにURLを読むだけにする。
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Optional, Union
+
+from app.core.config import settings
+from app.external.r2 import upload_local_file
+from app.services.ffmpeg_service import get_ffmpeg_service
+from app.services.remote_media import get_remote_media
+from app.services.scratch_space import get_scratch_space
+
+logger = logging.getLogger(__name__)
+
+# R2上の保存先プレフィックス
+DERIVED_PREFIX = "derived"
+
+POSTER_MAX_WIDTH = 1280
+THUMBNAIL_WIDTH = 320
+SPRITE_COLUMNS = 5
+SPRITE_ROWS = 2
+SPRITE_TILE_WIDTH = 160
+
+# 一覧のグリッドで自動再生するプレビュー（元のMP4の数十分の一のサイズ）
+PREVIEW_DURATION_SECONDS = 2.0
+PREVIEW_HEIGHT = 240
+PREVIEW_FPS = 12
+
+_PREVIEW_CONTENT_TYPES = {"mp4": "video/mp4", "webp": "image/webp"}
+
+# 派生アセットのカラム（取り込みに失敗した場合は古い値を残さないようNULLにする）
+DERIVED_COLUMNS = (
+    "first_frame_url",
+    "last_frame_url",
+    "poster_url",
+    "thumbnail_url",
+    "sprite_url",
+    "preview_url",
+    "media_metadata",
+)
+
+# ポスター・サムネイルに使う位置（冒頭の暗転・フェードインを避ける）
+_POSTER_TIME_SECONDS = 1.0
+
+
+class MediaIngestError(Exception):
+    """派生アセットの作成に失敗"""
+    pass
+
+
+@dataclass
+class DerivedArtifacts:
+    """派生アセット"""
+    first_frame_url: str
+    last_frame_url: str
+    poster_url: str
+    thumbnail_url: str
+    sprite_url: Optional[str]
+    preview_url: Optional[str]
+    metadata: dict[str, Any]
+
+    def to_columns(self) -> dict[str, Any]:
+        """DBカラム用の辞書"""
+        columns = {
+            "first_frame_url": self.first_frame_url,
+            "last_frame_url": self.last_frame_url,
+            "poster_url": self.poster_url,
+            "thumbnail_url": self.thumbnail_url,
+            "sprite_url": self.sprite_url,
+            "preview_url": self.preview_url,
+            "media_metadata": self.metadata,
+        }
+        if self.sprite_url is not None:
+            columns["media_metadata"] = {
+                **self.metadata,
+                "sprite": {
+                    "columns": SPRITE_COLUMNS,
+                    "rows": SPRITE_ROWS,
+                    "tile_width": SPRITE_TILE_WIDTH,
+                },
+            }
+        return columns
+
+
+def _parse_rate(rate: Optional[str]) -> Optional[float]:
+    """"30000/1001" 形式のフレームレートを数値に変換"""
+    if not rate:
+        return None
+    try:
+        num, _, den = rate.partition("/")
+        value = float(num) / float(den or 1)
+    except (ValueError, ZeroDivisionError):
+        return None
+    return round(value, 3) if value > 0 else None
+
+
+def parse_media_metadata(info: dict) -> dict[str, Any]:
+    """
+    ffprobeのJSON（-show_format -show_streams）からメタデータを取り出す
+
+    width / height は回転メタデータを考慮した表示サイズ。
+    """
+    fmt = info.get("format", {})
+    streams = info.get("streams", [])
+    video = next((s for s in streams if s.get("codec_type") == "video"), None)
+
+    def to_float(value) -> Optional[float]:
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
+
+    def to_int(value) -> Optional[int]:
+        number = to_float(value)
+        return int(number) if number is not None else None
+
+    metadata: dict[str, Any] = {
+        "duration": to_float(fmt.get("duration")),
+        "size": to_int(fmt.get("size")),
+        "bit_rate": to_int(fmt.get("bit_rate")),
+        "width": None,
+        "height": None,
+        "fps": None,
+        "video_codec": None,
+        "has_audio": any(s.get("codec_type") == "audio" for s in streams),
+    }
+    if video is None:
+        return metadata
+
+    width, height = video.get("width"), video.get("height")
+    rotation = video.get("tags", {}).get("rotate")
+    for side_data in video.get("side_data_list", []):
+        rotation = side_data.get("rotation", rotation)
+    rotation = to_int(rotation) or 0
+    if rotation % 180 != 0:
+        width, height = height, width
+
+    metadata.update(
+        width=width,
+        height=height,
+        fps=_parse_rate(video.get("avg_frame_rate")) or _parse_rate(video.get("r_frame_rate")),
+        video_codec=video.get("codec_name"),
+    )
+    if metadata["duration"] is None:
+        metadata["duration"] = to_float(video.get("duration"))
+    return metadata
+
+
+def preview_format() -> str:
+    """一覧用プレビューの形式（"mp4" または "webp"）"""
+    return "webp" if settings.MEDIA_PREVIEW_FORMAT == "webp" else "mp4"
+
+
+def preview_start(duration: float) -> float:
+    """プレビューの開始位置（冒頭の暗転を避けつつ、短い動画では先頭から）"""
+    return max(0.0, min(1.0, duration - PREVIEW_DURATION_SECONDS))
+
+
+def derived_key_prefix(kind: str, row_id: str) -> str:
+    """派生アセットのR2キープレフィックス（再生成時にCDNキャッシュを避けるため時刻付き）"""
+    return f"{DERIVED_PREFIX}/{kind}/{row_id}/{int(time.time())}"
+
+
+async def ingest_video(
+    source: Union[str, bytes],
+    key_prefix: str,
+    sprite: Optional[bool] = None,
+) -> DerivedArtifacts:
+    """
+    動画から派生アセットを作成してR2に保存
+
+    Args:
+        source: 動画（ローカルパス・URL・バイト列）
+        key_prefix: R2の保存先プレフィックス
+        sprite: スプライトを生成するか（Noneの場合は設定値）
+
+    Returns:
+        DerivedArtifacts: 派生アセット
+
+    Raises:
+        MediaIngestError: 動画を解析できない場合
+        FFmpegError: 画像の出力に失敗した場合
+    """
+    ffmpeg = get_ffmpeg_service()
+    with_sprite = settings.MEDIA_INGEST_SPRITE_ENABLED if sprite is None else sprite
+
+    with get_scratch_space().workspace("ingest") as workspace:
+        if isinstance(source, bytes):
+            video_path = workspace.file("video.mp4")
+            await asyncio.to_thread(_write_bytes, video_path, source)
+        else:
+            video_path = await get_remote_media().media_source(source, workspace, "video.mp4")
+
+        metadata = parse_media_metadata(await ffmpeg.get_video_info(video_path))
+        duration = metadata["duration"]
+        if not duration:
+            raise MediaIngestError("Failed to probe video")
+
+        names = {
+            "first_frame": "first_frame.jpg",
+            "last_frame": "last_frame.jpg",
+            "poster": "poster.jpg",
+            "thumbnail": "thumbnail.jpg",
+        }
+        if with_sprite:
+            names["sprite"] = "sprite.jpg"
+        names["preview"] = f"preview.{preview_format()}"
+        # フレーム・ポスター・サムネイル等の小さな画像はRAM層、プレビュー動画はディスク層
+        paths = {
+            name: workspace.file(filename) if name == "preview" else workspace.small_file(filename)
+            for name, filename in names.items()
+        }
+
+        await ffmpeg.extract_derived_images(
+            video_path,
+            duration,
+            first_frame_path=paths["first_frame"],
+            last_frame_path=paths["last_frame"],
+            poster_path=paths["poster"],
+            thumbnail_path=paths["thumbnail"],
+            poster_time=min(_POSTER_TIME_SECONDS, duration / 2),
+            poster_max_width=POSTER_MAX_WIDTH,
+            thumbnail_width=THUMBNAIL_WIDTH,
+            sprite_path=paths.get("sprite"),
+            sprite_columns=SPRITE_COLUMNS,
+            sprite_rows=SPRITE_ROWS,
+            sprite_tile_width=SPRITE_TILE_WIDTH,
+            preview_path=paths["preview"],
+            preview_start=preview_start(duration),
+            preview_duration=PREVIEW_DURATION_SECONDS,
+            preview_height=PREVIEW_HEIGHT,
+            preview_fps=PREVIEW_FPS,
+        )
+
+        urls = await asyncio.gather(*(
+            upload_local_file(
+                paths[name],
+                f"{key_prefix}/{filename}",
+                _PREVIEW_CONTENT_TYPES[preview_format()] if name == "preview" else "image/jpeg",
+            )
+            for name, filename in names.items()
+        ))
+
+    uploaded = dict(zip(names, urls))
+    logger.info(f"Derived artifacts stored under {key_prefix} ({len(uploaded)} images)")
+    return DerivedArtifacts(
+        first_frame_url=uploaded["first_frame"],
+        last_frame_url=uploaded["last_frame"],
+        poster_url=uploaded["poster"],
+        thumbnail_url=uploaded["thumbnail"],
+        sprite_url=uploaded.get("sprite"),
+        preview_url=uploaded["preview"],
+        metadata=metadata,
+    )
+
+
+def _write_bytes(path: str, data: bytes) -> None:
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+async def ingest_derived_columns(
+    source: Union[str, bytes],
+    kind: str,
+    row_id: str,
+) -> dict[str, Any]:
+    """
+    派生アセットを作成し、行に保存するカラムを返す
+
+    派生アセットは補助的なものなので、失敗しても例外を投げない（動画自体はそのまま利用可能）。
+    再生成時に前の動画の派生アセットが残らないよう、失敗時は各カラムをNULLにする。
+
+    Args:
+        source: 動画（ローカルパス・URL・バイト列）
+        kind: 種類（"storyboard_scenes", "video_generations" 等、R2キーに使用）
+        row_id: 行ID
+
+    Returns:
+        dict: DBカラム用の辞書（無効時は空、失敗時は全てNULL）
+    """
+    if not settings.MEDIA_INGEST_ENABLED:
+        return {}
+
+    try:
+        artifacts = await ingest_video(source, derived_key_prefix(kind, row_id))
+    except Exception as e:
+        logger.warning(f"Media ingest failed for {kind}/{row_id}: {e}")
+        return cleared_columns()
+    return artifacts.to_columns()
+
+
+def cleared_columns() -> dict:
+    """
+    派生アセットのカラムを全てNULLにする更新内容
+
+    動画を作り直すためにリセットする場合に使う（前の動画のフレーム・プレビューを残さない）。
+    """
+    return {column: None for column in DERIVED_COLUMNS}
+
+
+async def create_preview(source: Union[str, bytes], key: str) -> str:
+    """
+    一覧用プレビューを作成してR2に保存
+
+    最初/最終フレーム等が不要な動画（結合結果・アップロード動画）用。
+
+    Args:
+        source: 動画（ローカルパス・URL・バイト列）
+        key: R2キー（拡張子なし）
+
+    Returns:
+        str: プレビューの公開URL
+    """
+    ffmpeg = get_ffmpeg_service()
+    fmt = preview_format()
+
+    with get_scratch_space().workspace("preview") as workspace:
+        if isinstance(source, bytes):
+            video_path = workspace.file("video.mp4")
+            await asyncio.to_thread(_write_bytes, video_path, source)
+        else:
+            video_path = await get_remote_media().media_source(source, workspace, "video.mp4")
+
+        duration = await ffmpeg._get_video_duration(video_path)
+        output_path = workspace.file(f"preview.{fmt}")
+        await ffmpeg.create_preview_clip(
+            video_path,
+            output_path,
+            start=preview_start(duration or 0.0),
+            duration=PREVIEW_DURATION_SECONDS,
+            height=PREVIEW_HEIGHT,
+            fps=PREVIEW_FPS,
+        )
+        return await upload_local_file(output_path, f"{key}.{fmt}", _PREVIEW_CONTENT_TYPES[fmt])
+
+
+async def preview_columns(source: Union[str, bytes], kind: str, row_id: str) -> dict[str, Any]:
+    """
+    一覧用プレビューを作成し、行に保存するカラムを返す
+
+    Returns:
+        dict: {"preview_url": URL}（無効時は空、失敗時はNULL）
+    """
+    if not settings.MEDIA_INGEST_ENABLED:
+        return {}
+
+    try:
+        url = await create_preview(source, f"{derived_key_prefix(kind, row_id)}/preview")
+    except Exception as e:
+        logger.warning(f"Preview generation failed for {kind}/{row_id}: {e}")
+        return {"preview_url": None}
+    return {"preview_url": url}
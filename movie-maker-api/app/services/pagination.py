@@ -0,0 +1,236 @@
+"""
+一覧APIのページネーション
+
+- キーセットページネーション: (created_at, id) の降順で、カーソルより後の行だけを取得する。
+  OFFSETを使わないため、深いページでも1ページ目と同じコストで取得できる。
+- カーソル: ページ最後の行の (created_at, id) をbase64urlにした不透明な文字列（next_cursor）
+- 件数キャッシュ: 一覧のたびに count="exact" を実行しないよう件数をキャッシュし、
+  追加・削除時に増減させる（他のワーカーでの変更はTTLの経過で反映される）
+
+カーソルを指定しない場合は page からオフセットを計算する（後方互換、深いページほど遅い）。
+"""
+
+import base64
+import json
+import logging
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Optional
+
+from supabase import Client
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# フィルタ式に埋め込むため、カーソルのIDは英数字・ハイフン・アンダースコアのみ許可
+_CURSOR_ID_PATTERN = re.compile(r"[0-9A-Za-z_-]+")
+
+
+class InvalidCursorError(ValueError):
+    """不正なカーソル"""
+    pass
+
+
+def encode_cursor(created_at: str, item_id: str) -> str:
+    """(created_at, id) を不透明なカーソル文字列にする"""
+    payload = json.dumps({"t": created_at, "id": item_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, str]:
+    """
+    カーソルを (created_at, id) に戻す
+
+    Raises:
+        InvalidCursorError: 不正なカーソル
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        created_at, item_id = str(payload["t"]), str(payload["id"])
+        datetime.fromisoformat(created_at.replace("Z", "+00:00"))
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidCursorError(f"不正なカーソルです: {e}")
+    if not _CURSOR_ID_PATTERN.fullmatch(item_id):
+        raise InvalidCursorError("不正なカーソルです")
+    return created_at, item_id
+
+
+def row_cursor(row: dict) -> str:
+    """行の位置を表すカーソル"""
+    return encode_cursor(str(row["created_at"]), str(row["id"]))
+
+
+def sort_key(row: dict) -> tuple[datetime, str]:
+    """(created_at, id) のソートキー（複数テーブルの結果をマージする場合用）"""
+    return datetime.fromisoformat(str(row["created_at"]).replace("Z", "+00:00")), str(row["id"])
+
+
+def apply_keyset(query, position: Optional[tuple[str, str]], limit: int):
+    """(created_at, id) の降順で、position より後の行を limit 件取得するクエリ"""
+    if position:
+        created_at, item_id = position
+        query = query.or_(
+            f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt.{item_id})'
+        )
+    return query.order("created_at", desc=True).order("id", desc=True).limit(limit)
+
+
+@dataclass
+class Page:
+    """1ページ分の結果"""
+    rows: list[dict]
+    has_next: bool
+    next_cursor: Optional[str]
+
+
+def fetch_page(query, per_page: int, cursor: Optional[str] = None, page: int = 1) -> Page:
+    """
+    1ページ分の行を取得
+
+    次ページの有無を判定するため per_page + 1 行だけ取得する（件数クエリは不要）。
+
+    Args:
+        query: select / フィルタ済みのクエリ（並び順・範囲は指定しない）
+        per_page: 1ページあたりの件数
+        cursor: 前のページの next_cursor
+        page: ページ番号（cursor 指定時は無視）
+
+    Returns:
+        Page: 行・次ページの有無・次ページのカーソル
+
+    Raises:
+        InvalidCursorError: 不正なカーソル
+    """
+    if cursor:
+        query = apply_keyset(query, decode_cursor(cursor), per_page + 1)
+    else:
+        offset = (page - 1) * per_page
+        query = query.order("created_at", desc=True).order("id", desc=True) \
+            .range(offset, offset + per_page)
+
+    rows = query.execute().data or []
+    has_next = len(rows) > per_page
+    rows = rows[:per_page]
+    return Page(
+        rows=rows,
+        has_next=has_next,
+        next_cursor=row_cursor(rows[-1]) if has_next and rows else None,
+    )
+
+
+class CountCache:
+    """
+    ユーザーごとの件数キャッシュ
+
+    キーは (テーブル, ユーザーID, 条件)。条件は同じテーブルをフィルタして数える場合
+    （カテゴリ別等）の識別子で、フィルタなしの件数は None。
+    件数は max_entries を上限に、最近使われていないものから破棄する。
+    """
+
+    def __init__(self, ttl_seconds: Optional[float] = None, max_entries: Optional[int] = None):
+        self.ttl_seconds = settings.LIST_COUNT_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self.max_entries = max_entries or settings.LIST_COUNT_CACHE_MAX_ENTRIES
+        # (テーブル, ユーザーID, 条件) → (取得時刻, 件数)
+        self._entries: "OrderedDict[tuple[str, str, Optional[str]], tuple[float, int]]" = OrderedDict()
+
+        self._hits = 0
+        self._misses = 0
+        self._adjustments = 0
+
+    def get(
+        self,
+        table: str,
+        user_id: str,
+        compute: Callable[[], int],
+        variant: Optional[str] = None,
+    ) -> int:
+        """件数を返す（キャッシュがない・期限切れの場合は compute で数える）"""
+        key = (table, user_id, variant)
+        cached = self._entries.get(key)
+        now = time.monotonic()
+        if cached and now - cached[0] < self.ttl_seconds:
+            self._hits += 1
+            self._entries.move_to_end(key)
+            return cached[1]
+
+        self._misses += 1
+        count = int(compute())
+        self._remember(key, now, count)
+        return count
+
+    def _remember(self, key: tuple[str, str, Optional[str]], fetched_at: float, count: int) -> None:
+        self._entries[key] = (fetched_at, count)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def adjust(self, table: str, user_id: str, delta: int) -> None:
+        """
+        行の追加・削除に合わせて件数を増減
+
+        フィルタなしの件数は増減させ、条件付きの件数は該当するか分からないため破棄する。
+        """
+        self._adjustments += 1
+        for key in [key for key in self._entries if key[0] == table and key[1] == user_id]:
+            if key[2] is None:
+                fetched_at, count = self._entries[key]
+                self._entries[key] = (fetched_at, max(0, count + delta))
+            else:
+                del self._entries[key]
+
+    def invalidate(self, user_id: str, table: Optional[str] = None) -> None:
+        """ユーザーの件数を破棄（table 省略時は全テーブル）"""
+        for key in [key for key in self._entries if key[1] == user_id and table in (None, key[0])]:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        """全件破棄"""
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        """キャッシュの状況（監視用）"""
+        return {
+            "entries": len(self._entries),
+            "hits": self._hits,
+            "misses": self._misses,
+            "adjustments": self._adjustments,
+        }
+
+
+# シングルトンインスタンス
+count_cache = CountCache()
+
+
+def get_count_cache() -> CountCache:
+    """CountCacheのインスタンスを取得"""
+    return count_cache
+
+
+def cached_count(
+    supabase: Client,
+    table: str,
+    user_id: str,
+    refine: Optional[Callable[[Any], Any]] = None,
+    variant: Optional[str] = None,
+) -> int:
+    """
+    ユーザーの行数を取得（行は取得せず件数のみ、キャッシュ付き）
+
+    Args:
+        supabase: Supabaseクライアント
+        table: テーブル名
+        user_id: ユーザーID
+        refine: 件数クエリに追加するフィルタ
+        variant: refine の識別子（refine を指定する場合は必須）
+    """
+    def compute() -> int:
+        query = supabase.table(table).select("id", count="exact", head=True).eq("user_id", user_id)
+        if refine is not None:
+            query = refine(query)
+        return query.execute().count or 0
+
+    return get_count_cache().get(table, user_id, compute, variant=variant)
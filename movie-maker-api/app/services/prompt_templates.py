@@ -0,0 +1,404 @@
+"""
+動画生成プロンプトテンプレートのレジストリ
+
+docs/prompt 以下のテンプレート（プロバイダー × モード × 被写体タイプ、アニメーションスタイル）を
+起動時に一度だけ読み込んで解析し、ファイルパスをキーにした読み取り専用の辞書に保持する。
+ストーリーボード生成・シーン翻訳のたびにMarkdownを読み込んで解析していた処理が、辞書の参照だけになる。
+
+PROMPT_TEMPLATE_HOT_RELOAD を有効にすると、テンプレートの更新（mtime・サイズの変化）を
+定期的に確認し、変更があれば全体を読み直して差し替える（開発時のテンプレート調整用）。
+"""
+
+import asyncio
+import logging
+import re
+from pathlib import Path
+from types import MappingProxyType
+from typing import Mapping, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# プロジェクトルートディレクトリ（movie-maker-api の親 = movie-project）
+PROJECT_ROOT = Path(__file__).parent.parent.parent.parent  # movie-project/
+
+PROMPT_TEMPLATE_ROOT = PROJECT_ROOT / "docs" / "prompt"
+
+# プロバイダー別テンプレートファイル名（不明なプロバイダーはrunway）
+PROVIDER_TEMPLATE_FILES = {
+    "veo": "veo_api_template.md",
+    "domoai": "domoai_api_template.md",
+    "piapi_kling": "kling_api_template.md",
+}
+DEFAULT_PROVIDER_TEMPLATE_FILE = "runway_api_template.md"
+
+# プロバイダー別のアニメーションテンプレートファイル名
+ANIMATION_TEMPLATE_FILES = {
+    "runway": {
+        "A-1": "A-1_modern_tv_anime.md",
+        "A-2": "A-2_ghibli_style.md",
+        "A-3": "A-3_90s_retro.md",
+        "A-4": "A-4_flat_design.md",
+        "B-1": "B-1_photorealistic.md",
+        "B-2": "B-2_game_ue5.md",
+        "B-3": "B-3_pixar_style.md",
+        "B-4": "B-4_low_poly_ps1.md",
+    },
+    "veo": {
+        "A-1": "A-1_modern_vtuber.md",
+        "A-2": "A-2_ghibli.md",
+        "A-3": "A-3_90s_retro.md",
+        "A-4": "A-4_flat_simple.md",
+        "B-1": "B-1_photorealistic.md",
+        "B-2": "B-2_ue5_game.md",
+        "B-3": "B-3_pixar.md",
+        "B-4": "B-4_low_poly_ps1.md",
+    },
+    "domoai": {
+        "A-1": "A-1_japanese_anime.md",
+        "A-2": "A-2_flat_color_anime.md",
+        "A-3": "A-3_90s_retro.md",
+        "A-4": "A-4_pixel_art.md",
+        "B-1": "B-1_realistic.md",
+        "B-2": "B-2_cartoon_game.md",
+        "B-3": "B-3_3d_anime.md",
+        "B-4": "B-4_chibi_deformed.md",
+    },
+    "piapi_kling": {
+        "A-1": "A-1_modern_tv_anime.md",
+        "A-2": "A-2_ghibli_style.md",
+        "A-3": "A-3_90s_retro.md",
+        "A-4": "A-4_flat_design.md",
+        "B-1": "B-1_photorealistic.md",
+        "B-2": "B-2_game_ue5.md",
+        "B-3": "B-3_pixar_style.md",
+        "B-4": "B-4_low_poly_ps1.md",
+    },
+}
+
+# プロバイダー別のディレクトリ名マッピング（フォルダ名が異なる場合）
+ANIMATION_PROVIDER_FOLDERS = {
+    "runway": "runway",
+    "veo": "veo",
+    "domoai": "domo",  # DomoAIはdomoフォルダを使用
+    "piapi_kling": "kling",  # PiAPI Klingはklingフォルダを使用
+}
+
+_ANIMATION_TEMPLATE_ID = re.compile(r"^([AB]-\d+)_")
+
+
+def provider_template_path(provider: str, mode: str, subject_type: Optional[str]) -> str:
+    """プロバイダー・モード・被写体タイプに対応するテンプレートのパス（docs/prompt からの相対パス）"""
+    if mode == "scene":
+        # animation選択でテンプレート未指定の場合・不明な被写体タイプはpersonをフォールバック
+        folder = f"scene/{subject_type if subject_type in ('person', 'object') else 'person'}"
+    else:
+        folder = mode
+    return f"{folder}/{PROVIDER_TEMPLATE_FILES.get(provider, DEFAULT_PROVIDER_TEMPLATE_FILE)}"
+
+
+def animation_template_path(category: str, template_id: str, provider: str) -> Optional[str]:
+    """アニメーションテンプレートのパス（docs/prompt からの相対パス、不明なIDの場合はNone）"""
+    file_map = ANIMATION_TEMPLATE_FILES.get(provider, ANIMATION_TEMPLATE_FILES["runway"])
+    filename = file_map.get(template_id)
+    if not filename:
+        return None
+    folder_name = ANIMATION_PROVIDER_FOLDERS.get(provider, provider)
+    return f"scene/anime/{category}/{folder_name}/{filename}"
+
+
+def parse_provider_template(content: str) -> dict:
+    """
+    プロバイダー別テンプレートから REFERENCE RULE / CLIP SPECIFIC / NEGATIVE PROMPT を抽出
+    """
+    result = {
+        "reference_rule": "",
+        "clip_specific_template": "",
+        "negative_prompt": None,
+        "style_keywords": None,
+        "quality_boosters": None
+    }
+
+    # REFERENCE RULE または SINGLE IMAGE RULE セクションを抽出
+    if "REFERENCE RULE" in content:
+        start = content.find("REFERENCE RULE")
+        end = content.find("CLIP SPECIFIC", start)
+        if end > start:
+            result["reference_rule"] = content[start:end].strip()
+    elif "SINGLE IMAGE RULE" in content:
+        # シーン用テンプレート（1枚の画像用）
+        start = content.find("SINGLE IMAGE RULE")
+        end = content.find("CLIP SPECIFIC", start)
+        if end > start:
+            result["reference_rule"] = content[start:end].strip()
+
+    # CLIP SPECIFIC テンプレートを抽出
+    if "CLIP SPECIFIC" in content:
+        start = content.find("CLIP SPECIFIC (edit only this block):")
+        if start != -1:
+            # 次のセクション（---）まで取得
+            end = content.find("---", start)
+            if end == -1:
+                end = content.find("## NEGATIVE PROMPT", start)
+            if end == -1:
+                end = content.find("## 例", start)
+            if end > start:
+                result["clip_specific_template"] = content[start:end].strip()
+
+    # NEGATIVE PROMPT を抽出（Runwayのみ）
+    if "NEGATIVE PROMPT" in content:
+        start = content.find("## NEGATIVE PROMPT")
+        if start != -1:
+            # セクション内容を取得
+            lines_start = content.find("\n", start) + 1
+            end = content.find("---", lines_start)
+            if end > lines_start:
+                result["negative_prompt"] = content[lines_start:end].strip()
+
+    return result
+
+
+def parse_animation_template(content: str, category: str, template_id: str) -> dict:
+    """
+    アニメーションスタイルテンプレートからスタイルキーワード・品質ブースター・
+    SINGLE IMAGE RULE / CLIP SPECIFIC・ネガティブキーワードを抽出
+    """
+    result = {
+        "reference_rule": "",
+        "clip_specific_template": "",
+        "negative_prompt": None,
+        "style_keywords": "",
+        "quality_boosters": ""  # DomoAI用の品質向上ブースター
+    }
+
+    # 品質向上ブースター（Magic Words）を抽出（DomoAI用）
+    if "## 品質向上ブースター" in content:
+        start = content.find("## 品質向上ブースター")
+        end = content.find("---", start)
+        if end > start:
+            booster_section = content[start:end]
+            # コードブロック内のキーワードを抽出
+            code_blocks = re.findall(r'```\n?(.*?)\n?```', booster_section, re.DOTALL)
+            if code_blocks:
+                # 最初の2つのコードブロックを結合（一般 + スタイル特化）
+                boosters = []
+                for block in code_blocks[:2]:
+                    boosters.append(block.strip())
+                result["quality_boosters"] = ", ".join(boosters)
+
+    # スタイルキーワードを抽出
+    if "## スタイルキーワード" in content:
+        start = content.find("## スタイルキーワード")
+        end = content.find("---", start)
+        if end > start:
+            keywords_section = content[start:end]
+            # バッククォート内のキーワードを抽出
+            keywords = re.findall(r'`([^`]+)`', keywords_section)
+            result["style_keywords"] = ", ".join(keywords)
+
+    # TEXT PROMPT セクションから SINGLE IMAGE RULE と CLIP SPECIFIC を抽出
+    if "## TEXT PROMPT" in content:
+        start = content.find("## TEXT PROMPT")
+        end = content.find("---", start)
+        if end > start:
+            template_section = content[start:end]
+
+            # SINGLE IMAGE RULE を抽出
+            if "SINGLE IMAGE RULE" in template_section:
+                rule_start = template_section.find("SINGLE IMAGE RULE")
+                rule_end = template_section.find("CLIP SPECIFIC", rule_start)
+                if rule_end > rule_start:
+                    result["reference_rule"] = template_section[rule_start:rule_end].strip()
+
+            # CLIP SPECIFIC テンプレートを抽出
+            if "CLIP SPECIFIC" in template_section:
+                clip_start = template_section.find("CLIP SPECIFIC (edit only this block):")
+                if clip_start != -1:
+                    # Final note: の行まで取得（セクション終了）
+                    clip_section = template_section[clip_start:]
+                    # Final note で終わる行を見つける
+                    final_note_match = re.search(r'Final note:.*', clip_section)
+                    if final_note_match:
+                        clip_end = final_note_match.end()
+                        result["clip_specific_template"] = clip_section[:clip_end].strip()
+                    else:
+                        result["clip_specific_template"] = clip_section.strip()
+
+    # 旧フォーマット対応（フォールバック）
+    elif "## プロンプトテンプレート" in content:
+        start = content.find("## プロンプトテンプレート")
+        end = content.find("---", start)
+        if end > start:
+            template_section = content[start:end]
+            # コードブロック内のテンプレートを抽出
+            code_start = template_section.find("```")
+            code_end = template_section.rfind("```")
+            if code_start != -1 and code_end > code_start:
+                template_text = template_section[code_start+3:code_end].strip()
+                if template_text.startswith("\n"):
+                    template_text = template_text[1:]
+                result["clip_specific_template"] = template_text
+
+    # ネガティブキーワードを抽出
+    if "## ネガティブキーワード" in content:
+        start = content.find("## ネガティブキーワード")
+        end = content.find("---", start)
+        if end == -1:
+            end = content.find("## 注意事項", start)
+        if end == -1:
+            end = content.find("## 実例", start)
+        if end > start:
+            neg_section = content[start:end]
+            # ❌で始まる行を抽出
+            negatives = re.findall(r'❌\s*(.+)', neg_section)
+            if negatives:
+                result["negative_prompt"] = "Avoid: " + ", ".join(negatives)
+
+    # reference_rule が空の場合のフォールバック
+    if not result["reference_rule"]:
+        result["reference_rule"] = f"""SINGLE IMAGE RULE (do not remove):
+Use the source image as the foundation for the video.
+Preserve the character design, art style, and color palette from the input image.
+Focus on motion and camera work only - do NOT describe character appearance.
+Animation style: {template_id} ({category.upper()})
+Style keywords: {result["style_keywords"]}"""
+
+    return result
+
+
+def _parse_template_file(relative_path: str, content: str) -> Optional[dict]:
+    """テンプレートの種類をパスから判定して解析（テンプレートでないファイルはNone）"""
+    parts = relative_path.split("/")
+    if parts[:2] == ["scene", "anime"] and len(parts) == 5:
+        match = _ANIMATION_TEMPLATE_ID.match(parts[-1])
+        if match is None:
+            return None
+        return parse_animation_template(content, parts[2], match.group(1))
+    if parts[-1].endswith("_api_template.md"):
+        return parse_provider_template(content)
+    return None
+
+
+class PromptTemplateRegistry:
+    """プロンプトテンプレートのレジストリ"""
+
+    def __init__(
+        self,
+        root: Optional[Path] = None,
+        hot_reload: Optional[bool] = None,
+        reload_interval_seconds: Optional[float] = None,
+    ):
+        self.root = root or PROMPT_TEMPLATE_ROOT
+        self.hot_reload = settings.PROMPT_TEMPLATE_HOT_RELOAD if hot_reload is None else hot_reload
+        self.reload_interval_seconds = (
+            reload_interval_seconds or settings.PROMPT_TEMPLATE_RELOAD_INTERVAL_SECONDS
+        )
+
+        # docs/prompt からの相対パス → 解析済みテンプレート（読み取り専用）
+        self._templates: Mapping[str, Mapping] = MappingProxyType({})
+        # (相対パス, mtime_ns, サイズ) の一覧（変更検知用）
+        self._signature: tuple = ()
+        self._loaded = False
+        self._watcher: Optional[asyncio.Task] = None
+
+        self._loads = 0
+        self._lookups = 0
+        self._misses = 0
+
+    def _scan(self) -> tuple:
+        if not self.root.is_dir():
+            return ()
+        return tuple(sorted(
+            (path.relative_to(self.root).as_posix(), stat.st_mtime_ns, stat.st_size)
+            for path in self.root.rglob("*.md")
+            for stat in (path.stat(),)
+        ))
+
+    def load(self) -> int:
+        """
+        全テンプレートを読み込んで解析し、まとめて差し替える
+
+        Returns:
+            int: 読み込んだテンプレート数
+        """
+        signature = self._scan()
+        templates: dict[str, Mapping] = {}
+        for relative_path, _, _ in signature:
+            try:
+                content = (self.root / relative_path).read_text(encoding="utf-8")
+                parsed = _parse_template_file(relative_path, content)
+            except Exception as e:
+                logger.warning(f"Failed to load prompt template {relative_path}: {e}")
+                continue
+            if parsed is not None:
+                templates[relative_path] = MappingProxyType(parsed)
+
+        self._templates = MappingProxyType(templates)
+        self._signature = signature
+        self._loaded = True
+        self._loads += 1
+        logger.info(f"Loaded {len(templates)} prompt templates from {self.root}")
+        return len(templates)
+
+    def get(self, relative_path: str) -> Optional[dict]:
+        """
+        解析済みテンプレートを取得（呼び出し元で変更できるようコピーを返す）
+
+        Returns:
+            Optional[dict]: テンプレート（存在しない場合はNone）
+        """
+        if not self._loaded:
+            self.load()
+        self._lookups += 1
+        template = self._templates.get(relative_path)
+        if template is None:
+            self._misses += 1
+            return None
+        return dict(template)
+
+    def reload_if_changed(self) -> bool:
+        """テンプレートが追加・変更・削除されていれば読み直す"""
+        if self._scan() == self._signature:
+            return False
+        self.load()
+        return True
+
+    async def _watch(self) -> None:
+        while True:
+            await asyncio.sleep(self.reload_interval_seconds)
+            try:
+                if await asyncio.to_thread(self.reload_if_changed):
+                    logger.info("Prompt templates changed, reloaded")
+            except Exception as e:
+                logger.warning(f"Prompt template reload failed: {e}")
+
+    def start_watching(self) -> None:
+        """テンプレートの変更監視を開始（PROMPT_TEMPLATE_HOT_RELOAD 有効時）"""
+        if self.hot_reload and self._watcher is None:
+            self._watcher = asyncio.get_running_loop().create_task(self._watch())
+
+    def stop_watching(self) -> None:
+        """テンプレートの変更監視を停止"""
+        if self._watcher is not None:
+            self._watcher.cancel()
+            self._watcher = None
+
+    def stats(self) -> dict:
+        """読み込み状況（監視用）"""
+        return {
+            "templates": len(self._templates),
+            "loads": self._loads,
+            "lookups": self._lookups,
+            "misses": self._misses,
+            "hot_reload": self.hot_reload,
+        }
+
+
+# シングルトンインスタンス
+prompt_templates = PromptTemplateRegistry()
+
+
+def get_prompt_templates() -> PromptTemplateRegistry:
+    """PromptTemplateRegistryのインスタンスを取得"""
+    return prompt_templates
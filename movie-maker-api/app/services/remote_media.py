@@ -0,0 +1,181 @@
+"""
+リモートメディアアクセス
+
+R2・公開URL上の動画から1フレームや数秒だけを読む処理（スクリーンショット、
+最終フレーム抽出、BGM用の動画分析等）で、動画全体をダウンロードせずに
+FFmpegにURLを直接渡す。FFmpegのHTTP入力はRangeリクエストでmoovアトムと
+必要な範囲だけを読むため、フレーム抽出の転送量はファイル全体ではなく数百KB程度になる。
+
+Rangeリクエストに対応していないサーバーの場合は、スクラッチ領域に
+ストリーミングでダウンロードしたローカルファイルを使う。
+"""
+
+import logging
+import time
+from typing import Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.core.config import settings
+from app.services.render_cache import hash_file
+from app.services.scratch_space import ScratchWorkspace
+
+logger = logging.getLogger(__name__)
+
+# Range対応状況のキャッシュ期間（オリジン単位）
+_RANGE_SUPPORT_TTL_SECONDS = 600
+
+# ETagがない場合にURLを識別子として使う期間（URLの内容が差し替えられても古い結果を使い続けない）
+_URL_FINGERPRINT_TTL_SECONDS = 600
+
+_DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+class RemoteMediaAccessor:
+    """リモートメディアアクセサ"""
+
+    def __init__(self, range_enabled: Optional[bool] = None):
+        self.range_enabled = settings.REMOTE_MEDIA_RANGE_ENABLED if range_enabled is None else range_enabled
+
+        # オリジン → (Range対応か, 確認時刻)
+        self._range_support: dict[str, tuple[bool, float]] = {}
+
+        self._remote_sources = 0
+        self._downloaded_sources = 0
+        self._bytes_downloaded = 0
+
+    @staticmethod
+    def _origin(url: str) -> str:
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}"
+
+    @staticmethod
+    def _resource(url: str) -> str:
+        """オリジン + パス（大文字小文字を区別しないスキーム・ホストは小文字に正規化）"""
+        parts = urlsplit(url)
+        return f"{parts.scheme.lower()}://{parts.netloc.lower()}{parts.path or '/'}"
+
+    async def _probe_range_support(self, url: str) -> bool:
+        """1バイトだけのRangeリクエストで部分取得に対応しているか確認"""
+        try:
+            async with httpx.AsyncClient(follow_redirects=True, timeout=15.0) as client:
+                async with client.stream("GET", url, headers={"Range": "bytes=0-0"}) as response:
+                    # 200 の場合は本文を読まずに閉じる
+                    return response.status_code == 206
+        except httpx.HTTPError as e:
+            logger.warning(f"Range probe failed for {self._origin(url)}: {e}")
+            return False
+
+    async def supports_range(self, url: str) -> bool:
+        """URLのサーバーがRangeリクエストに対応しているか（オリジン単位でキャッシュ）"""
+        origin = self._origin(url)
+        cached = self._range_support.get(origin)
+        if cached is not None and time.monotonic() - cached[1] < _RANGE_SUPPORT_TTL_SECONDS:
+            return cached[0]
+
+        supported = await self._probe_range_support(url)
+        self._range_support[origin] = (supported, time.monotonic())
+        return supported
+
+    async def fingerprint(self, url: str) -> str:
+        """
+        動画の内容を識別するフィンガープリント（本体はダウンロードしない）
+
+        HEADレスポンスのETag（R2の単一パートアップロードでは内容のMD5）とサイズに、
+        オリジン + パスを加える（別のサーバー・オブジェクトの弱いETagとサイズが一致しても混同しない）。
+        ETagが取得できない場合はURL自体を識別子とするが、内容の差し替えを検知できないため
+        一定時間（_URL_FINGERPRINT_TTL_SECONDS）ごとに変わる識別子にする。
+        ローカルパスの場合は内容のSHA-256。
+        """
+        if not url.startswith(("http://", "https://")):
+            return f"sha256:{await hash_file(url)}"
+
+        try:
+            async with httpx.AsyncClient(follow_redirects=True, timeout=15.0) as client:
+                response = await client.head(url)
+            etag = response.headers.get("etag", "").strip('"') if response.status_code == 200 else ""
+            if etag:
+                return f"etag:{self._resource(url)}:{etag}:{response.headers.get('content-length', '')}"
+        except httpx.HTTPError as e:
+            logger.warning(f"HEAD failed for {self._origin(url)}: {e}")
+
+        window = int(time.time() // _URL_FINGERPRINT_TTL_SECONDS)
+        return f"url:{url}:{window}"
+
+    async def download(self, url: str, path: str, workspace: Optional[ScratchWorkspace] = None) -> int:
+        """
+        ファイル全体をストリーミングでダウンロード（メモリに全体を載せない）
+
+        workspace を指定した場合は、書き込んだバイト数がクォータの残りを超えた時点で中断する。
+
+        Raises:
+            ScratchQuotaExceededError: ワークスペースのクォータを超えた場合
+        """
+        remaining = workspace.quota_bytes - workspace.check_quota() if workspace is not None else None
+        size = 0
+        async with httpx.AsyncClient(follow_redirects=True, timeout=120.0) as client:
+            async with client.stream("GET", url) as response:
+                response.raise_for_status()
+                with open(path, "wb") as f:
+                    async for chunk in response.aiter_bytes(_DOWNLOAD_CHUNK_SIZE):
+                        f.write(chunk)
+                        size += len(chunk)
+                        if remaining is not None and size > remaining:
+                            # 書き込み済みの分を含めて使用量を確認（超過していれば例外）
+                            f.flush()
+                            workspace.check_quota()
+
+        self._bytes_downloaded += size
+        return size
+
+    async def media_source(
+        self,
+        url: str,
+        workspace: ScratchWorkspace,
+        filename: str = "source.mp4",
+    ) -> str:
+        """
+        FFmpeg/FFprobeの入力として使うソースを取得
+
+        Args:
+            url: 動画のURL（ローカルパスの場合はそのまま返す）
+            workspace: Range非対応時のダウンロード先
+            filename: ダウンロード時のファイル名
+
+        Returns:
+            str: Range対応ならURLそのもの、非対応ならダウンロードしたローカルパス
+        """
+        if not url.startswith(("http://", "https://")):
+            return url
+
+        if self.range_enabled and await self.supports_range(url):
+            self._remote_sources += 1
+            return url
+
+        path = workspace.file(filename)
+        size = await self.download(url, path, workspace)
+        self._downloaded_sources += 1
+        logger.info(f"Downloaded media for local access: {size} bytes")
+        return path
+
+    def stats(self) -> dict:
+        """統計（監視用）"""
+        return {
+            "range_enabled": self.range_enabled,
+            "remote_sources": self._remote_sources,
+            "downloaded_sources": self._downloaded_sources,
+            "bytes_downloaded": self._bytes_downloaded,
+            "known_origins": {
+                origin: supported for origin, (supported, _) in self._range_support.items()
+            },
+        }
+
+
+# シングルトンインスタンス
+remote_media = RemoteMediaAccessor()
+
+
+def get_remote_media() -> RemoteMediaAccessor:
+    """RemoteMediaAccessorのインスタンスを取得"""
+    return remote_media
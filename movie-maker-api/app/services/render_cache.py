@@ -0,0 +1,371 @@
+"""
+レンダリング結果キャッシュ（メモ化）
+
+入力ファイルのコンテンツハッシュと、処理名・パラメータの正規化ハッシュから
+キャッシュキーを作り、レンダリング結果をR2に保存する。
+同じ入力・同じパラメータの再レンダリング（BGM再適用・ProRes再エクスポート等）は
+エンコードせずに既存のR2オブジェクトを返す。
+
+同一キーのレンダリングが同時に要求された場合は1回だけ実行し、結果を共有する（single-flight）。
+バックグラウンドタスクは asyncio.run で別のイベントループを使うため、実行中のレンダリングは
+concurrent.futures.Future で管理し、threading.Lock で保護する（プロセス全体で1回にする）。
+"""
+
+import asyncio
+import concurrent.futures
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional, Union
+
+from botocore.exceptions import ClientError
+
+from app.core.config import settings
+from app.external.r2 import get_public_url, get_r2_client
+from app.services.scratch_space import get_scratch_space
+
+logger = logging.getLogger(__name__)
+
+# フィルター等のレンダリング内容を変更した場合はバージョンを上げて既存キャッシュを無効化する
+RENDER_CACHE_VERSION = 1
+
+# R2上の保存先プレフィックス（アプリからは削除しない）
+RENDER_CACHE_PREFIX = "videos/render-cache"
+
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass
+class RenderResult:
+    """レンダリング結果"""
+    key: str                          # R2オブジェクトキー
+    url: str                          # 公開URL
+    size: int                         # バイト数
+    hit: bool                         # キャッシュヒットか
+    local_path: Optional[str] = None  # ミス時のローカル出力パス（呼び出し元が指定した場合のみ）
+
+
+RenderInput = Union[str, bytes, None]
+
+
+def hash_bytes(data: bytes) -> str:
+    """バイト列のSHA-256"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def _hash_file_sync(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(_HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+async def hash_file(path: str) -> str:
+    """ファイルのSHA-256（イベントループをブロックしないようスレッドで計算）"""
+    return await asyncio.to_thread(_hash_file_sync, path)
+
+
+def canonical_params_hash(operation: str, params: dict[str, Any]) -> str:
+    """処理名とパラメータの正規化ハッシュ（キー順・空白に依存しない）"""
+    payload = json.dumps(
+        {"v": RENDER_CACHE_VERSION, "op": operation, "params": params},
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def build_cache_key(operation: str, params: dict[str, Any], input_hashes: list[Optional[str]]) -> str:
+    """入力のコンテンツハッシュと処理パラメータからキャッシュキーを作成"""
+    digest = hashlib.sha256()
+    digest.update(canonical_params_hash(operation, params).encode())
+    for input_hash in input_hashes:
+        digest.update(b"|")
+        digest.update((input_hash or "-").encode())
+    return digest.hexdigest()
+
+
+class RenderCache:
+    """レンダリング結果キャッシュ"""
+
+    def __init__(self, enabled: Optional[bool] = None, max_index_entries: int = 10000):
+        self.enabled = settings.RENDER_CACHE_ENABLED if enabled is None else enabled
+        self.max_index_entries = max_index_entries
+
+        # R2に存在を確認済みのキー → サイズ（プレフィックス配下は削除しないため再確認不要）
+        self._index: "OrderedDict[str, int]" = OrderedDict()
+        # 実行中のレンダリング（イベントループをまたいで共有する）
+        self._lock = threading.Lock()
+        self._inflight: dict[str, concurrent.futures.Future] = {}
+
+        self._lookups = 0
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+        self._bytes_saved = 0
+        self._bytes_stored = 0
+
+    def object_key(self, operation: str, cache_key: str, ext: str) -> str:
+        """キャッシュキーに対応するR2オブジェクトキー"""
+        return f"{RENDER_CACHE_PREFIX}/{operation}/{cache_key}.{ext}"
+
+    def _remember(self, object_key: str, size: int) -> None:
+        with self._lock:
+            self._index[object_key] = size
+            self._index.move_to_end(object_key)
+            while len(self._index) > self.max_index_entries:
+                self._index.popitem(last=False)
+
+    async def _head(self, object_key: str) -> Optional[int]:
+        """R2オブジェクトのサイズ（存在しない場合はNone）"""
+        with self._lock:
+            if object_key in self._index:
+                self._index.move_to_end(object_key)
+                return self._index[object_key]
+
+        def head() -> Optional[int]:
+            try:
+                response = get_r2_client().head_object(
+                    Bucket=settings.R2_BUCKET_NAME,
+                    Key=object_key,
+                )
+            except ClientError:
+                return None
+            return int(response.get("ContentLength", 0))
+
+        size = await asyncio.to_thread(head)
+        if size is not None:
+            self._remember(object_key, size)
+        return size
+
+    async def _upload(self, path: str, object_key: str, content_type: str) -> int:
+        """ローカルファイルをR2にアップロード（メモリに全体を読み込まない）"""
+        def upload() -> None:
+            get_r2_client().upload_file(
+                path,
+                settings.R2_BUCKET_NAME,
+                object_key,
+                ExtraArgs={
+                    "ContentType": content_type,
+                    "CacheControl": "public, max-age=31536000, immutable",
+                },
+            )
+
+        await asyncio.to_thread(upload)
+        size = os.path.getsize(path)
+        self._remember(object_key, size)
+        self._bytes_stored += size
+        return size
+
+    async def _hash_inputs(self, inputs: list[RenderInput]) -> list[Optional[str]]:
+        hashes: list[Optional[str]] = []
+        for item in inputs:
+            if item is None:
+                hashes.append(None)
+            elif isinstance(item, bytes):
+                hashes.append(await asyncio.to_thread(hash_bytes, item))
+            else:
+                hashes.append(await hash_file(item))
+        return hashes
+
+    async def lookup(
+        self,
+        operation: str,
+        params: dict[str, Any],
+        inputs: list[RenderInput],
+        ext: str = "mp4",
+    ) -> Optional[RenderResult]:
+        """
+        キャッシュを参照（レンダリングはしない）
+
+        Args:
+            operation: 処理名
+            params: 処理パラメータ（JSON化できる値）
+            inputs: 入力（ファイルパス or バイト列、未使用の入力はNone）
+            ext: 出力ファイルの拡張子
+
+        Returns:
+            RenderResult | None: ヒットした場合のみ
+        """
+        if not self.enabled:
+            return None
+
+        cache_key = build_cache_key(operation, params, await self._hash_inputs(inputs))
+        object_key = self.object_key(operation, cache_key, ext)
+        self._lookups += 1
+
+        size = await self._head(object_key)
+        if size is None:
+            return None
+
+        self._hits += 1
+        self._bytes_saved += size
+        return RenderResult(key=object_key, url=get_public_url(object_key), size=size, hit=True)
+
+    async def store(
+        self,
+        operation: str,
+        params: dict[str, Any],
+        inputs: list[RenderInput],
+        path: str,
+        ext: str = "mp4",
+        content_type: str = "video/mp4",
+    ) -> RenderResult:
+        """
+        レンダリング済みのファイルをキャッシュに保存
+
+        lookup でミスした複数の出力を1回のFFmpeg実行でまとめてレンダリングした場合に使う。
+
+        Args:
+            operation: 処理名
+            params: 処理パラメータ（JSON化できる値）
+            inputs: 入力（ファイルパス or バイト列、未使用の入力はNone）
+            path: レンダリング済みのローカルファイル
+            ext: 出力ファイルの拡張子
+            content_type: R2に保存する際のContent-Type
+
+        Returns:
+            RenderResult: 保存結果
+        """
+        cache_key = build_cache_key(operation, params, await self._hash_inputs(inputs))
+        object_key = self.object_key(operation, cache_key, ext)
+
+        if self.enabled:
+            self._misses += 1
+        size = await self._upload(path, object_key, content_type)
+        logger.info(f"Render cache stored: {operation} {cache_key[:12]} ({size} bytes)")
+        return RenderResult(
+            key=object_key,
+            url=get_public_url(object_key),
+            size=size,
+            hit=False,
+            local_path=path,
+        )
+
+    async def get_or_render(
+        self,
+        operation: str,
+        params: dict[str, Any],
+        inputs: list[RenderInput],
+        render: Callable[[str], Awaitable[Any]],
+        ext: str = "mp4",
+        content_type: str = "video/mp4",
+        output_path: Optional[str] = None,
+    ) -> RenderResult:
+        """
+        キャッシュにあればそのR2オブジェクトを返し、なければレンダリングして保存
+
+        Args:
+            operation: 処理名（"add_bgm", "process_video" 等）
+            params: 出力に影響する全てのパラメータ（JSON化できる値）
+            inputs: 入力（ファイルパス or バイト列、未使用の入力はNone）
+            render: 出力パスを受け取ってレンダリングする非同期関数
+            ext: 出力ファイルの拡張子
+            content_type: R2に保存する際のContent-Type
+            output_path: レンダリング先（指定時はミスした場合にファイルが残る。
+                省略時はスクラッチ領域に出力し、アップロード後に削除）
+
+        Returns:
+            RenderResult: レンダリング結果
+        """
+        cache_key = build_cache_key(operation, params, await self._hash_inputs(inputs))
+        object_key = self.object_key(operation, cache_key, ext)
+
+        future: Optional[concurrent.futures.Future] = None
+        if self.enabled:
+            self._lookups += 1
+            size = await self._head(object_key)
+            if size is not None:
+                self._hits += 1
+                self._bytes_saved += size
+                logger.info(f"Render cache hit: {operation} {cache_key[:12]} ({size} bytes)")
+                return RenderResult(key=object_key, url=get_public_url(object_key), size=size, hit=True)
+
+            # 同一レンダリングが実行中なら（別のイベントループでも）結果を待って共有
+            while True:
+                with self._lock:
+                    inflight = self._inflight.get(object_key)
+                    if inflight is None:
+                        future = concurrent.futures.Future()
+                        self._inflight[object_key] = future
+                        break
+                try:
+                    result: RenderResult = await asyncio.shield(asyncio.wrap_future(inflight))
+                except asyncio.CancelledError:
+                    if inflight.cancelled():
+                        # 実行元がキャンセルされた場合は自分でレンダリングする
+                        continue
+                    raise
+                self._hits += 1
+                self._coalesced += 1
+                self._bytes_saved += result.size
+                return RenderResult(key=result.key, url=result.url, size=result.size, hit=True)
+
+            self._misses += 1
+
+        try:
+            if output_path is not None:
+                await render(output_path)
+                size = await self._upload(output_path, object_key, content_type)
+            else:
+                with get_scratch_space().workspace(f"render_{operation}") as workspace:
+                    local_path = workspace.file(f"output.{ext}")
+                    await render(local_path)
+                    size = await self._upload(local_path, object_key, content_type)
+
+            result = RenderResult(
+                key=object_key,
+                url=get_public_url(object_key),
+                size=size,
+                hit=False,
+                local_path=output_path,
+            )
+            if future is not None:
+                future.set_result(result)
+            logger.info(f"Render cache stored: {operation} {cache_key[:12]} ({size} bytes)")
+            return result
+        except asyncio.CancelledError:
+            if future is not None:
+                future.cancel()
+            raise
+        except Exception as e:
+            if future is not None:
+                future.set_exception(e)
+            raise
+        finally:
+            if future is not None:
+                with self._lock:
+                    # 自分が登録したエントリのみ外す
+                    if self._inflight.get(object_key) is future:
+                        del self._inflight[object_key]
+
+    def stats(self) -> dict:
+        """キャッシュの統計（監視用）"""
+        return {
+            "enabled": self.enabled,
+            "lookups": self._lookups,
+            "hits": self._hits,
+            "misses": self._misses,
+            "coalesced": self._coalesced,
+            "hit_rate": self._hits / self._lookups if self._lookups else 0.0,
+            "bytes_saved": self._bytes_saved,
+            "bytes_stored": self._bytes_stored,
+            "indexed_objects": len(self._index),
+            "inflight": len(self._inflight),
+        }
+
+
+# シングルトンインスタンス
+render_cache = RenderCache()
+
+
+def get_render_cache() -> RenderCache:
+    """RenderCacheのインスタンスを取得"""
+    return render_cache
@@ -0,0 +1,265 @@
+"""
+スクラッチ領域管理サービス
+
+FFmpeg処理等の中間ファイルをジョブごとのワークスペースに集約し、
+容量上限（クォータ）とクリーンアップを一元管理する。
+
+- ディスク層: 動画等の大きな中間ファイル
+- RAM層（tmpfs）: フレーム・サムネイル・ファイルリスト等の小さな中間ファイル
+- 起動時に、終了済みプロセスが残したワークスペースを削除（孤児掃除）
+"""
+
+import logging
+import os
+import re
+import shutil
+import tempfile
+import uuid
+from typing import Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_SCRATCH_DIR_NAME = "movie-maker-scratch"
+
+
+class ScratchQuotaExceededError(Exception):
+    """ワークスペースの容量上限超過"""
+    pass
+
+
+def _dir_size(path: str) -> int:
+    """ディレクトリ配下のファイルサイズ合計（バイト）"""
+    total = 0
+    for root, _dirs, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                # 削除中のファイル等は無視
+                pass
+    return total
+
+
+def _pid_alive(pid: int) -> bool:
+    """プロセスが生存しているか"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class ScratchWorkspace:
+    """ジョブ単位のスクラッチワークスペース"""
+
+    def __init__(
+        self,
+        manager: "ScratchSpaceManager",
+        name: str,
+        path: str,
+        quota_bytes: int,
+    ):
+        self.manager = manager
+        self.name = name
+        self.path = path
+        self.quota_bytes = quota_bytes
+        self._tmpfs_path: Optional[str] = None
+        self._closed = False
+
+    def file(self, filename: str) -> str:
+        """ディスク層のファイルパスを返す"""
+        return os.path.join(self.path, filename)
+
+    def small_file(self, filename: str) -> str:
+        """
+        小さな中間ファイル用のパスを返す
+
+        RAM層（tmpfs）が利用可能かつ空き容量がある場合はRAM層、
+        それ以外はディスク層のパスを返す。
+        """
+        tmpfs_dir = self._get_tmpfs_dir()
+        if tmpfs_dir is None:
+            return self.file(filename)
+        return os.path.join(tmpfs_dir, filename)
+
+    def _get_tmpfs_dir(self) -> Optional[str]:
+        if self._tmpfs_path is None:
+            tmpfs_root = self.manager.tmpfs_root
+            if tmpfs_root is None or not self.manager.tmpfs_has_capacity():
+                return None
+            self._tmpfs_path = os.path.join(tmpfs_root, os.path.basename(self.path))
+            os.makedirs(self._tmpfs_path, exist_ok=True)
+        return self._tmpfs_path
+
+    def usage_bytes(self) -> int:
+        """ワークスペースの使用量（両層の合計）"""
+        usage = _dir_size(self.path)
+        if self._tmpfs_path:
+            usage += _dir_size(self._tmpfs_path)
+        return usage
+
+    def check_quota(self) -> int:
+        """
+        使用量がクォータ内か確認
+
+        Returns:
+            int: 現在の使用量（バイト）
+
+        Raises:
+            ScratchQuotaExceededError: クォータを超過した場合
+        """
+        usage = self.usage_bytes()
+        if usage > self.quota_bytes:
+            self.manager._quota_exceeded += 1
+            raise ScratchQuotaExceededError(
+                f"スクラッチ領域の上限を超えました: {self.name} "
+                f"({usage} / {self.quota_bytes} bytes)"
+            )
+        return usage
+
+    def cleanup(self) -> None:
+        """ワークスペースを削除（複数回呼んでも安全）"""
+        if self._closed:
+            return
+        self._closed = True
+        shutil.rmtree(self.path, ignore_errors=True)
+        if self._tmpfs_path:
+            shutil.rmtree(self._tmpfs_path, ignore_errors=True)
+        self.manager._on_cleanup(self)
+
+    def __enter__(self) -> "ScratchWorkspace":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.cleanup()
+
+
+class ScratchSpaceManager:
+    """スクラッチ領域マネージャー"""
+
+    def __init__(
+        self,
+        root: Optional[str] = None,
+        tmpfs_root: Optional[str] = None,
+        default_quota_bytes: Optional[int] = None,
+        tmpfs_max_bytes: Optional[int] = None,
+    ):
+        if root is None:
+            base = settings.SCRATCH_DIR or tempfile.gettempdir()
+            root = os.path.join(base, _SCRATCH_DIR_NAME)
+        self.root = root
+
+        if tmpfs_root is None and settings.SCRATCH_TMPFS_DIR and os.path.isdir(settings.SCRATCH_TMPFS_DIR):
+            tmpfs_root = os.path.join(settings.SCRATCH_TMPFS_DIR, _SCRATCH_DIR_NAME)
+        self.tmpfs_root = tmpfs_root
+
+        self.default_quota_bytes = default_quota_bytes or settings.SCRATCH_WORKSPACE_QUOTA_MB * 1024 * 1024
+        self.tmpfs_max_bytes = tmpfs_max_bytes or settings.SCRATCH_TMPFS_MAX_MB * 1024 * 1024
+
+        self._active: dict[str, ScratchWorkspace] = {}
+        self._created = 0
+        self._cleaned = 0
+        self._quota_exceeded = 0
+        self._orphans_swept = 0
+
+    def workspace(self, name: str, quota_bytes: Optional[int] = None) -> ScratchWorkspace:
+        """
+        ジョブ用のワークスペースを作成
+
+        with文で使うと終了時（例外時も含む）に自動削除される。
+        レスポンス送信後まで残す場合は cleanup() を明示的に呼ぶこと。
+
+        Args:
+            name: ジョブ名（ディレクトリ名に使用）
+            quota_bytes: 容量上限（省略時は設定値）
+
+        Returns:
+            ScratchWorkspace: 作成したワークスペース
+        """
+        safe_name = re.sub(r"[^A-Za-z0-9_-]", "_", name)[:64]
+        dirname = f"{os.getpid()}-{safe_name}-{uuid.uuid4().hex[:8]}"
+        path = os.path.join(self.root, dirname)
+        os.makedirs(path, exist_ok=True)
+
+        ws = ScratchWorkspace(self, name, path, quota_bytes or self.default_quota_bytes)
+        self._active[path] = ws
+        self._created += 1
+        return ws
+
+    def _on_cleanup(self, ws: ScratchWorkspace) -> None:
+        if self._active.pop(ws.path, None) is not None:
+            self._cleaned += 1
+
+    def tmpfs_has_capacity(self) -> bool:
+        """RAM層に空き容量があるか"""
+        if self.tmpfs_root is None:
+            return False
+        return _dir_size(self.tmpfs_root) < self.tmpfs_max_bytes
+
+    def sweep_orphans(self) -> int:
+        """
+        終了済みプロセスが残したワークスペースを削除
+
+        ディレクトリ名の先頭に作成元のPIDを含めているため、
+        PIDが生存していないものを孤児とみなす（同じPIDの場合は前回起動時の残骸）。
+
+        Returns:
+            int: 削除したワークスペース数
+        """
+        swept = 0
+        current_pid = os.getpid()
+
+        for tier_root in (self.root, self.tmpfs_root):
+            if not tier_root or not os.path.isdir(tier_root):
+                continue
+            for entry in os.listdir(tier_root):
+                path = os.path.join(tier_root, entry)
+                if path in self._active or not os.path.isdir(path):
+                    continue
+                pid_str = entry.split("-", 1)[0]
+                if pid_str.isdigit():
+                    pid = int(pid_str)
+                    if pid != current_pid and _pid_alive(pid):
+                        continue
+                shutil.rmtree(path, ignore_errors=True)
+                swept += 1
+
+        if swept:
+            logger.info(f"Swept {swept} orphaned scratch workspaces")
+        self._orphans_swept += swept
+        return swept
+
+    def stats(self) -> dict:
+        """スクラッチ領域の使用状況（監視用）"""
+        disk_bytes = _dir_size(self.root) if os.path.isdir(self.root) else 0
+        tmpfs_bytes = (
+            _dir_size(self.tmpfs_root)
+            if self.tmpfs_root and os.path.isdir(self.tmpfs_root)
+            else 0
+        )
+        return {
+            "root": self.root,
+            "tmpfs_root": self.tmpfs_root,
+            "active_workspaces": len(self._active),
+            "disk_bytes": disk_bytes,
+            "tmpfs_bytes": tmpfs_bytes,
+            "tmpfs_max_bytes": self.tmpfs_max_bytes,
+            "default_quota_bytes": self.default_quota_bytes,
+            "workspaces_created": self._created,
+            "workspaces_cleaned": self._cleaned,
+            "quota_exceeded": self._quota_exceeded,
+            "orphans_swept": self._orphans_swept,
+        }
+
+
+# シングルトンインスタンス
+scratch_space = ScratchSpaceManager()
+
+
+def get_scratch_space() -> ScratchSpaceManager:
+    """ScratchSpaceManagerのインスタンスを取得"""
+    return scratch_space
@@ -0,0 +1,217 @@
+"""
+スクラブ用スプライトシート + WebVTTサムネイルトラック
+
+エディタ（ストーリーボードのレビュー、/concat/v2 のトリミング、Ad Creatorのカット編集）の
+シークバーのプレビュー用に、一定間隔のフレームを並べたスプライトシートと、
+各時間帯がシートのどの領域かを示すWebVTT（#xywh=）を作成してR2に保存する。
+スクラブ中は動画へのRangeリクエストを繰り返さず、シート画像を1回取得するだけになる。
+
+保存先は動画の隣（<動画キー>.scrub/<間隔>_<形式>/）。このバケット以外の動画は
+URLのハッシュから決めたキーに保存する。同じ動画・同じ設定の2回目以降は生成しない。
+"""
+
+import asyncio
+import hashlib
+import logging
+import math
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+from botocore.exceptions import ClientError
+
+from app.core.config import settings
+from app.external.r2 import get_public_url, get_r2_client, key_from_public_url, upload_local_file
+from app.services.ffmpeg_service import get_ffmpeg_service
+from app.services.media_ingest import parse_media_metadata
+from app.services.remote_media import get_remote_media
+from app.services.scratch_space import get_scratch_space
+
+logger = logging.getLogger(__name__)
+
+SCRUB_TRACK_FILENAME = "thumbnails.vtt"
+
+# 1シートのコマ数（10x10 = 間隔1秒で100秒分）
+SCRUB_COLUMNS = 10
+SCRUB_ROWS = 10
+SCRUB_TILE_WIDTH = 160
+
+_CONTENT_TYPES = {"jpg": "image/jpeg", "webp": "image/webp"}
+
+
+class ScrubTrackError(Exception):
+    """スクラブトラックを作成できない"""
+    pass
+
+
+@dataclass
+class ScrubTrack:
+    """スクラブトラック"""
+    vtt_url: str
+    sprite_urls: list[str]
+    interval_seconds: float
+    columns: int
+    rows: int
+    tile_width: int
+    tile_height: int
+    cached: bool
+
+
+def _format_timestamp(seconds: float) -> str:
+    """WebVTTのタイムスタンプ（HH:MM:SS.mmm）"""
+    millis = int(round(seconds * 1000))
+    hours, millis = divmod(millis, 3_600_000)
+    minutes, millis = divmod(millis, 60_000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}.{millis:03d}"
+
+
+def build_webvtt(
+    duration: float,
+    interval_seconds: float,
+    sheet_names: list[str],
+    columns: int,
+    rows: int,
+    tile_width: int,
+    tile_height: int,
+) -> str:
+    """
+    スプライトシートのWebVTTインデックスを作成
+
+    各キューは「その時間帯のコマ」をシート名 + #xywh= で指す。
+    シート名はVTTからの相対パス（同じディレクトリに置く）。
+    """
+    per_sheet = columns * rows
+    cue_count = min(math.ceil(duration / interval_seconds), per_sheet * len(sheet_names))
+
+    lines = ["WEBVTT", ""]
+    for index in range(cue_count):
+        start = index * interval_seconds
+        end = min((index + 1) * interval_seconds, duration)
+        sheet, position = divmod(index, per_sheet)
+        row, column = divmod(position, columns)
+        lines.append(f"{_format_timestamp(start)} --> {_format_timestamp(end)}")
+        lines.append(
+            f"{sheet_names[sheet]}#xywh={column * tile_width},{row * tile_height},{tile_width},{tile_height}"
+        )
+        lines.append("")
+    return "\n".join(lines)
+
+
+def scrub_key_prefix(video_url: str, interval_seconds: float, image_format: str) -> str:
+    """スクラブトラックの保存先（このバケットの動画は動画の隣）"""
+    variant = f"{int(round(interval_seconds * 1000))}ms_{image_format}"
+    video_key = key_from_public_url(video_url)
+    if video_key:
+        return f"{video_key.rsplit('.', 1)[0]}.scrub/{variant}"
+    digest = hashlib.sha256(video_url.encode()).hexdigest()[:32]
+    return f"scrub/external/{digest}/{variant}"
+
+
+def _head_track(vtt_key: str) -> Optional[dict]:
+    try:
+        response = get_r2_client().head_object(Bucket=settings.R2_BUCKET_NAME, Key=vtt_key)
+    except ClientError:
+        return None
+    return response.get("Metadata", {})
+
+
+def _put_track(vtt_key: str, body: str, metadata: dict[str, str]) -> None:
+    get_r2_client().put_object(
+        Bucket=settings.R2_BUCKET_NAME,
+        Key=vtt_key,
+        Body=body.encode(),
+        ContentType="text/vtt; charset=utf-8",
+        CacheControl="public, max-age=31536000, immutable",
+        Metadata=metadata,
+    )
+
+
+async def get_or_create_scrub_track(
+    video_url: str,
+    interval_seconds: float = 1.0,
+    image_format: str = "jpg",
+) -> ScrubTrack:
+    """
+    スクラブトラックを取得（なければ作成してR2に保存）
+
+    Args:
+        video_url: 動画のURL
+        interval_seconds: コマの間隔（秒）
+        image_format: シート画像の形式（"jpg" または "webp"）
+
+    Returns:
+        ScrubTrack: VTTとシート画像のURL
+
+    Raises:
+        ScrubTrackError: 動画を解析できない場合
+    """
+    prefix = scrub_key_prefix(video_url, interval_seconds, image_format)
+    vtt_key = f"{prefix}/{SCRUB_TRACK_FILENAME}"
+
+    # VTTは最後に保存するため、存在すればシートも揃っている
+    existing = await asyncio.to_thread(_head_track, vtt_key)
+    if existing is not None and existing.get("sheets"):
+        sheet_count = int(existing["sheets"])
+        return ScrubTrack(
+            vtt_url=get_public_url(vtt_key),
+            sprite_urls=[get_public_url(f"{prefix}/sheet_{i:03d}.{image_format}") for i in range(sheet_count)],
+            interval_seconds=interval_seconds,
+            columns=SCRUB_COLUMNS,
+            rows=SCRUB_ROWS,
+            tile_width=SCRUB_TILE_WIDTH,
+            tile_height=int(existing.get("tile-height", 0)),
+            cached=True,
+        )
+
+    ffmpeg = get_ffmpeg_service()
+    with get_scratch_space().workspace("scrub_track") as workspace:
+        source = await get_remote_media().media_source(video_url, workspace)
+
+        metadata = parse_media_metadata(await ffmpeg.get_video_info(source))
+        if not metadata["duration"] or not metadata["width"] or not metadata["height"]:
+            raise ScrubTrackError("Failed to probe video")
+        tile_height = round(metadata["height"] * SCRUB_TILE_WIDTH / metadata["width"] / 2) * 2
+
+        sheet_dir = workspace.file("sheets")
+        os.makedirs(sheet_dir, exist_ok=True)
+        sheets = await ffmpeg.generate_sprite_sheets(
+            source,
+            sheet_dir,
+            interval_seconds=interval_seconds,
+            columns=SCRUB_COLUMNS,
+            rows=SCRUB_ROWS,
+            tile_width=SCRUB_TILE_WIDTH,
+            image_format=image_format,
+        )
+
+        sheet_names = [os.path.basename(path) for path in sheets]
+        sprite_urls = await asyncio.gather(*(
+            upload_local_file(path, f"{prefix}/{name}", _CONTENT_TYPES[image_format])
+            for path, name in zip(sheets, sheet_names)
+        ))
+
+    vtt = build_webvtt(
+        metadata["duration"],
+        interval_seconds,
+        sheet_names,
+        SCRUB_COLUMNS,
+        SCRUB_ROWS,
+        SCRUB_TILE_WIDTH,
+        tile_height,
+    )
+    await asyncio.to_thread(
+        _put_track, vtt_key, vtt, {"sheets": str(len(sheets)), "tile-height": str(tile_height)}
+    )
+    logger.info(f"Scrub track stored: {vtt_key} ({len(sheets)} sheets)")
+
+    return ScrubTrack(
+        vtt_url=get_public_url(vtt_key),
+        sprite_urls=list(sprite_urls),
+        interval_seconds=interval_seconds,
+        columns=SCRUB_COLUMNS,
+        rows=SCRUB_ROWS,
+        tile_width=SCRUB_TILE_WIDTH,
+        tile_height=tile_height,
+        cached=False,
+    )
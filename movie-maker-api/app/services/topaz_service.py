@@ -12,6 +12,7 @@ from pathlib import Path
 import httpx
 
 from app.core.config import settings
+from app.services.ffmpeg_scheduler import FFmpegJobClass, get_ffmpeg_scheduler
 
 logger = logging.getLogger(__name__)
 
@@ -65,14 +66,11 @@ class TopazVideoService:
         ]
 
         try:
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
+            returncode, stdout, stderr = await get_ffmpeg_scheduler().run(
+                cmd, FFmpegJobClass.INTERACTIVE
             )
-            stdout, stderr = await process.communicate()
 
-            if process.returncode == 0 and stdout:
+            if returncode == 0 and stdout:
                 data = json.loads(stdout.decode())
 
                 # 動画ストリームを探す
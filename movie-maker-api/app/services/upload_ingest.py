@@ -0,0 +1,109 @@
+"""
+アップロードファイルの取り込み
+
+multipartで受け取ったファイルをチャンク単位でスクラッチ領域に書き出す。
+ファイル全体をメモリに読み込まず、サイズ上限を超えた時点で中断するため、
+アップロード1件あたりのピークメモリはチャンクサイズ分で一定になる。
+書き出したファイルはそのままFFprobe・サムネイル生成・R2アップロードに使う。
+"""
+
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator
+
+from fastapi import UploadFile
+
+from app.services.scratch_space import ScratchWorkspace, get_scratch_space
+
+logger = logging.getLogger(__name__)
+
+_CHUNK_SIZE = 1024 * 1024
+
+
+class UploadTooLargeError(Exception):
+    """アップロードファイルのサイズ上限超過"""
+
+    def __init__(self, max_bytes: int):
+        super().__init__(f"Upload exceeds {max_bytes} bytes")
+        self.max_bytes = max_bytes
+
+
+@dataclass
+class IngestedUpload:
+    """スクラッチ領域に書き出したアップロードファイル"""
+    path: str                    # ローカルパス
+    size: int                    # バイト数
+    workspace: ScratchWorkspace  # 派生ファイル（サムネイル等）の出力先
+
+
+async def spool_upload(
+    file: UploadFile,
+    dest_path: str,
+    max_bytes: int,
+    chunk_size: int = _CHUNK_SIZE,
+) -> int:
+    """
+    アップロードファイルをチャンク単位でディスクに書き出す
+
+    Args:
+        file: アップロードファイル
+        dest_path: 書き出し先
+        max_bytes: サイズ上限
+        chunk_size: 読み込み単位
+
+    Returns:
+        int: 書き出したバイト数
+
+    Raises:
+        UploadTooLargeError: サイズ上限を超えた場合（書き出し途中のファイルは削除）
+    """
+    # multipartの解析時にサイズが分かっている場合は読み込む前に拒否
+    if file.size is not None and file.size > max_bytes:
+        raise UploadTooLargeError(max_bytes)
+
+    total = 0
+    try:
+        with open(dest_path, "wb") as out:
+            while chunk := await file.read(chunk_size):
+                total += len(chunk)
+                if total > max_bytes:
+                    raise UploadTooLargeError(max_bytes)
+                await asyncio.to_thread(out.write, chunk)
+    except BaseException:
+        if os.path.exists(dest_path):
+            os.remove(dest_path)
+        raise
+
+    return total
+
+
+@asynccontextmanager
+async def ingest_upload(
+    file: UploadFile,
+    max_bytes: int,
+    ext: str,
+    name: str = "upload",
+) -> AsyncIterator[IngestedUpload]:
+    """
+    アップロードファイルをスクラッチ領域に取り込み、終了時にワークスペースごと削除
+
+    Args:
+        file: アップロードファイル
+        max_bytes: サイズ上限
+        ext: 書き出すファイルの拡張子
+        name: ワークスペース名
+
+    Yields:
+        IngestedUpload: 取り込んだファイル
+
+    Raises:
+        UploadTooLargeError: サイズ上限を超えた場合
+    """
+    with get_scratch_space().workspace(name) as workspace:
+        path = workspace.file(f"input.{ext}")
+        size = await spool_upload(file, path, max_bytes)
+        logger.info(f"Upload spooled: {file.filename} ({size} bytes)")
+        yield IngestedUpload(path=path, size=size, workspace=workspace)
@@ -5,15 +5,16 @@
 """
 
 import logging
-import os
-import tempfile
 import base64
 from typing import Optional
 
-import httpx
-from google import genai
 from google.genai import types
 
+from app.external.gemini_gateway import get_gemini_gateway
+from app.services.ffmpeg_scheduler import FFmpegJobClass, get_ffmpeg_scheduler
+from app.services.llm_media import MEDIA_PROFILES, MediaPurpose
+from app.services.remote_media import get_remote_media
+from app.services.scratch_space import ScratchWorkspace, get_scratch_space
 from app.videos.schemas import BGMPromptSuggestion, BGMMood, BGMGenre
 
 logger = logging.getLogger(__name__)
@@ -49,9 +50,9 @@ class VideoAnalyzer:
         from app.services.ffmpeg_service import get_ffmpeg_service
         ffmpeg = get_ffmpeg_service()
 
-        # フレーム抽出
-        with tempfile.TemporaryDirectory() as temp_dir:
-            frame_paths = await self._extract_frames(video_path, temp_dir, num_frames=4)
+        # フレーム抽出（小さな画像なのでRAM層）
+        with get_scratch_space().workspace("video_frames") as workspace:
+            frame_paths = await self._extract_frames(video_path, workspace, num_frames=4)
 
             # フレームを読み込みBase64エンコード
             frames_base64 = []
@@ -98,7 +99,7 @@ class VideoAnalyzer:
     async def _extract_frames(
         self,
         video_path: str,
-        output_dir: str,
+        workspace: ScratchWorkspace,
         num_frames: int = 4,
     ) -> list[str]:
         """
@@ -106,7 +107,7 @@ class VideoAnalyzer:
 
         Args:
             video_path: 入力動画パス
-            output_dir: 出力ディレクトリ
+            workspace: 出力先のワークスペース
             num_frames: 抽出フレーム数
 
         Returns:
@@ -115,6 +116,8 @@ class VideoAnalyzer:
         import subprocess
         import json
 
+        scheduler = get_ffmpeg_scheduler()
+
         # 動画の長さを取得
         probe_cmd = [
             "ffprobe", "-v", "quiet",
@@ -122,26 +125,36 @@ class VideoAnalyzer:
             "-show_format",
             video_path
         ]
-        result = subprocess.run(probe_cmd, capture_output=True, text=True)
-        data = json.loads(result.stdout)
+        _, stdout, _ = await scheduler.run(probe_cmd, FFmpegJobClass.INTERACTIVE)
+        data = json.loads(stdout.decode())
         duration = float(data["format"]["duration"])
 
         interval = duration / (num_frames + 1)
 
+        # Geminiに送るフレームは解析に使う大きさ（長辺）まで縮小して抽出
+        max_edge = MEDIA_PROFILES[MediaPurpose.FRAME].max_edge
+        scale_filter = (
+            f"scale=w='min({max_edge},iw)':h='min({max_edge},ih)'"
+            ":force_original_aspect_ratio=decrease"
+        )
+
         frame_paths = []
         for i in range(1, num_frames + 1):
             timestamp = interval * i
-            output_path = os.path.join(output_dir, f"frame_{i:02d}.jpg")
+            output_path = workspace.small_file(f"frame_{i:02d}.jpg")
 
             cmd = [
                 "ffmpeg", "-y",
                 "-ss", str(timestamp),
                 "-i", video_path,
                 "-vframes", "1",
-                "-q:v", "2",
+                "-vf", scale_filter,
+                "-q:v", "5",
                 output_path
             ]
-            subprocess.run(cmd, capture_output=True, check=True)
+            returncode, stdout, stderr = await scheduler.run(cmd, FFmpegJobClass.INTERACTIVE)
+            if returncode != 0:
+                raise subprocess.CalledProcessError(returncode, cmd, stdout, stderr)
             frame_paths.append(output_path)
 
         return frame_paths
@@ -153,8 +166,6 @@ class VideoAnalyzer:
         num_cuts: int,
     ) -> dict:
         """Geminiで動画フレームを分析"""
-        from app.core.config import settings
-
         prompt = f"""
 あなたは映像のBGM選定の専門家です。
 以下の動画フレーム（{len(frames_base64)}枚）を分析し、適切なBGMの特徴を提案してください。
@@ -172,15 +183,13 @@ class VideoAnalyzer:
 """
 
         try:
-            client = genai.Client(api_key=settings.GOOGLE_API_KEY)
-
             # 画像パーツを作成
             parts = [prompt]
             for img_b64 in frames_base64:
                 img_bytes = base64.b64decode(img_b64)
                 parts.append(types.Part.from_bytes(data=img_bytes, mime_type="image/jpeg"))
 
-            response = client.models.generate_content(
+            response = await get_gemini_gateway().generate_content(
                 model="gemini-2.0-flash",
                 contents=parts,
                 config=types.GenerateContentConfig(temperature=0.3)
@@ -265,18 +274,11 @@ class VideoAnalyzer:
         Returns:
             BGMPromptSuggestion: BGM生成用の提案
         """
-        import subprocess
         import json
 
-        with tempfile.TemporaryDirectory() as temp_dir:
-            video_path = os.path.join(temp_dir, "video.mp4")
-
-            # ダウンロード
-            async with httpx.AsyncClient(timeout=120.0, follow_redirects=True) as client:
-                response = await client.get(video_url)
-                response.raise_for_status()
-                with open(video_path, "wb") as f:
-                    f.write(response.content)
+        with get_scratch_space().workspace("video_analyze") as workspace:
+            # Range対応ならダウンロードせず、抽出するフレーム付近だけを読む
+            video_path = await get_remote_media().media_source(video_url, workspace, "video.mp4")
 
             # 動画の長さを取得
             probe_cmd = [
@@ -285,8 +287,10 @@ class VideoAnalyzer:
                 "-show_format",
                 video_path
             ]
-            result = subprocess.run(probe_cmd, capture_output=True, text=True)
-            data = json.loads(result.stdout)
+            _, stdout, _ = await get_ffmpeg_scheduler().run(
+                probe_cmd, FFmpegJobClass.INTERACTIVE
+            )
+            data = json.loads(stdout.decode())
             duration = float(data["format"]["duration"])
 
             return await self.analyze_for_bgm(video_path, cut_points, duration)
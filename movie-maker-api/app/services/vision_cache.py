@@ -0,0 +1,407 @@
+"""
+画像分析（ビジョンモデル）の結果キャッシュ
+
+ストーリー候補の提案・ベースプロンプト用の画像解析は、リトライやストーリーボードの
+再オープンのたびに同じ画像をダウンロードしてGeminiに送っていた。
+画像の内容から結果を引けるようにして、同じ画像の分析は画像を送らずに即座に返す。
+
+- 主キー: 画像バイト列のSHA-256（完全一致）
+- 副キー: 知覚ハッシュ（明暗のdHash 64bit + 4x4の平均色）。再エンコード・リサイズされた
+  同じ画像を、dHashのハミング距離（VISION_CACHE_PHASH_DISTANCE 以下）と平均色の差で
+  見つける（メモリ上のエントリのみ）。形が同じで色が違う画像は平均色で区別する。
+  色・細部の正確さが必要な分析（ベースプロンプト等）は near_duplicates=False で完全一致のみにする
+- URLの内容は差し替えられる場合があるため、URLだけでは結果を返さない（毎回ダウンロードして照合）
+- 結果はメモリ（LRU）とR2（SHA-256をキーにしたJSON）に保存
+
+分析の種類（kind）ごとにプロンプトが異なるため、kindもキーに含める。
+プロンプトを変更した場合は kind のバージョン（"story_suggestions:v1" 等）を上げる。
+"""
+
+import asyncio
+import hashlib
+import io
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional
+
+import httpx
+from botocore.exceptions import ClientError
+from PIL import Image
+
+from app.core.config import settings
+from app.external.r2 import get_r2_client
+from app.services.image_executor import get_image_executor
+
+logger = logging.getLogger(__name__)
+
+# R2上の保存先プレフィックス
+VISION_CACHE_PREFIX = "vision-cache/v2"
+
+# dHashの縮小サイズ（横 9 x 縦 8 → 64bit）
+_DHASH_SIZE = 8
+_DHASH_MASK = (1 << (_DHASH_SIZE * _DHASH_SIZE)) - 1
+# 平均色の縮小サイズ（4 x 4 x RGB）
+_COLOR_GRID = 4
+# 同じ画像とみなす平均色の差（各マス・各チャンネルの最大差, 0-255）
+_COLOR_TOLERANCE = 32
+
+
+def content_hash(data: bytes) -> str:
+    """画像バイト列のSHA-256"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def perceptual_hash(data: bytes) -> int:
+    """
+    画像の知覚ハッシュ
+
+    下位64bit: グレースケールで 9x8 に縮小し、横に隣り合う画素の明暗を並べたdHash。
+    上位: 4x4 に縮小した各マスのRGB平均（8bit x 48）。
+    再エンコード・リサイズではほぼ変わらず、形が同じでも色が違う画像は平均色で区別できる。
+    """
+    with Image.open(io.BytesIO(data)) as img:
+        img.draft("RGB", (_DHASH_SIZE * 4, _DHASH_SIZE * 4))
+        rgb = img.convert("RGB")
+        pixels = list(
+            rgb.convert("L").resize((_DHASH_SIZE + 1, _DHASH_SIZE), Image.Resampling.LANCZOS).getdata()
+        )
+        colors = rgb.resize((_COLOR_GRID, _COLOR_GRID), Image.Resampling.BOX).tobytes()
+
+    value = 0
+    for row in range(_DHASH_SIZE):
+        for col in range(_DHASH_SIZE):
+            left = pixels[row * (_DHASH_SIZE + 1) + col]
+            right = pixels[row * (_DHASH_SIZE + 1) + col + 1]
+            value = (value << 1) | (1 if left > right else 0)
+    return (int.from_bytes(colors, "big") << (_DHASH_SIZE * _DHASH_SIZE)) | value
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """知覚ハッシュのdHash部分のハミング距離"""
+    return bin((a ^ b) & _DHASH_MASK).count("1")
+
+
+def color_distance(a: int, b: int) -> int:
+    """知覚ハッシュの平均色部分の差（各マス・各チャンネルの最大差）"""
+    size = _COLOR_GRID * _COLOR_GRID * 3
+    colors_a = (a >> (_DHASH_SIZE * _DHASH_SIZE)).to_bytes(size, "big")
+    colors_b = (b >> (_DHASH_SIZE * _DHASH_SIZE)).to_bytes(size, "big")
+    return max(abs(x - y) for x, y in zip(colors_a, colors_b))
+
+
+class VisionAnalysisCache:
+    """画像分析の結果キャッシュ（メモリLRU + R2）"""
+
+    def __init__(
+        self,
+        enabled: Optional[bool] = None,
+        ttl_seconds: Optional[int] = None,
+        max_memory_entries: Optional[int] = None,
+        phash_distance: Optional[int] = None,
+        persistent: Optional[bool] = None,
+    ):
+        self.enabled = settings.VISION_CACHE_ENABLED if enabled is None else enabled
+        self.ttl_seconds = settings.VISION_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self.max_memory_entries = (
+            settings.VISION_CACHE_MEMORY_ENTRIES if max_memory_entries is None else max_memory_entries
+        )
+        self.phash_distance = settings.VISION_CACHE_PHASH_DISTANCE if phash_distance is None else phash_distance
+        self.persistent = settings.VISION_CACHE_PERSISTENT if persistent is None else persistent
+
+        # (kind, SHA-256) → (保存時刻（UNIX時間）, 知覚ハッシュ, 結果)
+        self._memory: "OrderedDict[tuple[str, str], tuple[float, Optional[int], Any]]" = OrderedDict()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._inflight: dict[tuple[str, str], asyncio.Future] = {}
+
+        self._lookups = 0
+        self._memory_hits = 0
+        self._phash_hits = 0
+        self._persistent_hits = 0
+        self._misses = 0
+        self._coalesced = 0
+        self._persistent_errors = 0
+
+    def _ensure_loop(self) -> None:
+        """イベントループが変わった場合（asyncio.run で起動するタスク等）は実行中の状態を作り直す"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._inflight = {}
+
+    def object_key(self, kind: str, digest: str) -> str:
+        """分析結果のR2オブジェクトキー"""
+        return f"{VISION_CACHE_PREFIX}/{kind.replace(':', '-')}/{digest[:2]}/{digest}.json"
+
+    def _fresh(self, stored_at: float) -> bool:
+        return time.time() - stored_at < self.ttl_seconds
+
+    def _remember(self, kind: str, digest: str, stored_at: float, phash: Optional[int], result: Any) -> None:
+        key = (kind, digest)
+        self._memory[key] = (stored_at, phash, result)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _from_memory(self, kind: str, digest: str) -> Optional[Any]:
+        entry = self._memory.get((kind, digest))
+        if entry is None:
+            return None
+        stored_at, _, result = entry
+        if not self._fresh(stored_at):
+            del self._memory[(kind, digest)]
+            return None
+        self._memory.move_to_end((kind, digest))
+        return result
+
+    def _from_phash(self, kind: str, phash: int) -> Optional[tuple[float, Any]]:
+        """知覚ハッシュが近い（同じ画像の再エンコード等）エントリを探す"""
+        best: Optional[tuple[int, float, Any]] = None
+        for (entry_kind, _), (stored_at, entry_phash, result) in self._memory.items():
+            if entry_kind != kind or entry_phash is None or not self._fresh(stored_at):
+                continue
+            distance = hamming_distance(phash, entry_phash)
+            if distance > self.phash_distance or color_distance(phash, entry_phash) > _COLOR_TOLERANCE:
+                continue
+            if best is None or distance < best[0]:
+                best = (distance, stored_at, result)
+        return (best[1], best[2]) if best else None
+
+    async def _load(self, kind: str, digest: str) -> Optional[tuple[float, Optional[int], Any]]:
+        """R2から結果を読み込む（存在しない・期限切れ・読めない場合はNone）"""
+        def load() -> Optional[bytes]:
+            try:
+                obj = get_r2_client().get_object(Bucket=settings.R2_BUCKET_NAME, Key=self.object_key(kind, digest))
+            except ClientError:
+                return None
+            return obj["Body"].read()
+
+        try:
+            body = await asyncio.to_thread(load)
+            if body is None:
+                return None
+            payload = json.loads(body)
+            stored_at = float(payload["stored_at"])
+            if not self._fresh(stored_at):
+                return None
+            return stored_at, payload.get("phash"), payload["result"]
+        except Exception as e:
+            self._persistent_errors += 1
+            logger.warning(f"Vision cache load failed for {digest[:12]}: {e}")
+            return None
+
+    async def _save(self, kind: str, digest: str, stored_at: float, phash: Optional[int], result: Any) -> None:
+        """R2に結果を保存（失敗しても呼び出し元には影響させない）"""
+        body = json.dumps(
+            {"stored_at": stored_at, "phash": phash, "result": result},
+            ensure_ascii=False,
+        ).encode()
+
+        def save() -> None:
+            get_r2_client().put_object(
+                Bucket=settings.R2_BUCKET_NAME,
+                Key=self.object_key(kind, digest),
+                Body=body,
+                ContentType="application/json",
+            )
+
+        try:
+            await asyncio.to_thread(save)
+        except Exception as e:
+            self._persistent_errors += 1
+            logger.warning(f"Vision cache save failed for {digest[:12]}: {e}")
+
+    async def _lookup(self, kind: str, digest: str) -> Optional[Any]:
+        """SHA-256でメモリ・R2を引く"""
+        result = self._from_memory(kind, digest)
+        if result is not None:
+            self._memory_hits += 1
+            return result
+        if self.persistent:
+            loaded = await self._load(kind, digest)
+            if loaded is not None:
+                self._persistent_hits += 1
+                self._remember(kind, digest, *loaded)
+                return loaded[2]
+        return None
+
+    async def _phash(self, image_data: bytes) -> Optional[int]:
+        try:
+            return await get_image_executor().run(perceptual_hash, image_data)
+        except Exception as e:
+            # デコードできない画像は完全一致のみで扱う
+            logger.warning(f"Perceptual hash failed: {e}")
+            return None
+
+    async def get_or_analyze(
+        self,
+        kind: str,
+        image_url: str,
+        analyze: Callable[[bytes], Awaitable[Any]],
+        near_duplicates: bool = True,
+    ) -> Any:
+        """
+        画像を取得し、分析結果がキャッシュにあればそれを返し、なければ analyze を実行
+
+        Args:
+            kind: 分析の種類（プロンプトのバージョンを含む。例: "story_suggestions:v1"）
+            image_url: 分析対象の画像URL
+            analyze: 画像バイト列を受け取ってビジョンモデルを呼び出す非同期関数
+                （結果はJSON化できる値。失敗時は例外を送出し、その結果は保存しない）
+            near_duplicates: 見た目がほぼ同じ画像（知覚ハッシュが近い画像）の結果も使う
+                （Falseの場合は内容が完全に一致する画像のみ）
+
+        Returns:
+            Any: 分析結果
+        """
+        if not self.enabled:
+            return await analyze(await fetch_image_bytes(image_url))
+
+        self._ensure_loop()
+        self._lookups += 1
+
+        # 同じ画像の分析が実行中なら結果を待って共有
+        flight_key = (kind, image_url)
+        inflight = self._inflight.get(flight_key)
+        if inflight is not None:
+            self._coalesced += 1
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[flight_key] = future
+        try:
+            result = await self._fetch_and_analyze(kind, image_url, analyze, near_duplicates)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            # 待っている呼び出しがない場合に "exception was never retrieved" を出さない
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(flight_key, None)
+
+    async def _fetch_and_analyze(
+        self,
+        kind: str,
+        image_url: str,
+        analyze: Callable[[bytes], Awaitable[Any]],
+        near_duplicates: bool,
+    ) -> Any:
+        image_data = await fetch_image_bytes(image_url)
+        digest = content_hash(image_data)
+
+        result, phash = await self._find(kind, digest, image_data, near_duplicates)
+        if result is not None:
+            return result
+
+        self._misses += 1
+        result = await analyze(image_data)
+        await self._store(kind, digest, phash, result)
+        return result
+
+    async def _find(
+        self,
+        kind: str,
+        digest: str,
+        image_data: bytes,
+        near_duplicates: bool,
+    ) -> tuple[Optional[Any], Optional[int]]:
+        """同じ画像、なければ見た目がほぼ同じ画像の結果を探す（戻り値: (結果, pHash)）"""
+        result = await self._lookup(kind, digest)
+        if result is not None or not near_duplicates:
+            # 完全一致のみの分析は知覚ハッシュを保存しない（他の画像から引かれないようにする）
+            return result, None
+
+        phash = await self._phash(image_data)
+        if phash is not None:
+            similar = self._from_phash(kind, phash)
+            if similar is not None:
+                self._phash_hits += 1
+                stored_at, result = similar
+                self._remember(kind, digest, stored_at, phash, result)
+                return result, phash
+        return None, phash
+
+    async def _store(self, kind: str, digest: str, phash: Optional[int], result: Any) -> None:
+        stored_at = time.time()
+        self._remember(kind, digest, stored_at, phash, result)
+        if self.persistent:
+            await self._save(kind, digest, stored_at, phash, result)
+
+    async def lookup(
+        self,
+        kind: str,
+        image_data: bytes,
+        near_duplicates: bool = True,
+    ) -> Optional[Any]:
+        """
+        キャッシュ済みの分析結果を返す（分析は実行しない）
+
+        ストリーミングで分析する場合など、get_or_analyze を使えない呼び出し元向け。
+        結果がなければ分析後に store で保存する。
+
+        Args:
+            kind: 分析の種類
+            image_data: 画像バイト列
+            near_duplicates: 見た目がほぼ同じ画像の結果も使う
+
+        Returns:
+            Optional[Any]: 分析結果（キャッシュにない場合はNone）
+        """
+        if not self.enabled:
+            return None
+        self._ensure_loop()
+        self._lookups += 1
+
+        result, _ = await self._find(kind, content_hash(image_data), image_data, near_duplicates)
+        if result is None:
+            self._misses += 1
+        return result
+
+    async def store(self, kind: str, image_data: bytes, result: Any, near_duplicates: bool = True) -> None:
+        """分析結果を保存（lookup で見つからなかった場合に分析後に呼ぶ）"""
+        if not self.enabled:
+            return
+        self._ensure_loop()
+        phash = await self._phash(image_data) if near_duplicates else None
+        await self._store(kind, content_hash(image_data), phash, result)
+
+    def clear(self) -> None:
+        """メモリ上の結果を破棄"""
+        self._memory.clear()
+
+    def stats(self) -> dict:
+        """ヒット率等（監視用）"""
+        hits = self._memory_hits + self._phash_hits + self._persistent_hits
+        return {
+            "enabled": self.enabled,
+            "persistent": self.persistent,
+            "lookups": self._lookups,
+            "memory_hits": self._memory_hits,
+            "phash_hits": self._phash_hits,
+            "persistent_hits": self._persistent_hits,
+            "misses": self._misses,
+            "coalesced": self._coalesced,
+            "persistent_errors": self._persistent_errors,
+            "hit_rate": hits / self._lookups if self._lookups else 0.0,
+            "memory_entries": len(self._memory),
+        }
+
+
+async def fetch_image_bytes(image_url: str) -> bytes:
+    """分析対象の画像をダウンロード"""
+    async with httpx.AsyncClient() as http_client:
+        response = await http_client.get(image_url, timeout=30.0)
+        response.raise_for_status()
+        return response.content
+
+
+# シングルトンインスタンス
+vision_cache = VisionAnalysisCache()
+
+
+def get_vision_cache() -> VisionAnalysisCache:
+    """VisionAnalysisCacheのインスタンスを取得"""
+    return vision_cache
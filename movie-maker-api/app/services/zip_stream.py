@@ -0,0 +1,79 @@
+"""
+ストリーミングZIP生成
+
+無圧縮（ZIP_STORED）のZIPを、メンバーを追加しながらチャンク単位で出力する。
+ZIP全体をディスクやメモリに作らずにレスポンスへ流せるため、
+最初のメンバーが揃った時点でダウンロードを開始できる。
+"""
+
+import asyncio
+import time
+import zipfile
+from typing import AsyncIterator
+
+_CHUNK_SIZE = 1024 * 1024
+
+
+class _ZipStreamBuffer:
+    """
+    zipfile の書き込み先（シーク不可のストリームとして扱われる）
+
+    書き込まれたバイト列を溜めておき、drain() で取り出す。
+    seek を持たないため zipfile はデータディスクリプタ形式で書き出す。
+    """
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+async def stream_zip(
+    members: AsyncIterator[tuple[str, str]],
+    chunk_size: int = _CHUNK_SIZE,
+) -> AsyncIterator[bytes]:
+    """
+    (ZIP内のファイル名, ローカルパス) を受け取った順にZIP_STOREDで出力
+
+    Args:
+        members: ZIPに追加するメンバー（準備ができた順に yield する非同期イテレータ）
+        chunk_size: ファイル読み込み単位
+
+    Yields:
+        bytes: ZIPデータ
+    """
+    buffer = _ZipStreamBuffer()
+
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as zf:
+        async for arcname, path in members:
+            info = zipfile.ZipInfo(arcname, date_time=time.localtime()[:6])
+            info.compress_type = zipfile.ZIP_STORED
+
+            with open(path, "rb") as src, zf.open(info, "w", force_zip64=True) as dest:
+                while chunk := await asyncio.to_thread(src.read, chunk_size):
+                    dest.write(chunk)
+                    yield buffer.drain()
+
+            data = buffer.drain()
+            if data:
+                yield data
+
+    # セントラルディレクトリ
+    data = buffer.drain()
+    if data:
+        yield data
@@ -17,6 +17,8 @@ from app.tasks.storyboard_processor import (
 from app.tasks.upscale_processor import process_upscale, start_upscale_processing
 from app.tasks.interpolation_processor import process_interpolation, start_interpolation_processing
 from app.tasks.topaz_upscale_processor import process_topaz_upscale, start_topaz_upscale_processing
+from app.tasks.export_processor import process_export_job, start_export_processing
+from app.tasks.direct_upload_processor import process_direct_upload, start_direct_upload_processing
 
 __all__ = [
     "process_video_generation",
@@ -39,4 +41,8 @@ __all__ = [
     "start_interpolation_processing",
     "process_topaz_upscale",
     "start_topaz_upscale_processing",
+    "process_export_job",
+    "start_export_processing",
+    "process_direct_upload",
+    "start_direct_upload_processing",
 ]
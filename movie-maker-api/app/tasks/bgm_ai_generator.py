@@ -9,13 +9,15 @@ Webhookでコールバックを受け取りDBを更新します。
 
 import logging
 import os
-import tempfile
 
 from app.core.supabase import get_supabase
 from app.external.suno_client import suno_client, SunoAPIError
 from app.external.r2 import download_file
 from app.services.video_analyzer import video_analyzer
 from app.services.ffmpeg_service import get_ffmpeg_service
+from app.services.render_cache import get_render_cache
+from app.services.scratch_space import get_scratch_space
+from app.services.remote_media import get_remote_media
 
 logger = logging.getLogger(__name__)
 
@@ -72,14 +74,12 @@ async def process_bgm_ai_generation(
         video_url = concat_data["final_video_url"]
         video_duration = concat_data.get("total_duration", 30)
 
-        with tempfile.TemporaryDirectory() as temp_dir:
-            # Step 1: 動画ダウンロード
+        with get_scratch_space().workspace(f"bgm_ai_{bgm_generation_id}") as workspace:
+            # Step 1: 動画ソース取得
             await update_bgm_status(bgm_generation_id, "analyzing", progress=5)
 
-            video_path = os.path.join(temp_dir, "video.mp4")
-            video_content = await download_file(video_url)
-            with open(video_path, "wb") as f:
-                f.write(video_content)
+            # Range対応ならダウンロードせず、分析に使うフレーム付近だけを読む
+            video_path = await get_remote_media().media_source(video_url, workspace, "video.mp4")
 
             # Step 2: 動画分析・プロンプト生成
             cut_points = []
@@ -187,13 +187,12 @@ async def process_bgm_apply(
         )
         concat_data = concat_response.data
         video_url = concat_data["final_video_url"]
-        user_id = concat_data["user_id"]
 
-        with tempfile.TemporaryDirectory() as temp_dir:
+        with get_scratch_space().workspace(f"bgm_apply_{concat_id}") as workspace:
+            temp_dir = workspace.path
             # ダウンロード
             video_path = os.path.join(temp_dir, "video.mp4")
             bgm_path = os.path.join(temp_dir, "bgm.mp3")
-            output_path = os.path.join(temp_dir, "output_with_bgm.mp4")
 
             video_content = await download_file(video_url)
             with open(video_path, "wb") as f:
@@ -203,26 +202,30 @@ async def process_bgm_apply(
             with open(bgm_path, "wb") as f:
                 f.write(bgm_content)
 
-            # BGM追加
-            await ffmpeg.add_bgm(
-                video_path=video_path,
-                audio_path=bgm_path,
-                output_path=output_path,
-                video_volume=original_volume,
-                audio_volume=bgm_volume,
-                fade_out_duration=fade_out,
-            )
-
-            # R2にアップロード
-            with open(output_path, "rb") as f:
-                video_bytes = f.read()
+            # BGM追加 → R2にアップロード
+            # （同じ動画・BGM・パラメータの結果がキャッシュにあれば再エンコードしない）
+            bgm_params = {
+                "video_volume": original_volume,
+                "audio_volume": bgm_volume,
+                "fade_out_duration": fade_out,
+            }
+
+            async def render(output_path: str) -> None:
+                await ffmpeg.add_bgm(
+                    video_path=video_path,
+                    audio_path=bgm_path,
+                    output_path=output_path,
+                    job_id=concat_id,
+                    **bgm_params,
+                )
 
-            from app.external.r2 import upload_video
-            filename = f"{user_id}/concat/{concat_id}/final_with_bgm.mp4"
-            final_url = await upload_video(
-                file_content=video_bytes,
-                filename=filename,
+            result = await get_render_cache().get_or_render(
+                operation="add_bgm",
+                params=bgm_params,
+                inputs=[video_content, bgm_content],
+                render=render,
             )
+            final_url = result.url
 
             # 更新
             supabase.table("video_concatenations").update({
@@ -7,11 +7,12 @@ BGM再処理タスク
 import asyncio
 import logging
 import os
-import tempfile
 
 from app.core.supabase import get_supabase
 from app.services.ffmpeg_service import FFmpegService
-from app.external.r2 import download_file, upload_video
+from app.external.r2 import download_file
+from app.services.render_cache import get_render_cache
+from app.services.scratch_space import get_scratch_space
 
 logger = logging.getLogger(__name__)
 
@@ -64,7 +65,8 @@ async def process_bgm_reprocessing(video_id: str):
         if not source_video_url:
             raise Exception("ソース動画が見つかりません")
 
-        with tempfile.TemporaryDirectory() as temp_dir:
+        with get_scratch_space().workspace(f"bgm_{video_id}") as workspace:
+            temp_dir = workspace.path
             # ソース動画をダウンロード
             logger.info(f"Downloading source video: {source_video_url}")
             video_content = await download_file(source_video_url)
@@ -90,32 +92,38 @@ async def process_bgm_reprocessing(video_id: str):
                 "progress": 50,
             }).eq("id", video_id).execute()
 
-            # FFmpegでBGMを追加
-            output_path = os.path.join(temp_dir, "output_with_bgm.mp4")
+            # FFmpegでBGMを追加してR2にアップロード
+            # （同じ動画・BGM・パラメータの結果がキャッシュにあれば再エンコードしない）
             logger.info(f"Adding BGM to video...")
-
-            await ffmpeg.add_bgm(
-                video_path=source_video_path,
-                audio_path=bgm_path,
-                output_path=output_path,
-                video_volume=0.3,  # 元動画の音声ボリューム
-                audio_volume=0.7,  # BGMのボリューム
-                fade_out_duration=1.0,
+            bgm_params = {
+                "video_volume": 0.3,  # 元動画の音声ボリューム
+                "audio_volume": 0.7,  # BGMのボリューム
+                "fade_out_duration": 1.0,
+            }
+
+            async def render(output_path: str) -> None:
+                await ffmpeg.add_bgm(
+                    video_path=source_video_path,
+                    audio_path=bgm_path,
+                    output_path=output_path,
+                    job_id=video_id,
+                    **bgm_params,
+                )
+
+            result = await get_render_cache().get_or_render(
+                operation="add_bgm",
+                params=bgm_params,
+                inputs=[video_content, bgm_content],
+                render=render,
             )
+            final_video_url = result.url
 
             # 進捗更新: 80%
             supabase.table("video_generations").update({
                 "progress": 80,
             }).eq("id", video_id).execute()
 
-            # R2にアップロード
-            with open(output_path, "rb") as f:
-                video_bytes = f.read()
-
-            final_filename = f"{video_data['user_id']}/{video_id}_with_bgm.mp4"
-            final_video_url = await upload_video(video_bytes, final_filename)
-
-            logger.info(f"Uploaded video with BGM: {final_video_url}")
+            logger.info(f"Uploaded video with BGM: {final_video_url} (cache_hit={result.hit})")
 
             # DB更新: 完了
             supabase.table("video_generations").update({
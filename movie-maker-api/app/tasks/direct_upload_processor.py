@@ -0,0 +1,136 @@
+"""
+R2直接アップロードの取り込みプロセッサ
+
+クライアントがR2に直接アップロードしたファイルを検証し、
+プローブ・サムネイル生成・DB登録を行う。検証に失敗したオブジェクトは削除する。
+一時的なエラー（プローブ・通信の失敗等）ではオブジェクトを残し、finalize からやり直せるようにする。
+"""
+import logging
+
+from app.core.supabase import get_supabase
+from app.external.r2 import delete_file, generate_presigned_url, get_public_url, head_object
+from app.services.direct_upload import DIRECT_UPLOAD_POLICIES, DIRECT_UPLOADS_TABLE
+from app.services.ffmpeg_service import get_ffmpeg_service
+from app.videos.schemas import DirectUploadKind
+from app.videos.service import register_direct_user_video
+
+logger = logging.getLogger(__name__)
+
+
+class DirectUploadValidationError(Exception):
+    """アップロードされたファイルが制限を満たさない"""
+    pass
+
+
+async def update_direct_upload_status(
+    supabase,
+    upload_id: str,
+    status: str = None,
+    error_message: str = None,
+    result: dict = None,
+) -> None:
+    """direct_uploads テーブルのステータスを更新"""
+    update_data = {}
+    if status is not None:
+        update_data["status"] = status
+    if error_message is not None:
+        update_data["error_message"] = error_message
+    if result is not None:
+        update_data["result"] = result
+
+    if update_data:
+        supabase.table(DIRECT_UPLOADS_TABLE).update(update_data).eq("id", upload_id).execute()
+
+
+async def _ingest(upload: dict, file_size: int) -> dict:
+    """種類ごとの検証・プローブ・登録"""
+    kind = DirectUploadKind(upload["kind"])
+    key = upload["r2_key"]
+
+    if kind == DirectUploadKind.USER_VIDEO:
+        try:
+            return await register_direct_user_video(
+                user_id=upload["user_id"],
+                video_key=key,
+                file_size=file_size,
+                filename=upload["filename"],
+                mime_type=upload["content_type"],
+                title=upload.get("title"),
+            )
+        except ValueError as e:
+            raise DirectUploadValidationError(str(e)) from e
+
+    if kind == DirectUploadKind.BGM:
+        # 音声の長さを署名付きURLから取得（取得できない場合はNone）
+        duration_seconds = await get_ffmpeg_service()._get_video_duration(generate_presigned_url(key))
+        return {"bgm_url": get_public_url(key), "duration_seconds": duration_seconds}
+
+    return {"image_url": get_public_url(key)}
+
+
+async def process_direct_upload(upload_id: str) -> None:
+    """
+    直接アップロードの取り込みメイン関数
+
+    処理フロー:
+    1. DBからアップロード情報を取得（direct_uploads テーブル）
+    2. R2オブジェクトの存在・サイズを確認
+    3. 種類ごとに検証・プローブ・サムネイル生成・DB登録
+    4. ステータスを completed に更新（失敗時は failed、検証に通らない場合はオブジェクトも削除）
+    """
+    supabase = get_supabase()
+    upload = None
+
+    try:
+        response = (
+            supabase.table(DIRECT_UPLOADS_TABLE)
+            .select("*")
+            .eq("id", upload_id)
+            .single()
+            .execute()
+        )
+        if not response.data:
+            logger.error(f"Direct upload not found: {upload_id}")
+            return
+
+        upload = response.data
+        policy = DIRECT_UPLOAD_POLICIES[DirectUploadKind(upload["kind"])]
+
+        head = await head_object(upload["r2_key"])
+        if head is None:
+            raise DirectUploadValidationError("アップロードされたファイルが見つかりません")
+
+        file_size = int(head.get("ContentLength", 0))
+        if file_size > policy.max_bytes:
+            raise DirectUploadValidationError(
+                f"ファイルサイズが大きすぎます。最大{policy.max_bytes // (1024 * 1024)}MBまでアップロード可能です。"
+            )
+
+        result = await _ingest(upload, file_size)
+
+        await update_direct_upload_status(supabase, upload_id, status="completed", result=result)
+        logger.info(f"Direct upload ingested: {upload_id} ({upload['kind']}, {file_size} bytes)")
+
+    except Exception as e:
+        logger.exception(f"Direct upload ingest failed for {upload_id}: {e}")
+
+        # 検証に通らなかったオブジェクトのみ削除（一時的なエラーで削除すると再試行できず、
+        # 登録済みの user_videos が存在しないオブジェクトを指すことになる）
+        if upload is not None and isinstance(e, (DirectUploadValidationError, ValueError)):
+            try:
+                await delete_file(upload["r2_key"])
+            except Exception as delete_error:
+                logger.warning(f"Failed to delete rejected upload {upload['r2_key']}: {delete_error}")
+
+        message = str(e) if isinstance(e, DirectUploadValidationError) else f"アップロードの取り込みに失敗しました: {e}"
+        await update_direct_upload_status(supabase, upload_id, status="failed", error_message=message)
+
+
+async def start_direct_upload_processing(upload_id: str) -> None:
+    """
+    直接アップロードの取り込みをバックグラウンドで開始
+
+    Args:
+        upload_id: 直接アップロードID
+    """
+    await process_direct_upload(upload_id)
@@ -0,0 +1,189 @@
+"""
+エクスポートジョブプロセッサ
+
+編集用素材（ProRes ZIP）・単一動画のProRes変換をバックグラウンドで実行し、
+成果物をエクスポート成果物ストレージ（ローカル or R2）に保存する。
+"""
+import logging
+import os
+from datetime import datetime
+
+import aiohttp
+
+from app.core.supabase import get_supabase
+from app.services.export_jobs import (
+    ARTIFACT_STORAGE_R2,
+    EXPORT_JOBS_TABLE,
+    artifact_expires_at,
+    store_artifact,
+)
+from app.services.ffmpeg_service import get_ffmpeg_service
+from app.services.material_export import convert_materials
+from app.services.render_cache import get_render_cache
+from app.services.scratch_space import ScratchWorkspace, get_scratch_space
+from app.services.zip_stream import stream_zip
+from app.videos.schemas import MaterialExportRequest, ProResExportRequest
+
+logger = logging.getLogger(__name__)
+
+_DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+async def update_export_status(
+    supabase,
+    job_id: str,
+    status: str = None,
+    progress: int = None,
+    error_message: str = None,
+    **fields,
+) -> None:
+    """export_jobs テーブルのステータスを更新"""
+    update_data = {key: value for key, value in fields.items() if value is not None}
+    if status is not None:
+        update_data["status"] = status
+    if progress is not None:
+        update_data["progress"] = progress
+    if error_message is not None:
+        update_data["error_message"] = error_message
+
+    if update_data:
+        supabase.table(EXPORT_JOBS_TABLE).update(update_data).eq("id", job_id).execute()
+
+
+async def _export_materials(supabase, job: dict, workspace: ScratchWorkspace) -> tuple[str, str, str, int]:
+    """編集用素材をZIPにまとめて保存"""
+    request = MaterialExportRequest(**job["params"])
+    total = len(request.cuts)
+    members = convert_materials(request.cuts, request.aspect_ratio, workspace, job_id=job["id"])
+
+    async def zip_members():
+        """変換済みカットを返し、ZIPへの書き込み後に削除して進捗を更新"""
+        done = 0
+        async for filename, filepath in members:
+            yield filename, filepath
+            os.remove(filepath)
+            done += 1
+            await update_export_status(supabase, job["id"], progress=5 + int(90 * done / total))
+
+    filename = f"materials_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
+    zip_path = workspace.file(filename)
+    try:
+        with open(zip_path, "wb") as f:
+            async for chunk in stream_zip(zip_members()):
+                f.write(chunk)
+    finally:
+        await members.aclose()
+
+    storage, key, size = await store_artifact(
+        job["id"], job["user_id"], zip_path, filename, "application/zip"
+    )
+    return filename, storage, key, size
+
+
+async def _export_prores(supabase, job: dict, workspace: ScratchWorkspace) -> tuple[str, str, str, int]:
+    """動画をProResに変換（成果物はレンダリングキャッシュのR2オブジェクトを共有）"""
+    request = ProResExportRequest(**job["params"])
+    input_path = workspace.file("input.mp4")
+
+    async with aiohttp.ClientSession() as session:
+        async with session.get(request.video_url) as resp:
+            if resp.status != 200:
+                raise Exception("動画のダウンロードに失敗しました")
+            with open(input_path, "wb") as f:
+                async for chunk in resp.content.iter_chunked(_DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
+
+    await update_export_status(supabase, job["id"], progress=20)
+
+    ffmpeg = get_ffmpeg_service()
+    render_params = request.options.model_dump()
+
+    async def render(path: str) -> None:
+        await ffmpeg.convert_to_prores(
+            video_path=input_path,
+            output_path=path,
+            job_id=job["id"],
+            **render_params,
+        )
+        if not os.path.exists(path):
+            raise Exception("ProRes変換に失敗しました")
+        workspace.check_quota()
+
+    # /download/prores と同じキーでキャッシュを共有する
+    result = await get_render_cache().get_or_render(
+        operation="convert_to_prores",
+        params=render_params,
+        inputs=[input_path],
+        render=render,
+        ext="mov",
+        content_type="video/quicktime",
+    )
+    filename = f"prores_{int(datetime.now().timestamp())}.mov"
+    return filename, ARTIFACT_STORAGE_R2, result.key, result.size
+
+
+async def process_export_job(job_id: str) -> None:
+    """
+    エクスポートジョブのメイン関数
+
+    処理フロー:
+    1. DBからジョブ取得（export_jobs テーブル）
+    2. ステータスを processing に更新
+    3. 種別ごとに変換し、成果物を保存
+    4. ステータスを completed に更新（保持期限を設定）
+    """
+    supabase = get_supabase()
+
+    try:
+        response = (
+            supabase.table(EXPORT_JOBS_TABLE)
+            .select("*")
+            .eq("id", job_id)
+            .single()
+            .execute()
+        )
+        if not response.data:
+            logger.error(f"Export job not found: {job_id}")
+            return
+
+        job = response.data
+        logger.info(f"Starting export job {job_id}: kind={job['kind']}")
+        await update_export_status(supabase, job_id, status="processing", progress=5)
+
+        with get_scratch_space().workspace(f"export_{job_id}") as workspace:
+            if job["kind"] == "materials":
+                filename, storage, key, size = await _export_materials(supabase, job, workspace)
+            else:
+                filename, storage, key, size = await _export_prores(supabase, job, workspace)
+
+        await update_export_status(
+            supabase,
+            job_id,
+            status="completed",
+            progress=100,
+            filename=filename,
+            file_size=size,
+            artifact_storage=storage,
+            artifact_key=key,
+            expires_at=artifact_expires_at().isoformat(),
+        )
+        logger.info(f"Export job completed: {job_id} ({size} bytes, storage={storage})")
+
+    except Exception as e:
+        logger.exception(f"Export job failed for {job_id}: {e}")
+        await update_export_status(
+            supabase,
+            job_id,
+            status="failed",
+            error_message=str(e),
+        )
+
+
+async def start_export_processing(job_id: str) -> None:
+    """
+    エクスポートジョブをバックグラウンドで開始
+
+    Args:
+        job_id: エクスポートジョブID
+    """
+    await process_export_job(job_id)
@@ -11,14 +11,16 @@
 import asyncio
 import logging
 import os
-import tempfile
 from typing import Optional
 
 from app.core.supabase import get_supabase
 from app.external.video_provider import get_video_provider, VideoGenerationStatus
 from app.external.r2 import r2_client
 from app.services.ffmpeg_service import get_ffmpeg_service, FFmpegError
+from app.services.ffmpeg_runner import progress_to_range
 from app.videos.service import update_video_status
+from app.services.render_cache import get_render_cache
+from app.services.scratch_space import get_scratch_space
 
 logger = logging.getLogger(__name__)
 
@@ -222,9 +224,9 @@ async def process_story_video(video_id: str, video_provider_name: str = None, el
         # Step 3: FFmpeg処理 → R2アップロード
         await update_video_status(video_id, "processing", progress=75)
 
-        with tempfile.TemporaryDirectory() as temp_dir:
+        with get_scratch_space().workspace(f"story_{video_id}") as workspace:
+            temp_dir = workspace.path
             raw_video_path = os.path.join(temp_dir, "raw_video.mp4")
-            processed_video_path = os.path.join(temp_dir, "processed_video.mp4")
 
             # プロバイダー経由でダウンロード
             logger.info(f"Downloading video from {provider.provider_name}...")
@@ -266,32 +268,53 @@ async def process_story_video(video_id: str, video_provider_name: str = None, el
                     logger.warning(f"Failed to download BGM: {e}")
                     bgm_path = None
 
-            try:
+            async def update_ffmpeg_progress(progress: int):
+                await update_video_status(video_id, "processing", progress=progress)
+
+            # FFmpeg処理 → R2アップロード
+            # （同じ入力・同じパラメータの結果がキャッシュにあれば再エンコードしない）
+            render_params = {
+                "text": video_data.get("overlay_text"),
+                "text_position": video_data.get("overlay_position", "bottom"),
+                "text_font": video_data.get("overlay_font", "NotoSansJP"),
+                "text_color": video_data.get("overlay_color", "#FFFFFF"),
+            }
+
+            async def render(output_path: str) -> None:
                 await ffmpeg.process_video(
                     video_path=raw_video_path,
-                    output_path=processed_video_path,
-                    text=video_data.get("overlay_text"),
-                    text_position=video_data.get("overlay_position", "bottom"),
-                    text_font=video_data.get("overlay_font", "NotoSansJP"),
-                    text_color=video_data.get("overlay_color", "#FFFFFF"),
+                    output_path=output_path,
                     bgm_path=bgm_path,
+                    job_id=video_id,
+                    progress_callback=progress_to_range(update_ffmpeg_progress, 80, 90),
+                    **render_params,
                 )
+
+            final_url = None
+            try:
+                result = await get_render_cache().get_or_render(
+                    operation="process_video",
+                    params=render_params,
+                    inputs=[raw_video_path, bgm_path],
+                    render=render,
+                )
+                final_url = result.url
             except FFmpegError as e:
                 logger.warning(f"FFmpeg processing failed, using raw video: {e}")
-                processed_video_path = raw_video_path
 
             await update_video_status(video_id, "processing", progress=90)
 
-            # R2にアップロード
-            final_key = f"videos/{user_id}/{video_id}/final.mp4"
-            with open(processed_video_path, "rb") as f:
-                video_bytes = f.read()
+            if final_url is None:
+                # FFmpeg処理に失敗した場合はRaw動画をそのままアップロード
+                final_key = f"videos/{user_id}/{video_id}/final.mp4"
+                with open(raw_video_path, "rb") as f:
+                    video_bytes = f.read()
 
-            final_url = await r2_client.upload_file(
-                file_data=video_bytes,
-                key=final_key,
-                content_type="video/mp4",
-            )
+                final_url = await r2_client.upload_file(
+                    file_data=video_bytes,
+                    key=final_key,
+                    content_type="video/mp4",
+                )
 
             if not final_url:
                 raise Exception("Failed to upload final video to R2")
@@ -7,7 +7,6 @@
 import asyncio
 import logging
 import os
-import tempfile
 import time
 from typing import Optional
 
@@ -19,13 +18,13 @@ from app.external.video_provider import (
 )
 from app.external.r2 import download_file, upload_video
 from app.services.ffmpeg_service import FFmpegService
+from app.services.media_ingest import cleared_columns, ingest_derived_columns, preview_columns
+from app.services.scratch_space import get_scratch_space
+from app.services.remote_media import get_remote_media
 
 logger = logging.getLogger(__name__)
 
 
-import httpx
-
-
 def get_previous_video_url(current_scene: dict, all_scenes: list) -> Optional[str]:
     """
     結合順で直前のシーンの動画URLを取得（V2V用）
@@ -192,17 +191,11 @@ async def _extract_and_upload_last_frame(
     """
     from app.external.r2 import upload_image
 
-    async with httpx.AsyncClient() as client:
-        response = await client.get(video_url)
-        response.raise_for_status()
-        video_content = response.content
-
-    with tempfile.TemporaryDirectory() as temp_dir:
-        video_path = os.path.join(temp_dir, "video.mp4")
-        frame_path = os.path.join(temp_dir, "last_frame.jpg")
+    with get_scratch_space().workspace(f"last_frame_{storyboard_id}_{scene_number}") as workspace:
+        frame_path = workspace.small_file("last_frame.jpg")
 
-        with open(video_path, "wb") as f:
-            f.write(video_content)
+        # Range対応ならダウンロードせず、終端付近だけを読む
+        video_path = await get_remote_media().media_source(video_url, workspace, "video.mp4")
 
         await ffmpeg.extract_last_frame(video_path, frame_path)
 
@@ -419,8 +412,12 @@ async def process_storyboard_generation(
                 parent_scene = scene_by_id[parent_scene_id]
                 parent_video_url = parent_scene.get("video_url")
 
-                if parent_video_url:
-                    # 親の最終フレームを抽出して使用
+                if parent_video_url and parent_scene.get("last_frame_url"):
+                    # 生成完了時に取り込み済みの最終フレームを使用（動画がない場合は前の動画のものなので使わない）
+                    scene_image_url = parent_scene["last_frame_url"]
+                    logger.info(f"Scene {scene_number} ({label}): Using parent's ingested last frame as input")
+                elif parent_video_url:
+                    # 親の最終フレームを抽出して使用（取り込み前のシーン）
                     try:
                         scene_image_url = await _extract_and_upload_last_frame(
                             ffmpeg, parent_video_url, storyboard_id, scene_number
@@ -511,11 +508,15 @@ async def process_storyboard_generation(
                 r2_url = await upload_video(video_content, r2_filename)
                 logger.info(f"Scene {scene_number} ({label}): Uploaded to R2: {r2_url}")
 
-                # シーンを完了に更新（R2のURLを保存）
+                # 派生アセット（最初/最終フレーム・ポスター・サムネイル・メタデータ）を1回のデコードで作成
+                derived_columns = await ingest_derived_columns(video_content, "storyboard_scenes", scene_id)
+
+                # シーンを完了に更新（R2のURLと派生アセットを保存）
                 supabase.table("storyboard_scenes").update({
                     "status": "completed",
                     "progress": 100,
                     "video_url": r2_url,
+                    **derived_columns,
                 }).eq("id", scene_id).execute()
 
                 logger.info(f"Scene {scene_number} ({label}): Completed ✓")
@@ -525,6 +526,7 @@ async def process_storyboard_generation(
                 # シーンマップを更新（後続のサブシーンが参照できるように）
                 scene["video_url"] = r2_url
                 scene["status"] = "completed"
+                scene.update(derived_columns)
 
             except Exception as e:
                 logger.exception(f"Scene {scene_number} ({label}) failed: {e}")
@@ -658,12 +660,13 @@ async def process_single_scene_regeneration(
 
         logger.info(f"Regenerating scene {scene_number} ({act_name}) for storyboard {storyboard_id} using {provider.provider_name}, mode={video_mode or 'i2v'}")
 
-        # シーンを generating に更新
+        # シーンを generating に更新（前の動画の派生アセットも消す）
         supabase.table("storyboard_scenes").update({
             "status": "generating",
             "progress": 10,
             "video_url": None,
             "error_message": None,
+            **cleared_columns(),
         }).eq("id", scene_id).execute()
 
         # V2Vモードの場合、参照動画URLを取得
@@ -782,11 +785,15 @@ async def process_single_scene_regeneration(
         r2_url = await upload_video(video_content, r2_filename)
         logger.info(f"Scene {scene_number} ({act_name}): Uploaded to R2: {r2_url}")
 
-        # シーンを完了に更新（R2のURLを保存）
+        # 派生アセットを作り直す（前の動画のフレーム・プレビューを残さない）
+        derived_columns = await ingest_derived_columns(video_content, "storyboard_scenes", scene_id)
+
+        # シーンを完了に更新（R2のURLと派生アセットを保存）
         supabase.table("storyboard_scenes").update({
             "status": "completed",
             "progress": 100,
             "video_url": r2_url,
+            **derived_columns,
         }).eq("id", scene_id).execute()
 
         # ストーリーボードのステータスを videos_ready に更新（自動結合はしない）
@@ -871,7 +878,8 @@ async def process_storyboard_concatenation(
         logger.info(f"Starting concatenation for storyboard {storyboard_id}")
 
         # 動画をダウンロードして結合
-        with tempfile.TemporaryDirectory() as temp_dir:
+        with get_scratch_space().workspace(f"storyboard_concat_{storyboard_id}") as workspace:
+            temp_dir = workspace.path
             video_paths = []
 
             # 各動画をダウンロード
@@ -891,6 +899,7 @@ async def process_storyboard_concatenation(
                 output_path=concat_output,
                 transition="none",
                 transition_duration=0,
+                job_id=storyboard_id,
             )
 
             current_video = concat_output
@@ -924,6 +933,7 @@ async def process_storyboard_concatenation(
                     video_volume=0.3,
                     audio_volume=0.7,
                     fade_out_duration=2.0,
+                    job_id=storyboard_id,
                 )
                 current_video = bgm_output
 
@@ -937,12 +947,16 @@ async def process_storyboard_concatenation(
 
             logger.info(f"Uploaded final video: {final_video_url}")
 
+            # 一覧用プレビュー（ローカルの結合結果から作成）
+            preview = await preview_columns(current_video, "storyboards", storyboard_id)
+
             # ストーリーボードを完了に更新
             supabase.table("storyboards").update({
                 "status": "completed",
                 "final_video_url": final_video_url,
                 "total_duration": 20.0,
                 "error_message": None,
+                **preview,
             }).eq("id", storyboard_id).execute()
 
             logger.info(f"Storyboard {storyboard_id} concatenation completed successfully")
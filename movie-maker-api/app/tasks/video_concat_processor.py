@@ -7,12 +7,14 @@
 import asyncio
 import logging
 import os
-import tempfile
 import aiohttp
 
 from app.core.supabase import get_supabase
 from app.external.r2 import r2_client
 from app.services.ffmpeg_service import get_ffmpeg_service, FFmpegError
+from app.services.ffmpeg_runner import progress_to_range
+from app.services.media_ingest import preview_columns
+from app.services.scratch_space import get_scratch_space
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +26,7 @@ async def update_concat_status(
     error_message: str | None = None,
     final_video_url: str | None = None,
     total_duration: float | None = None,
+    preview_url: str | None = None,
 ) -> None:
     """結合ジョブのステータスを更新"""
     supabase = get_supabase()
@@ -37,6 +40,8 @@ async def update_concat_status(
         update_data["final_video_url"] = final_video_url
     if total_duration is not None:
         update_data["total_duration"] = total_duration
+    if preview_url is not None:
+        update_data["preview_url"] = preview_url
 
     supabase.table("video_concatenations").update(update_data).eq("id", concat_id).execute()
 
@@ -124,7 +129,8 @@ async def process_concat_generation(
 
         await update_concat_status(concat_id, "processing", progress=10)
 
-        with tempfile.TemporaryDirectory() as temp_dir:
+        with get_scratch_space().workspace(f"concat_{concat_id}") as workspace:
+            temp_dir = workspace.path
             # Step 1: 各動画をダウンロード
             video_paths = []
             total_videos = len(video_urls)
@@ -190,12 +196,17 @@ async def process_concat_generation(
             await update_concat_status(concat_id, "processing", progress=60)
             output_path = os.path.join(temp_dir, "concatenated.mp4")
 
+            async def update_ffmpeg_progress(progress: int):
+                await update_concat_status(concat_id, "processing", progress=progress)
+
             logger.info(f"Concatenating videos with transition: {transition}")
             await ffmpeg.concat_videos(
                 video_paths=video_paths_to_concat,
                 output_path=output_path,
                 transition=transition,
                 transition_duration=transition_duration,
+                job_id=concat_id,
+                progress_callback=progress_to_range(update_ffmpeg_progress, 60, 75),
             )
 
             await update_concat_status(concat_id, "processing", progress=75)
@@ -220,6 +231,9 @@ async def process_concat_generation(
             if not final_url:
                 raise Exception("Failed to upload concatenated video to R2")
 
+            # 一覧用プレビュー（ローカルの結合結果から作成、失敗しても結合は完了扱い）
+            preview = await preview_columns(output_path, "video_concatenations", concat_id)
+
             await update_concat_status(concat_id, "processing", progress=95)
 
         # Step 5: 完了
@@ -229,6 +243,7 @@ async def process_concat_generation(
             progress=100,
             final_video_url=final_url,
             total_duration=total_duration,
+            preview_url=preview.get("preview_url"),
         )
 
         logger.info(f"Concat processing completed: {concat_id}, duration: {total_duration}s")
@@ -7,7 +7,6 @@ Runway API → [Topaz 60fps変換] → FFmpeg処理 → R2アップロード の
 import asyncio
 import logging
 import os
-import tempfile
 from typing import Optional
 
 import httpx
@@ -20,8 +19,12 @@ from app.external.runway_client import (
 )
 from app.external.r2 import r2_client
 from app.services.ffmpeg_service import get_ffmpeg_service, FFmpegError
+from app.services.ffmpeg_runner import progress_to_range
 from app.services.topaz_service import get_topaz_service, TopazServiceError
 from app.videos.service import update_video_status
+from app.services.media_ingest import ingest_derived_columns
+from app.services.render_cache import get_render_cache
+from app.services.scratch_space import get_scratch_space
 
 logger = logging.getLogger(__name__)
 
@@ -118,9 +121,9 @@ async def process_video_generation(video_id: str) -> None:
         # Step 3: 動画をダウンロード
         await update_video_status(video_id, "processing", progress=65)
 
-        with tempfile.TemporaryDirectory() as temp_dir:
+        with get_scratch_space().workspace(f"video_{video_id}") as workspace:
+            temp_dir = workspace.path
             raw_video_path = os.path.join(temp_dir, "raw_video.mp4")
-            processed_video_path = os.path.join(temp_dir, "processed_video.mp4")
 
             # ダウンロード
             success = await download_video(raw_video_url, raw_video_path)
@@ -192,40 +195,79 @@ async def process_video_generation(video_id: str) -> None:
 
             await update_video_status(video_id, "processing", progress=75)
 
-            try:
-                # 60fps変換済みの場合はそのFPSを維持、そうでなければ24fps
-                ffmpeg_target_fps = None if target_fps == 60 else 24
-
+            async def update_ffmpeg_progress(progress: int):
+                await update_video_status(video_id, "processing", progress=progress)
+
+            # Step 5: FFmpeg処理 → R2アップロード
+            # （同じ入力・同じパラメータの結果がキャッシュにあれば再エンコードしない）
+            # 60fps変換済みの場合はそのFPSを維持、そうでなければ24fps
+            ffmpeg_target_fps = None if target_fps == 60 else 24
+            render_params = {
+                "text": video_data.get("overlay_text"),
+                "text_position": video_data.get("overlay_position", "bottom"),
+                "text_font": video_data.get("overlay_font", "NotoSansJP"),
+                "text_color": video_data.get("overlay_color", "#FFFFFF"),
+                "target_fps": ffmpeg_target_fps,  # 60fpsの場合はFPS変換しない
+            }
+
+            async def render(output_path: str) -> None:
                 await ffmpeg.process_video(
                     video_path=interpolated_video_path,  # 60fps変換済み or 元動画
-                    output_path=processed_video_path,
-                    text=video_data.get("overlay_text"),
-                    text_position=video_data.get("overlay_position", "bottom"),
-                    text_font=video_data.get("overlay_font", "NotoSansJP"),
-                    text_color=video_data.get("overlay_color", "#FFFFFF"),
+                    output_path=output_path,
                     bgm_path=bgm_path,
-                    target_fps=ffmpeg_target_fps,  # 60fpsの場合はFPS変換しない
+                    job_id=video_id,
+                    progress_callback=progress_to_range(update_ffmpeg_progress, 75, 85),
+                    **render_params,
+                )
+
+            final_url = None
+            # キャッシュミス時はレンダリング結果をローカルに残し、派生アセットの作成に使う
+            final_video_path = os.path.join(temp_dir, "final.mp4")
+            try:
+                result = await get_render_cache().get_or_render(
+                    operation="process_video",
+                    params=render_params,
+                    inputs=[
+                        interpolated_video_path,
+                        bgm_path if bgm_path and os.path.exists(bgm_path) else None,
+                    ],
+                    render=render,
+                    output_path=final_video_path,
                 )
+                final_url = result.url
             except FFmpegError as e:
                 logger.warning(f"FFmpeg processing failed, using source video: {e}")
-                processed_video_path = interpolated_video_path
 
             await update_video_status(video_id, "processing", progress=85)
 
-            # Step 5: R2にアップロード
-            final_key = f"videos/{user_id}/{video_id}/final.mp4"
-            with open(processed_video_path, "rb") as f:
-                video_bytes = f.read()
-
-            final_url = await r2_client.upload_file(
-                file_data=video_bytes,
-                key=final_key,
-                content_type="video/mp4",
-            )
+            render_failed = final_url is None
+            if final_url is None:
+                # FFmpeg処理に失敗した場合は元動画をそのままアップロード
+                final_key = f"videos/{user_id}/{video_id}/final.mp4"
+                with open(interpolated_video_path, "rb") as f:
+                    video_bytes = f.read()
+
+                final_url = await r2_client.upload_file(
+                    file_data=video_bytes,
+                    key=final_key,
+                    content_type="video/mp4",
+                )
 
             if not final_url:
                 raise Exception("Failed to upload final video to R2")
 
+            await update_video_status(video_id, "processing", progress=90)
+
+            # 派生アセット（最初/最終フレーム・ポスター・サムネイル・メタデータ）を1回のデコードで作成
+            # （ローカルに最終動画がない＝キャッシュヒットの場合のみR2から読む）
+            if render_failed:
+                ingest_source = interpolated_video_path
+            elif os.path.exists(final_video_path):
+                ingest_source = final_video_path
+            else:
+                ingest_source = final_url
+            derived_columns = await ingest_derived_columns(ingest_source, "video_generations", video_id)
+
             await update_video_status(video_id, "processing", progress=95)
 
             # Raw動画もR2に保存
@@ -245,6 +287,7 @@ async def process_video_generation(video_id: str) -> None:
             progress=100,
             raw_video_url=raw_url,
             final_video_url=final_url,
+            derived=derived_columns,
         )
 
         logger.info(f"Video processing completed: {video_id}")
@@ -301,7 +344,8 @@ async def process_hls_conversion(
     )
 
     try:
-        with tempfile.TemporaryDirectory() as temp_dir:
+        with get_scratch_space().workspace(f"hls_{video_id}") as workspace:
+            temp_dir = workspace.path
             # 元動画をストリーミングダウンロード（メモリ効率化）
             input_path = os.path.join(temp_dir, "input.mp4")
 
@@ -1,16 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, BackgroundTasks, Body, Form, Query
 from pathlib import Path
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import FileResponse, RedirectResponse, StreamingResponse
 from typing import Optional
 from datetime import datetime
+import asyncio
+import json
 import logging
 import uuid
 import time
 import tempfile
 import os
 import aiohttp
-import shutil
-import zipfile
 
 from app.core.dependencies import get_current_user, check_usage_limit
 from app.core.supabase import get_supabase
@@ -55,12 +56,19 @@ from app.videos.schemas import (
     AdCreatorSaveDraftRequest, AdCreatorDraftResponse, AdCreatorDraftMetadata, AdCreatorDraftExistsResponse,
     # 編集用素材エクスポート
     MaterialExportRequest,
+    # エクスポートジョブ
+    ExportJobKind, ExportJobStatus, ExportJobResponse, ProResExportRequest,
     # Ad Creatorプロジェクト管理
     AdCreatorProjectCreate, AdCreatorProjectUpdate, AdCreatorProjectResponse, AdCreatorProjectListResponse,
     # スクリーンショット用
-    ScreenshotSource, ScreenshotCreateRequest, ScreenshotResponse, ScreenshotListResponse,
+    ScreenshotSource, ScreenshotSourceRequest, ScreenshotCreateRequest, ScreenshotResponse, ScreenshotListResponse,
+    ScreenshotBatchCreateRequest, ScreenshotBatchResponse,
+    # スクラブ用スプライトシート
+    ScrubTrackRequest, ScrubTrackResponse,
     # 動画アップロード用
     VideoUploadResponse,
+    # R2直接アップロード用
+    DirectUploadCreateRequest, DirectUploadCreateResponse, DirectUploadStatusResponse, DirectUploadStatus,
 )
 from app.videos import service
 from app.videos.service import (
@@ -69,17 +77,60 @@ from app.videos.service import (
     delete_user_uploaded_video as service_delete_user_uploaded_video,
     USER_VIDEO_ALLOWED_TYPES,
     USER_VIDEO_MAX_SIZE_MB,
-    get_image_dimensions,
 )
-from app.external.r2 import upload_image, upload_audio, upload_video, download_file, delete_file, get_r2_client, get_public_url
+from app.external.r2 import upload_image, upload_audio_file, upload_video_file, upload_local_file, delete_file, get_r2_client, generate_presigned_put_url, copy_object
 from app.services.topaz_service import get_topaz_service
-from app.external.gemini_client import suggest_stories_from_image, generate_4scene_storyboard, generate_story_frame_image, generate_ad_script, convert_to_flux_json_prompt
+from app.external.gemini_client import (
+    suggest_stories_from_image, generate_4scene_storyboard, generate_story_frame_image, generate_ad_script, convert_to_flux_json_prompt,
+    stream_story_suggestions, stream_4scene_storyboard, stream_ad_script,
+)
 from app.tasks import start_video_processing, start_story_processing, start_concat_processing
-from app.services.ffmpeg_service import get_ffmpeg_service
+from app.services.ffmpeg_service import FFmpegError, get_ffmpeg_service
+from app.services.ffmpeg_runner import cancel_ffmpeg_job
+from app.services.scratch_space import get_scratch_space
+from app.services.frame_cache import FrameExtractionError, get_frame_cache
+from app.services.scrub_track import ScrubTrackError, get_or_create_scrub_track
+from app.services.render_cache import get_render_cache
+from app.services.media_ingest import cleared_columns
+from app.services.material_export import MaterialExportError, convert_materials
+from app.services.zip_stream import stream_zip
+from app.services import export_jobs
+from app.services.upload_ingest import UploadTooLargeError, ingest_upload
+from app.services import direct_upload
+from app.services.pagination import InvalidCursorError, cached_count, fetch_page, get_count_cache
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/videos", tags=["videos"])
 
+# 一覧で取得するカラム（レスポンスに使うもののみ）
+# ストーリーボード一覧では draft_metadata（編集中の状態、大きいJSONB）は返さない
+STORYBOARD_LIST_COLUMNS = (
+    "id, user_id, source_image_url, source_image_webp_url, title, theme, status, bgm_track_id, "
+    "custom_bgm_url, final_video_url, hls_master_url, preview_url, total_duration, error_message, "
+    "video_provider, max_scenes, created_at, updated_at"
+)
+STORYBOARD_SCENE_LIST_COLUMNS = (
+    "id, storyboard_id, scene_number, act, description_ja, runway_prompt, camera_work, mood, "
+    "duration_seconds, scene_image_url, scene_image_webp_url, parent_scene_id, sub_scene_order, "
+    "generation_seed, status, progress, video_url, hls_master_url, first_frame_url, last_frame_url, "
+    "poster_url, thumbnail_url, sprite_url, preview_url, media_metadata, runway_task_id, error_message, "
+    "created_at, updated_at"
+)
+SCREENSHOT_LIST_COLUMNS = (
+    "id, user_id, source_video_generation_id, source_storyboard_scene_id, source_user_video_id, "
+    "source_video_url, timestamp_seconds, image_url, width, height, title, created_at"
+)
+# Ad Creatorプロジェクト一覧では project_data（カット情報等）は返さない（詳細APIで取得）
+AD_CREATOR_PROJECT_LIST_COLUMNS = (
+    "id, user_id, title, description, aspect_ratio, target_duration, theory, status, "
+    "thumbnail_url, final_video_url, created_at, updated_at"
+)
+
+
+def _invalid_cursor(e: InvalidCursorError) -> HTTPException:
+    """不正なカーソルは400"""
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
 
 # ===== Act-Two モーションライブラリ用エンドポイント (静的パスは動的パスより先に定義) =====
 
@@ -186,11 +237,6 @@ async def upload_motion_video(
     if not file.content_type or not file.content_type.startswith("video/"):
         raise HTTPException(status_code=400, detail="Only video files are allowed")
 
-    # ファイルサイズ制限（50MB）
-    content = await file.read()
-    if len(content) > 50 * 1024 * 1024:
-        raise HTTPException(status_code=400, detail="File size exceeds 50MB limit")
-
     # 重複チェック
     existing = supabase.table("motions").select("id").eq("id", motion_id).execute()
     if existing.data:
@@ -212,15 +258,10 @@ async def upload_motion_video(
     r2_key = f"motions/{folder}/{motion_id}.mp4"
 
     try:
-        # R2クライアントで直接アップロード
-        from app.external.r2 import get_r2_client
-        r2_client = get_r2_client()
-        r2_client.put_object(
-            Bucket=settings.R2_BUCKET_NAME,
-            Key=r2_key,
-            Body=content,
-            ContentType="video/mp4",
-        )
+        # ファイルサイズ制限（50MB、超過した時点で読み込みを中断）
+        async with ingest_upload(file, 50 * 1024 * 1024, "mp4", name="motion_upload") as upload:
+            # R2にファイルから直接アップロード
+            await upload_local_file(upload.path, r2_key, "video/mp4")
 
         # 公開URL
         motion_url = f"{settings.R2_PUBLIC_URL.rstrip('/')}/{r2_key}"
@@ -253,6 +294,8 @@ async def upload_motion_video(
             "message": f"モーション動画 '{name_ja}' をアップロードしました",
         }
 
+    except UploadTooLargeError:
+        raise HTTPException(status_code=400, detail="File size exceeds 50MB limit")
     except HTTPException:
         raise
     except Exception as e:
@@ -317,41 +360,34 @@ async def delete_motion(
 async def list_concat_videos(
     page: int = 1,
     per_page: int = 10,
+    cursor: str | None = None,
     current_user: dict = Depends(get_current_user),
 ):
-    """結合動画の履歴一覧を取得"""
+    """結合動画の履歴一覧を取得（cursor は前のページの next_cursor）"""
     supabase = get_supabase()
     user_id = current_user["user_id"]
 
-    # 総件数を取得
-    count_response = (
+    query = (
         supabase.table("video_concatenations")
-        .select("id", count="exact")
+        .select(service.CONCAT_LIST_COLUMNS)
         .eq("user_id", user_id)
-        .execute()
-    )
-    total = count_response.count or 0
-
-    # ページネーション付きで取得
-    offset = (page - 1) * per_page
-    response = (
-        supabase.table("video_concatenations")
-        .select("*")
-        .eq("user_id", user_id)
-        .order("created_at", desc=True)
-        .range(offset, offset + per_page - 1)
-        .execute()
     )
+    try:
+        result = fetch_page(query, per_page, cursor=cursor, page=page)
+    except InvalidCursorError as e:
+        raise _invalid_cursor(e)
 
     concatenations = [
-        service._format_concat_response(item) for item in (response.data or [])
+        service._format_concat_response(item) for item in result.rows
     ]
 
     return {
         "concatenations": concatenations,
-        "total": total,
+        "total": cached_count(supabase, "video_concatenations", user_id),
         "page": page,
         "per_page": per_page,
+        "has_next": result.has_next,
+        "next_cursor": result.next_cursor,
     }
 
 
@@ -425,6 +461,7 @@ async def concat_videos(
 
     insert_response = supabase.table("video_concatenations").insert(concat_data).execute()
     concat_record = insert_response.data[0] if insert_response.data else concat_data
+    get_count_cache().adjust("video_concatenations", user_id, 1)
 
     logger.info(f"Created concat job: {concat_id}, videos: {len(video_urls)}, transition: {request.transition}")
 
@@ -512,6 +549,7 @@ async def concat_videos_v2(
 
     insert_response = supabase.table("video_concatenations").insert(concat_data).execute()
     concat_record = insert_response.data[0] if insert_response.data else concat_data
+    get_count_cache().adjust("video_concatenations", user_id, 1)
 
     logger.info(f"Created concat job (v2): {concat_id}, videos: {len(video_urls)}, transition: {request.transition}")
 
@@ -737,7 +775,8 @@ async def download_as_prores(
     動画をProRes形式でダウンロード（オンザフライ変換）
 
     AI生成動画のバンディングを除去し、編集耐性の高いProRes 422 HQ (10bit)に変換。
-    R2には保存せず、一時ファイルとして処理後に削除。
+    変換結果はレンダリングキャッシュ（R2）に保存し、同じ動画・同じパラメータの
+    再エクスポートでは再エンコードせずにキャッシュから返す。
 
     - video_url: 変換元の動画URL（R2上のMP4）
     - deband_strength: デバンド強度（0.5-2.0、デフォルト1.1）
@@ -746,21 +785,16 @@ async def download_as_prores(
     """
     from app.services.ffmpeg_service import get_ffmpeg_service
 
-    # 一時ファイルパス
+    # 一時ファイルパス（レスポンス送信後まで残すため明示的にクリーンアップ）
     task_id = str(uuid.uuid4())
-    temp_dir = tempfile.gettempdir()
-    input_path = os.path.join(temp_dir, f"{task_id}_input.mp4")
-    output_path = os.path.join(temp_dir, f"{task_id}_prores.mov")
+    workspace = get_scratch_space().workspace(f"prores_{task_id}")
+    input_path = workspace.file("input.mp4")
+    output_path = workspace.file("prores.mov")
 
     def cleanup_files():
         """一時ファイルをクリーンアップ"""
-        for path in [input_path, output_path]:
-            try:
-                if os.path.exists(path):
-                    os.remove(path)
-                    logger.info(f"Cleaned up: {path}")
-            except Exception as e:
-                logger.warning(f"Cleanup failed: {path}, {e}")
+        workspace.cleanup()
+        logger.info(f"Cleaned up: {workspace.path}")
 
     try:
         # 1. 動画をダウンロード
@@ -772,35 +806,61 @@ async def download_as_prores(
                 with open(input_path, "wb") as f:
                     f.write(await resp.read())
 
-        # 2. ProRes変換
-        logger.info(f"Converting to ProRes: {input_path}")
+        # 2. ProRes変換（キャッシュにあれば再エンコードしない）
         ffmpeg = get_ffmpeg_service()
-        await ffmpeg.convert_to_prores(
-            video_path=input_path,
+        render_params = request.model_dump()
+
+        async def render(path: str) -> None:
+            logger.info(f"Converting to ProRes: {input_path}")
+            await ffmpeg.convert_to_prores(
+                video_path=input_path,
+                output_path=path,
+                **render_params,
+            )
+            if not os.path.exists(path):
+                raise HTTPException(status_code=500, detail="ProRes変換に失敗しました")
+            workspace.check_quota()
+
+        result = await get_render_cache().get_or_render(
+            operation="convert_to_prores",
+            params=render_params,
+            inputs=[input_path],
+            render=render,
+            ext="mov",
+            content_type="video/quicktime",
             output_path=output_path,
-            deband_strength=request.deband_strength,
-            deband_radius=request.deband_radius,
-            apply_flat_look=request.apply_flat_look,
-            contrast=request.contrast,
-            saturation=request.saturation,
-            brightness=request.brightness,
         )
+        logger.info(f"ProRes conversion completed: {result.size} bytes (cache_hit={result.hit})")
 
-        # 3. ファイルサイズを確認
-        if not os.path.exists(output_path):
-            raise HTTPException(status_code=500, detail="ProRes変換に失敗しました")
+        timestamp = int(time.time())
+        filename = f"prores_{timestamp}.mov"
 
-        file_size = os.path.getsize(output_path)
-        logger.info(f"ProRes conversion completed: {file_size} bytes")
+        if result.hit:
+            # 3a. キャッシュヒット: R2のオブジェクトを中継して返す
+            async def stream_cached():
+                try:
+                    async with aiohttp.ClientSession() as session:
+                        async with session.get(result.url) as resp:
+                            resp.raise_for_status()
+                            async for chunk in resp.content.iter_chunked(1024 * 1024):
+                                yield chunk
+                finally:
+                    cleanup_files()
+
+            return StreamingResponse(
+                stream_cached(),
+                media_type="video/quicktime",
+                headers={
+                    "Content-Disposition": f'attachment; filename="{filename}"',
+                    "Content-Length": str(result.size),
+                },
+            )
 
-        # 4. クリーンアップをバックグラウンドタスクに登録
+        # 3b. クリーンアップをバックグラウンドタスクに登録
         if background_tasks:
             background_tasks.add_task(cleanup_files)
 
-        # 5. ファイルをレスポンスとして返す
-        timestamp = int(time.time())
-        filename = f"prores_{timestamp}.mov"
-
+        # 4. ファイルをレスポンスとして返す
         return FileResponse(
             path=output_path,
             filename=filename,
@@ -819,6 +879,102 @@ async def download_as_prores(
 
 # ===== ストーリーボード（起承転結4シーン）エンドポイント =====
 
+def _sse(event: str, data) -> str:
+    """Server-Sent Events の1イベント分のテキスト"""
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data), ensure_ascii=False)}\n\n"
+
+
+def _sse_response(events) -> StreamingResponse:
+    """SSEのレスポンス（プロキシでバッファリングさせない）"""
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
+def _storyboard_options(request: StoryboardCreateRequest) -> tuple[str, str, list[str]]:
+    """ストーリーボード作成リクエストから (video_provider, aspect_ratio, element_urls) を決定"""
+    # video_providerを決定（指定なければ環境変数のデフォルト値を使用）
+    provider = request.video_provider.value if request.video_provider else settings.VIDEO_PROVIDER.lower()
+    logger.info(f"Using video provider: {provider}")
+
+    # アスペクト比を取得
+    aspect_ratio = request.aspect_ratio.value if request.aspect_ratio else "9:16"
+    logger.info(f"Using aspect ratio: {aspect_ratio}")
+
+    # element_imagesを取得（Kling Elements用）
+    element_urls = [e.image_url for e in request.element_images] if request.element_images else []
+    if element_urls:
+        logger.info(f"Using {len(element_urls)} element images for consistency")
+
+    return provider, aspect_ratio, element_urls
+
+
+async def _save_generated_storyboard(
+    request: StoryboardCreateRequest,
+    user_id: str,
+    provider: str,
+    aspect_ratio: str,
+    element_urls: list[str],
+    storyboard_data: dict,
+) -> dict:
+    """生成した4シーン構成をDBに保存し、ストーリーボードを返す"""
+    supabase = get_supabase()
+    storyboard_id = str(uuid.uuid4())
+
+    # ストーリーボードをDBに保存（video_provider, aspect_ratio, element_imagesも保存）
+    sb_record = {
+        "id": storyboard_id,
+        "user_id": user_id,
+        "source_image_url": request.image_url,
+        "title": storyboard_data.get("title"),
+        "status": "draft",
+        "video_provider": provider,
+        "aspect_ratio": aspect_ratio,
+        "element_images": element_urls,
+    }
+    supabase.table("storyboards").insert(sb_record).execute()
+    get_count_cache().adjust("storyboards", user_id, 1)
+
+    # 4シーンをDBに保存（この段階では画像生成せず、ストーリーとプロンプトのみ）
+    # 画像生成は /generate-images エンドポイントで別途実行
+    scenes_to_insert = []
+
+    for scene in storyboard_data.get("scenes", []):
+        scene_number = scene["scene_number"]
+
+        # シーン1のみ元画像を設定、シーン2-4は画像なし（後で生成）
+        scene_image_url = request.image_url if scene_number == 1 else None
+
+        scene_record = {
+            "id": str(uuid.uuid4()),
+            "storyboard_id": storyboard_id,
+            "scene_number": scene_number,
+            "display_order": scene_number,  # display_order = scene_number for initial creation
+            "act": scene["act"],
+            "description_ja": scene.get("description_ja", ""),
+            "runway_prompt": scene.get("runway_prompt", ""),
+            "camera_work": scene.get("camera_work"),
+            "mood": scene.get("mood"),
+            "scene_image_url": scene_image_url,
+            "status": "pending",
+            "progress": 0,
+        }
+        scenes_to_insert.append(scene_record)
+
+    if scenes_to_insert:
+        supabase.table("storyboard_scenes").insert(scenes_to_insert).execute()
+
+    logger.info(f"Created storyboard {storyboard_id} with {len(scenes_to_insert)} scenes")
+
+    # レスポンスを構築
+    return await _get_storyboard_with_scenes(storyboard_id, user_id)
+
+
 @router.post("/storyboard", response_model=StoryboardResponse, status_code=status.HTTP_201_CREATED)
 async def create_storyboard(
     request: StoryboardCreateRequest,
@@ -831,23 +987,10 @@ async def create_storyboard(
     シーン1（起）は元画像を使用、シーン2-4（承転結）はNano Bananaで画像生成。
     生成後、ユーザーは各シーンを編集してから動画生成を開始できる。
     """
-    supabase = get_supabase()
     user_id = current_user["user_id"]
-    storyboard_id = str(uuid.uuid4())
 
     try:
-        # video_providerを決定（指定なければ環境変数のデフォルト値を使用）
-        provider = request.video_provider.value if request.video_provider else settings.VIDEO_PROVIDER.lower()
-        logger.info(f"Using video provider: {provider}")
-
-        # アスペクト比を取得
-        aspect_ratio = request.aspect_ratio.value if request.aspect_ratio else "9:16"
-        logger.info(f"Using aspect ratio: {aspect_ratio}")
-
-        # element_imagesを取得（Kling Elements用）
-        element_urls = [e.image_url for e in request.element_images] if request.element_images else []
-        if element_urls:
-            logger.info(f"Using {len(element_urls)} element images for consistency")
+        provider, aspect_ratio, element_urls = _storyboard_options(request)
 
         # AIで4シーン構成を生成（プロバイダー別テンプレート適用）
         logger.info(f"Generating storyboard for image: {request.image_url}, mood: {request.mood}, provider: {provider}")
@@ -857,52 +1000,9 @@ async def create_storyboard(
             video_provider=provider
         )
 
-        # ストーリーボードをDBに保存（video_provider, aspect_ratio, element_imagesも保存）
-        sb_record = {
-            "id": storyboard_id,
-            "user_id": user_id,
-            "source_image_url": request.image_url,
-            "title": storyboard_data.get("title"),
-            "status": "draft",
-            "video_provider": provider,
-            "aspect_ratio": aspect_ratio,
-            "element_images": element_urls,
-        }
-        supabase.table("storyboards").insert(sb_record).execute()
-
-        # 4シーンをDBに保存（この段階では画像生成せず、ストーリーとプロンプトのみ）
-        # 画像生成は /generate-images エンドポイントで別途実行
-        scenes_to_insert = []
-
-        for scene in storyboard_data.get("scenes", []):
-            scene_number = scene["scene_number"]
-
-            # シーン1のみ元画像を設定、シーン2-4は画像なし（後で生成）
-            scene_image_url = request.image_url if scene_number == 1 else None
-
-            scene_record = {
-                "id": str(uuid.uuid4()),
-                "storyboard_id": storyboard_id,
-                "scene_number": scene_number,
-                "display_order": scene_number,  # display_order = scene_number for initial creation
-                "act": scene["act"],
-                "description_ja": scene.get("description_ja", ""),
-                "runway_prompt": scene.get("runway_prompt", ""),
-                "camera_work": scene.get("camera_work"),
-                "mood": scene.get("mood"),
-                "scene_image_url": scene_image_url,
-                "status": "pending",
-                "progress": 0,
-            }
-            scenes_to_insert.append(scene_record)
-
-        if scenes_to_insert:
-            supabase.table("storyboard_scenes").insert(scenes_to_insert).execute()
-
-        logger.info(f"Created storyboard {storyboard_id} with {len(scenes_to_insert)} scenes")
-
-        # レスポンスを構築
-        return await _get_storyboard_with_scenes(storyboard_id, user_id)
+        return await _save_generated_storyboard(
+            request, user_id, provider, aspect_ratio, element_urls, storyboard_data
+        )
 
     except Exception as e:
         logger.exception(f"Failed to create storyboard: {e}")
@@ -912,6 +1012,47 @@ async def create_storyboard(
         )
 
 
+@router.post("/storyboard/stream")
+async def create_storyboard_stream(
+    request: StoryboardCreateRequest,
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    画像からストーリーボードを生成（SSEで逐次返す）
+
+    /storyboard と同じ処理で、生成中のシーンを完成した順に返す。
+
+    Events:
+        meta: {"title", "theme"}（タイトル・テーマが確定した時点）
+        scene: 生成されたシーン（完成するたびに）
+        storyboard: DBに保存したストーリーボード（StoryboardResponse と同じ形）
+        error: {"detail"}（保存に失敗した場合）
+    """
+    user_id = current_user["user_id"]
+    provider, aspect_ratio, element_urls = _storyboard_options(request)
+
+    async def events():
+        try:
+            logger.info(f"Streaming storyboard for image: {request.image_url}, mood: {request.mood}, provider: {provider}")
+            async for event, data in stream_4scene_storyboard(
+                request.image_url,
+                mood=request.mood,
+                video_provider=provider
+            ):
+                if event == "done":
+                    storyboard = await _save_generated_storyboard(
+                        request, user_id, provider, aspect_ratio, element_urls, data
+                    )
+                    yield _sse("storyboard", storyboard)
+                else:
+                    yield _sse(event, data)
+        except Exception as e:
+            logger.exception(f"Failed to create storyboard: {e}")
+            yield _sse("error", {"detail": f"ストーリーボードの生成に失敗しました: {str(e)}"})
+
+    return _sse_response(events())
+
+
 async def _generate_scene_image(
     user_id: str,
     storyboard_id: str,
@@ -984,50 +1125,51 @@ Visual requirements:
 async def list_storyboards(
     page: int = 1,
     per_page: int = 10,
+    cursor: str | None = None,
     current_user: dict = Depends(get_current_user),
 ):
-    """ストーリーボード一覧を取得"""
+    """
+    ストーリーボード一覧を取得（cursor は前のページの next_cursor）
+
+    シーンはページ内のストーリーボード分を1回のクエリでまとめて取得する。
+    draft_metadata は含まない（詳細APIで取得）。
+    """
     supabase = get_supabase()
     user_id = current_user["user_id"]
 
-    # 総件数を取得
-    count_response = (
-        supabase.table("storyboards")
-        .select("id", count="exact")
-        .eq("user_id", user_id)
-        .execute()
-    )
-    total = count_response.count or 0
-
-    # ページネーション付きで取得
-    offset = (page - 1) * per_page
-    response = (
+    query = (
         supabase.table("storyboards")
-        .select("*")
+        .select(STORYBOARD_LIST_COLUMNS)
         .eq("user_id", user_id)
-        .order("created_at", desc=True)
-        .range(offset, offset + per_page - 1)
-        .execute()
     )
+    try:
+        result = fetch_page(query, per_page, cursor=cursor, page=page)
+    except InvalidCursorError as e:
+        raise _invalid_cursor(e)
 
-    storyboards = []
-    for sb in response.data or []:
-        # 各ストーリーボードのシーンも取得
+    scenes_by_storyboard: dict[str, list[dict]] = {sb["id"]: [] for sb in result.rows}
+    if scenes_by_storyboard:
         scenes_response = (
             supabase.table("storyboard_scenes")
-            .select("*")
-            .eq("storyboard_id", sb["id"])
+            .select(STORYBOARD_SCENE_LIST_COLUMNS)
+            .in_("storyboard_id", list(scenes_by_storyboard))
             .order("display_order")
             .execute()
         )
-        sb["scenes"] = scenes_response.data or []
-        storyboards.append(sb)
+        for scene in scenes_response.data or []:
+            scenes_by_storyboard[scene["storyboard_id"]].append(scene)
+
+    storyboards = [
+        {**sb, "scenes": scenes_by_storyboard[sb["id"]]} for sb in result.rows
+    ]
 
     return {
         "storyboards": storyboards,
-        "total": total,
+        "total": cached_count(supabase, "storyboards", user_id),
         "page": page,
         "per_page": per_page,
+        "has_next": result.has_next,
+        "next_cursor": result.next_cursor,
     }
 
 
@@ -1218,6 +1360,7 @@ async def translate_scene_description(
             scene_number=request.scene_number,
             video_provider=video_provider,
             scene_act=scene_act,
+            use_cache=not request.regenerate,
         )
         return TranslateSceneResponse(runway_prompt=runway_prompt)
     except Exception as e:
@@ -1603,7 +1746,10 @@ async def add_sub_scene(
     # ※ 動画がない = まだ動画生成前なので、画像は継承せず空で作成
     scene_image_url = None
 
-    if parent_scene.get("video_url"):
+    if parent_scene.get("video_url") and parent_scene.get("last_frame_url"):
+        # 生成完了時に取り込み済みの最終フレームを使用（動画がない場合は前の動画のものなので使わない）
+        scene_image_url = parent_scene["last_frame_url"]
+    elif parent_scene.get("video_url"):
         # 動画生成後にサブシーン追加 → 最終フレームを抽出
         try:
             ffmpeg = get_ffmpeg_service()
@@ -2406,7 +2552,7 @@ async def generate_storyboard_videos(
         else:
             scenes_to_reset.append(scene["id"])
 
-    # 未完了シーンのみリセット
+    # 未完了シーンのみリセット（前の動画の派生アセットも消す）
     for scene_id in scenes_to_reset:
         supabase.table("storyboard_scenes").update({
             "status": "pending",
@@ -2414,6 +2560,7 @@ async def generate_storyboard_videos(
             "video_url": None,
             "runway_task_id": None,
             "error_message": None,
+            **cleared_columns(),
         }).eq("id", scene_id).execute()
 
     scenes_to_generate = len(scenes_to_reset)
@@ -2541,8 +2688,12 @@ async def delete_storyboard(
     if not sb_response.data:
         raise HTTPException(status_code=404, detail="Storyboard not found")
 
+    # 処理中の結合ジョブを停止
+    cancel_ffmpeg_job(storyboard_id)
+
     # CASCADE削除（シーンも自動削除）
     supabase.table("storyboards").delete().eq("id", storyboard_id).execute()
+    get_count_cache().adjust("storyboards", user_id, -1)
     logger.info(f"Deleted storyboard: {storyboard_id}")
 
 
@@ -2596,10 +2747,14 @@ async def create_video(
 async def list_videos(
     page: int = 1,
     per_page: int = 10,
+    cursor: str | None = None,
     current_user: dict = Depends(get_current_user),
 ):
-    """生成履歴を取得"""
-    return await service.get_user_videos(current_user["user_id"], page, per_page)
+    """生成履歴を取得（cursor は前のページの next_cursor）"""
+    try:
+        return await service.get_user_videos(current_user["user_id"], page, per_page, cursor=cursor)
+    except InvalidCursorError as e:
+        raise _invalid_cursor(e)
 
 
 # ===== ユーザーアップロード動画エンドポイント（動的パスより先に定義） =====
@@ -2626,44 +2781,186 @@ async def upload_user_video_endpoint(
             detail="対応していないファイル形式です。MP4またはMOVをアップロードしてください。"
         )
 
-    # ファイルサイズチェック（ストリーミング読み込み）
-    content = await file.read()
-    file_size = len(content)
+    # タイトル自動生成
+    filename = file.filename or "video.mp4"
+    video_title = title or (Path(file.filename).stem if file.filename else "マイ動画")
+    ext = filename.split(".")[-1].lower() if "." in filename else "mp4"
 
-    if file_size > USER_VIDEO_MAX_SIZE_MB * 1024 * 1024:
+    try:
+        # ファイルサイズチェック（ストリーミング読み込み、超過した時点で中断）
+        async with ingest_upload(file, USER_VIDEO_MAX_SIZE_MB * 1024 * 1024, ext, name="user_video_upload") as upload:
+            result = await service_upload_user_video(
+                user_id=current_user["user_id"],
+                video_path=upload.path,
+                file_size=upload.size,
+                filename=filename,
+                mime_type=file.content_type,
+                title=video_title,
+            )
+        return result
+    except UploadTooLargeError:
         raise HTTPException(
             status_code=400,
             detail=f"ファイルサイズが大きすぎます。最大{USER_VIDEO_MAX_SIZE_MB}MBまでアップロード可能です。"
         )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    # タイトル自動生成
-    video_title = title or (Path(file.filename).stem if file.filename else "マイ動画")
 
+# ===== R2直接アップロード（APIを経由せずにR2へアップロード） =====
+
+@router.post("/uploads", response_model=DirectUploadCreateResponse, status_code=status.HTTP_201_CREATED)
+async def create_direct_upload(
+    request: DirectUploadCreateRequest,
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    R2直接アップロード用の署名付きPUT URLを発行
+
+    1. このAPIで署名付きURLを取得し、クライアントからR2へ直接PUTする
+    2. アップロード完了後に POST /uploads/{upload_id}/finalize を呼ぶ
+
+    Content-Type と Content-Length は署名に含まれるため、
+    申告と異なるファイルはR2側で拒否される。
+    """
     try:
-        result = await service_upload_user_video(
-            user_id=current_user["user_id"],
-            content=content,
-            filename=file.filename or "video.mp4",
-            mime_type=file.content_type,
-            title=video_title,
+        ext = direct_upload.validate_upload_request(
+            request.kind, request.filename, request.content_type, request.file_size
         )
-        return result
-    except ValueError as e:
+    except direct_upload.DirectUploadError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+    user_id = current_user["user_id"]
+    r2_key = direct_upload.build_object_key(request.kind, user_id, ext)
+
+    supabase = get_supabase()
+    insert_response = supabase.table(direct_upload.DIRECT_UPLOADS_TABLE).insert({
+        "user_id": user_id,
+        "kind": request.kind.value,
+        "r2_key": r2_key,
+        "filename": request.filename,
+        "content_type": request.content_type,
+        "file_size": request.file_size,
+        "title": request.title,
+        "status": DirectUploadStatus.AWAITING_UPLOAD.value,
+    }).execute()
+
+    if not insert_response.data:
+        raise HTTPException(status_code=500, detail="アップロードの作成に失敗しました")
+
+    upload_url = generate_presigned_put_url(
+        r2_key,
+        content_type=request.content_type,
+        content_length=request.file_size,
+        expires_in=direct_upload.DIRECT_UPLOAD_URL_EXPIRES_IN,
+    )
+
+    return DirectUploadCreateResponse(
+        id=str(insert_response.data[0]["id"]),
+        upload_url=upload_url,
+        headers={
+            "Content-Type": request.content_type,
+            "Cache-Control": "public, max-age=31536000, immutable",
+        },
+        expires_in=direct_upload.DIRECT_UPLOAD_URL_EXPIRES_IN,
+    )
+
+
+def _get_direct_upload(upload_id: str, user_id: str) -> dict:
+    """ユーザーの直接アップロードを取得"""
+    supabase = get_supabase()
+    response = (
+        supabase.table(direct_upload.DIRECT_UPLOADS_TABLE)
+        .select("*")
+        .eq("id", upload_id)
+        .eq("user_id", user_id)
+        .execute()
+    )
+    if not response.data:
+        raise HTTPException(status_code=404, detail="アップロードが見つかりません")
+    return response.data[0]
+
+
+def _direct_upload_response(upload: dict) -> DirectUploadStatusResponse:
+    return DirectUploadStatusResponse(
+        id=str(upload["id"]),
+        kind=upload["kind"],
+        status=upload["status"],
+        error_message=upload.get("error_message"),
+        result=upload.get("result"),
+    )
+
+
+@router.post(
+    "/uploads/{upload_id}/finalize",
+    response_model=DirectUploadStatusResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def finalize_direct_upload(
+    upload_id: str,
+    background_tasks: BackgroundTasks,
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    R2直接アップロードの完了を通知
+
+    検証（動画の長さ・解像度の上限）・プローブ・サムネイル生成をバックグラウンドで行う。
+    結果は GET /uploads/{upload_id} で確認する。
+    一時的なエラーで failed になった場合はオブジェクトが残っているため、再度 finalize できる。
+    """
+    upload = _get_direct_upload(upload_id, current_user["user_id"])
+
+    retryable_statuses = (DirectUploadStatus.AWAITING_UPLOAD.value, DirectUploadStatus.FAILED.value)
+    if upload["status"] not in retryable_statuses:
+        # 二重の finalize は現在の状態をそのまま返す
+        return _direct_upload_response(upload)
+
+    # 読み込んだ時点の状態からのみ processing に遷移（同時の finalize で二重に取り込まない）
+    supabase = get_supabase()
+    update_response = supabase.table(direct_upload.DIRECT_UPLOADS_TABLE).update({
+        "status": DirectUploadStatus.PROCESSING.value,
+        "error_message": None,
+    }).eq("id", upload_id).eq("status", upload["status"]).execute()
+
+    if not update_response.data:
+        return _direct_upload_response(_get_direct_upload(upload_id, current_user["user_id"]))
+
+    from app.tasks.direct_upload_processor import start_direct_upload_processing
+    background_tasks.add_task(start_direct_upload_processing, upload_id)
+
+    return _direct_upload_response({
+        **upload,
+        "status": DirectUploadStatus.PROCESSING.value,
+        "error_message": None,
+    })
+
+
+@router.get("/uploads/{upload_id}", response_model=DirectUploadStatusResponse)
+async def get_direct_upload_status(
+    upload_id: str,
+    current_user: dict = Depends(get_current_user),
+):
+    """R2直接アップロードの取り込みステータスを返す"""
+    return _direct_upload_response(_get_direct_upload(upload_id, current_user["user_id"]))
+
 
 @router.get("/user-videos", response_model=UserVideoListResponse)
 async def list_user_videos(
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
+    cursor: str | None = None,
     current_user: dict = Depends(get_current_user),
 ):
-    """ユーザーアップロード動画一覧を取得"""
-    return await service_get_user_uploaded_videos(
-        user_id=current_user["user_id"],
-        page=page,
-        per_page=per_page,
-    )
+    """ユーザーアップロード動画一覧を取得（cursor は前のページの next_cursor）"""
+    try:
+        return await service_get_user_uploaded_videos(
+            user_id=current_user["user_id"],
+            page=page,
+            per_page=per_page,
+            cursor=cursor,
+        )
+    except InvalidCursorError as e:
+        raise _invalid_cursor(e)
 
 
 @router.delete("/user-videos/{video_id}")
@@ -2883,7 +3180,7 @@ async def get_user_video_upscale_status(
 # ===== スクリーンショット用ヘルパー関数 =====
 
 async def _resolve_video_url(
-    request: ScreenshotCreateRequest,
+    request: ScreenshotSourceRequest,
     user_id: str,
     db
 ) -> str:
@@ -2924,7 +3221,7 @@ async def _resolve_video_url(
     raise HTTPException(status_code=400, detail="Invalid source type")
 
 
-def _get_source_columns(request: ScreenshotCreateRequest) -> dict:
+def _get_source_columns(request: ScreenshotSourceRequest) -> dict:
     """リクエストからDBカラム用のソース情報を生成"""
     if request.source_type == ScreenshotSource.VIDEO_GENERATION:
         return {"source_video_generation_id": request.source_id}
@@ -2969,6 +3266,63 @@ def _db_row_to_response(row: dict) -> ScreenshotResponse:
 
 # ===== スクリーンショットエンドポイント =====
 
+async def _create_screenshots(
+    request: ScreenshotSourceRequest,
+    timestamps: list[float],
+    title: str | None,
+    max_width: int | None,
+    user_id: str,
+) -> tuple[list[ScreenshotResponse], int]:
+    """
+    複数のタイムスタンプのスクリーンショットを作成（単体・バッチ共通）
+
+    フレームは抽出済みフレームキャッシュから取得し、キャッシュにないものだけを
+    1回のFFmpeg実行でまとめて抽出する。ユーザーのスクリーンショットは削除できるため、
+    キャッシュのオブジェクトをR2内でコピーして個別のキーに保存する。
+
+    Returns:
+        tuple[list[ScreenshotResponse], int]: (timestamps と同じ順序のスクリーンショット, キャッシュヒット数)
+    """
+    db = get_supabase()
+
+    # 1. ソース動画URLを解決
+    video_url = await _resolve_video_url(request, user_id, db)
+
+    # 2. フレームを取得（タイムスタンプの範囲チェックを含む）
+    try:
+        frames = await get_frame_cache().get_frames(video_url, timestamps, max_width=max_width)
+    except FrameExtractionError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # 3. ユーザーごとのキーに並列コピー
+    r2_keys = [f"screenshots/{user_id}/{uuid.uuid4()}.jpg" for _ in frames]
+    image_urls = await asyncio.gather(*(
+        copy_object(frame.key, r2_key) for frame, r2_key in zip(frames, r2_keys)
+    ))
+
+    # 4. DBにまとめて保存
+    source_columns = _get_source_columns(request)
+    rows = [
+        {
+            "user_id": user_id,
+            "timestamp_seconds": timestamp,
+            "image_url": image_url,
+            "r2_key": r2_key,
+            "width": frame.width,
+            "height": frame.height,
+            "title": title,
+            **source_columns,
+        }
+        for timestamp, frame, r2_key, image_url in zip(timestamps, frames, r2_keys, image_urls)
+    ]
+    result = db.table("video_screenshots").insert(rows).execute()
+    get_count_cache().adjust("video_screenshots", user_id, len(result.data))
+
+    cache_hits = sum(1 for frame in frames if frame.hit)
+    logger.info(f"Screenshots created: {len(result.data)} for user {user_id} ({cache_hits} cached)")
+    return [_db_row_to_response(row) for row in result.data], cache_hits
+
+
 @router.post("/screenshots", response_model=ScreenshotResponse)
 async def create_screenshot(
     request: ScreenshotCreateRequest,
@@ -2980,104 +3334,94 @@ async def create_screenshot(
     指定したタイムスタンプのフレームを画像として保存し、
     動画生成のソース画像として再利用可能にする。
     """
-    user_id = current_user["user_id"]
-    db = get_supabase()
-    ffmpeg = get_ffmpeg_service()
+    screenshots, _ = await _create_screenshots(
+        request,
+        [request.timestamp_seconds],
+        request.title,
+        None,
+        current_user["user_id"],
+    )
+    return screenshots[0]
 
-    # 1. ソース動画URLを解決
-    video_url = await _resolve_video_url(request, user_id, db)
 
-    # 2. 動画をダウンロード
-    with tempfile.TemporaryDirectory() as tmp_dir:
-        video_path = os.path.join(tmp_dir, "source.mp4")
-        video_content = await download_file(video_url)
-        with open(video_path, "wb") as f:
-            f.write(video_content)
-
-        # 3. タイムスタンプのバリデーション
-        duration = await ffmpeg._get_video_duration(video_path)
-        if duration is None:
-            raise HTTPException(status_code=400, detail="Failed to get video duration")
-        if request.timestamp_seconds > duration:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Timestamp ({request.timestamp_seconds}s) exceeds video duration ({duration:.1f}s)"
-            )
+@router.post("/screenshots/batch", response_model=ScreenshotBatchResponse)
+async def create_screenshots_batch(
+    request: ScreenshotBatchCreateRequest,
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    動画から複数のスクリーンショットを一括抽出
 
-        # 4. フレーム抽出（既存メソッドを使用）
-        image_path = os.path.join(tmp_dir, "screenshot.jpg")
-        await ffmpeg.extract_first_frame(
-            video_path,
-            image_path,
-            offset_seconds=request.timestamp_seconds
-        )
+    動画へのアクセス・プローブ・フレーム抽出を1回にまとめる。
+    抽出済みの (動画, タイムスタンプ, サイズ) はキャッシュから返すため、
+    同じ位置の繰り返しのスクラブではFFmpegを起動しない。
+    """
+    screenshots, cache_hits = await _create_screenshots(
+        request,
+        request.timestamps,
+        request.title,
+        request.max_width,
+        current_user["user_id"],
+    )
+    return ScreenshotBatchResponse(screenshots=screenshots, cache_hits=cache_hits)
 
-        # 5. 画像サイズ取得
-        width, height = await get_image_dimensions(image_path)
 
-        # 6. R2にアップロード
-        r2_key = f"screenshots/{user_id}/{uuid.uuid4()}.jpg"
-        with open(image_path, "rb") as f:
-            image_content = f.read()
+@router.post("/scrub-track", response_model=ScrubTrackResponse)
+async def create_scrub_track(
+    request: ScrubTrackRequest,
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    スクラブ用のスプライトシートとWebVTTサムネイルトラックを取得
 
-        client = get_r2_client()
-        client.put_object(
-            Bucket=settings.R2_BUCKET_NAME,
-            Key=r2_key,
-            Body=image_content,
-            ContentType="image/jpeg",
+    一定間隔のフレームを並べたシート画像と、時間帯ごとのシート内の位置を示すWebVTTを
+    動画の隣に保存する。作成済みの場合は生成せずにURLを返す。
+    エディタのシークバーはシート画像を1回取得するだけでプレビューできる。
+    """
+    try:
+        track = await get_or_create_scrub_track(
+            request.video_url,
+            interval_seconds=request.interval_seconds,
+            image_format=request.image_format,
         )
-        image_url = get_public_url(r2_key)
-
-        # 7. DBに保存
-        data = {
-            "user_id": user_id,
-            "timestamp_seconds": request.timestamp_seconds,
-            "image_url": image_url,
-            "r2_key": r2_key,
-            "width": width,
-            "height": height,
-            "title": request.title,
-            **_get_source_columns(request)
-        }
+    except ScrubTrackError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except FFmpegError as e:
+        logger.error(f"Scrub track generation failed: {e}")
+        raise HTTPException(status_code=500, detail="スプライトシートの作成に失敗しました")
 
-        result = db.table("video_screenshots").insert(data).execute()
-        logger.info(f"Screenshot created: {result.data[0]['id']} for user {user_id}")
-        return _db_row_to_response(result.data[0])
+    return ScrubTrackResponse(**vars(track))
 
 
 @router.get("/screenshots", response_model=ScreenshotListResponse)
 async def list_screenshots(
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
+    cursor: str | None = None,
     current_user: dict = Depends(get_current_user),
 ):
     """
     スクリーンショット一覧を取得
 
     ページネーション付きでユーザーのスクリーンショットを取得する。
-    作成日時の降順でソートされる。
+    作成日時の降順でソートされる。cursor は前のページの next_cursor。
     """
     user_id = current_user["user_id"]
     db = get_supabase()
 
-    # 総数取得
-    count_result = db.table("video_screenshots").select(
-        "*", count="exact"
-    ).eq("user_id", user_id).execute()
-    total = count_result.count or 0
-
-    # ページネーション
-    offset = (page - 1) * per_page
-    result = db.table("video_screenshots").select("*").eq(
-        "user_id", user_id
-    ).order("created_at", desc=True).range(offset, offset + per_page - 1).execute()
+    query = db.table("video_screenshots").select(SCREENSHOT_LIST_COLUMNS).eq("user_id", user_id)
+    try:
+        result = fetch_page(query, per_page, cursor=cursor, page=page)
+    except InvalidCursorError as e:
+        raise _invalid_cursor(e)
 
     return ScreenshotListResponse(
-        screenshots=[_db_row_to_response(row) for row in result.data],
-        total=total,
+        screenshots=[_db_row_to_response(row) for row in result.rows],
+        total=cached_count(db, "video_screenshots", user_id),
         page=page,
         per_page=per_page,
+        has_next=result.has_next,
+        next_cursor=result.next_cursor,
     )
 
 
@@ -3131,6 +3475,7 @@ async def delete_screenshot(
 
     # DBから削除
     db.table("video_screenshots").delete().eq("id", screenshot_id).execute()
+    get_count_cache().adjust("video_screenshots", user_id, -1)
 
     logger.info(f"Screenshot deleted: {screenshot_id} for user {user_id}")
     return {"message": "Screenshot deleted successfully"}
@@ -3225,14 +3570,7 @@ async def upload_video_raw_endpoint(
             detail=f"対応していないファイル形式です。対応形式: {', '.join(allowed_types)}"
         )
 
-    # ファイルサイズチェック（50MB上限）
-    contents = await file.read()
     max_size_mb = 50
-    if len(contents) > max_size_mb * 1024 * 1024:
-        raise HTTPException(
-            status_code=400,
-            detail=f"ファイルサイズが{max_size_mb}MBを超えています"
-        )
 
     # 拡張子を決定
     ext = "mp4"
@@ -3241,58 +3579,51 @@ async def upload_video_raw_endpoint(
     if ext not in ["mp4", "webm", "mov"]:
         ext = "mp4"
 
-    # 一時ファイルに保存してFFmpegで検証
-    temp_video_path = None
-    temp_thumbnail_path = None
     try:
-        with tempfile.NamedTemporaryFile(suffix=f".{ext}", delete=False) as f:
-            f.write(contents)
-            temp_video_path = f.name
-
-        # FFmpegで動画長を取得
-        ffmpeg = get_ffmpeg_service()
-        duration = await ffmpeg._get_video_duration(temp_video_path)
-
-        if duration is None:
-            raise HTTPException(
-                status_code=400,
-                detail="動画の長さを取得できませんでした。破損したファイルの可能性があります"
-            )
+        # スクラッチ領域にストリーミングで書き出し（50MB上限、超過した時点で中断）
+        async with ingest_upload(file, max_size_mb * 1024 * 1024, ext, name="video_raw_upload") as upload:
+            # FFmpegで動画長を取得
+            ffmpeg = get_ffmpeg_service()
+            duration = await ffmpeg._get_video_duration(upload.path)
 
-        # 動画長制限チェック（10秒以下）
-        max_duration = 10.0
-        if duration > max_duration:
-            raise HTTPException(
-                status_code=400,
-                detail=f"動画の長さが{max_duration}秒を超えています（現在: {duration:.1f}秒）"
-            )
+            if duration is None:
+                raise HTTPException(
+                    status_code=400,
+                    detail="動画の長さを取得できませんでした。破損したファイルの可能性があります"
+                )
 
-        # サムネイル生成（最初のフレーム）
-        thumbnail_url = None
-        try:
-            with tempfile.NamedTemporaryFile(suffix=".jpg", delete=False) as f:
-                temp_thumbnail_path = f.name
+            # 動画長制限チェック（10秒以下）
+            max_duration = 10.0
+            if duration > max_duration:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"動画の長さが{max_duration}秒を超えています（現在: {duration:.1f}秒）"
+                )
 
-            await ffmpeg.extract_first_frame(
-                temp_video_path,
-                temp_thumbnail_path,
-                offset_seconds=0.0
-            )
+            # サムネイル生成（最初のフレーム）
+            thumbnail_url = None
+            try:
+                thumbnail_path = upload.workspace.small_file("thumbnail.jpg")
+                await ffmpeg.extract_first_frame(
+                    upload.path,
+                    thumbnail_path,
+                    offset_seconds=0.0
+                )
 
-            # サムネイルをR2にアップロード
-            with open(temp_thumbnail_path, "rb") as f:
-                thumbnail_content = f.read()
+                # サムネイルをR2にアップロード
+                with open(thumbnail_path, "rb") as f:
+                    thumbnail_content = f.read()
 
-            thumbnail_filename = f"{current_user['user_id']}/{uuid.uuid4()}_thumb.jpg"
-            thumbnail_url = await upload_image(thumbnail_content, thumbnail_filename)
-            logger.info(f"Thumbnail generated and uploaded: {thumbnail_filename}")
-        except Exception as e:
-            logger.warning(f"Failed to generate thumbnail: {e}")
-            # サムネイル生成失敗は致命的ではないので続行
+                thumbnail_filename = f"{current_user['user_id']}/{uuid.uuid4()}_thumb.jpg"
+                thumbnail_url = await upload_image(thumbnail_content, thumbnail_filename)
+                logger.info(f"Thumbnail generated and uploaded: {thumbnail_filename}")
+            except Exception as e:
+                logger.warning(f"Failed to generate thumbnail: {e}")
+                # サムネイル生成失敗は致命的ではないので続行
 
-        # R2に動画をアップロード
-        video_filename = f"{current_user['user_id']}/{uuid.uuid4()}.{ext}"
-        video_url = await upload_video(contents, video_filename)
+            # R2に動画をファイルからアップロード
+            video_filename = f"{current_user['user_id']}/{uuid.uuid4()}.{ext}"
+            video_url = await upload_video_file(upload.path, video_filename)
 
         logger.info(f"Video uploaded: {video_filename} for user {current_user['user_id']}, duration: {duration:.1f}s")
 
@@ -3302,6 +3633,11 @@ async def upload_video_raw_endpoint(
             duration=round(duration, 2),
         )
 
+    except UploadTooLargeError:
+        raise HTTPException(
+            status_code=400,
+            detail=f"ファイルサイズが{max_size_mb}MBを超えています"
+        )
     except HTTPException:
         raise
     except Exception as e:
@@ -3310,18 +3646,6 @@ async def upload_video_raw_endpoint(
             status_code=500,
             detail=f"動画のアップロードに失敗しました: {str(e)}"
         )
-    finally:
-        # 一時ファイルをクリーンアップ
-        if temp_video_path and os.path.exists(temp_video_path):
-            try:
-                os.unlink(temp_video_path)
-            except Exception:
-                pass
-        if temp_thumbnail_path and os.path.exists(temp_thumbnail_path):
-            try:
-                os.unlink(temp_thumbnail_path)
-            except Exception:
-                pass
 
 
 @router.post("/upload-bgm", response_model=BGMUploadResponse)
@@ -3331,11 +3655,6 @@ async def upload_bgm_endpoint(
 ):
     """BGM音源をアップロード"""
     try:
-        # ファイルサイズチェック（20MB上限）
-        contents = await file.read()
-        if len(contents) > 20 * 1024 * 1024:
-            raise HTTPException(status_code=400, detail="ファイルサイズが20MBを超えています")
-
         # 拡張子を取得してチェック
         ext = "mp3"
         if file.filename and "." in file.filename:
@@ -3348,17 +3667,21 @@ async def upload_bgm_endpoint(
                 detail=f"対応していないファイル形式です。対応形式: {', '.join(allowed_extensions)}"
             )
 
-        # R2にアップロード
-        filename = f"{current_user['user_id']}/{uuid.uuid4()}.{ext}"
-        bgm_url = await upload_audio(contents, filename)
+        # ファイルサイズチェック（20MB上限、超過した時点で読み込みを中断）
+        async with ingest_upload(file, 20 * 1024 * 1024, ext, name="bgm_upload") as upload:
+            # 音声の長さを取得（取得できない場合はNone）
+            duration_seconds = await get_ffmpeg_service()._get_video_duration(upload.path)
 
-        logger.info(f"BGM uploaded: {filename} for user {current_user['user_id']}")
+            # R2にファイルからアップロード
+            filename = f"{current_user['user_id']}/{uuid.uuid4()}.{ext}"
+            bgm_url = await upload_audio_file(upload.path, filename)
 
-        # TODO: 音声の長さを取得（ffprobeで実装予定）
-        duration_seconds = None
+        logger.info(f"BGM uploaded: {filename} for user {current_user['user_id']}")
 
         return {"bgm_url": bgm_url, "duration_seconds": duration_seconds}
 
+    except UploadTooLargeError:
+        raise HTTPException(status_code=400, detail="ファイルサイズが20MBを超えています")
     except HTTPException:
         raise
     except Exception as e:
@@ -3445,7 +3768,7 @@ async def suggest_stories(
 ):
     """画像からストーリー候補を提案（AI主導モード）"""
     try:
-        suggestions = await suggest_stories_from_image(request.image_url)
+        suggestions = await suggest_stories_from_image(request.image_url, use_cache=not request.regenerate)
         return {"suggestions": suggestions}
     except Exception as e:
         raise HTTPException(
@@ -3454,6 +3777,28 @@ async def suggest_stories(
         )
 
 
+@router.post("/suggest-stories/stream")
+async def suggest_stories_stream(
+    request: StorySuggestRequest,
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    画像からストーリー候補を提案（SSEで逐次返す）
+
+    Events:
+        suggestion: ストーリー候補（完成するたびに）
+        done: {"suggestions"}（StorySuggestResponse と同じ形）
+    """
+    async def events():
+        async for event, data in stream_story_suggestions(request.image_url, use_cache=not request.regenerate):
+            if event == "done":
+                yield _sse("done", {"suggestions": data})
+            else:
+                yield _sse(event, data)
+
+    return _sse_response(events())
+
+
 @router.post("/story/translate", response_model=TranslateStoryPromptResponse)
 async def translate_story_prompt(
     request: TranslateStoryPromptRequest,
@@ -3482,6 +3827,7 @@ async def translate_story_prompt(
             # アニメーションパラメータ（animation選択時のみ）
             animation_category=request.animation_category.value if request.animation_category else None,
             animation_template=request.animation_template.value if request.animation_template else None,
+            use_cache=not request.regenerate,
         )
         return TranslateStoryPromptResponse(english_prompt=english_prompt)
     except Exception as e:
@@ -3568,6 +3914,7 @@ async def create_story_video(
     # DBに保存（レスポンスを取得してcreated_at等を含める）
     insert_response = supabase.table("video_generations").insert(video_data).execute()
     video_record = insert_response.data[0] if insert_response.data else video_data
+    get_count_cache().adjust("video_generations", user_id, 1)
 
     # ユーザーの動画生成カウントを更新
     supabase.rpc("increment_video_count", {"user_id_param": user_id}).execute()
@@ -4537,6 +4884,41 @@ async def generate_ad_script_endpoint(
         )
 
 
+@router.post("/ad-script/generate/stream")
+async def generate_ad_script_stream_endpoint(
+    request: AdScriptGenerateRequest,
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    広告の説明からCM構成（カット割り）を生成（SSEで逐次返す）
+
+    Events:
+        meta: {"theory", "theory_label"}（広告理論が確定した時点）
+        cut: カット（完成するたびに。done のカットと同じID）
+        done: 生成された脚本データ（AdScriptGenerateResponse と同じ形）
+    """
+    logger.info(f"Streaming ad script for user {current_user['user_id']}")
+
+    async def events():
+        async for event, data in stream_ad_script(
+            description=request.description,
+            target_duration=request.target_duration,
+            aspect_ratio=request.aspect_ratio.value,
+        ):
+            if event == "done":
+                logger.info(f"Generated ad script: {data['id']} with {len(data['cuts'])} cuts")
+                data = AdScriptGenerateResponse(
+                    id=data["id"],
+                    theory=data["theory"],
+                    theory_label=data["theory_label"],
+                    total_duration=data["total_duration"],
+                    cuts=data["cuts"],
+                )
+            yield _sse(event, data)
+
+    return _sse_response(events())
+
+
 # ===== FLUX.2 JSONプロンプト変換エンドポイント =====
 
 @router.post("/convert-to-flux-json", response_model=ConvertToFluxJsonResponse)
@@ -4571,6 +4953,7 @@ async def convert_to_flux_json_endpoint(
             description_ja=request.description_ja,
             negative_prompt_ja=request.negative_prompt_ja,
             aspect_ratio=request.aspect_ratio.value,
+            use_cache=not request.regenerate,
         )
 
         return ConvertToFluxJsonResponse(
@@ -4633,6 +5016,7 @@ async def generate_scene_image_endpoint(
             image_provider=request.image_provider.value,
             reference_images=reference_images_data,
             negative_prompt=request.negative_prompt,
+            use_cache=not request.regenerate,
         )
         return GenerateSceneImageResponse(**result)
 
@@ -4703,6 +5087,7 @@ async def generate_image_from_text_endpoint(
             image_provider=request.image_provider.value,
             reference_images=reference_images_data,
             negative_prompt=request.negative_prompt,
+            use_cache=not request.regenerate,
         )
         return GenerateSceneImageResponse(**result)
 
@@ -4915,7 +5300,8 @@ async def export_ad_creator_materials(
     編集用素材をProRes形式でZIPダウンロード
 
     各カットをFull HD ProRes 422 HQに変換し、ZIPファイルとして返却。
-    R2は使用せず、サーバー一時ディレクトリで処理。
+    カットのダウンロード・変換は並行して行い、変換が完了したカットから順に
+    ZIP（無圧縮）としてストリーミングする。R2は使用せず、サーバー一時ディレクトリで処理。
 
     - 解像度: 1920x1080
     - コーデック: ProRes 422 HQ
@@ -4932,104 +5318,230 @@ async def export_ad_creator_materials(
         )
 
     task_id = str(uuid.uuid4())
-    temp_dir = os.path.join(tempfile.gettempdir(), f"materials_{task_id}")
+    workspace = get_scratch_space().workspace(f"materials_{task_id}")
+    logger.info(f"Materials export started: task_id={task_id}, cuts={len(request.cuts)}")
 
+    # カットの並行ダウンロード・変換（完了した順に返る）
+    members = convert_materials(request.cuts, request.aspect_ratio, workspace, job_id=task_id)
+
+    # 最初のカットが揃うまではエラーをHTTPステータスで返せるよう、ここで待つ
     try:
-        os.makedirs(temp_dir, exist_ok=True)
-        logger.info(f"Materials export started: task_id={task_id}, cuts={len(request.cuts)}")
+        first_member = await anext(members)
+    except MaterialExportError as e:
+        await members.aclose()
+        workspace.cleanup()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e),
+        )
+    except BaseException:
+        await members.aclose()
+        workspace.cleanup()
+        raise
 
-        ffmpeg = get_ffmpeg_service()
-        converted_files: list[tuple[str, str]] = []
+    async def zip_members():
+        """変換済みカットを返し、ZIPへの書き込み後に削除（ディスク節約）"""
+        async def all_members():
+            yield first_member
+            async for member in members:
+                yield member
 
-        for cut in request.cuts:
-            try:
-                # 1. 動画ダウンロード
-                input_filename = f"input_{cut.cut_number:02d}.mp4"
-                input_path = os.path.join(temp_dir, input_filename)
-
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(cut.video_url) as resp:
-                        if resp.status != 200:
-                            raise HTTPException(
-                                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                                detail=f"動画ダウンロードに失敗しました: cut_{cut.cut_number:02d}"
-                            )
-                        with open(input_path, "wb") as f:
-                            f.write(await resp.read())
-
-                # 2. ProRes変換
-                # ラベルからファイル名に使えない文字を除去し、最大50文字に制限
-                safe_label = "".join(c for c in cut.label if c.isalnum() or c in "ぁ-んァ-ン一-龯_- ")
-                safe_label = safe_label[:50].rstrip()  # 50文字に制限
-                output_filename = f"{cut.cut_number:02d}_{safe_label}.mov"
-                output_path = os.path.join(temp_dir, output_filename)
-
-                await ffmpeg.convert_to_prores_hd(
-                    input_path=input_path,
-                    output_path=output_path,
-                    trim_start=cut.trim_start,
-                    trim_end=cut.trim_end,
-                    aspect_ratio=request.aspect_ratio,
-                )
+        async for filename, filepath in all_members():
+            yield filename, filepath
+            os.remove(filepath)
 
-                converted_files.append((output_filename, output_path))
-                logger.info(f"Converted: {output_filename}")
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    zip_filename = f"materials_{timestamp}.zip"
 
-                # 入力ファイル削除（ディスク節約）
-                os.remove(input_path)
+    # ZIP（無圧縮）を変換済みのカットから順にストリーミング
+    async def stream_and_cleanup():
+        try:
+            async for chunk in stream_zip(zip_members()):
+                yield chunk
+            logger.info(f"ZIP streamed: {zip_filename}")
+        except MaterialExportError as e:
+            # レスポンス送信開始後のため、ストリームを中断してクライアントに失敗を伝える
+            logger.error(f"Materials export failed during streaming: {e}")
+            raise
+        finally:
+            # クリーンアップ（クライアント切断時は残りの変換もキャンセル）
+            await members.aclose()
+            workspace.cleanup()
+            logger.info(f"Cleanup completed: {workspace.path}")
+
+    return StreamingResponse(
+        stream_and_cleanup(),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": f'attachment; filename="{zip_filename}"',
+        },
+    )
 
-            except HTTPException:
-                raise
-            except Exception as e:
-                logger.exception(f"Failed to process cut {cut.cut_number}: {e}")
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail=f"カット{cut.cut_number}の変換に失敗しました: {str(e)}"
-                )
 
-        # 3. ZIP作成
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        zip_filename = f"materials_{timestamp}.zip"
-        zip_path = os.path.join(temp_dir, zip_filename)
+# ===== エクスポートジョブ（非同期・成果物の再利用/レジューム対応）=====
+
+def _export_job_response(job: dict, reused: bool = False) -> ExportJobResponse:
+    """export_jobs の行をレスポンスに変換"""
+    download_url = None
+    if job["status"] == ExportJobStatus.COMPLETED.value:
+        download_url = f"/api/v1/videos/exports/{job['id']}/download"
+
+    return ExportJobResponse(
+        id=str(job["id"]),
+        kind=job["kind"],
+        status=job["status"],
+        progress=job.get("progress") or 0,
+        error_message=job.get("error_message"),
+        filename=job.get("filename"),
+        file_size=job.get("file_size"),
+        download_url=download_url,
+        expires_at=job.get("expires_at"),
+        reused=reused,
+        created_at=job.get("created_at"),
+    )
 
-        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_STORED) as zf:
-            for filename, filepath in converted_files:
-                zf.write(filepath, filename)
-                # 変換済みファイル削除（ディスク節約）
-                os.remove(filepath)
 
-        logger.info(f"ZIP created: {zip_filename}")
+def _create_export_job(
+    kind: ExportJobKind,
+    params: dict,
+    user_id: str,
+    background_tasks: BackgroundTasks,
+) -> ExportJobResponse:
+    """エクスポートジョブを作成（同一リクエストの実行中・期限内ジョブがあれば再利用）"""
+    supabase = get_supabase()
+    request_hash = export_jobs.export_request_hash(kind.value, params)
 
-        # 4. StreamingResponse で返却
-        async def stream_and_cleanup():
-            try:
-                with open(zip_path, 'rb') as f:
-                    while chunk := f.read(8192):
-                        yield chunk
-            finally:
-                # クリーンアップ
-                shutil.rmtree(temp_dir, ignore_errors=True)
-                logger.info(f"Cleanup completed: {temp_dir}")
-
-        return StreamingResponse(
-            stream_and_cleanup(),
-            media_type="application/zip",
-            headers={
-                "Content-Disposition": f'attachment; filename="{zip_filename}"',
-            },
-        )
+    existing = export_jobs.find_reusable_job(user_id, kind.value, request_hash)
+    if existing:
+        logger.info(f"Reusing export job: {existing['id']} (status={existing['status']})")
+        return _export_job_response(existing, reused=True)
 
-    except HTTPException:
-        shutil.rmtree(temp_dir, ignore_errors=True)
-        raise
-    except Exception as e:
-        shutil.rmtree(temp_dir, ignore_errors=True)
-        logger.exception(f"Materials export failed: {e}")
+    job_data = {
+        "user_id": user_id,
+        "kind": kind.value,
+        "request_hash": request_hash,
+        "params": params,
+        "status": ExportJobStatus.PENDING.value,
+        "progress": 0,
+    }
+    insert_response = supabase.table(export_jobs.EXPORT_JOBS_TABLE).insert(job_data).execute()
+    if not insert_response.data:
+        raise HTTPException(status_code=500, detail="エクスポートジョブの作成に失敗しました")
+
+    job = insert_response.data[0]
+
+    # バックグラウンドタスクで処理開始（期限切れ成果物の掃除も併せて行う）
+    from app.tasks.export_processor import start_export_processing
+    background_tasks.add_task(start_export_processing, job["id"])
+    background_tasks.add_task(export_jobs.expire_export_jobs)
+
+    return _export_job_response(job)
+
+
+@router.post("/exports/materials", response_model=ExportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_materials_export_job(
+    request: MaterialExportRequest,
+    background_tasks: BackgroundTasks,
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    編集用素材（ProRes ZIP）のエクスポートジョブを作成
+
+    変換はバックグラウンドで行い、GET /exports/{job_id} で進捗を確認する。
+    同じカット構成・パラメータのジョブが実行中または保持期限内の場合は、そのジョブを返す。
+    """
+    if not request.cuts:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"素材エクスポートに失敗しました: {str(e)}"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="カットが指定されていません"
+        )
+
+    return _create_export_job(
+        ExportJobKind.MATERIALS,
+        request.model_dump(),
+        current_user["user_id"],
+        background_tasks,
+    )
+
+
+@router.post("/exports/prores", response_model=ExportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_prores_export_job(
+    request: ProResExportRequest,
+    background_tasks: BackgroundTasks,
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    ProRes変換のエクスポートジョブを作成
+
+    成果物は /download/prores と共通のレンダリングキャッシュ（R2）に保存される。
+    """
+    return _create_export_job(
+        ExportJobKind.PRORES,
+        request.model_dump(),
+        current_user["user_id"],
+        background_tasks,
+    )
+
+
+def _get_export_job(job_id: str, user_id: str) -> dict:
+    """ユーザーのエクスポートジョブを取得"""
+    supabase = get_supabase()
+    response = (
+        supabase.table(export_jobs.EXPORT_JOBS_TABLE)
+        .select("*")
+        .eq("id", job_id)
+        .eq("user_id", user_id)
+        .execute()
+    )
+    if not response.data:
+        raise HTTPException(status_code=404, detail="エクスポートジョブが見つかりません")
+    return response.data[0]
+
+
+@router.get("/exports/{job_id}", response_model=ExportJobResponse)
+async def get_export_job_status(
+    job_id: str,
+    current_user: dict = Depends(get_current_user),
+):
+    """エクスポートジョブのステータスを返す"""
+    job = _get_export_job(job_id, current_user["user_id"])
+    if job["status"] == ExportJobStatus.COMPLETED.value and export_jobs.is_job_expired(job):
+        job = {**job, "status": ExportJobStatus.EXPIRED.value}
+    return _export_job_response(job)
+
+
+@router.get("/exports/{job_id}/download")
+async def download_export_artifact(
+    job_id: str,
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    エクスポート成果物をダウンロード
+
+    Rangeリクエストに対応しており、中断したダウンロードを途中から再開できる。
+    R2に保存された成果物は署名付きURLへリダイレクトする。
+    """
+    job = _get_export_job(job_id, current_user["user_id"])
+
+    if job["status"] != ExportJobStatus.COMPLETED.value:
+        raise HTTPException(status_code=409, detail="エクスポートが完了していません")
+    if export_jobs.is_job_expired(job):
+        raise HTTPException(status_code=410, detail="エクスポートの保持期限が切れています")
+
+    if job.get("artifact_storage") == export_jobs.ARTIFACT_STORAGE_R2:
+        return RedirectResponse(
+            export_jobs.artifact_download_url(job["artifact_key"]),
+            status_code=status.HTTP_307_TEMPORARY_REDIRECT,
         )
 
+    path = export_jobs.local_artifact_path(job["artifact_key"])
+    if not os.path.exists(path):
+        raise HTTPException(status_code=410, detail="エクスポートの成果物が見つかりません")
+
+    media_type = "application/zip" if job["kind"] == ExportJobKind.MATERIALS.value else "video/quicktime"
+    # FileResponse は Range / If-Range に対応（206 Partial Content）
+    return FileResponse(path=path, filename=job.get("filename"), media_type=media_type)
+
 
 # ========================================
 # Ad Creator プロジェクト管理 API
@@ -5040,27 +5552,23 @@ async def export_ad_creator_materials(
 async def list_ad_creator_projects(
     page: int = Query(1, ge=1),
     per_page: int = Query(10, ge=1, le=50),
+    cursor: str | None = None,
     current_user: dict = Depends(get_current_user),
 ):
     """
     ユーザーのAd Creatorプロジェクト一覧を取得
+
+    cursor は前のページの next_cursor。project_data は含まない（詳細APIで取得）。
     """
     supabase = get_supabase()
     user_id = current_user["user_id"]
-    offset = (page - 1) * per_page
 
     try:
         # プロジェクト一覧取得
-        projects_result = supabase.table("ad_creator_projects").select("*").eq(
-            "user_id", user_id
-        ).order("created_at", desc=True).range(offset, offset + per_page - 1).execute()
-
-        # 総件数取得
-        count_result = supabase.table("ad_creator_projects").select(
-            "id", count="exact"
-        ).eq("user_id", user_id).execute()
-
-        total = count_result.count if count_result.count else 0
+        query = supabase.table("ad_creator_projects").select(
+            AD_CREATOR_PROJECT_LIST_COLUMNS
+        ).eq("user_id", user_id)
+        projects_result = fetch_page(query, per_page, cursor=cursor, page=page)
 
         projects = [
             AdCreatorProjectResponse(
@@ -5074,20 +5582,23 @@ async def list_ad_creator_projects(
                 status=p["status"],
                 thumbnail_url=p.get("thumbnail_url"),
                 final_video_url=p.get("final_video_url"),
-                project_data=p.get("project_data"),
                 created_at=p["created_at"],
                 updated_at=p["updated_at"],
             )
-            for p in projects_result.data
+            for p in projects_result.rows
         ]
 
         return AdCreatorProjectListResponse(
             projects=projects,
-            total=total,
+            total=cached_count(supabase, "ad_creator_projects", user_id),
             page=page,
             per_page=per_page,
+            has_next=projects_result.has_next,
+            next_cursor=projects_result.next_cursor,
         )
 
+    except InvalidCursorError as e:
+        raise _invalid_cursor(e)
     except Exception as e:
         logger.exception(f"Failed to list ad creator projects: {e}")
         raise HTTPException(
@@ -5169,6 +5680,7 @@ async def create_ad_creator_project(
         }
 
         result = supabase.table("ad_creator_projects").insert(project_data).execute()
+        get_count_cache().adjust("ad_creator_projects", user_id, 1)
 
         if not result.data:
             raise HTTPException(
@@ -5316,6 +5828,7 @@ async def delete_ad_creator_project(
         supabase.table("ad_creator_projects").delete().eq(
             "id", project_id
         ).eq("user_id", user_id).execute()
+        get_count_cache().adjust("ad_creator_projects", user_id, -1)
 
         logger.info(f"Ad Creator project deleted: {project_id}")
 
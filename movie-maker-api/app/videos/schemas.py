@@ -1,7 +1,7 @@
 from pydantic import BaseModel, Field, model_validator, validator
 from datetime import datetime
 from enum import Enum
-from typing import Self, Optional, Literal
+from typing import Annotated, Self, Optional, Literal
 
 
 class VideoStatus(str, Enum):
@@ -215,6 +215,12 @@ class VideoResponse(BaseModel):
     final_video_url: str | None = None
     original_video_url: str | None = None  # 60fps変換前の元動画URL（バージョニング用）
     hls_master_url: str | None = None  # HLS adaptive streaming URL
+    # 生成完了時に作成した派生アセット
+    poster_url: str | None = None
+    thumbnail_url: str | None = None
+    sprite_url: str | None = None
+    preview_url: str | None = None  # 一覧用の2秒ループ（240p H.264 / アニメーションWebP）
+    media_metadata: dict | None = None  # duration, width, height, fps, video_codec, has_audio 等
     error_message: str | None = None
     expires_at: datetime | None = None
     created_at: datetime
@@ -244,6 +250,8 @@ class VideoListResponse(BaseModel):
     total: int
     page: int
     per_page: int
+    has_next: bool = False
+    next_cursor: str | None = None  # 次のページの取得に使う（created_at, id のキーセット）
 
 
 # ===== AI主導ストーリーテリング用スキーマ =====
@@ -251,6 +259,10 @@ class VideoListResponse(BaseModel):
 class StorySuggestRequest(BaseModel):
     """ストーリー提案リクエスト"""
     image_url: str = Field(..., description="分析対象の画像URL")
+    regenerate: bool = Field(
+        default=False,
+        description="前回と同じ入力でも結果を再利用せず生成し直す（再生成・やり直し用）"
+    )
 
 
 class StorySuggestResponse(BaseModel):
@@ -376,6 +388,10 @@ class TranslateStoryPromptRequest(BaseModel):
         default=True,
         description="Act-Twoボディモーション転写（デフォルトtrue）"
     )
+    regenerate: bool = Field(
+        default=False,
+        description="前回と同じ入力でも結果を再利用せず生成し直す（再生成・やり直し用）"
+    )
 
     @model_validator(mode='after')
     def validate_animation_params(self) -> Self:
@@ -557,6 +573,7 @@ class ConcatVideoResponse(BaseModel):
     final_video_url: str | None = None
     hls_master_url: str | None = None  # HLS adaptive streaming URL
     total_duration: float | None = None
+    preview_url: str | None = None  # 一覧用の2秒ループ
     error_message: str | None = None
     created_at: datetime | None = None
     updated_at: datetime | None = None
@@ -582,6 +599,8 @@ class ConcatVideoListResponse(BaseModel):
     total: int
     page: int
     per_page: int
+    has_next: bool = False
+    next_cursor: str | None = None
 
 
 # ===== ストーリーボード（起承転結4シーン）用スキーマ =====
@@ -653,6 +672,14 @@ class StoryboardSceneResponse(StoryboardSceneBase):
     progress: int = 0
     video_url: str | None = None
     hls_master_url: str | None = None  # HLS adaptive streaming URL
+    # 生成完了時に作成した派生アセット
+    first_frame_url: str | None = None
+    last_frame_url: str | None = None
+    poster_url: str | None = None
+    thumbnail_url: str | None = None
+    sprite_url: str | None = None
+    preview_url: str | None = None  # 一覧用の2秒ループ（240p H.264 / アニメーションWebP）
+    media_metadata: dict | None = None  # duration, width, height, fps, video_codec, has_audio 等
     runway_task_id: str | None = None
     error_message: str | None = None
     created_at: datetime | None = None
@@ -709,6 +736,10 @@ class TranslateSceneRequest(BaseModel):
     description_ja: str = Field(..., description="日本語のシーン説明")
     scene_number: int = Field(..., ge=1, description="シーン番号（1以上、新規シーンの場合は任意の正の数）")
     storyboard_id: str | None = Field(None, description="ストーリーボードID（テンプレート取得用）")
+    regenerate: bool = Field(
+        default=False,
+        description="前回と同じ入力でも結果を再利用せず生成し直す（再生成・やり直し用）"
+    )
 
 
 class TranslateSceneResponse(BaseModel):
@@ -792,6 +823,7 @@ class StoryboardResponse(BaseModel):
     custom_bgm_url: str | None = None
     final_video_url: str | None = None
     hls_master_url: str | None = None  # HLS adaptive streaming URL
+    preview_url: str | None = None  # 一覧用の2秒ループ
     total_duration: float | None = None
     error_message: str | None = None
     created_at: datetime | None = None
@@ -810,6 +842,8 @@ class StoryboardListResponse(BaseModel):
     total: int
     page: int
     per_page: int
+    has_next: bool = False
+    next_cursor: str | None = None
 
 
 class StoryboardStatusResponse(BaseModel):
@@ -1246,6 +1280,7 @@ class UserVideoResponse(BaseModel):
     hls_master_url: str | None = None  # HLS adaptive streaming URL
     thumbnail_url: str | None = None
     thumbnail_webp_url: str | None = None
+    preview_url: str | None = None  # 一覧用の2秒ループ
     duration_seconds: float
     width: int
     height: int
@@ -1266,6 +1301,7 @@ class UserVideoListResponse(BaseModel):
     page: int
     per_page: int
     has_next: bool
+    next_cursor: str | None = None
 
 
 # ===== ユーザー動画Topazアップスケール用スキーマ =====
@@ -1328,13 +1364,15 @@ class ScreenshotSource(str, Enum):
     URL = "url"                            # 外部URL
 
 
-class ScreenshotCreateRequest(BaseModel):
-    """スクリーンショット作成リクエスト"""
+# バッチ作成で1回に指定できるタイムスタンプ数
+SCREENSHOT_BATCH_MAX_TIMESTAMPS = 50
+
+
+class ScreenshotSourceRequest(BaseModel):
+    """スクリーンショットのソース指定（単体・バッチ共通）"""
     source_type: ScreenshotSource
     source_id: str | None = Field(None, description="ソースのID（URLの場合は不要）")
     source_url: str | None = Field(None, description="動画URL（source_type=urlの場合のみ）")
-    timestamp_seconds: float = Field(..., ge=0.0, description="抽出位置（秒）")
-    title: str | None = Field(None, max_length=100, description="スクリーンショット名")
 
     @model_validator(mode='after')
     def validate_source(self) -> Self:
@@ -1347,6 +1385,24 @@ class ScreenshotCreateRequest(BaseModel):
         return self
 
 
+class ScreenshotCreateRequest(ScreenshotSourceRequest):
+    """スクリーンショット作成リクエスト"""
+    timestamp_seconds: float = Field(..., ge=0.0, description="抽出位置（秒）")
+    title: str | None = Field(None, max_length=100, description="スクリーンショット名")
+
+
+class ScreenshotBatchCreateRequest(ScreenshotSourceRequest):
+    """スクリーンショット一括作成リクエスト"""
+    timestamps: list[Annotated[float, Field(ge=0.0)]] = Field(
+        ...,
+        min_length=1,
+        max_length=SCREENSHOT_BATCH_MAX_TIMESTAMPS,
+        description="抽出位置（秒）のリスト",
+    )
+    title: str | None = Field(None, max_length=100, description="スクリーンショット名（全件共通）")
+    max_width: int | None = Field(None, ge=16, le=3840, description="最大幅（指定時は縮小、未指定は元のサイズ）")
+
+
 class ScreenshotResponse(BaseModel):
     """スクリーンショットレスポンス"""
     id: str
@@ -1365,12 +1421,41 @@ class ScreenshotResponse(BaseModel):
         from_attributes = True
 
 
+class ScreenshotBatchResponse(BaseModel):
+    """スクリーンショット一括作成レスポンス"""
+    screenshots: list[ScreenshotResponse]  # timestamps と同じ順序
+    cache_hits: int = Field(0, description="抽出済みフレームキャッシュから返した件数")
+
+
 class ScreenshotListResponse(BaseModel):
     """スクリーンショット一覧レスポンス"""
     screenshots: list[ScreenshotResponse]
     total: int
     page: int
     per_page: int
+    has_next: bool = False
+    next_cursor: str | None = None
+
+
+# ===== スクラブ用スプライトシート =====
+
+class ScrubTrackRequest(BaseModel):
+    """スクラブ用スプライトシート + WebVTT作成リクエスト"""
+    video_url: str = Field(..., description="動画URL")
+    interval_seconds: float = Field(1.0, ge=0.25, le=10.0, description="コマの間隔（秒）")
+    image_format: Literal["jpg", "webp"] = Field("jpg", description="シート画像の形式")
+
+
+class ScrubTrackResponse(BaseModel):
+    """スクラブ用スプライトシート + WebVTTレスポンス"""
+    vtt_url: str = Field(..., description="WebVTTサムネイルトラックのURL（キューはシート画像の #xywh= を指す）")
+    sprite_urls: list[str]
+    interval_seconds: float
+    columns: int
+    rows: int
+    tile_width: int
+    tile_height: int
+    cached: bool = Field(False, description="作成済みのトラックを返した場合はtrue")
 
 
 # ===== ストーリーボード一時保存（ドラフト）用スキーマ =====
@@ -1505,6 +1590,10 @@ class GenerateSceneImageRequest(BaseModel):
         max_length=1000,
         description="ネガティブプロンプト（BFL FLUX.2のみ対応）"
     )
+    regenerate: bool = Field(
+        default=False,
+        description="前回と同じ入力でも結果を再利用せず生成し直す（再生成・やり直し用）"
+    )
 
     @model_validator(mode='after')
     def validate_at_least_one_input(self) -> Self:
@@ -1576,6 +1665,10 @@ class ConvertToFluxJsonRequest(BaseModel):
         default=AspectRatio.PORTRAIT,
         description="アスペクト比（構図のヒントに使用）"
     )
+    regenerate: bool = Field(
+        default=False,
+        description="前回と同じ入力でも結果を再利用せず生成し直す（再生成・やり直し用）"
+    )
 
 
 class FluxJsonPreview(BaseModel):
@@ -1714,6 +1807,10 @@ class GenerateImageFromTextRequest(BaseModel):
         max_length=1000,
         description="ネガティブプロンプト（BFL FLUX.2のみ対応）"
     )
+    regenerate: bool = Field(
+        default=False,
+        description="前回と同じ入力でも結果を再利用せず生成し直す（再生成・やり直し用）"
+    )
 
     @model_validator(mode='after')
     def validate_input_provided(self) -> Self:
@@ -1786,6 +1883,42 @@ class MaterialExportRequest(BaseModel):
     aspect_ratio: str = Field(default="16:9", description="アスペクト比 (16:9, 9:16, 1:1)")
 
 
+class ExportJobKind(str, Enum):
+    """エクスポートジョブの種類"""
+    MATERIALS = "materials"  # 編集用素材（ProRes ZIP）
+    PRORES = "prores"        # 単一動画のProRes変換
+
+
+class ExportJobStatus(str, Enum):
+    """エクスポートジョブのステータス"""
+    PENDING = "pending"
+    PROCESSING = "processing"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    EXPIRED = "expired"  # 成果物の保持期限切れ
+
+
+class ProResExportRequest(BaseModel):
+    """ProRes変換エクスポートリクエスト"""
+    video_url: str = Field(..., description="変換元の動画URL")
+    options: ProResConversionRequest = Field(default_factory=ProResConversionRequest)
+
+
+class ExportJobResponse(BaseModel):
+    """エクスポートジョブレスポンス"""
+    id: str
+    kind: ExportJobKind
+    status: ExportJobStatus
+    progress: int = 0
+    error_message: str | None = None
+    filename: str | None = None
+    file_size: int | None = None
+    download_url: str | None = None  # 完了時のみ（Range/レジューム対応）
+    expires_at: datetime | None = None
+    reused: bool = False  # 同一リクエストの既存ジョブを再利用した場合True
+    created_at: datetime | None = None
+
+
 # ========================================
 # Ad Creator プロジェクト管理
 # ========================================
@@ -1846,6 +1979,8 @@ class AdCreatorProjectListResponse(BaseModel):
     total: int
     page: int
     per_page: int
+    has_next: bool = False
+    next_cursor: str | None = None
 
 
 # ===== 動画アップロード用スキーマ =====
@@ -1855,3 +1990,47 @@ class VideoUploadResponse(BaseModel):
     video_url: str = Field(..., description="アップロードされた動画のURL")
     thumbnail_url: Optional[str] = Field(None, description="サムネイルURL")
     duration: Optional[float] = Field(None, description="動画の長さ（秒）")
+
+
+# ===== R2直接アップロード用スキーマ =====
+
+class DirectUploadKind(str, Enum):
+    """直接アップロードの種類"""
+    USER_VIDEO = "user_video"  # ユーザー動画（/upload-video 相当）
+    IMAGE = "image"            # 画像（/upload-image 相当）
+    BGM = "bgm"                # BGM音源（/upload-bgm 相当）
+
+
+class DirectUploadStatus(str, Enum):
+    """直接アップロードのステータス"""
+    AWAITING_UPLOAD = "awaiting_upload"  # クライアントのアップロード待ち
+    PROCESSING = "processing"            # 検証・プローブ・サムネイル生成中
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class DirectUploadCreateRequest(BaseModel):
+    """直接アップロードURL発行リクエスト"""
+    kind: DirectUploadKind
+    filename: str = Field(..., min_length=1, max_length=255, description="元のファイル名")
+    content_type: str = Field(..., description="ファイルのMIMEタイプ")
+    file_size: int = Field(..., gt=0, description="ファイルサイズ（バイト）")
+    title: Optional[str] = Field(None, max_length=255, description="動画タイトル（user_videoのみ）")
+
+
+class DirectUploadCreateResponse(BaseModel):
+    """直接アップロードURL発行レスポンス"""
+    id: str
+    upload_url: str = Field(..., description="R2への署名付きPUT URL")
+    method: str = "PUT"
+    headers: dict[str, str] = Field(..., description="PUT時に付与が必要なヘッダー")
+    expires_in: int = Field(..., description="URLの有効期限（秒）")
+
+
+class DirectUploadStatusResponse(BaseModel):
+    """直接アップロードのステータスレスポンス"""
+    id: str
+    kind: DirectUploadKind
+    status: DirectUploadStatus
+    error_message: Optional[str] = None
+    result: Optional[dict] = Field(None, description="完了時の結果（種類ごとの通常アップロードAPIと同じ形式）")
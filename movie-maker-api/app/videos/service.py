@@ -1,9 +1,29 @@
 from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable
 from uuid import uuid4
 
 from app.core.supabase import get_supabase
 from app.videos.schemas import VideoCreate, VideoStatus, VideoResponse
 from app.external.gemini_client import optimize_prompt
+from app.services.ffmpeg_runner import cancel_ffmpeg_job
+from app.services.pagination import cached_count, fetch_page, get_count_cache
+
+# 一覧で取得するカラム（レスポンスに使うもののみ、プロンプト詳細等の大きいカラムは除外）
+VIDEO_LIST_COLUMNS = (
+    "id, user_id, status, progress, image_urls, original_image_url, user_prompt, optimized_prompt, "
+    "overlay_text, overlay_position, raw_video_url, final_video_url, error_message, expires_at, "
+    "film_grain, use_lut, camera_work, poster_url, thumbnail_url, sprite_url, preview_url, media_metadata, "
+    "created_at, updated_at"
+)
+CONCAT_LIST_COLUMNS = (
+    "id, user_id, status, progress, source_video_ids, transition, transition_duration, "
+    "final_video_url, total_duration, preview_url, error_message, created_at, updated_at"
+)
+USER_VIDEO_LIST_COLUMNS = (
+    "id, user_id, title, description, video_url, hls_master_url, thumbnail_url, thumbnail_webp_url, "
+    "preview_url, duration_seconds, width, height, file_size_bytes, mime_type, upscaled_video_url, "
+    "created_at, updated_at"
+)
 
 
 async def create_video(user_id: str, request: VideoCreate) -> dict:
@@ -20,7 +40,8 @@ async def create_video(user_id: str, request: VideoCreate) -> dict:
             if style_keywords:
                 template_prompt += f" Style: {', '.join(style_keywords)}"
 
-    # プロンプト最適化
+    # プロンプト最適化（同じ入力なら同じ最適化結果で良いためキャッシュを使う。
+    # 動画の生成自体は毎回行うので、作り直しでも別の動画になる）
     combined_prompt = f"{request.prompt}. {template_prompt}" if template_prompt else request.prompt
     optimized_prompt = await optimize_prompt(combined_prompt, request.template_id)
 
@@ -54,6 +75,7 @@ async def create_video(user_id: str, request: VideoCreate) -> dict:
     # DBに挿入
     response = supabase.table("video_generations").insert(video_data).execute()
     video_record = response.data[0]
+    get_count_cache().adjust("video_generations", user_id, 1)
 
     # ユーザーの動画生成カウントを更新
     supabase.rpc("increment_video_count", {"user_id_param": user_id}).execute()
@@ -111,25 +133,27 @@ async def get_video_status(user_id: str, video_id: str) -> dict | None:
     }
 
 
-async def get_user_videos(user_id: str, page: int = 1, per_page: int = 10) -> dict:
-    """ユーザーの動画一覧を取得"""
-    supabase = get_supabase()
+async def get_user_videos(user_id: str, page: int = 1, per_page: int = 10, cursor: str | None = None) -> dict:
+    """
+    ユーザーの動画一覧を取得
 
-    # 総数を取得
-    count_response = supabase.table("video_generations").select("id", count="exact").eq("user_id", user_id).execute()
-    total = count_response.count or 0
+    cursor（前のページの next_cursor）を指定するとキーセットで取得する。
 
-    # ページネーション
-    offset = (page - 1) * per_page
-    response = supabase.table("video_generations").select("*").eq("user_id", user_id).order("created_at", desc=True).range(offset, offset + per_page - 1).execute()
+    Raises:
+        InvalidCursorError: 不正なカーソル
+    """
+    supabase = get_supabase()
 
-    videos = [_format_video_response(v) for v in response.data]
+    query = supabase.table("video_generations").select(VIDEO_LIST_COLUMNS).eq("user_id", user_id)
+    result = fetch_page(query, per_page, cursor=cursor, page=page)
 
     return {
-        "videos": videos,
-        "total": total,
+        "videos": [_format_video_response(v) for v in result.rows],
+        "total": cached_count(supabase, "video_generations", user_id),
         "page": page,
         "per_page": per_page,
+        "has_next": result.has_next,
+        "next_cursor": result.next_cursor,
     }
 
 
@@ -167,9 +191,13 @@ async def delete_video(user_id: str, video_id: str) -> bool:
         logger.info(f"Deleting video_upscales for video {video_id}")
         supabase.table("video_upscales").delete().eq("video_id", video_id).execute()
 
+        # 処理中のFFmpegジョブ（レンダリング・HLS変換）を停止
+        cancel_ffmpeg_job(video_id)
+
         # 削除
         logger.info(f"Deleting video {video_id}")
         supabase.table("video_generations").delete().eq("id", video_id).execute()
+        get_count_cache().adjust("video_generations", user_id, -1)
 
         logger.info(f"Video deleted successfully: {video_id}")
         return True
@@ -179,8 +207,8 @@ async def delete_video(user_id: str, video_id: str) -> bool:
         raise
 
 
-async def update_video_status(video_id: str, status: str, progress: int = None, error_message: str = None, raw_video_url: str = None, final_video_url: str = None) -> None:
-    """動画のステータスを更新（内部用）"""
+async def update_video_status(video_id: str, status: str, progress: int = None, error_message: str = None, raw_video_url: str = None, final_video_url: str = None, derived: dict = None) -> None:
+    """動画のステータスを更新（内部用、derived は派生アセットのカラム）"""
     supabase = get_supabase()
 
     update_data = {"status": status}
@@ -192,6 +220,8 @@ async def update_video_status(video_id: str, status: str, progress: int = None,
         update_data["raw_video_url"] = raw_video_url
     if final_video_url is not None:
         update_data["final_video_url"] = final_video_url
+    if derived:
+        update_data.update(derived)
 
     supabase.table("video_generations").update(update_data).eq("id", video_id).execute()
 
@@ -221,6 +251,11 @@ def _format_video_response(data: dict) -> dict:
         "film_grain": data.get("film_grain"),
         "use_lut": data.get("use_lut"),
         "camera_work": data.get("camera_work"),
+        "poster_url": data.get("poster_url"),
+        "thumbnail_url": data.get("thumbnail_url"),
+        "sprite_url": data.get("sprite_url"),
+        "preview_url": data.get("preview_url"),
+        "media_metadata": data.get("media_metadata"),
     }
 
 
@@ -260,6 +295,7 @@ async def create_story_video(user_id: str, image_url: str, story_text: str, bgm_
     # DBに挿入
     response = supabase.table("video_generations").insert(video_data).execute()
     video_record = response.data[0]
+    get_count_cache().adjust("video_generations", user_id, 1)
 
     # ユーザーの動画生成カウントを更新
     supabase.rpc("increment_video_count", {"user_id_param": user_id}).execute()
@@ -307,6 +343,7 @@ def _format_concat_response(data: dict) -> dict:
         "transition_duration": data.get("transition_duration", 0.5),
         "final_video_url": data.get("final_video_url"),
         "total_duration": data.get("total_duration"),
+        "preview_url": data.get("preview_url"),
         "error_message": data.get("error_message"),
         "created_at": data.get("created_at"),
         "updated_at": data.get("updated_at"),
@@ -323,42 +360,43 @@ USER_VIDEO_MAX_HEIGHT = 2160
 USER_VIDEO_ALLOWED_TYPES = {"video/mp4", "video/quicktime"}
 
 
-async def upload_user_video(
+async def _register_user_video(
     user_id: str,
-    content: bytes,
+    source: str,
+    video_key: str,
+    upload_video: Callable[[], Awaitable[str]],
+    file_size: int,
     filename: str,
     mime_type: str,
     title: str | None = None,
 ) -> dict:
     """
-    ユーザー動画をアップロード
+    動画をFFprobeで検証し、サムネイル・一覧用プレビューを生成してDBに登録
 
-    1. 一時ファイルに保存
-    2. FFprobeでメタデータ取得・バリデーション
-    3. サムネイル生成
-    4. R2にアップロード
-    5. DBに保存
+    Args:
+        source: FFmpegの入力（ローカルパス or 署名付きURL）
+        video_key: 動画のR2キー
+        upload_video: 検証後に動画をR2に配置して公開URLを返す関数
     """
-    import tempfile
-    import os
-    from uuid import uuid4
+    import logging
     from app.services.ffmpeg_service import get_ffmpeg_service
-    from app.external.r2 import upload_user_video as r2_upload_user_video, delete_file
+    from app.services.media_ingest import (
+        PREVIEW_DURATION_SECONDS,
+        PREVIEW_FPS,
+        PREVIEW_HEIGHT,
+        preview_format,
+        preview_start,
+    )
+    from app.services.scratch_space import get_scratch_space
+    from app.external.r2 import upload_user_video_file as r2_upload_user_video_file
 
+    logger = logging.getLogger(__name__)
     supabase = get_supabase()
     ffmpeg_service = get_ffmpeg_service()
 
-    # 拡張子を取得
-    ext = filename.split(".")[-1].lower() if "." in filename else "mp4"
-
-    with tempfile.TemporaryDirectory() as tmp_dir:
-        # 一時ファイルに保存
-        video_path = os.path.join(tmp_dir, f"input.{ext}")
-        with open(video_path, "wb") as f:
-            f.write(content)
-
+    with get_scratch_space().workspace("user_video_thumb") as workspace:
         # メタデータ取得
-        metadata = await ffmpeg_service.get_video_info(video_path)
+        metadata = await ffmpeg_service.get_video_info(source)
 
         # ffprobeのJSON出力から正しく値を取得
         # format.duration は文字列で返される
@@ -387,19 +425,34 @@ async def upload_user_video(
             )
 
         # サムネイル生成
-        thumb_path = os.path.join(tmp_dir, "thumbnail.jpg")
-        await ffmpeg_service.extract_first_frame(video_path, thumb_path)
+        thumb_path = workspace.small_file("thumbnail.jpg")
+        await ffmpeg_service.extract_first_frame(source, thumb_path)
 
         # R2にアップロード
-        video_uuid = str(uuid4())
-        video_key = f"user_videos/{user_id}/{video_uuid}.{ext}"
-        thumb_key = f"user_videos/{user_id}/{video_uuid}_thumb.jpg"
-
-        video_url = await r2_upload_user_video(content, video_key, mime_type)
-
-        with open(thumb_path, "rb") as f:
-            thumb_content = f.read()
-        thumb_url = await r2_upload_user_video(thumb_content, thumb_key, "image/jpeg")
+        thumb_key = f"{video_key.rsplit('.', 1)[0]}_thumb.jpg"
+        video_url = await upload_video()
+        thumb_url = await r2_upload_user_video_file(thumb_path, thumb_key, "image/jpeg")
+
+        # 一覧用プレビュー（補助的なものなので失敗しても登録は続ける）
+        preview_url = None
+        try:
+            fmt = preview_format()
+            preview_path = workspace.file(f"preview.{fmt}")
+            await ffmpeg_service.create_preview_clip(
+                source,
+                preview_path,
+                start=preview_start(duration),
+                duration=PREVIEW_DURATION_SECONDS,
+                height=PREVIEW_HEIGHT,
+                fps=PREVIEW_FPS,
+            )
+            preview_url = await r2_upload_user_video_file(
+                preview_path,
+                f"{video_key.rsplit('.', 1)[0]}_preview.{fmt}",
+                "image/webp" if fmt == "webp" else "video/mp4",
+            )
+        except Exception as e:
+            logger.warning(f"Preview generation failed for {video_key}: {e}")
 
         # DBに保存
         result = supabase.table("user_videos").insert({
@@ -408,43 +461,107 @@ async def upload_user_video(
             "r2_key": video_key,
             "video_url": video_url,
             "thumbnail_url": thumb_url,
+            "preview_url": preview_url,
             "duration_seconds": duration,
             "width": width,
             "height": height,
-            "file_size_bytes": len(content),
+            "file_size_bytes": file_size,
             "mime_type": mime_type,
         }).execute()
+        get_count_cache().adjust("user_videos", user_id, 1)
 
         return _format_user_video_response(result.data[0])
 
 
+async def upload_user_video(
+    user_id: str,
+    video_path: str,
+    file_size: int,
+    filename: str,
+    mime_type: str,
+    title: str | None = None,
+) -> dict:
+    """
+    ユーザー動画をアップロード
+
+    1. FFprobeでメタデータ取得・バリデーション（取り込み済みのファイルから）
+    2. サムネイル生成
+    3. R2にアップロード（ファイルから送信）
+    4. DBに保存
+    """
+    from app.external.r2 import upload_user_video_file as r2_upload_user_video_file
+
+    # 拡張子を取得
+    ext = filename.split(".")[-1].lower() if "." in filename else "mp4"
+    video_key = f"user_videos/{user_id}/{uuid4()}.{ext}"
+
+    return await _register_user_video(
+        user_id=user_id,
+        source=video_path,
+        video_key=video_key,
+        upload_video=lambda: r2_upload_user_video_file(video_path, video_key, mime_type),
+        file_size=file_size,
+        filename=filename,
+        mime_type=mime_type,
+        title=title,
+    )
+
+
+async def register_direct_user_video(
+    user_id: str,
+    video_key: str,
+    file_size: int,
+    filename: str,
+    mime_type: str,
+    title: str | None = None,
+) -> dict:
+    """
+    クライアントがR2に直接アップロードしたユーザー動画を登録
+
+    動画はダウンロードせず、署名付きURLに対してFFprobe・サムネイル生成を行う
+    （FFmpegはHTTP Rangeで必要な部分だけを読む）。
+    """
+    from app.external.r2 import generate_presigned_url, get_public_url
+
+    async def already_uploaded() -> str:
+        return get_public_url(video_key)
+
+    return await _register_user_video(
+        user_id=user_id,
+        source=generate_presigned_url(video_key),
+        video_key=video_key,
+        upload_video=already_uploaded,
+        file_size=file_size,
+        filename=filename,
+        mime_type=mime_type,
+        title=title,
+    )
+
+
 async def get_user_uploaded_videos(
     user_id: str,
     page: int = 1,
     per_page: int = 20,
+    cursor: str | None = None,
 ) -> dict:
-    """ユーザーアップロード動画一覧を取得"""
-    supabase = get_supabase()
-    offset = (page - 1) * per_page
+    """
+    ユーザーアップロード動画一覧を取得
 
-    # 総数を取得
-    count_result = supabase.table("user_videos").select("*", count="exact").eq("user_id", user_id).execute()
-    total = count_result.count or 0
+    Raises:
+        InvalidCursorError: 不正なカーソル
+    """
+    supabase = get_supabase()
 
-    # ページネーション付きで取得
-    result = supabase.table("user_videos") \
-        .select("*") \
-        .eq("user_id", user_id) \
-        .order("created_at", desc=True) \
-        .range(offset, offset + per_page - 1) \
-        .execute()
+    query = supabase.table("user_videos").select(USER_VIDEO_LIST_COLUMNS).eq("user_id", user_id)
+    result = fetch_page(query, per_page, cursor=cursor, page=page)
 
     return {
-        "videos": [_format_user_video_response(v) for v in result.data],
-        "total": total,
+        "videos": [_format_user_video_response(v) for v in result.rows],
+        "total": cached_count(supabase, "user_videos", user_id),
         "page": page,
         "per_page": per_page,
-        "has_next": offset + per_page < total,
+        "has_next": result.has_next,
+        "next_cursor": result.next_cursor,
     }
 
 
@@ -453,13 +570,13 @@ async def delete_user_uploaded_video(
     video_id: str,
 ) -> bool:
     """ユーザーアップロード動画を削除（R2 + DB）"""
-    from app.external.r2 import delete_file
+    from app.external.r2 import delete_file, key_from_public_url
 
     supabase = get_supabase()
 
     # 動画情報を取得
     result = supabase.table("user_videos") \
-        .select("r2_key") \
+        .select("r2_key, preview_url") \
         .eq("id", video_id) \
         .eq("user_id", user_id) \
         .execute()
@@ -469,14 +586,22 @@ async def delete_user_uploaded_video(
 
     r2_key = result.data[0]["r2_key"]
 
+    # 処理中のFFmpegジョブ（HLS変換等）を停止
+    cancel_ffmpeg_job(video_id)
+
     # R2から削除
     await delete_file(r2_key)
     # サムネイルも削除
     thumb_key = r2_key.rsplit(".", 1)[0] + "_thumb.jpg"
     await delete_file(thumb_key)
+    # 一覧用プレビューも削除
+    preview_key = key_from_public_url(result.data[0].get("preview_url") or "")
+    if preview_key:
+        await delete_file(preview_key)
 
     # DBから削除
     supabase.table("user_videos").delete().eq("id", video_id).eq("user_id", user_id).execute()
+    get_count_cache().adjust("user_videos", user_id, -1)
 
     return True
 
@@ -490,6 +615,7 @@ def _format_user_video_response(data: dict) -> dict:
         "description": data.get("description"),
         "video_url": data["video_url"],
         "thumbnail_url": data.get("thumbnail_url"),
+        "preview_url": data.get("preview_url"),
         "duration_seconds": data["duration_seconds"],
         "width": data["width"],
         "height": data["height"],
@@ -515,9 +641,10 @@ async def get_image_dimensions(image_path: str) -> tuple[int | None, int | None]
     Returns:
         tuple[int | None, int | None]: (width, height) 取得できない場合は (None, None)
     """
-    import asyncio
     import logging
 
+    from app.services.ffmpeg_scheduler import FFmpegJobClass, get_ffmpeg_scheduler
+
     logger = logging.getLogger(__name__)
 
     cmd = [
@@ -529,14 +656,11 @@ async def get_image_dimensions(image_path: str) -> tuple[int | None, int | None]
     ]
 
     try:
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
+        returncode, stdout, stderr = await get_ffmpeg_scheduler().run(
+            cmd, FFmpegJobClass.INTERACTIVE
         )
-        stdout, stderr = await process.communicate()
 
-        if process.returncode == 0 and stdout:
+        if returncode == 0 and stdout:
             parts = stdout.decode().strip().split(",")
             if len(parts) >= 2:
                 return int(parts[0]), int(parts[1])
@@ -605,7 +729,8 @@ async def generate_scene_image(
     aspect_ratio: str = "9:16",
     image_provider: str = "nanobanana",
     reference_images: list[dict] | None = None,
-    negative_prompt: str | None = None
+    negative_prompt: str | None = None,
+    use_cache: bool = True,
 ) -> dict:
     """
     脚本（とオプションでセリフ）からシーン画像を生成
@@ -620,6 +745,7 @@ async def generate_scene_image(
             - BFL FLUX.2: 最大8枚
             [{"url": "...", "purpose": "character"}, ...]
         negative_prompt: ネガティブプロンプト（BFL FLUX.2のみ対応）
+        use_cache: 同じ入力のプロンプト生成結果を再利用する（再生成時は False）
 
     Returns:
         dict: {
@@ -716,7 +842,8 @@ async def generate_scene_image(
     prompt_ja, prompt_en = await generate_image_prompt_from_scene(
         description_ja=description_ja,
         dialogue=dialogue,
-        aspect_ratio=aspect_ratio
+        aspect_ratio=aspect_ratio,
+        use_cache=use_cache,
     )
     logger.info(f"Generated prompt: {prompt_en[:100]}...")
 
@@ -812,7 +939,8 @@ async def generate_image_from_text(
     aspect_ratio: str = "9:16",
     image_provider: str = "nanobanana",
     reference_images: list[dict] | None = None,
-    negative_prompt: str | None = None
+    negative_prompt: str | None = None,
+    use_cache: bool = True,
 ) -> dict:
     """
     構造化テキスト入力またはフリーテキストからシーン画像を生成（Text-to-Image）
@@ -835,6 +963,7 @@ async def generate_image_from_text(
             - Nano Banana: 最大3枚（掛け合わせ生成）
             - BFL FLUX.2: 最大8枚
             [{"url": "...", "purpose": "character"}, ...]
+        use_cache: 同じ入力のプロンプト生成結果を再利用する（再生成時は False）
 
     Note:
         structured_input または free_text_description のどちらかは必須
@@ -952,7 +1081,8 @@ async def generate_image_from_text(
             dialogue=None,
             aspect_ratio=aspect_ratio,
             structured_input=translated_input,
-            reference_image_url=reference_image_url
+            reference_image_url=reference_image_url,
+            use_cache=use_cache,
         )
     else:
         # フリーテキストモード
@@ -964,7 +1094,8 @@ async def generate_image_from_text(
             dialogue=None,
             aspect_ratio=aspect_ratio,
             structured_input=None,
-            reference_image_url=reference_image_url
+            reference_image_url=reference_image_url,
+            use_cache=use_cache,
         )
 
     logger.info(f"Generated prompt: {prompt_en[:100]}...")
@@ -1,7 +1,10 @@
 """
 共通テストフィクスチャ
 """
+import io
+
 import pytest
+from botocore.exceptions import ClientError
 from fastapi.testclient import TestClient
 from unittest.mock import patch, MagicMock
 
@@ -19,6 +22,88 @@ MOCK_USER = {
 }
 
 
+@pytest.fixture(autouse=True)
+def clear_count_cache():
+    """一覧の件数キャッシュをテストごとに破棄"""
+    from app.services.pagination import get_count_cache
+
+    get_count_cache().clear()
+    yield
+    get_count_cache().clear()
+
+
+@pytest.fixture(autouse=True)
+def disable_llm_cache():
+    """LLM応答・画像分析キャッシュを無効化（テスト間で結果を共有せず、R2にもアクセスしない）"""
+    from app.services.llm_cache import get_llm_cache
+    from app.services.vision_cache import get_vision_cache
+
+    with patch.object(get_llm_cache(), "enabled", False), \
+         patch.object(get_vision_cache(), "enabled", False):
+        yield
+
+
+class FakeR2:
+    """
+    メモリ上のR2クライアント代替（head_object / get_object / put_object / upload_file）
+
+    objects はキー → {"Body", "ContentType", "CacheControl", "Metadata"}。
+    """
+
+    def __init__(self):
+        self.objects: dict[str, dict] = {}
+        self.gets = 0
+        self.puts = 0
+        self.uploads = 0
+
+    def head_object(self, Bucket, Key):
+        if Key not in self.objects:
+            raise ClientError({"Error": {"Code": "404"}}, "HeadObject")
+        obj = self.objects[Key]
+        return {
+            "ContentLength": len(obj["Body"]),
+            "ContentType": obj["ContentType"],
+            "Metadata": obj["Metadata"],
+        }
+
+    def get_object(self, Bucket, Key):
+        self.gets += 1
+        if Key not in self.objects:
+            raise ClientError({"Error": {"Code": "NoSuchKey"}}, "GetObject")
+        obj = self.objects[Key]
+        return {
+            "Body": io.BytesIO(obj["Body"]),
+            "ContentLength": len(obj["Body"]),
+            "ContentType": obj["ContentType"],
+            "Metadata": obj["Metadata"],
+        }
+
+    def put_object(self, Bucket, Key, Body, ContentType=None, CacheControl=None, Metadata=None):
+        self.puts += 1
+        self._store(Key, Body, ContentType, CacheControl, Metadata)
+
+    def upload_file(self, path, bucket, key, ExtraArgs=None):
+        self.uploads += 1
+        extra = ExtraArgs or {}
+        with open(path, "rb") as f:
+            body = f.read()
+        self._store(key, body, extra.get("ContentType"), extra.get("CacheControl"), extra.get("Metadata"))
+
+    def _store(self, key, body, content_type, cache_control, metadata):
+        self.objects[key] = {
+            "Body": body,
+            "ContentType": content_type,
+            "CacheControl": cache_control,
+            "Metadata": metadata or {},
+        }
+
+
+@pytest.fixture
+def fake_r2():
+    """メモリ上のR2（各テストモジュールで自分の get_r2_client をパッチして使う）"""
+    return FakeR2()
+
+
 @pytest.fixture
 def client():
     """TestClient フィクスチャ"""
@@ -0,0 +1,235 @@
+"""
+Gemini非同期ゲートウェイのテスト
+"""
+import asyncio
+import threading
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+from google.genai import errors
+
+from app.external.gemini_gateway import GeminiGateway, GeminiTimeoutError
+
+
+def _gateway(**kwargs) -> GeminiGateway:
+    options = dict(
+        api_key="test-key",
+        max_concurrency=2,
+        image_max_concurrency=1,
+        timeout_seconds=5.0,
+        image_timeout_seconds=5.0,
+        max_retries=2,
+    )
+    options.update(kwargs)
+    return GeminiGateway(**options)
+
+
+@pytest.fixture
+def genai_client():
+    """client.aio.models.generate_content を持つクライアントのモック"""
+    client = MagicMock()
+    client.aio.models.generate_content = AsyncMock(return_value=MagicMock(text="ok"))
+    client.aio.aclose = AsyncMock()
+    with patch("app.external.gemini_gateway.genai.Client", return_value=client) as factory, \
+         patch("app.external.gemini_gateway.RETRY_BASE_SECONDS", 0.0):
+        yield client, factory
+
+
+class TestGeminiGateway:
+    """GeminiGatewayのテスト"""
+
+    @pytest.mark.asyncio
+    async def test_shares_one_async_client(self, genai_client):
+        """非同期クライアントを1つだけ作成して使い回す"""
+        client, factory = genai_client
+        gateway = _gateway()
+
+        await gateway.generate_content(model="gemini-2.0-flash", contents="a")
+        response = await gateway.generate_content(model="gemini-2.0-flash", contents="b")
+
+        assert response.text == "ok"
+        assert factory.call_count == 1
+        assert client.aio.models.generate_content.await_count == 2
+        assert gateway.stats()["models"]["gemini-2.0-flash"]["calls"] == 2
+
+    @pytest.mark.asyncio
+    async def test_retries_transient_errors(self, genai_client):
+        """429・5xxは再試行する"""
+        client, _ = genai_client
+        client.aio.models.generate_content.side_effect = [
+            errors.ServerError(503, {"error": {"message": "unavailable"}}),
+            MagicMock(text="ok"),
+        ]
+        gateway = _gateway()
+
+        response = await gateway.generate_content(model="gemini-2.0-flash", contents="a")
+
+        assert response.text == "ok"
+        assert gateway.stats()["models"]["gemini-2.0-flash"]["retries"] == 1
+
+    @pytest.mark.asyncio
+    async def test_does_not_retry_client_errors(self, genai_client):
+        """リクエスト自体の誤り（400等）は再試行しない"""
+        client, _ = genai_client
+        client.aio.models.generate_content.side_effect = errors.ClientError(
+            400, {"error": {"message": "bad request"}}
+        )
+        gateway = _gateway()
+
+        with pytest.raises(errors.ClientError):
+            await gateway.generate_content(model="gemini-2.0-flash", contents="a")
+
+        assert client.aio.models.generate_content.await_count == 1
+        assert gateway.stats()["models"]["gemini-2.0-flash"]["errors"] == 1
+
+    @pytest.mark.asyncio
+    async def test_deadline(self, genai_client):
+        """期限内に応答がない場合はGeminiTimeoutError"""
+        client, _ = genai_client
+
+        async def hang(**kwargs):
+            await asyncio.sleep(10)
+
+        client.aio.models.generate_content.side_effect = hang
+        gateway = _gateway(timeout_seconds=0.05)
+
+        with pytest.raises(GeminiTimeoutError):
+            await gateway.generate_content(model="gemini-2.0-flash", contents="a")
+
+        assert gateway.stats()["models"]["gemini-2.0-flash"]["timeouts"] == 1
+
+    @pytest.mark.asyncio
+    async def test_limits_concurrency_per_model(self, genai_client):
+        """モデルごとに同時実行数を制限する（画像生成モデルは別枠）"""
+        client, _ = genai_client
+        running = {"now": 0, "peak": 0}
+
+        async def slow(**kwargs):
+            running["now"] += 1
+            running["peak"] = max(running["peak"], running["now"])
+            await asyncio.sleep(0.01)
+            running["now"] -= 1
+            return MagicMock(text="ok")
+
+        client.aio.models.generate_content.side_effect = slow
+        gateway = _gateway()
+
+        await asyncio.gather(*(
+            gateway.generate_content(model="gemini-3-pro-image-preview", contents="a")
+            for _ in range(4)
+        ))
+        assert running["peak"] == 1
+
+        running["peak"] = 0
+        await asyncio.gather(*(
+            gateway.generate_content(model="gemini-2.0-flash", contents="a")
+            for _ in range(4)
+        ))
+        assert running["peak"] == 2
+
+    @pytest.mark.asyncio
+    async def test_retries_connection_errors(self, genai_client):
+        """httpxの接続エラーも一時的なエラーとして再試行する"""
+        client, _ = genai_client
+        client.aio.models.generate_content.side_effect = [
+            httpx.ConnectError("connection refused"),
+            MagicMock(text="ok"),
+        ]
+        gateway = _gateway()
+
+        response = await gateway.generate_content(model="gemini-2.0-flash", contents="a")
+
+        assert response.text == "ok"
+        assert gateway.stats()["models"]["gemini-2.0-flash"]["retries"] == 1
+
+    def test_client_per_loop_closed_with_loop(self, genai_client):
+        """asyncio.run ごとにクライアントを作り、そのループの終了時に閉じる"""
+        client, factory = genai_client
+        gateway = _gateway()
+
+        for _ in range(2):
+            asyncio.run(gateway.generate_content(model="gemini-2.0-flash", contents="a"))
+
+        assert factory.call_count == 2
+        assert client.aio.aclose.await_count == 2
+        assert gateway._clients == {}
+
+    def test_limit_shared_across_event_loops(self, genai_client):
+        """同時実行数の上限は別スレッドのイベントループとも共有する"""
+        client, _ = genai_client
+        lock = threading.Lock()
+        running = {"now": 0, "peak": 0}
+
+        async def slow(**kwargs):
+            with lock:
+                running["now"] += 1
+                running["peak"] = max(running["peak"], running["now"])
+            await asyncio.sleep(0.05)
+            with lock:
+                running["now"] -= 1
+            return MagicMock(text="ok")
+
+        client.aio.models.generate_content.side_effect = slow
+        gateway = _gateway()
+
+        def worker():
+            asyncio.run(gateway.generate_content(model="gemini-3-pro-image-preview", contents="a"))
+
+        threads = [threading.Thread(target=worker) for _ in range(3)]
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=5)
+
+        assert running["peak"] == 1
+        assert time.monotonic() - started >= 0.15
+
+
+def _stream(*texts):
+    async def chunks():
+        for text in texts:
+            yield MagicMock(text=text, candidates=[MagicMock()])
+
+    return chunks()
+
+
+class TestGeminiGatewayStream:
+    """GeminiGateway.generate_content_streamのテスト"""
+
+    @pytest.mark.asyncio
+    async def test_yields_text_chunks(self, genai_client):
+        """生成されたテキストを順に返す"""
+        client, _ = genai_client
+        client.aio.models.generate_content_stream = AsyncMock(return_value=_stream('{"a": ', "1}"))
+        gateway = _gateway()
+
+        chunks = [chunk async for chunk in gateway.generate_content_stream(model="gemini-2.0-flash", contents="a")]
+
+        assert chunks == ['{"a": ', "1}"]
+        assert gateway.stats()["models"]["gemini-2.0-flash"]["calls"] == 1
+
+    @pytest.mark.asyncio
+    async def test_retries_only_before_first_chunk(self, genai_client):
+        """最初のチャンクより前のエラーは再試行し、途中のエラーは再試行しない"""
+        client, _ = genai_client
+
+        async def broken():
+            yield MagicMock(text="partial", candidates=[MagicMock()])
+            raise errors.ServerError(503, {"error": {"message": "unavailable"}})
+
+        client.aio.models.generate_content_stream = AsyncMock(side_effect=[
+            errors.ServerError(503, {"error": {"message": "unavailable"}}),
+            broken(),
+        ])
+        gateway = _gateway()
+
+        chunks = []
+        with pytest.raises(errors.ServerError):
+            async for chunk in gateway.generate_content_stream(model="gemini-2.0-flash", contents="a"):
+                chunks.append(chunk)
+
+        assert chunks == ["partial"]
+        assert client.aio.models.generate_content_stream.await_count == 2
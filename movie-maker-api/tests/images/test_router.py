@@ -0,0 +1,71 @@
+"""
+画像バリアントAPIのテスト
+"""
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from PIL import Image
+
+from app.services.image_variants import ImageFormat, ImageSourceNotFoundError, ImageVariant
+
+VARIANT = ImageVariant(
+    key="images/variants/v1/images/a.png/256w_q60.avif",
+    url="https://cdn.example.com/images/variants/v1/images/a.png/256w_q60.avif",
+    format=ImageFormat.AVIF,
+    hit=True,
+)
+
+
+def _service(**kwargs) -> MagicMock:
+    service = MagicMock()
+    service.get_variant = AsyncMock(**kwargs)
+    return service
+
+
+class TestGetImageVariant:
+    """GET /images/variant のテスト"""
+
+    def test_redirects_to_variant(self, client):
+        """Acceptヘッダーから形式を選び、R2の公開URLへリダイレクト"""
+        service = _service(return_value=VARIANT)
+
+        with patch("app.images.router.get_image_variant_service", return_value=service):
+            response = client.get(
+                "/api/v1/images/variant",
+                params={"key": "images/a.png", "w": 200},
+                headers={"Accept": "image/avif,image/webp,*/*"},
+                follow_redirects=False,
+            )
+
+        assert response.status_code == 302
+        assert response.headers["location"] == VARIANT.url
+        assert "Accept" in response.headers["vary"]
+        assert "immutable" in response.headers["cache-control"]
+        service.get_variant.assert_awaited_once_with(
+            "images/a.png", width=200, image_format=ImageFormat.AVIF, quality=None
+        )
+
+    def test_missing_source_is_404(self, client):
+        """元画像が存在しない場合は404"""
+        service = _service(side_effect=ImageSourceNotFoundError("Image not found"))
+
+        with patch("app.images.router.get_image_variant_service", return_value=service):
+            response = client.get(
+                "/api/v1/images/variant",
+                params={"key": "images/missing.png", "format": "jpeg"},
+                follow_redirects=False,
+            )
+
+        assert response.status_code == 404
+
+    def test_decompression_bomb_is_400(self, client):
+        """ピクセル数が上限を超える画像は400"""
+        service = _service(side_effect=Image.DecompressionBombError("Image size exceeds limit"))
+
+        with patch("app.images.router.get_image_variant_service", return_value=service):
+            response = client.get(
+                "/api/v1/images/variant",
+                params={"key": "images/huge.png", "format": "webp"},
+                follow_redirects=False,
+            )
+
+        assert response.status_code == 400
@@ -1,4 +1,5 @@
 """Tests for Image Library Service"""
+import asyncio
 import io
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
@@ -21,6 +22,7 @@ from app.library.service import (
     get_all_images,
     get_library_image,
     get_library_images,
+    read_image_size,
     update_library_image,
     _determine_aspect_ratio,
 )
@@ -86,6 +88,33 @@ async def test_generate_thumbnail_rgba():
     assert thumb_img.mode == 'RGB'
 
 
+def _rotated_jpeg(size=(800, 400)) -> bytes:
+    """EXIFで90度回転（Orientation=6）を指定したJPEG"""
+    img = Image.new('RGB', size, color='green')
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    buffer = io.BytesIO()
+    img.save(buffer, format='JPEG', exif=exif)
+    return buffer.getvalue()
+
+
+def test_read_image_size_uses_exif_orientation():
+    """ヘッダーのみでサイズを取得し、EXIFの回転を考慮する"""
+    assert read_image_size(_rotated_jpeg()) == (400, 800)
+
+    with pytest.raises(ValueError):
+        read_image_size(b"not an image")
+
+
+@pytest.mark.asyncio
+async def test_generate_thumbnail_jpeg_orientation():
+    """JPEGのサムネイルは表示上の向きで作成する"""
+    thumbnail_content = await generate_thumbnail(_rotated_jpeg(), max_size=(256, 256))
+
+    thumb_img = Image.open(io.BytesIO(thumbnail_content))
+    assert thumb_img.size == (128, 256)
+
+
 # ===== CRUD Operations Tests =====
 
 @pytest.mark.asyncio
@@ -149,6 +178,46 @@ async def test_create_library_image():
     assert result.source == ImageSource.UPLOADED
 
 
+@pytest.mark.asyncio
+async def test_create_library_image_uploads_concurrently():
+    """元画像のアップロードとサムネイル生成・アップロードを並行して実行"""
+    mock_supabase = MagicMock()
+    mock_supabase.table.return_value.insert.side_effect = lambda record: MagicMock(
+        execute=MagicMock(return_value=MagicMock(data=[{
+            **record, "id": "test-id", "created_at": "2026-01-20T00:00:00Z", "updated_at": "2026-01-20T00:00:00Z",
+        }]))
+    )
+
+    events = []
+    original_started = asyncio.Event()
+
+    async def upload(content, key):
+        events.append(("start", key))
+        if key.endswith("_thumb.jpg"):
+            # 元画像のアップロード中にサムネイルのアップロードが始まる
+            assert original_started.is_set()
+        else:
+            original_started.set()
+            await asyncio.sleep(0.05)
+        events.append(("end", key))
+        return f"https://example.com/{key}"
+
+    with patch('app.external.r2.upload_image', new=AsyncMock(side_effect=upload)):
+        result = await create_library_image(
+            mock_supabase,
+            "user-123",
+            ImageLibraryCreate(name="Photo", category=ImageCategory.GENERAL),
+            _rotated_jpeg(),
+            "photo.jpg",
+        )
+
+    starts = [i for i, (kind, _) in enumerate(events) if kind == "start"]
+    first_end = next(i for i, (kind, _) in enumerate(events) if kind == "end")
+    assert len(starts) == 2 and max(starts) < first_end
+    assert (result.width, result.height) == (400, 800)
+    assert result.thumbnail_url.endswith("_thumb.jpg")
+
+
 @pytest.mark.asyncio
 async def test_create_library_image_from_generation():
     """生成画像からライブラリ作成のテスト"""
@@ -414,59 +483,111 @@ async def test_delete_library_image():
 
 # ===== Unified Image Listing Tests =====
 
-@pytest.mark.asyncio
-async def test_get_all_images():
-    """統合画像一覧取得のテスト"""
-    mock_supabase = MagicMock()
-    
-    # ライブラリ画像のモック
-    library_result = MagicMock()
-    library_result.data = [{
-        "id": "lib-1",
+def _library_row(item_id: str, created_at: str) -> dict:
+    return {
+        "id": item_id,
         "user_id": "user-123",
         "name": "Library Image",
         "description": None,
         "image_url": "https://example.com/lib.png",
         "thumbnail_url": "https://example.com/lib_thumb.jpg",
+        "r2_key": "library/user-123/lib.png",
         "width": 800,
         "height": 600,
         "aspect_ratio": "16:9",
+        "file_size_bytes": None,
         "source": "uploaded",
+        "image_provider": None,
+        "generated_prompt_ja": None,
+        "generated_prompt_en": None,
         "category": "general",
-        "created_at": "2026-01-20T01:00:00Z",
-    }]
-    
-    # スクリーンショット画像のモック
-    screenshot_result = MagicMock()
-    screenshot_result.data = [{
-        "id": "ss-1",
+        "created_at": created_at,
+        "updated_at": created_at,
+    }
+
+
+def _screenshot_row(item_id: str, created_at: str) -> dict:
+    return {
+        "id": item_id,
         "user_id": "user-123",
         "original_image_url": "https://example.com/screenshot.png",
-        "created_at": "2026-01-20T00:00:00Z",
-    }]
-    
-    # チェーンメソッドのモック
-    library_chain = MagicMock()
-    library_chain.select.return_value = library_chain
-    library_chain.eq.return_value = library_chain
-    library_chain.order.return_value = library_chain
-    library_chain.execute.return_value = library_result
-    
-    screenshot_chain = MagicMock()
-    screenshot_chain.select.return_value = screenshot_chain
-    screenshot_chain.eq.return_value = screenshot_chain
-    screenshot_chain.not_ = MagicMock()
-    screenshot_chain.not_.is_.return_value = screenshot_chain
-    screenshot_chain.order.return_value = screenshot_chain
-    screenshot_chain.execute.return_value = screenshot_result
-    
-    # table()の呼び出しごとに異なるチェーンを返す
-    mock_supabase.table.side_effect = [library_chain, screenshot_chain]
-    
-    result = await get_all_images(mock_supabase, "user-123", source_filter="all")
-    
-    assert result.total == 2
-    assert len(result.images) == 2
-    # ライブラリ画像が先（新しい順）
-    assert result.images[0].id == "lib-1"
-    assert result.images[1].id == "ss-1"
+        "created_at": created_at,
+    }
+
+
+def _chain(rows: list[dict], count: int) -> MagicMock:
+    """Supabaseのクエリチェーンのモック（一覧は rows、件数クエリは count）"""
+    chain = MagicMock()
+    for method in ("select", "eq", "neq", "or_", "order", "limit"):
+        getattr(chain, method).return_value = chain
+    chain.not_.is_.return_value = chain
+    chain.execute.return_value = MagicMock(data=rows, count=count)
+    return chain
+
+
+@pytest.fixture
+def unified_supabase():
+    """ライブラリ3件・スクリーンショット2件（作成日時が交互）"""
+    from app.services.pagination import get_count_cache
+
+    get_count_cache().clear()
+    library = _chain([
+        _library_row("lib-3", "2026-01-20T05:00:00Z"),
+        _library_row("lib-2", "2026-01-20T03:00:00Z"),
+        _library_row("lib-1", "2026-01-20T01:00:00Z"),
+    ], count=3)
+    screenshots = _chain([
+        _screenshot_row("ss-2", "2026-01-20T04:00:00Z"),
+        _screenshot_row("ss-1", "2026-01-20T02:00:00Z"),
+    ], count=2)
+
+    mock_supabase = MagicMock()
+    mock_supabase.table.side_effect = lambda name: library if name == "user_image_library" else screenshots
+    yield mock_supabase, library, screenshots
+    get_count_cache().clear()
+
+
+@pytest.mark.asyncio
+async def test_get_all_images(unified_supabase):
+    """両ソースを作成日時の新しい順にマージし、1ページ + 1行だけ取得する"""
+    mock_supabase, library, screenshots = unified_supabase
+
+    result = await get_all_images(mock_supabase, "user-123", source_filter="all", per_page=3)
+
+    assert [i.id for i in result.library_images] == ["lib-3", "lib-2"]
+    assert [s.id for s in result.screenshots] == ["ss-2"]
+    assert (result.total_library, result.total_screenshots) == (3, 2)
+    assert result.has_next
+    library.limit.assert_called_with(4)
+    screenshots.limit.assert_called_with(4)
+    library.order.assert_any_call("id", desc=True)
+
+
+@pytest.mark.asyncio
+async def test_get_all_images_cursor(unified_supabase):
+    """カーソル以降の行だけを取得するフィルタを付ける"""
+    from app.services.pagination import decode_cursor
+
+    mock_supabase, library, screenshots = unified_supabase
+    first = await get_all_images(mock_supabase, "user-123", per_page=3)
+
+    assert decode_cursor(first.next_cursor) == ("2026-01-20T03:00:00Z", "lib-2")
+
+    await get_all_images(mock_supabase, "user-123", per_page=3, cursor=first.next_cursor)
+
+    library.or_.assert_called_with(
+        'created_at.lt."2026-01-20T03:00:00Z",and(created_at.eq."2026-01-20T03:00:00Z",id.lt.lib-2)'
+    )
+    # 件数はキャッシュから返す（件数クエリは最初の1回のみ）
+    assert sum(1 for c in library.select.call_args_list if c.kwargs.get("head")) == 1
+
+
+@pytest.mark.asyncio
+async def test_get_all_images_invalid_cursor(unified_supabase):
+    """不正なカーソルはValueError"""
+    from app.services.pagination import encode_cursor
+
+    mock_supabase, _, _ = unified_supabase
+    for cursor in ("not-a-cursor", encode_cursor("2026-01-20T00:00:00Z", "x),id.gt.0")):
+        with pytest.raises(ValueError):
+            await get_all_images(mock_supabase, "user-123", cursor=cursor)
@@ -0,0 +1,211 @@
+"""
+FFmpegサブプロセスランナーのテスト
+"""
+import asyncio
+import os
+import stat
+
+import pytest
+
+from app.services.ffmpeg_runner import (
+    FFmpegCancelledError,
+    FFmpegProgress,
+    cancel_ffmpeg_job,
+    is_ffmpeg_job_cancelled,
+    parse_progress_block,
+    progress_to_range,
+    run_ffmpeg,
+    run_ffmpeg_pipeline,
+    scale_progress,
+)
+
+
+def _write_fake_ffmpeg(directory, script: str) -> str:
+    """テスト用のffmpeg代替スクリプトを作成"""
+    path = os.path.join(directory, "ffmpeg")
+    with open(path, "w") as f:
+        f.write("#!/bin/sh\n" + script)
+    os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+    return path
+
+
+class TestParseProgressBlock:
+    """-progress 出力のパースのテスト"""
+
+    def test_percent_and_eta(self):
+        """出力時間と速度から進捗率とETAを算出"""
+        progress = parse_progress_block(
+            {"out_time_us": "2500000", "speed": "2.0x", "progress": "continue"},
+            duration=10.0,
+        )
+
+        assert progress.percent == pytest.approx(25.0)
+        assert progress.out_time == pytest.approx(2.5)
+        assert progress.speed == pytest.approx(2.0)
+        assert progress.eta_seconds == pytest.approx(3.75)
+
+    def test_out_time_ms_fallback(self):
+        """out_time_ms（実際はマイクロ秒）にも対応"""
+        progress = parse_progress_block(
+            {"out_time_ms": "5000000", "progress": "continue"},
+            duration=10.0,
+        )
+        assert progress.percent == pytest.approx(50.0)
+        assert progress.eta_seconds is None
+
+    def test_end(self):
+        """progress=end で100%"""
+        progress = parse_progress_block(
+            {"out_time_us": "1000000", "speed": "N/A", "progress": "end"},
+            duration=10.0,
+        )
+        assert progress.percent == 100.0
+        assert progress.speed is None
+
+    def test_unknown_duration(self):
+        """長さ不明の場合は進捗率0"""
+        progress = parse_progress_block(
+            {"out_time_us": "1000000", "progress": "continue"},
+            duration=None,
+        )
+        assert progress.percent == 0.0
+
+    def test_no_time(self):
+        """時間情報がない場合はNone"""
+        assert parse_progress_block({"out_time_us": "N/A", "progress": "continue"}, 10.0) is None
+
+
+class TestProgressCallbacks:
+    """進捗コールバックヘルパーのテスト"""
+
+    @pytest.mark.asyncio
+    async def test_scale_progress(self):
+        """0-100%を指定範囲にマッピング"""
+        received = []
+        callback = scale_progress(received.append, 50, 100)
+
+        await callback(FFmpegProgress(percent=50.0, out_time=1.0))
+
+        assert received[0].percent == pytest.approx(75.0)
+
+    def test_scale_progress_none(self):
+        """コールバックなしの場合はNone"""
+        assert scale_progress(None, 0, 50) is None
+
+    @pytest.mark.asyncio
+    async def test_progress_to_range_throttles(self):
+        """整数値が増えた時のみ通知"""
+        updates = []
+
+        async def update(value: int):
+            updates.append(value)
+
+        callback = progress_to_range(update, 60, 75)
+        for percent in (0.0, 3.0, 10.0, 12.0, 100.0):
+            await callback(FFmpegProgress(percent=percent, out_time=0.0))
+
+        assert updates == [61, 75]
+
+
+class TestRunFFmpeg:
+    """run_ffmpegのテスト"""
+
+    @pytest.mark.asyncio
+    async def test_reports_progress(self, tmp_path):
+        """-progress 出力をパースしてコールバックを呼ぶ"""
+        ffmpeg = _write_fake_ffmpeg(tmp_path, (
+            'echo "out_time_us=5000000"\n'
+            'echo "speed=1.0x"\n'
+            'echo "progress=continue"\n'
+            'echo "out_time_us=10000000"\n'
+            'echo "progress=end"\n'
+            'echo "done" >&2\n'
+        ))
+        received = []
+
+        returncode, stdout, stderr = await run_ffmpeg(
+            [ffmpeg, "-i", "in.mp4", "out.mp4"],
+            duration=10.0,
+            on_progress=received.append,
+        )
+
+        assert returncode == 0
+        assert stderr.strip() == b"done"
+        assert [p.percent for p in received] == [pytest.approx(50.0), 100.0]
+
+    @pytest.mark.asyncio
+    async def test_cancel_kills_process(self, tmp_path):
+        """キャンセルで子プロセスを終了し FFmpegCancelledError を送出"""
+        ffmpeg = _write_fake_ffmpeg(tmp_path, "exec sleep 30\n")
+        job_id = "test-cancel-job"
+
+        task = asyncio.create_task(
+            run_ffmpeg([ffmpeg, "-i", "in.mp4", "out.mp4"], job_id=job_id)
+        )
+        for _ in range(50):
+            await asyncio.sleep(0.02)
+            if cancel_ffmpeg_job(job_id):
+                break
+
+        with pytest.raises(FFmpegCancelledError):
+            await asyncio.wait_for(task, timeout=5)
+
+        assert is_ffmpeg_job_cancelled(job_id)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_job_not_started(self):
+        """キャンセル済みジョブは起動しない"""
+        cancel_ffmpeg_job("test-already-cancelled")
+
+        with pytest.raises(FFmpegCancelledError):
+            await run_ffmpeg(["ffmpeg", "-version"], job_id="test-already-cancelled")
+
+
+# 前段の出力（stdin）に印を追加して pipe:1 またはファイルへ書き出す代替ffmpeg
+_PIPE_STAGE_SCRIPT = (
+    'for a in "$@"; do last="$a"; done\n'
+    'case "$*" in *"-i pipe:0"*) data=$(cat) ;; *) data="src" ;; esac\n'
+    'if [ "$last" = "pipe:1" ]; then echo "$data|stage"; else echo "$data|final" > "$last"; fi\n'
+)
+
+
+class TestRunFFmpegPipeline:
+    """run_ffmpeg_pipelineのテスト"""
+
+    @pytest.mark.asyncio
+    async def test_chains_stages_through_pipes(self, tmp_path):
+        """前段のstdoutが次段のstdinに渡り、最終段のみファイルに書かれる"""
+        ffmpeg = _write_fake_ffmpeg(tmp_path, _PIPE_STAGE_SCRIPT)
+        output = str(tmp_path / "out.mp4")
+
+        returncode, stderr = await run_ffmpeg_pipeline([
+            [ffmpeg, "-i", "in.mp4", "-f", "nut", "pipe:1"],
+            [ffmpeg, "-f", "nut", "-i", "pipe:0", "-f", "nut", "pipe:1"],
+            [ffmpeg, "-f", "nut", "-i", "pipe:0", output],
+        ])
+
+        assert returncode == 0
+        with open(output) as f:
+            assert f.read().strip() == "src|stage|stage|final"
+        assert sorted(os.listdir(tmp_path)) == ["ffmpeg", "out.mp4"]
+
+    @pytest.mark.asyncio
+    async def test_failed_stage_stops_pipeline(self, tmp_path):
+        """途中の段が失敗したら他の段も終了させ、失敗した段の結果を返す"""
+        producer_dir = tmp_path / "producer"
+        failing_dir = tmp_path / "failing"
+        producer_dir.mkdir()
+        failing_dir.mkdir()
+        producer = _write_fake_ffmpeg(producer_dir, "exec sleep 30\n")
+        failing = _write_fake_ffmpeg(failing_dir, 'echo "boom" >&2\nexit 3\n')
+
+        returncode, stderr = await asyncio.wait_for(
+            run_ffmpeg_pipeline([
+                [producer, "-i", "in.mp4", "-f", "nut", "pipe:1"],
+                [failing, "-f", "nut", "-i", "pipe:0", "out.mp4"],
+            ]),
+            timeout=5,
+        )
+
+        assert returncode == 3
+        assert stderr.strip() == b"boom"
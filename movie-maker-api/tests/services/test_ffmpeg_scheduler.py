@@ -0,0 +1,195 @@
+"""
+FFmpeg同時実行スケジューラのテスト
+"""
+import asyncio
+import threading
+
+import pytest
+from unittest.mock import patch, MagicMock, AsyncMock
+
+from app.services.ffmpeg_scheduler import (
+    FFmpegScheduler,
+    FFmpegJobClass,
+    apply_thread_limits,
+    ffmpeg_scheduler,
+    get_ffmpeg_scheduler,
+)
+
+
+class TestApplyThreadLimits:
+    """スレッド数付与のテスト"""
+
+    def test_ffmpeg_command(self):
+        """ffmpegコマンドにスレッド指定が挿入される"""
+        cmd = ["ffmpeg", "-y", "-i", "in.mp4", "-c:v", "libx264", "out.mp4"]
+        result = apply_thread_limits(cmd, 2)
+
+        assert result[:5] == ["ffmpeg", "-filter_threads", "2", "-filter_complex_threads", "2"]
+        assert result[-3:] == ["-threads", "2", "out.mp4"]
+        assert "-i" in result
+
+    def test_every_output(self):
+        """出力が複数ある場合は各出力の直前に挿入される"""
+        cmd = [
+            "ffmpeg", "-y", "-i", "in.mp4", "-map", "0:v", "-an", "video.mp4",
+            "-map", "0:a", "-c:a", "aac", "audio.m4a",
+        ]
+        result = apply_thread_limits(cmd, 2)
+
+        assert result[5:] == [
+            "-y", "-i", "in.mp4", "-map", "0:v", "-an", "-threads", "2", "video.mp4",
+            "-map", "0:a", "-c:a", "aac", "-threads", "2", "audio.m4a",
+        ]
+
+    def test_ffprobe_untouched(self):
+        """ffprobeはそのまま"""
+        cmd = ["ffprobe", "-v", "error", "in.mp4"]
+        assert apply_thread_limits(cmd, 4) == cmd
+
+    def test_existing_threads_untouched(self):
+        """既に-threads指定がある場合はそのまま"""
+        cmd = ["ffmpeg", "-i", "in.mp4", "-threads", "1", "out.mp4"]
+        assert apply_thread_limits(cmd, 4) == cmd
+
+
+class TestFFmpegScheduler:
+    """FFmpegSchedulerのテスト"""
+
+    def test_slot_configuration(self):
+        """スロット数とスレッド数の算出"""
+        scheduler = FFmpegScheduler(total_slots=8, reserved_interactive_slots=1)
+
+        assert scheduler.threads_for(FFmpegJobClass.INTERACTIVE) == 1
+        assert scheduler.threads_for(FFmpegJobClass.BATCH) == 4
+
+    def test_batch_threads_capped(self):
+        """batchスレッド数は予約分を除いた容量を超えない"""
+        scheduler = FFmpegScheduler(total_slots=4, batch_threads=16, reserved_interactive_slots=1)
+        assert scheduler.threads_for(FFmpegJobClass.BATCH) == 3
+
+    @pytest.mark.asyncio
+    async def test_batch_jobs_queue_when_full(self):
+        """スロットが埋まるとbatchジョブはキューで待機"""
+        scheduler = FFmpegScheduler(total_slots=4, batch_threads=3, reserved_interactive_slots=1)
+        started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def hold():
+            async with scheduler.acquire(FFmpegJobClass.BATCH):
+                started.set()
+                await release.wait()
+
+        async def second():
+            async with scheduler.acquire(FFmpegJobClass.BATCH):
+                pass
+
+        first_task = asyncio.create_task(hold())
+        await started.wait()
+        second_task = asyncio.create_task(second())
+        await asyncio.sleep(0)
+
+        assert scheduler.stats()["queued"]["batch"] == 1
+        assert scheduler.queue_depth == 1
+
+        release.set()
+        await asyncio.gather(first_task, second_task)
+
+        stats = scheduler.stats()
+        assert stats["queue_depth"] == 0
+        assert stats["in_use_slots"] == 0
+
+    @pytest.mark.asyncio
+    async def test_interactive_uses_reserved_slot(self):
+        """batchで埋まっていても予約スロットでinteractiveが実行できる"""
+        scheduler = FFmpegScheduler(total_slots=4, batch_threads=3, reserved_interactive_slots=1)
+
+        async with scheduler.acquire(FFmpegJobClass.BATCH):
+            async with scheduler.acquire(FFmpegJobClass.INTERACTIVE) as threads:
+                assert threads == 1
+                assert scheduler.stats()["running"] == {"interactive": 1, "batch": 1}
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_removed(self):
+        """待機中にキャンセルされたジョブはキューから除かれる"""
+        scheduler = FFmpegScheduler(total_slots=2, batch_threads=1, reserved_interactive_slots=1)
+
+        async with scheduler.acquire(FFmpegJobClass.BATCH):
+            async def waiter():
+                async with scheduler.acquire(FFmpegJobClass.BATCH):
+                    pass
+
+            task = asyncio.create_task(waiter())
+            await asyncio.sleep(0)
+            assert scheduler.queue_depth == 1
+
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+            assert scheduler.queue_depth == 0
+
+    def test_slots_shared_across_event_loops(self):
+        """別スレッドのイベントループで待機しているジョブも、解放時に起こされる"""
+        scheduler = FFmpegScheduler(total_slots=2, batch_threads=1, reserved_interactive_slots=1)
+        holding = threading.Event()
+        release = threading.Event()
+        acquired = []
+
+        async def hold():
+            async with scheduler.acquire(FFmpegJobClass.BATCH):
+                holding.set()
+                await asyncio.get_running_loop().run_in_executor(None, release.wait)
+
+        async def wait_for_slot():
+            async with scheduler.acquire(FFmpegJobClass.BATCH):
+                acquired.append(scheduler.stats()["in_use_slots"])
+
+        holder = threading.Thread(target=lambda: asyncio.run(hold()))
+        holder.start()
+        holding.wait(5)
+        waiter = threading.Thread(target=lambda: asyncio.run(asyncio.wait_for(wait_for_slot(), 5)))
+        waiter.start()
+        while scheduler.queue_depth == 0 and waiter.is_alive():
+            threading.Event().wait(0.01)
+
+        assert scheduler.stats()["queued"]["batch"] == 1
+        release.set()
+        holder.join(5)
+        waiter.join(5)
+
+        assert acquired == [1]
+        stats = scheduler.stats()
+        assert stats["in_use_slots"] == 0
+        assert stats["running"] == {"interactive": 0, "batch": 0}
+
+    @pytest.mark.asyncio
+    async def test_run_applies_thread_limits(self):
+        """runはスレッド指定付きでサブプロセスを起動する"""
+        scheduler = FFmpegScheduler(total_slots=4, batch_threads=2, reserved_interactive_slots=1)
+        mock_process = MagicMock()
+        mock_process.returncode = 0
+        mock_process.communicate = AsyncMock(return_value=(b"out", b""))
+
+        with patch(
+            "app.services.ffmpeg_scheduler.asyncio.create_subprocess_exec",
+            new_callable=AsyncMock,
+            return_value=mock_process,
+        ) as mock_exec:
+            returncode, stdout, stderr = await scheduler.run(
+                ["ffmpeg", "-i", "in.mp4", "out.mp4"]
+            )
+
+        assert returncode == 0
+        assert stdout == b"out"
+        args = mock_exec.call_args.args
+        assert "-threads" in args
+        assert args[args.index("-threads") + 1] == "2"
+
+
+class TestFFmpegSchedulerSingleton:
+    """シングルトンインスタンスのテスト"""
+
+    def test_singleton_exists(self):
+        """シングルトンが存在する"""
+        assert get_ffmpeg_scheduler() is ffmpeg_scheduler
+        assert isinstance(ffmpeg_scheduler, FFmpegScheduler)
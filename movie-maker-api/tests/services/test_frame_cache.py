@@ -0,0 +1,143 @@
+"""
+抽出フレームキャッシュのテスト
+"""
+from unittest.mock import patch
+
+import pytest
+
+from app.services.frame_cache import FrameCache, FrameExtractionError, _parse_probe
+from app.services.render_cache import RenderCache
+from app.services.scratch_space import ScratchSpaceManager
+
+PROBE = {
+    "format": {"duration": "10.0"},
+    "streams": [{"codec_type": "video", "width": 1080, "height": 1920}],
+}
+
+
+class FakeFFmpeg:
+    """プローブ・フレーム抽出の呼び出しを記録する代替"""
+
+    def __init__(self):
+        self.probes = 0
+        self.extractions: list[list[float]] = []
+
+    async def get_video_info(self, source):
+        self.probes += 1
+        return PROBE
+
+    async def extract_frames(self, source, timestamps, output_paths, max_width=None):
+        self.extractions.append(list(timestamps))
+        for timestamp, path in zip(timestamps, output_paths):
+            with open(path, "wb") as f:
+                f.write(f"frame@{timestamp}".encode())
+        return output_paths
+
+
+class FakeRemoteMedia:
+    def __init__(self):
+        self.sources = 0
+
+    async def fingerprint(self, url):
+        return f"etag:{url}"
+
+    async def media_source(self, url, workspace, filename="source.mp4"):
+        self.sources += 1
+        return url
+
+
+@pytest.fixture
+def env(tmp_path, fake_r2):
+    ffmpeg = FakeFFmpeg()
+    remote = FakeRemoteMedia()
+    scratch = ScratchSpaceManager(root=str(tmp_path / "scratch"), tmpfs_root="")
+
+    async def dimensions(path):
+        return 540, 960
+
+    with patch("app.services.render_cache.get_r2_client", return_value=fake_r2), \
+         patch("app.services.render_cache.get_public_url", side_effect=lambda key: f"https://cdn.example.com/{key}"), \
+         patch("app.services.frame_cache.get_render_cache", return_value=RenderCache(enabled=True)), \
+         patch("app.services.frame_cache.get_ffmpeg_service", return_value=ffmpeg), \
+         patch("app.services.frame_cache.get_remote_media", return_value=remote), \
+         patch("app.services.frame_cache.get_scratch_space", return_value=scratch), \
+         patch("app.videos.service.get_image_dimensions", side_effect=dimensions):
+        yield fake_r2, ffmpeg, remote
+
+
+class TestGetFrames:
+    """get_framesのテスト"""
+
+    @pytest.mark.asyncio
+    async def test_misses_are_extracted_in_one_pass(self, env):
+        """キャッシュにないフレームは重複を除いて1回で抽出し、要求順に返す"""
+        r2, ffmpeg, _ = env
+        cache = FrameCache()
+
+        frames = await cache.get_frames("https://cdn.example.com/v.mp4", [3.0, 1.0, 3.0], max_width=540)
+
+        assert ffmpeg.extractions == [[1.0, 3.0]]
+        assert [f.timestamp for f in frames] == [3.0, 1.0, 3.0]
+        assert frames[0].key == frames[2].key != frames[1].key
+        assert all(not f.hit and (f.width, f.height) == (540, 960) for f in frames)
+        assert len(r2.objects) == 2
+
+    @pytest.mark.asyncio
+    async def test_repeat_request_is_served_from_cache(self, env):
+        """抽出済みのフレームはFFmpegも動画へのアクセスも行わない"""
+        _, ffmpeg, remote = env
+        cache = FrameCache()
+        url = "https://cdn.example.com/v.mp4"
+
+        first = await cache.get_frames(url, [1.0, 2.0])
+        second = await cache.get_frames(url, [2.0, 1.0, 4.5])
+
+        assert ffmpeg.extractions == [[1.0, 2.0], [4.5]]
+        assert ffmpeg.probes == 1
+        assert [f.hit for f in second] == [True, True, False]
+        assert second[1].key == first[0].key
+
+        again = await cache.get_frames(url, [4.5])
+        assert again[0].hit
+        assert remote.sources == 2
+        assert cache.stats()["extraction_passes"] == 2
+
+    @pytest.mark.asyncio
+    async def test_size_is_part_of_the_key(self, env):
+        """縮小サイズが違えば別のフレームとして抽出"""
+        _, ffmpeg, _ = env
+        cache = FrameCache()
+
+        a = await cache.get_frames("https://cdn.example.com/v.mp4", [1.0])
+        b = await cache.get_frames("https://cdn.example.com/v.mp4", [1.0], max_width=320)
+
+        assert a[0].key != b[0].key
+        assert len(ffmpeg.extractions) == 2
+
+    @pytest.mark.asyncio
+    async def test_timestamp_beyond_duration_is_rejected(self, env):
+        """動画の長さを超えるタイムスタンプはエラー"""
+        _, ffmpeg, _ = env
+
+        with pytest.raises(FrameExtractionError, match="exceeds video duration"):
+            await FrameCache().get_frames("https://cdn.example.com/v.mp4", [1.0, 12.0])
+        assert ffmpeg.extractions == []
+
+
+class TestParseProbe:
+    """プローブ結果の解析のテスト"""
+
+    def test_rotated_video_swaps_dimensions(self):
+        """回転メタデータがある場合は表示サイズを返す"""
+        probe = _parse_probe({
+            "format": {"duration": "5.5"},
+            "streams": [{
+                "codec_type": "video", "width": 1920, "height": 1080,
+                "side_data_list": [{"rotation": -90}],
+            }],
+        })
+        assert (probe.duration, probe.width, probe.height) == (5.5, 1080, 1920)
+
+    def test_missing_duration(self):
+        """長さが取得できない場合はNone"""
+        assert _parse_probe({}).duration is None
@@ -0,0 +1,37 @@
+"""
+画像処理用プロセスプールのテスト
+"""
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from app.services.image_executor import ImageExecutor
+
+
+class TestImageExecutor:
+    """ImageExecutorのテスト"""
+
+    @pytest.mark.asyncio
+    async def test_runs_in_thread_without_workers(self):
+        """ワーカー数0の場合はスレッドで実行する"""
+        executor = ImageExecutor(max_workers=0)
+
+        assert await executor.run(abs, -3) == 3
+        assert executor.stats()["jobs"] == 1
+
+    @pytest.mark.asyncio
+    async def test_recovers_after_worker_crash(self):
+        """ワーカーが異常終了してもプールを作り直し、以降の呼び出しは成功する"""
+        executor = ImageExecutor(max_workers=1)
+        try:
+            # 再実行でも落ちる関数はそのまま失敗する
+            with pytest.raises(BrokenProcessPool):
+                await executor.run(os._exit, 1)
+
+            assert await executor.run(abs, -3) == 3
+            stats = executor.stats()
+            assert stats["jobs"] == 2
+            assert stats["failures"] == 1
+        finally:
+            executor.shutdown()
@@ -0,0 +1,180 @@
+"""
+画像バリアント（オンデマンド変換）のテスト
+"""
+import asyncio
+import io
+from unittest.mock import patch
+
+import pytest
+from PIL import Image
+
+from app.services.image_executor import ImageExecutor
+from app.services.image_variants import (
+    ImageFormat,
+    ImageSourceNotFoundError,
+    ImageVariantError,
+    ImageVariantService,
+    avif_supported,
+    negotiate_format,
+    render_variant,
+    snap_quality,
+    snap_width,
+    variant_key,
+)
+
+
+def _png(size=(800, 400), mode="RGBA") -> bytes:
+    buffer = io.BytesIO()
+    Image.new(mode, size, (255, 0, 0, 128) if mode == "RGBA" else (255, 0, 0)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def r2(fake_r2):
+    fake_r2.put_object(Bucket="bucket", Key="images/library/u1/a.png", Body=_png(), ContentType="image/png")
+    with patch("app.services.image_variants.get_r2_client", return_value=fake_r2):
+        yield fake_r2
+
+
+class TestHelpers:
+    """キー・幅・形式の決定のテスト"""
+
+    def test_snap_width(self):
+        """指定幅は段階に切り上げ、上限を超える場合は最大"""
+        assert snap_width(100) == 128
+        assert snap_width(128) == 128
+        assert snap_width(5000) == 2560
+
+    def test_snap_quality(self):
+        """指定品質は段階に切り上げ、上限を超える場合は最大"""
+        assert snap_quality(1) == 40
+        assert snap_quality(61) == 80
+        assert snap_quality(100) == 90
+
+    def test_negotiate_format(self):
+        """Acceptヘッダーから最も小さい形式を選ぶ"""
+        with patch("app.services.image_variants.avif_supported", return_value=True):
+            assert negotiate_format("image/avif,image/webp,*/*") == ImageFormat.AVIF
+        assert negotiate_format("image/webp,*/*") == ImageFormat.WEBP
+        assert negotiate_format(None) == ImageFormat.JPEG
+
+    def test_negotiate_format_without_avif_encoder(self):
+        """AVIFをエンコードできないPillowではWebPを選ぶ"""
+        with patch("app.services.image_variants.avif_supported", return_value=False):
+            assert negotiate_format("image/avif,image/webp,*/*") == ImageFormat.WEBP
+
+    def test_variant_key_is_deterministic(self):
+        """キーは元画像キーとパラメータから決まる"""
+        assert variant_key("images/a.png", 256, ImageFormat.WEBP, 80) \
+            == "images/variants/v1/images/a.png/256w_q80.webp"
+        assert variant_key("images/a.png", None, ImageFormat.JPEG, 85).endswith("/orig_q85.jpg")
+
+
+class TestRenderVariant:
+    """変換処理のテスト"""
+
+    @pytest.mark.parametrize("image_format,pil_format", [
+        (ImageFormat.WEBP, "WEBP"),
+        pytest.param(
+            ImageFormat.AVIF, "AVIF",
+            marks=pytest.mark.skipif(not avif_supported(), reason="Pillow without AVIF encoder"),
+        ),
+        (ImageFormat.JPEG, "JPEG"),
+    ])
+    def test_resizes_and_encodes(self, image_format, pil_format):
+        """アスペクト比を保って縮小し、指定形式でエンコード"""
+        output = Image.open(io.BytesIO(render_variant(_png(), 256, image_format.value, 70)))
+        assert output.format == pil_format
+        assert output.size == (256, 128)
+
+    def test_never_upscales(self):
+        """元画像より大きい幅は拡大しない"""
+        output = Image.open(io.BytesIO(render_variant(_png((100, 50), "RGB"), 512, "jpeg", 85)))
+        assert output.size == (100, 50)
+
+    @pytest.mark.parametrize("width", [1920, 768, 384])
+    def test_exif_rotated_jpeg_keeps_width(self, width):
+        """EXIFで90度回転するJPEGもデコード時の縮小で指定幅を下回らない"""
+        exif = Image.Exif()
+        exif[0x0112] = 6
+        buffer = io.BytesIO()
+        Image.new("RGB", (4032, 3024), (0, 128, 255)).save(buffer, format="JPEG", exif=exif)
+
+        output = Image.open(io.BytesIO(render_variant(buffer.getvalue(), width, "jpeg", 80)))
+
+        assert output.size == (width, width * 4032 // 3024)
+
+    def test_invalid_image(self):
+        """画像として読めない場合"""
+        with pytest.raises(ImageVariantError):
+            render_variant(b"not an image", 256, "webp", 80)
+
+
+class TestImageVariantService:
+    """ImageVariantServiceのテスト"""
+
+    @pytest.mark.asyncio
+    async def test_renders_once_then_hits(self, r2):
+        """初回は作成して保存、2回目は既存のバリアントを返す"""
+        service = ImageVariantService(executor=ImageExecutor(max_workers=0))
+
+        first = await service.get_variant("images/library/u1/a.png", width=200)
+        second = await service.get_variant("images/library/u1/a.png", width=256)
+
+        assert not first.hit and second.hit
+        assert first.key == "images/variants/v1/images/library/u1/a.png/256w_q80.webp"
+        stored = r2.objects[first.key]
+        assert stored["ContentType"] == "image/webp"
+        assert "immutable" in stored["CacheControl"]
+        assert r2.gets == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_render_once(self, r2):
+        """同じバリアントの同時リクエストは1回だけ変換"""
+        service = ImageVariantService(executor=ImageExecutor(max_workers=0))
+
+        variants = await asyncio.gather(*(
+            service.get_variant("images/library/u1/a.png", width=128, image_format=ImageFormat.JPEG)
+            for _ in range(3)
+        ))
+
+        assert r2.gets == 1
+        assert sum(not v.hit for v in variants) == 1
+        assert service.stats()["coalesced"] == 2
+
+    @pytest.mark.asyncio
+    async def test_rejects_keys_outside_image_prefixes(self, r2):
+        """画像用プレフィックス以外・バリアント自身・相対パスは不可"""
+        service = ImageVariantService(executor=ImageExecutor(max_workers=0))
+        for key in ("videos/a.mp4", "images/variants/v1/x.webp", "images/../videos/a.mp4"):
+            with pytest.raises(ImageVariantError):
+                await service.get_variant(key)
+
+    @pytest.mark.asyncio
+    async def test_missing_source(self, r2):
+        """元画像が存在しない場合"""
+        service = ImageVariantService(executor=ImageExecutor(max_workers=0))
+        with pytest.raises(ImageSourceNotFoundError):
+            await service.get_variant("images/missing.png")
+        assert service.stats()["errors"] == 1
+
+    @pytest.mark.asyncio
+    async def test_quality_snaps_to_steps(self, r2):
+        """任意の品質は段階に切り上げ、同じバリアントを共有する"""
+        service = ImageVariantService(executor=ImageExecutor(max_workers=0))
+
+        first = await service.get_variant("images/library/u1/a.png", width=128, quality=71)
+        second = await service.get_variant("images/library/u1/a.png", width=128, quality=77)
+
+        assert first.key.endswith("/128w_q80.webp")
+        assert second.hit and second.key == first.key
+
+    @pytest.mark.asyncio
+    async def test_avif_unsupported(self, r2):
+        """AVIFをエンコードできない場合はエラー（500にしない）"""
+        service = ImageVariantService(executor=ImageExecutor(max_workers=0))
+
+        with patch("app.services.image_variants.avif_supported", return_value=False):
+            with pytest.raises(ImageVariantError):
+                await service.get_variant("images/library/u1/a.png", image_format=ImageFormat.AVIF)
+        assert r2.gets == 0
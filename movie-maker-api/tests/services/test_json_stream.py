@@ -0,0 +1,60 @@
+"""
+ストリーミング中のJSONの逐次パースのテスト
+"""
+import json
+import random
+
+from app.services.json_stream import IncrementalJsonParser
+
+STORYBOARD = {
+    "title": "朝の散歩 \"前編\"",
+    "theme": "日常",
+    "scenes": [
+        {"scene_number": 1, "act": "起", "description_ja": "歩き出す, {ゆっくり}", "mood": None},
+        {"scene_number": 2, "act": "承", "description_ja": "振り返る [笑顔]", "tags": ["a", "b"]},
+    ],
+    "score": 0.5,
+}
+
+
+def _feed_in_chunks(parser: IncrementalJsonParser, text: str, seed: int) -> list:
+    rng = random.Random(seed)
+    items = []
+    position = 0
+    while position < len(text):
+        size = rng.randint(1, 7)
+        items.extend(parser.feed(text[position:position + size]))
+        position += size
+    return items
+
+
+class TestIncrementalJsonParser:
+    """IncrementalJsonParserのテスト"""
+
+    def test_emits_array_items_and_fields(self):
+        """配列の要素を完成した順に返し、トップレベルのスカラー値を fields に入れる"""
+        text = "```json\n" + json.dumps(STORYBOARD, ensure_ascii=False, indent=2) + "\n```"
+        for seed in range(20):
+            parser = IncrementalJsonParser("scenes")
+
+            assert _feed_in_chunks(parser, text, seed) == STORYBOARD["scenes"]
+            assert parser.fields == {"title": "朝の散歩 \"前編\"", "theme": "日常", "score": 0.5}
+            assert parser.text == text
+
+    def test_emits_items_before_the_end(self):
+        """配列の途中でも完成した要素は返す"""
+        parser = IncrementalJsonParser("scenes")
+
+        items = parser.feed('{"title": "a", "scenes": [{"act": "起"}, {"act": "承"')
+
+        assert items == [{"act": "起"}]
+        assert parser.fields == {"title": "a"}
+        assert parser.feed("}]}") == [{"act": "承"}]
+
+    def test_top_level_array(self):
+        """キー未指定の場合はトップレベルの配列の要素を返す"""
+        suggestions = ["手を振る", "風で髪がなびく, ゆっくり", "笑う\\n"]
+        text = json.dumps(suggestions, ensure_ascii=False)
+        for seed in range(10):
+            parser = IncrementalJsonParser()
+            assert _feed_in_chunks(parser, text, seed) == suggestions
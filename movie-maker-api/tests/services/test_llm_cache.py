@@ -0,0 +1,156 @@
+"""
+LLM応答キャッシュのテスト
+"""
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from google.genai import types
+
+from app.services.llm_cache import LLMResponseCache, build_llm_cache_key, is_cacheable
+
+
+def _response(text: str, finish_reason=types.FinishReason.STOP) -> types.GenerateContentResponse:
+    return types.GenerateContentResponse(
+        candidates=[
+            types.Candidate(
+                content=types.Content(role="model", parts=[types.Part(text=text)]),
+                finish_reason=finish_reason,
+            )
+        ]
+    )
+
+
+@pytest.fixture
+def r2(fake_r2):
+    with patch("app.services.llm_cache.get_r2_client", return_value=fake_r2):
+        yield fake_r2
+
+
+def _cache(**kwargs) -> LLMResponseCache:
+    options = dict(enabled=True, ttl_seconds=60, max_memory_entries=10, persistent=True)
+    options.update(kwargs)
+    return LLMResponseCache(**options)
+
+
+class TestCacheKey:
+    """build_llm_cache_keyのテスト"""
+
+    def test_deterministic(self):
+        """同じ入力・設定は同じキー"""
+        config = types.GenerateContentConfig(system_instruction="translate", temperature=0.3)
+        assert build_llm_cache_key("gemini-2.0-flash", "猫", config) == build_llm_cache_key(
+            "gemini-2.0-flash", "猫", types.GenerateContentConfig(system_instruction="translate", temperature=0.3)
+        )
+
+    @pytest.mark.parametrize("model, contents, config", [
+        ("gemini-3-flash-preview", "猫", types.GenerateContentConfig(system_instruction="translate", temperature=0.3)),
+        ("gemini-2.0-flash", "犬", types.GenerateContentConfig(system_instruction="translate", temperature=0.3)),
+        ("gemini-2.0-flash", "猫", types.GenerateContentConfig(system_instruction="summarize", temperature=0.3)),
+        ("gemini-2.0-flash", "猫", types.GenerateContentConfig(system_instruction="translate", temperature=0.7)),
+    ])
+    def test_changes_with_inputs(self, model, contents, config):
+        """モデル・入力・システムプロンプト・温度が変わればキーも変わる"""
+        base = build_llm_cache_key(
+            "gemini-2.0-flash", "猫", types.GenerateContentConfig(system_instruction="translate", temperature=0.3)
+        )
+        assert build_llm_cache_key(model, contents, config) != base
+
+
+class TestIsCacheable:
+    """is_cacheableのテスト"""
+
+    def test_rejects_truncated_and_invalid_json(self):
+        """打ち切られた応答・パースできないJSON応答は保存しない"""
+        json_config = types.GenerateContentConfig(response_mime_type="application/json")
+
+        assert is_cacheable(_response("cat"))
+        assert not is_cacheable(_response("ca", finish_reason=types.FinishReason.MAX_TOKENS))
+        assert not is_cacheable(_response('{"a": '), json_config)
+        assert is_cacheable(_response('{"a": 1}'), json_config)
+
+
+class TestLLMResponseCache:
+    """LLMResponseCacheのテスト"""
+
+    @pytest.mark.asyncio
+    async def test_memory_hit(self, r2):
+        """2回目はLLMを呼ばずにメモリから返す"""
+        cache = _cache()
+        generate = AsyncMock(return_value=_response("cat"))
+
+        first = await cache.get_or_generate("gemini-2.0-flash", "猫", None, generate)
+        second = await cache.get_or_generate("gemini-2.0-flash", "猫", None, generate)
+
+        assert first.text == second.text == "cat"
+        assert generate.await_count == 1
+        assert cache.stats()["memory_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_persistent_hit_across_workers(self, r2):
+        """R2に保存した応答は別のワーカー（インスタンス）からも使える"""
+        generate = AsyncMock(return_value=_response("cat"))
+        await _cache().get_or_generate("gemini-2.0-flash", "猫", None, generate)
+
+        other = _cache()
+        response = await other.get_or_generate("gemini-2.0-flash", "猫", None, generate)
+
+        assert response.text == "cat"
+        assert response.candidates[0].finish_reason == types.FinishReason.STOP
+        assert generate.await_count == 1
+        assert other.stats()["persistent_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_expired_entries_are_regenerated(self, r2):
+        """有効期限を過ぎた応答は使わない"""
+        cache = _cache(ttl_seconds=0)
+        generate = AsyncMock(return_value=_response("cat"))
+
+        await cache.get_or_generate("gemini-2.0-flash", "猫", None, generate)
+        await cache.get_or_generate("gemini-2.0-flash", "猫", None, generate)
+
+        assert generate.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_uncacheable_response_is_not_stored(self, r2):
+        """打ち切られた応答は保存しない"""
+        cache = _cache()
+        generate = AsyncMock(return_value=_response("ca", finish_reason=types.FinishReason.MAX_TOKENS))
+
+        await cache.get_or_generate("gemini-2.0-flash", "猫", None, generate)
+        await cache.get_or_generate("gemini-2.0-flash", "猫", None, generate)
+
+        assert generate.await_count == 2
+        assert r2.objects == {}
+
+    @pytest.mark.asyncio
+    async def test_single_flight(self, r2):
+        """同じキーの同時呼び出しはLLMを1回だけ呼ぶ"""
+        cache = _cache()
+        calls = 0
+
+        async def generate():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return _response("cat")
+
+        responses = await asyncio.gather(*(
+            cache.get_or_generate("gemini-2.0-flash", "猫", None, generate) for _ in range(5)
+        ))
+
+        assert calls == 1
+        assert {response.text for response in responses} == {"cat"}
+        assert cache.stats()["coalesced"] == 4
+
+    @pytest.mark.asyncio
+    async def test_disabled(self):
+        """無効時は毎回LLMを呼ぶ"""
+        cache = _cache(enabled=False)
+        generate = AsyncMock(return_value=_response("cat"))
+
+        await cache.get_or_generate("gemini-2.0-flash", "猫", None, generate)
+        await cache.get_or_generate("gemini-2.0-flash", "猫", None, generate)
+
+        assert generate.await_count == 2
+        assert cache.stats()["lookups"] == 0
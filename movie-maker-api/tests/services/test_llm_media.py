@@ -0,0 +1,85 @@
+"""
+LLMに送る画像の縮小のテスト
+"""
+import asyncio
+import io
+from unittest.mock import patch
+
+import httpx
+import pytest
+from PIL import Image
+
+from app.services.llm_media import LLMMediaShrinker, MediaPurpose, shrink_image
+
+
+def _image(image_format: str, size: tuple[int, int], mode: str = "RGB") -> bytes:
+    img = Image.effect_noise(size, 64).convert(mode)
+    buffer = io.BytesIO()
+    img.save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+class TestShrinkImage:
+    """shrink_imageのテスト"""
+
+    def test_downscales_large_png_to_jpeg(self):
+        """長辺を上限まで縮小してJPEGにする（縦横比は維持）"""
+        data = _image("PNG", (2000, 1000), mode="RGBA")
+
+        shrunk, mime_type = shrink_image(data, 768, 85)
+
+        assert mime_type == "image/jpeg"
+        assert len(shrunk) < len(data)
+        with Image.open(io.BytesIO(shrunk)) as img:
+            assert img.size == (768, 384)
+
+    def test_keeps_small_jpeg(self):
+        """上限以下のJPEGはそのまま"""
+        data = _image("JPEG", (300, 200))
+        assert shrink_image(data, 768, 85) == (data, "image/jpeg")
+
+
+def _transport(images: dict[str, bytes], in_flight: dict) -> httpx.MockTransport:
+    async def handler(request: httpx.Request) -> httpx.Response:
+        in_flight["now"] += 1
+        in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+        await asyncio.sleep(0.01)
+        in_flight["now"] -= 1
+        url = str(request.url)
+        if url not in images:
+            return httpx.Response(404)
+        return httpx.Response(200, content=images[url])
+
+    return httpx.MockTransport(handler)
+
+
+class TestFetchImageParts:
+    """fetch_image_partsのテスト"""
+
+    @pytest.mark.asyncio
+    async def test_fetches_concurrently_and_keeps_order(self):
+        """並行してダウンロードし、取得できなかった画像はNone"""
+        images = {
+            "https://example.com/a.png": _image("PNG", (1600, 1600)),
+            "https://example.com/b.jpg": _image("JPEG", (400, 300)),
+        }
+        in_flight = {"now": 0, "peak": 0}
+        real_client = httpx.AsyncClient
+        shrinker = LLMMediaShrinker(enabled=True)
+
+        with patch(
+            "app.services.llm_media.httpx.AsyncClient",
+            lambda **kwargs: real_client(transport=_transport(images, in_flight), **kwargs),
+        ):
+            parts = await shrinker.fetch_image_parts(
+                ["https://example.com/a.png", "https://example.com/missing.png", "https://example.com/b.jpg"],
+                MediaPurpose.REFERENCE,
+            )
+
+        assert in_flight["peak"] == 3
+        assert parts[1] is None
+        with Image.open(io.BytesIO(parts[0].inline_data.data)) as img:
+            assert img.size == (1536, 1536)
+        assert parts[2].inline_data.data == images["https://example.com/b.jpg"]
+        stats = shrinker.stats()
+        assert stats["images"] == 2 and stats["bytes_out"] < stats["bytes_in"]
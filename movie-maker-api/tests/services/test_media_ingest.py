@@ -0,0 +1,239 @@
+"""
+派生アセット取り込みのテスト
+"""
+from unittest.mock import patch
+
+import pytest
+
+from app.core.config import settings
+from app.services import media_ingest
+from app.services.ffmpeg_service import FFmpegService
+from app.services.media_ingest import (
+    DERIVED_COLUMNS,
+    ingest_derived_columns,
+    ingest_video,
+    parse_media_metadata,
+    preview_start,
+)
+from app.services.scratch_space import ScratchSpaceManager
+
+PROBE = {
+    "format": {"duration": "5.041", "size": "2048000", "bit_rate": "3250000"},
+    "streams": [
+        {
+            "codec_type": "video", "codec_name": "h264", "width": 720, "height": 1280,
+            "avg_frame_rate": "24000/1001", "r_frame_rate": "24/1",
+        },
+        {"codec_type": "audio", "codec_name": "aac"},
+    ],
+}
+
+
+class FakeFFmpeg:
+    """プローブと派生画像の出力を記録する代替"""
+
+    def __init__(self, probe=PROBE):
+        self.probe = probe
+        self.calls = []
+
+    async def get_video_info(self, path):
+        return self.probe
+
+    async def extract_derived_images(self, video_path, duration, **outputs):
+        self.calls.append((video_path, duration, outputs))
+        for name, path in outputs.items():
+            if name.endswith("_path") and path:
+                with open(path, "wb") as f:
+                    f.write(name.encode())
+
+
+@pytest.fixture
+def env(tmp_path):
+    ffmpeg = FakeFFmpeg()
+    uploads = {}
+
+    async def upload(path, key, content_type):
+        with open(path, "rb") as f:
+            uploads[key] = (content_type, f.read())
+        return f"https://cdn.example.com/{key}"
+
+    scratch = ScratchSpaceManager(root=str(tmp_path / "scratch"), tmpfs_root="")
+    with patch("app.services.media_ingest.get_ffmpeg_service", return_value=ffmpeg), \
+         patch("app.services.media_ingest.upload_local_file", side_effect=upload), \
+         patch("app.services.media_ingest.get_scratch_space", return_value=scratch):
+        yield ffmpeg, uploads
+
+
+class TestParseMediaMetadata:
+    """プローブ結果の解析のテスト"""
+
+    def test_extracts_stream_details(self):
+        """長さ・サイズ・fps・コーデック・音声有無を取り出す"""
+        metadata = parse_media_metadata(PROBE)
+        assert metadata == {
+            "duration": 5.041,
+            "size": 2048000,
+            "bit_rate": 3250000,
+            "width": 720,
+            "height": 1280,
+            "fps": 23.976,
+            "video_codec": "h264",
+            "has_audio": True,
+        }
+
+    def test_rotation_swaps_dimensions(self):
+        """回転メタデータがある場合は表示サイズ"""
+        metadata = parse_media_metadata({
+            "format": {},
+            "streams": [{"codec_type": "video", "width": 1920, "height": 1080, "tags": {"rotate": "90"}}],
+        })
+        assert (metadata["width"], metadata["height"]) == (1080, 1920)
+        assert metadata["duration"] is None
+        assert metadata["has_audio"] is False
+
+
+class TestIngestVideo:
+    """ingest_videoのテスト"""
+
+    @pytest.mark.asyncio
+    async def test_single_pass_produces_all_artifacts(self, env):
+        """1回の抽出で全画像を作り、R2に保存する"""
+        ffmpeg, uploads = env
+
+        artifacts = await ingest_video(b"video-bytes", "derived/storyboard_scenes/s1/1", sprite=True)
+
+        assert len(ffmpeg.calls) == 1
+        _, duration, outputs = ffmpeg.calls[0]
+        assert duration == 5.041
+        assert outputs["poster_time"] == 1.0
+        assert sorted(uploads) == [
+            f"derived/storyboard_scenes/s1/1/{name}"
+            for name in (
+                "first_frame.jpg", "last_frame.jpg", "poster.jpg", "preview.mp4", "sprite.jpg", "thumbnail.jpg",
+            )
+        ]
+        assert artifacts.last_frame_url == "https://cdn.example.com/derived/storyboard_scenes/s1/1/last_frame.jpg"
+
+        columns = artifacts.to_columns()
+        assert columns["sprite_url"].endswith("sprite.jpg")
+        assert columns["media_metadata"]["sprite"]["columns"] == media_ingest.SPRITE_COLUMNS
+        assert columns["media_metadata"]["width"] == 720
+
+    @pytest.mark.asyncio
+    async def test_sprite_is_optional(self, env):
+        """スプライト無効時は出力しない"""
+        ffmpeg, uploads = env
+
+        artifacts = await ingest_video(b"video-bytes", "derived/x/1", sprite=False)
+
+        assert ffmpeg.calls[0][2]["sprite_path"] is None
+        assert len(uploads) == 5
+        assert artifacts.to_columns()["sprite_url"] is None
+
+    @pytest.mark.asyncio
+    async def test_preview_loop(self, env, monkeypatch):
+        """一覧用プレビューは同じデコードから出力し、形式に応じたContent-Typeで保存"""
+        ffmpeg, uploads = env
+
+        artifacts = await ingest_video(b"video-bytes", "derived/x/1", sprite=False)
+
+        outputs = ffmpeg.calls[0][2]
+        assert outputs["preview_path"].endswith("preview.mp4")
+        assert (outputs["preview_duration"], outputs["preview_height"]) == (2.0, 240)
+        assert outputs["preview_start"] == 1.0
+        assert uploads["derived/x/1/preview.mp4"][0] == "video/mp4"
+        assert artifacts.to_columns()["preview_url"] == "https://cdn.example.com/derived/x/1/preview.mp4"
+
+        monkeypatch.setattr(settings, "MEDIA_PREVIEW_FORMAT", "webp")
+        await ingest_video(b"video-bytes", "derived/x/2", sprite=False)
+        assert uploads["derived/x/2/preview.webp"][0] == "image/webp"
+
+    def test_preview_start_fits_short_videos(self):
+        """短い動画は先頭から、長い動画は冒頭の暗転を避ける"""
+        assert preview_start(1.5) == 0.0
+        assert preview_start(2.5) == 0.5
+        assert preview_start(10.0) == 1.0
+
+
+class TestIngestDerivedColumns:
+    """ingest_derived_columnsのテスト"""
+
+    @pytest.mark.asyncio
+    async def test_failure_clears_columns(self, env):
+        """解析できない動画でも例外を投げず、前の動画の派生アセットを残さない"""
+        ffmpeg, uploads = env
+        ffmpeg.probe = {}
+
+        columns = await ingest_derived_columns(b"broken", "video_generations", "v1")
+
+        assert columns == {column: None for column in DERIVED_COLUMNS}
+        assert "last_frame_url" in columns
+        assert uploads == {}
+
+    @pytest.mark.asyncio
+    async def test_disabled(self, env, monkeypatch):
+        """無効時は何もしない"""
+        ffmpeg, _ = env
+        monkeypatch.setattr(settings, "MEDIA_INGEST_ENABLED", False)
+
+        assert await ingest_derived_columns(b"video", "video_generations", "v1") == {}
+        assert ffmpeg.calls == []
+
+
+class TestExtractDerivedImages:
+    """FFmpegコマンド生成のテスト"""
+
+    @pytest.mark.asyncio
+    async def test_one_input_many_outputs(self):
+        """入力は1つで、最終フレームは上書き出力"""
+        service = FFmpegService.__new__(FFmpegService)
+        commands = []
+
+        async def run(cmd, job_class=None, **kwargs):
+            commands.append(cmd)
+            return 0, b"", b""
+
+        with patch.object(FFmpegService, "_check_ffmpeg", return_value=True), \
+             patch.object(FFmpegService, "_run", side_effect=run):
+            await service.extract_derived_images(
+                "in.mp4", 5.0, "first.jpg", "last.jpg", "poster.jpg", "thumb.jpg",
+                poster_time=1.0, sprite_path="sprite.jpg",
+            )
+
+        cmd = commands[0]
+        assert cmd.count("-i") == 1
+        graph = cmd[cmd.index("-filter_complex") + 1]
+        assert "split=4" in graph
+        assert "trim=start=4.500" in graph
+        assert "tile=5x2" in graph
+        assert cmd[cmd.index("last.jpg") - 5:cmd.index("last.jpg")] == ["[last]", "-update", "1", "-q:v", "2"]
+
+    @pytest.mark.asyncio
+    async def test_preview_branch(self):
+        """プレビューは音声なし・低解像度のH.264で同じコマンドに追加"""
+        service = FFmpegService.__new__(FFmpegService)
+        commands = []
+
+        async def run(cmd, job_class=None, **kwargs):
+            commands.append(cmd)
+            return 0, b"", b""
+
+        with patch.object(FFmpegService, "_check_ffmpeg", return_value=True), \
+             patch.object(FFmpegService, "_run", side_effect=run):
+            await service.extract_derived_images(
+                "in.mp4", 5.0, "first.jpg", "last.jpg", "poster.jpg", "thumb.jpg",
+                poster_time=1.0, preview_path="preview.mp4", preview_start=1.0,
+            )
+            await service.create_preview_clip("in.mp4", "preview.webp", start=0.5)
+
+        cmd = commands[0]
+        graph = cmd[cmd.index("-filter_complex") + 1]
+        assert "split=4" in graph
+        assert "[preview_in]trim=start=1.000:duration=2.000" in graph
+        assert "scale=-2:240[preview]" in graph
+        assert cmd[-1] == "preview.mp4"
+        assert "-an" in cmd and "libx264" in cmd
+
+        webp = commands[1]
+        assert webp[webp.index("-ss") + 1] == "0.5"
+        assert "libwebp_anim" in webp and webp[-1] == "preview.webp"
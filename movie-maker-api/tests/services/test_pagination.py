@@ -0,0 +1,116 @@
+"""
+一覧APIのページネーションのテスト
+"""
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.services.pagination import (
+    CountCache,
+    InvalidCursorError,
+    decode_cursor,
+    encode_cursor,
+    fetch_page,
+)
+
+
+def _query(rows: list[dict]) -> MagicMock:
+    """Supabaseのクエリチェーンのモック"""
+    query = MagicMock()
+    for method in ("or_", "order", "range", "limit"):
+        getattr(query, method).return_value = query
+    query.execute.return_value = MagicMock(data=rows)
+    return query
+
+
+def _rows(count: int) -> list[dict]:
+    return [{"id": f"row-{i}", "created_at": f"2026-01-20T0{9 - i}:00:00Z"} for i in range(count)]
+
+
+class TestCursor:
+    """カーソルのエンコード・デコードのテスト"""
+
+    def test_round_trip(self):
+        """エンコードしたカーソルは元の (created_at, id) に戻る"""
+        cursor = encode_cursor("2026-01-20T03:00:00+00:00", "9b2f-41d4")
+        assert decode_cursor(cursor) == ("2026-01-20T03:00:00+00:00", "9b2f-41d4")
+
+    @pytest.mark.parametrize("cursor", [
+        "not-a-cursor",
+        encode_cursor("yesterday", "row-1"),
+        encode_cursor("2026-01-20T00:00:00Z", "x),id.gt.0"),
+    ])
+    def test_invalid(self, cursor):
+        """デコードできない・日時でない・フィルタ式を含むIDは不正"""
+        with pytest.raises(InvalidCursorError):
+            decode_cursor(cursor)
+
+
+class TestFetchPage:
+    """fetch_pageのテスト"""
+
+    def test_first_page_fetches_one_extra_row(self):
+        """per_page + 1 行だけ取得して次ページの有無を判定"""
+        query = _query(_rows(3))
+
+        page = fetch_page(query, per_page=2)
+
+        query.range.assert_called_once_with(0, 2)
+        assert [row["id"] for row in page.rows] == ["row-0", "row-1"]
+        assert page.has_next
+        assert decode_cursor(page.next_cursor) == ("2026-01-20T08:00:00Z", "row-1")
+
+    def test_cursor_uses_keyset_instead_of_offset(self):
+        """カーソル指定時はOFFSETを使わない"""
+        query = _query(_rows(1))
+
+        page = fetch_page(query, per_page=2, cursor=encode_cursor("2026-01-20T08:00:00Z", "row-1"), page=50)
+
+        query.range.assert_not_called()
+        query.limit.assert_called_once_with(3)
+        query.order.assert_any_call("id", desc=True)
+        assert not page.has_next and page.next_cursor is None
+
+
+class TestCountCache:
+    """CountCacheのテスト"""
+
+    def test_caches_and_adjusts(self):
+        """件数は1回だけ数え、追加・削除で増減する"""
+        cache = CountCache(ttl_seconds=60)
+        compute = MagicMock(return_value=5)
+
+        assert cache.get("storyboards", "u1", compute) == 5
+        cache.adjust("storyboards", "u1", 1)
+        assert cache.get("storyboards", "u1", compute) == 6
+        cache.adjust("storyboards", "u1", -10)
+        assert cache.get("storyboards", "u1", compute) == 0
+        assert compute.call_count == 1
+
+    def test_adjust_drops_filtered_counts(self):
+        """条件付きの件数は増減できないため破棄する"""
+        cache = CountCache(ttl_seconds=60)
+        cache.get("user_image_library", "u1", lambda: 3, variant="category:product")
+
+        cache.adjust("user_image_library", "u1", 1)
+
+        assert cache.get("user_image_library", "u1", lambda: 7, variant="category:product") == 7
+
+    def test_evicts_least_recently_used(self):
+        """上限を超えた件数は最近使われていないものから破棄する"""
+        cache = CountCache(ttl_seconds=60, max_entries=2)
+        cache.get("user_videos", "u1", lambda: 1)
+        cache.get("user_videos", "u2", lambda: 2)
+        cache.get("user_videos", "u1", lambda: 99)
+        cache.get("user_videos", "u3", lambda: 3)
+
+        assert cache.stats()["entries"] == 2
+        assert cache.get("user_videos", "u1", lambda: 99) == 1
+        assert cache.get("user_videos", "u2", lambda: 20) == 20
+
+    def test_expires(self):
+        """TTLを過ぎた件数は数え直す"""
+        cache = CountCache(ttl_seconds=0)
+        cache.get("user_videos", "u1", lambda: 1)
+        assert cache.get("user_videos", "u1", lambda: 2) == 2
+        assert cache.stats()["misses"] == 2
@@ -0,0 +1,83 @@
+"""
+プロンプトテンプレートレジストリのテスト
+"""
+import os
+from pathlib import Path
+from unittest.mock import patch
+
+from app.services.prompt_templates import (
+    ANIMATION_TEMPLATE_FILES,
+    PromptTemplateRegistry,
+    animation_template_path,
+    provider_template_path,
+)
+
+RUNWAY_TEMPLATE = """# Runway
+REFERENCE RULE (do not remove):
+Keep the subject.
+
+CLIP SPECIFIC (edit only this block):
+Camera: {camera}
+---
+## NEGATIVE PROMPT
+blurry, distorted
+---
+"""
+
+
+def _write(root: Path, relative_path: str, content: str) -> Path:
+    path = root / relative_path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding="utf-8")
+    return path
+
+
+class TestPromptTemplateRegistry:
+    """PromptTemplateRegistryのテスト"""
+
+    def test_parses_once_and_serves_copies(self, tmp_path):
+        """起動時に解析した結果を返し、参照時にファイルを読まない"""
+        _write(tmp_path, "story/runway_api_template.md", RUNWAY_TEMPLATE)
+        _write(tmp_path, "notes.md", "not a template")
+        registry = PromptTemplateRegistry(root=tmp_path, hot_reload=False)
+
+        assert registry.load() == 1
+        with patch.object(Path, "read_text", side_effect=AssertionError("read from disk")):
+            template = registry.get(provider_template_path("runway", "story", None))
+
+        assert template["reference_rule"].startswith("REFERENCE RULE")
+        assert template["clip_specific_template"] == "CLIP SPECIFIC (edit only this block):\nCamera: {camera}"
+        assert template["negative_prompt"] == "blurry, distorted"
+
+        template["reference_rule"] = "changed"
+        assert registry.get("story/runway_api_template.md")["reference_rule"].startswith("REFERENCE RULE")
+        assert registry.get("story/veo_api_template.md") is None
+
+    def test_reload_if_changed(self, tmp_path):
+        """ファイルが更新された場合のみ読み直す"""
+        path = _write(tmp_path, "story/runway_api_template.md", RUNWAY_TEMPLATE)
+        registry = PromptTemplateRegistry(root=tmp_path, hot_reload=True)
+        registry.load()
+
+        assert not registry.reload_if_changed()
+
+        path.write_text(RUNWAY_TEMPLATE.replace("blurry", "noisy"), encoding="utf-8")
+        os.utime(path, ns=(path.stat().st_atime_ns, path.stat().st_mtime_ns + 1_000_000))
+
+        assert registry.reload_if_changed()
+        assert registry.get("story/runway_api_template.md")["negative_prompt"] == "noisy, distorted"
+
+    def test_all_mapped_templates_exist(self):
+        """docs/prompt のテンプレートが全て登録されている"""
+        registry = PromptTemplateRegistry(hot_reload=False)
+        registry.load()
+
+        for provider, file_map in ANIMATION_TEMPLATE_FILES.items():
+            for template_id in file_map:
+                category = "2d" if template_id.startswith("A") else "3d"
+                assert registry.get(animation_template_path(category, template_id, provider)) is not None
+        for provider in ("runway", "veo", "domoai", "piapi_kling"):
+            for mode, subject_type in (("story", None), ("scene", "person"), ("scene", "object")):
+                if provider == "domoai" and mode == "story":
+                    continue
+                assert registry.get(provider_template_path(provider, mode, subject_type)) is not None
@@ -0,0 +1,168 @@
+"""
+リモートメディアアクセスのテスト
+"""
+from unittest.mock import patch
+
+import pytest
+from aiohttp import web
+
+from app.services.remote_media import RemoteMediaAccessor
+from app.services.scratch_space import ScratchQuotaExceededError, ScratchSpaceManager
+
+VIDEO_BYTES = b"\x00\x00\x00\x18ftypmp42" + b"v" * 4096
+
+
+@pytest.fixture
+async def media_server(tmp_path):
+    """Range対応（/ranged、同じ内容の2つのパス）と非対応（/plain）のエンドポイントを持つHTTPサーバー"""
+    video_file = tmp_path / "video.mp4"
+    video_file.write_bytes(VIDEO_BYTES)
+    requests = []
+
+    async def ranged(request):
+        requests.append(("ranged", request.headers.get("Range")))
+        return web.FileResponse(video_file)
+
+    async def plain(request):
+        requests.append(("plain", request.headers.get("Range")))
+        return web.Response(body=VIDEO_BYTES, content_type="video/mp4")
+
+    app = web.Application()
+    app.router.add_get("/ranged/video.mp4", ranged)
+    app.router.add_get("/ranged/other.mp4", ranged)
+    app.router.add_get("/plain/video.mp4", plain)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    yield f"http://127.0.0.1:{port}", requests
+
+    await runner.cleanup()
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    manager = ScratchSpaceManager(root=str(tmp_path / "scratch"), tmpfs_root="")
+    with manager.workspace("remote_media") as ws:
+        yield ws
+
+
+class TestMediaSource:
+    """media_sourceのテスト"""
+
+    @pytest.mark.asyncio
+    async def test_range_capable_url_is_passed_through(self, media_server, workspace):
+        """Range対応ならダウンロードせずURLを返す"""
+        base_url, requests = media_server
+        accessor = RemoteMediaAccessor(range_enabled=True)
+        url = f"{base_url}/ranged/video.mp4"
+
+        assert await accessor.media_source(url, workspace) == url
+        assert requests == [("ranged", "bytes=0-0")]
+        assert accessor.stats()["remote_sources"] == 1
+        assert accessor.stats()["bytes_downloaded"] == 0
+
+        # 同じオリジンの確認結果は再利用される
+        await accessor.media_source(url, workspace)
+        assert len(requests) == 1
+
+    @pytest.mark.asyncio
+    async def test_server_without_range_falls_back_to_download(self, media_server, workspace):
+        """Range非対応ならスクラッチ領域にダウンロード"""
+        base_url, _ = media_server
+        accessor = RemoteMediaAccessor(range_enabled=True)
+
+        source = await accessor.media_source(f"{base_url}/plain/video.mp4", workspace, "clip.mp4")
+
+        assert source == workspace.file("clip.mp4")
+        with open(source, "rb") as f:
+            assert f.read() == VIDEO_BYTES
+        assert accessor.stats()["downloaded_sources"] == 1
+        assert accessor.stats()["bytes_downloaded"] == len(VIDEO_BYTES)
+
+    @pytest.mark.asyncio
+    async def test_download_respects_workspace_quota(self, media_server, tmp_path):
+        """ダウンロードがワークスペースのクォータを超えたら中断"""
+        base_url, _ = media_server
+        accessor = RemoteMediaAccessor(range_enabled=False)
+        manager = ScratchSpaceManager(root=str(tmp_path / "scratch"), tmpfs_root="", default_quota_bytes=1024)
+
+        with manager.workspace("remote_media") as small:
+            with pytest.raises(ScratchQuotaExceededError):
+                await accessor.media_source(f"{base_url}/plain/video.mp4", small)
+
+        assert manager.stats()["quota_exceeded"] == 1
+
+    @pytest.mark.asyncio
+    async def test_disabled_always_downloads(self, media_server, workspace):
+        """無効時はRange対応でもダウンロード"""
+        base_url, requests = media_server
+        accessor = RemoteMediaAccessor(range_enabled=False)
+
+        source = await accessor.media_source(f"{base_url}/ranged/video.mp4", workspace)
+
+        assert source.startswith(workspace.path)
+        assert requests == [("ranged", None)]
+
+    @pytest.mark.asyncio
+    async def test_local_path_is_returned_as_is(self, workspace):
+        """ローカルパスはそのまま返す"""
+        accessor = RemoteMediaAccessor(range_enabled=True)
+        assert await accessor.media_source("/tmp/video.mp4", workspace) == "/tmp/video.mp4"
+
+
+class TestFingerprint:
+    """fingerprintのテスト"""
+
+    @pytest.mark.asyncio
+    async def test_uses_etag_without_downloading(self, media_server):
+        """HEADのETagとサイズから識別子を作る"""
+        base_url, _ = media_server
+        accessor = RemoteMediaAccessor(range_enabled=True)
+
+        fingerprint = await accessor.fingerprint(f"{base_url}/ranged/video.mp4")
+
+        assert fingerprint.startswith(f"etag:{base_url}/ranged/video.mp4:")
+        assert fingerprint.endswith(f":{len(VIDEO_BYTES)}")
+        assert accessor.stats()["bytes_downloaded"] == 0
+
+    @pytest.mark.asyncio
+    async def test_same_etag_on_other_paths_differs(self, media_server):
+        """ETagとサイズが同じでも、別のオブジェクトは別の識別子"""
+        base_url, _ = media_server
+        accessor = RemoteMediaAccessor(range_enabled=True)
+
+        a = await accessor.fingerprint(f"{base_url}/ranged/video.mp4")
+        b = await accessor.fingerprint(f"{base_url}/ranged/other.mp4")
+
+        assert a.split(":")[-2:] == b.split(":")[-2:]
+        assert a != b
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_url_without_etag(self, media_server):
+        """ETagがない場合はURLを識別子にし、一定時間ごとに変える"""
+        base_url, _ = media_server
+        url = f"{base_url}/plain/video.mp4"
+        accessor = RemoteMediaAccessor()
+
+        with patch("app.services.remote_media.time.time", return_value=1000.0):
+            first = await accessor.fingerprint(url)
+            assert await accessor.fingerprint(url) == first
+        with patch("app.services.remote_media.time.time", return_value=1000.0 + 3600):
+            later = await accessor.fingerprint(url)
+
+        assert first.startswith(f"url:{url}:")
+        assert later != first
+
+    @pytest.mark.asyncio
+    async def test_local_file_is_hashed(self, tmp_path):
+        """ローカルファイルは内容のハッシュ"""
+        a = tmp_path / "a.mp4"
+        b = tmp_path / "b.mp4"
+        a.write_bytes(VIDEO_BYTES)
+        b.write_bytes(VIDEO_BYTES)
+        accessor = RemoteMediaAccessor()
+
+        assert await accessor.fingerprint(str(a)) == await accessor.fingerprint(str(b))
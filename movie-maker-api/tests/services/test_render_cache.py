@@ -0,0 +1,172 @@
+"""
+レンダリング結果キャッシュのテスト
+"""
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.services.render_cache import RenderCache, build_cache_key
+
+
+@pytest.fixture
+def r2(fake_r2):
+    with patch("app.services.render_cache.get_r2_client", return_value=fake_r2), \
+         patch("app.services.render_cache.get_public_url", side_effect=lambda key: f"https://cdn.example.com/{key}"):
+        yield fake_r2
+
+
+class TestCacheKey:
+    """キャッシュキーのテスト"""
+
+    def test_param_order_independent(self):
+        """パラメータの順序に依存しない"""
+        a = build_cache_key("add_bgm", {"x": 1, "y": 2}, ["h1"])
+        b = build_cache_key("add_bgm", {"y": 2, "x": 1}, ["h1"])
+        assert a == b
+
+    def test_differs_by_input_and_params(self):
+        """入力・パラメータ・処理名が違えば別キー"""
+        base = build_cache_key("add_bgm", {"x": 1}, ["h1", None])
+        assert base != build_cache_key("add_bgm", {"x": 2}, ["h1", None])
+        assert base != build_cache_key("add_bgm", {"x": 1}, ["h2", None])
+        assert base != build_cache_key("process_video", {"x": 1}, ["h1", None])
+        assert base != build_cache_key("add_bgm", {"x": 1}, ["h1"])
+
+
+class TestGetOrRender:
+    """get_or_renderのテスト"""
+
+    @pytest.mark.asyncio
+    async def test_hit_skips_render(self, r2):
+        """2回目は再レンダリングせず既存オブジェクトを返す"""
+        cache = RenderCache(enabled=True)
+        render_calls = 0
+
+        async def render(path: str) -> None:
+            nonlocal render_calls
+            render_calls += 1
+            with open(path, "wb") as f:
+                f.write(b"rendered")
+
+        first = await cache.get_or_render("add_bgm", {"v": 1}, [b"video", b"bgm"], render)
+        second = await cache.get_or_render("add_bgm", {"v": 1}, [b"video", b"bgm"], render)
+
+        assert render_calls == 1
+        assert first.hit is False
+        assert second.hit is True
+        assert second.url == first.url
+        assert second.url.startswith("https://cdn.example.com/videos/render-cache/add_bgm/")
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == pytest.approx(0.5)
+        assert stats["bytes_saved"] == len(b"rendered")
+
+    @pytest.mark.asyncio
+    async def test_single_flight(self, r2):
+        """同時に要求された同一レンダリングは1回だけ実行"""
+        cache = RenderCache(enabled=True)
+        render_calls = 0
+        started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def render(path: str) -> None:
+            nonlocal render_calls
+            render_calls += 1
+            started.set()
+            await release.wait()
+            with open(path, "wb") as f:
+                f.write(b"data")
+
+        first = asyncio.create_task(cache.get_or_render("op", {}, [b"in"], render))
+        await started.wait()
+        second = asyncio.create_task(cache.get_or_render("op", {}, [b"in"], render))
+        # 入力のハッシュ・R2の確認はスレッドで行うため、待機に入るまで待つ
+        while cache.stats()["lookups"] < 2:
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.05)
+        release.set()
+
+        results = await asyncio.gather(first, second)
+
+        assert render_calls == 1
+        assert r2.uploads == 1
+        assert [r.hit for r in results] == [False, True]
+        assert cache.stats()["coalesced"] == 1
+
+    def test_single_flight_across_event_loops(self, r2):
+        """別スレッドのイベントループ（asyncio.run のタスク）からの同一レンダリングも1回だけ実行"""
+        cache = RenderCache(enabled=True)
+        render_calls = 0
+        started = threading.Event()
+        release = threading.Event()
+        results = []
+
+        async def render(path: str) -> None:
+            nonlocal render_calls
+            render_calls += 1
+            started.set()
+            await asyncio.to_thread(release.wait, 5)
+            with open(path, "wb") as f:
+                f.write(b"data")
+
+        def worker():
+            results.append(asyncio.run(cache.get_or_render("op", {}, [b"in"], render)))
+
+        first = threading.Thread(target=worker)
+        first.start()
+        assert started.wait(5)
+        second = threading.Thread(target=worker)
+        second.start()
+        # 2つ目が参照を終えて実行中のレンダリングを待つまで待ってから完了させる
+        deadline = time.monotonic() + 5
+        while cache.stats()["lookups"] < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.1)
+        release.set()
+        first.join(5)
+        second.join(5)
+
+        assert render_calls == 1
+        assert r2.uploads == 1
+        assert sorted(r.hit for r in results) == [False, True]
+        assert cache.stats()["inflight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_render_error_propagates(self, r2):
+        """レンダリング失敗は例外として伝わり、キャッシュされない"""
+        cache = RenderCache(enabled=True)
+
+        async def render(path: str) -> None:
+            raise RuntimeError("encode failed")
+
+        with pytest.raises(RuntimeError):
+            await cache.get_or_render("op", {}, [b"in"], render)
+
+        assert r2.uploads == 0
+        assert cache.stats()["inflight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_disabled_always_renders(self, r2, tmp_path):
+        """無効時は毎回レンダリングする"""
+        cache = RenderCache(enabled=False)
+        render = MagicMock()
+
+        async def do_render(path: str) -> None:
+            render()
+            with open(path, "wb") as f:
+                f.write(b"data")
+
+        input_path = tmp_path / "in.mp4"
+        input_path.write_bytes(b"video")
+
+        await cache.get_or_render("op", {}, [str(input_path)], do_render)
+        result = await cache.get_or_render("op", {}, [str(input_path)], do_render)
+
+        assert render.call_count == 2
+        assert result.hit is False
+        assert cache.stats()["lookups"] == 0
@@ -0,0 +1,105 @@
+"""
+スクラッチ領域管理サービスのテスト
+"""
+import os
+
+import pytest
+
+from app.services.scratch_space import ScratchQuotaExceededError, ScratchSpaceManager
+
+
+@pytest.fixture
+def manager(tmp_path):
+    return ScratchSpaceManager(
+        root=str(tmp_path / "disk"),
+        tmpfs_root=str(tmp_path / "ram"),
+        default_quota_bytes=1024,
+        tmpfs_max_bytes=100,
+    )
+
+
+def _write(path: str, size: int) -> None:
+    with open(path, "wb") as f:
+        f.write(b"x" * size)
+
+
+class TestScratchWorkspace:
+    """ワークスペースのテスト"""
+
+    def test_cleanup_on_exit(self, manager):
+        """with文を抜けるとワークスペースが削除される"""
+        with manager.workspace("video_abc") as ws:
+            _write(ws.file("a.mp4"), 10)
+            _write(ws.small_file("list.txt"), 10)
+            assert manager.stats()["active_workspaces"] == 1
+
+        assert not os.path.exists(ws.path)
+        stats = manager.stats()
+        assert stats["active_workspaces"] == 0
+        assert stats["disk_bytes"] == 0
+        assert stats["tmpfs_bytes"] == 0
+        assert stats["workspaces_cleaned"] == 1
+
+    def test_cleanup_on_error(self, manager):
+        """例外時も削除される"""
+        with pytest.raises(RuntimeError):
+            with manager.workspace("job") as ws:
+                _write(ws.file("a.mp4"), 10)
+                raise RuntimeError("boom")
+
+        assert not os.path.exists(ws.path)
+
+    def test_small_file_uses_tmpfs(self, manager, tmp_path):
+        """小さなファイルはRAM層に置かれる"""
+        with manager.workspace("job") as ws:
+            assert ws.small_file("list.txt").startswith(str(tmp_path / "ram"))
+            assert ws.file("a.mp4").startswith(str(tmp_path / "disk"))
+
+    def test_small_file_falls_back_to_disk(self, manager, tmp_path):
+        """RAM層が上限に達している場合はディスク層を使う"""
+        os.makedirs(manager.tmpfs_root)
+        _write(os.path.join(manager.tmpfs_root, "big"), 200)
+
+        with manager.workspace("job") as ws:
+            assert ws.small_file("list.txt").startswith(str(tmp_path / "disk"))
+
+    def test_quota_exceeded(self, manager):
+        """クォータ超過で例外"""
+        with manager.workspace("job", quota_bytes=100) as ws:
+            _write(ws.file("a.mp4"), 50)
+            assert ws.check_quota() == 50
+
+            _write(ws.file("b.mp4"), 60)
+            with pytest.raises(ScratchQuotaExceededError):
+                ws.check_quota()
+
+        assert manager.stats()["quota_exceeded"] == 1
+
+    def test_name_sanitized(self, manager):
+        """ジョブ名のパス区切り等は置換される"""
+        with manager.workspace("../etc/passwd") as ws:
+            assert os.path.dirname(ws.path) == manager.root
+
+
+class TestSweepOrphans:
+    """孤児ワークスペース掃除のテスト"""
+
+    def test_sweeps_dead_and_stale(self, manager):
+        """終了済みプロセスと前回起動時の残骸を削除し、実行中のものは残す"""
+        os.makedirs(manager.root)
+        dead = os.path.join(manager.root, "999999999-job-deadbeef")
+        stale = os.path.join(manager.root, f"{os.getpid()}-job-cafebabe")
+        alive = os.path.join(manager.root, "1-job-0badf00d")
+        for path in (dead, stale, alive):
+            os.makedirs(path)
+
+        active = manager.workspace("active")
+
+        assert manager.sweep_orphans() == 2
+        assert not os.path.exists(dead)
+        assert not os.path.exists(stale)
+        assert os.path.exists(alive)
+        assert os.path.exists(active.path)
+        assert manager.stats()["orphans_swept"] == 2
+
+        active.cleanup()
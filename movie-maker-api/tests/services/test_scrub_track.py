@@ -0,0 +1,118 @@
+"""
+スクラブ用スプライトシート + WebVTTのテスト
+"""
+import os
+from unittest.mock import patch
+
+import pytest
+
+from app.core.config import settings
+from app.services import scrub_track
+from app.services.scrub_track import build_webvtt, get_or_create_scrub_track, scrub_key_prefix
+from app.services.scratch_space import ScratchSpaceManager
+
+PROBE = {
+    "format": {"duration": "150.5"},
+    "streams": [{"codec_type": "video", "width": 1280, "height": 720}],
+}
+
+
+class FakeFFmpeg:
+    def __init__(self):
+        self.generated = 0
+
+    async def get_video_info(self, source):
+        return PROBE
+
+    async def generate_sprite_sheets(self, source, output_dir, interval_seconds, columns, rows, tile_width, image_format):
+        self.generated += 1
+        paths = []
+        for i in range(2):
+            path = os.path.join(output_dir, f"sheet_{i:03d}.{image_format}")
+            with open(path, "wb") as f:
+                f.write(b"sheet")
+            paths.append(path)
+        return paths
+
+
+class FakeRemoteMedia:
+    async def media_source(self, url, workspace, filename="source.mp4"):
+        return url
+
+
+@pytest.fixture
+def env(tmp_path, monkeypatch, fake_r2):
+    monkeypatch.setattr(settings, "R2_PUBLIC_URL", "https://cdn.example.com")
+    ffmpeg = FakeFFmpeg()
+    uploads = []
+
+    async def upload(path, key, content_type):
+        uploads.append((key, content_type))
+        return f"https://cdn.example.com/{key}"
+
+    scratch = ScratchSpaceManager(root=str(tmp_path / "scratch"), tmpfs_root="")
+    with patch("app.services.scrub_track.get_r2_client", return_value=fake_r2), \
+         patch("app.services.scrub_track.upload_local_file", side_effect=upload), \
+         patch("app.services.scrub_track.get_ffmpeg_service", return_value=ffmpeg), \
+         patch("app.services.scrub_track.get_remote_media", return_value=FakeRemoteMedia()), \
+         patch("app.services.scrub_track.get_scratch_space", return_value=scratch):
+        yield fake_r2, ffmpeg, uploads
+
+
+class TestBuildWebvtt:
+    """WebVTTインデックスのテスト"""
+
+    def test_cues_point_into_sheets(self):
+        """キューは時間順にシート内の位置を指し、シートをまたぐ"""
+        vtt = build_webvtt(5.5, 1.0, ["sheet_000.jpg", "sheet_001.jpg"], 2, 2, 160, 90)
+        blocks = vtt.strip().split("\n\n")
+
+        assert blocks[0] == "WEBVTT"
+        assert len(blocks) == 7
+        assert blocks[1] == "00:00:00.000 --> 00:00:01.000\nsheet_000.jpg#xywh=0,0,160,90"
+        assert blocks[4] == "00:00:03.000 --> 00:00:04.000\nsheet_000.jpg#xywh=160,90,160,90"
+        assert blocks[5] == "00:00:04.000 --> 00:00:05.000\nsheet_001.jpg#xywh=0,0,160,90"
+        # 最後のキューは動画の終端まで
+        assert blocks[6].startswith("00:00:05.000 --> 00:00:05.500")
+
+    def test_long_timestamps(self):
+        """1時間を超える位置"""
+        vtt = build_webvtt(3725.0, 3600.0, ["s.jpg"], 1, 2, 160, 90)
+        assert "01:00:00.000 --> 01:02:05.000" in vtt
+
+
+class TestGetOrCreate:
+    """get_or_create_scrub_trackのテスト"""
+
+    def test_key_is_next_to_own_video(self, monkeypatch):
+        """このバケットの動画は動画の隣、それ以外はハッシュ"""
+        monkeypatch.setattr(settings, "R2_PUBLIC_URL", "https://cdn.example.com")
+        assert scrub_key_prefix("https://cdn.example.com/videos/sb/scene_1.mp4", 1.0, "jpg") \
+            == "videos/sb/scene_1.scrub/1000ms_jpg"
+        assert scrub_key_prefix("https://other.example.com/v.mp4", 0.5, "webp").startswith("scrub/external/")
+
+    @pytest.mark.asyncio
+    async def test_generates_once_and_reuses(self, env):
+        """1回目は作成してR2に保存、2回目はVTTの存在だけ確認して返す"""
+        r2, ffmpeg, uploads = env
+        url = "https://cdn.example.com/videos/sb/scene_1.mp4"
+
+        first = await get_or_create_scrub_track(url)
+
+        assert not first.cached
+        assert (first.tile_width, first.tile_height) == (scrub_track.SCRUB_TILE_WIDTH, 90)
+        assert first.vtt_url == "https://cdn.example.com/videos/sb/scene_1.scrub/1000ms_jpg/thumbnails.vtt"
+        assert [key for key, _ in uploads] == [
+            "videos/sb/scene_1.scrub/1000ms_jpg/sheet_000.jpg",
+            "videos/sb/scene_1.scrub/1000ms_jpg/sheet_001.jpg",
+        ]
+        vtt = r2.objects["videos/sb/scene_1.scrub/1000ms_jpg/thumbnails.vtt"]
+        assert vtt["ContentType"].startswith("text/vtt")
+        assert b"sheet_001.jpg#xywh=" in vtt["Body"]
+
+        second = await get_or_create_scrub_track(url)
+
+        assert second.cached
+        assert ffmpeg.generated == 1
+        assert second.sprite_urls == first.sprite_urls
+        assert second.tile_height == first.tile_height
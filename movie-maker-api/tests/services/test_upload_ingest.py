@@ -0,0 +1,80 @@
+"""
+アップロードファイル取り込みのテスト
+"""
+import io
+import os
+
+import pytest
+from fastapi import UploadFile
+
+from app.services.upload_ingest import UploadTooLargeError, ingest_upload, spool_upload
+
+
+class CountingStream(io.BytesIO):
+    """読み込み回数・最大読み込みサイズを記録するストリーム"""
+
+    def __init__(self, data: bytes):
+        super().__init__(data)
+        self.max_read = 0
+        self.total_read = 0
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.max_read = max(self.max_read, len(chunk))
+        self.total_read += len(chunk)
+        return chunk
+
+
+class TestSpoolUpload:
+    """spool_uploadのテスト"""
+
+    @pytest.mark.asyncio
+    async def test_writes_in_chunks(self, tmp_path):
+        """チャンク単位で読み込んでファイルに書き出す"""
+        data = b"v" * 10_000
+        stream = CountingStream(data)
+        dest = tmp_path / "out.mp4"
+
+        size = await spool_upload(UploadFile(stream, filename="a.mp4"), str(dest), max_bytes=20_000, chunk_size=1024)
+
+        assert size == len(data)
+        assert dest.read_bytes() == data
+        assert stream.max_read == 1024
+
+    @pytest.mark.asyncio
+    async def test_aborts_when_limit_exceeded(self, tmp_path):
+        """上限を超えた時点で読み込みを中断し、書き出し途中のファイルを削除"""
+        stream = CountingStream(b"x" * 10_000)
+        dest = tmp_path / "out.mp4"
+
+        with pytest.raises(UploadTooLargeError):
+            await spool_upload(UploadFile(stream, filename="a.mp4"), str(dest), max_bytes=3000, chunk_size=1024)
+
+        assert not dest.exists()
+        # 上限を超えたチャンク（3チャンク目）までしか読まない
+        assert stream.total_read == 3072
+
+    @pytest.mark.asyncio
+    async def test_rejects_known_size_before_reading(self, tmp_path):
+        """サイズが分かっている場合は読み込む前に拒否"""
+        stream = CountingStream(b"x" * 100)
+
+        with pytest.raises(UploadTooLargeError):
+            await spool_upload(UploadFile(stream, size=100, filename="a.mp4"), str(tmp_path / "out"), max_bytes=10)
+
+        assert stream.total_read == 0
+
+
+class TestIngestUpload:
+    """ingest_uploadのテスト"""
+
+    @pytest.mark.asyncio
+    async def test_workspace_removed_after_use(self):
+        """ブロックを抜けるとワークスペースごと削除"""
+        async with ingest_upload(UploadFile(io.BytesIO(b"audio"), filename="a.mp3"), 100, "mp3") as upload:
+            assert upload.size == 5
+            assert upload.path.endswith(".mp3")
+            with open(upload.path, "rb") as f:
+                assert f.read() == b"audio"
+
+        assert not os.path.exists(upload.workspace.path)
@@ -104,10 +104,10 @@ class TestVideoAnalyzer:
     @pytest.mark.asyncio
     async def test_analyze_with_gemini_error_fallback(self, analyzer):
         """Gemini分析エラー時のフォールバック"""
-        mock_client = MagicMock()
-        mock_client.models.generate_content.side_effect = Exception("API Error")
+        mock_gateway = MagicMock()
+        mock_gateway.generate_content = AsyncMock(side_effect=Exception("API Error"))
 
-        with patch("app.services.video_analyzer.genai.Client", return_value=mock_client):
+        with patch("app.services.video_analyzer.get_gemini_gateway", return_value=mock_gateway):
             result = await analyzer._analyze_with_gemini(
                 frames_base64=["base64data"],
                 duration=30.0,
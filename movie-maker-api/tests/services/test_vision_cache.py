@@ -0,0 +1,202 @@
+"""
+画像分析結果キャッシュのテスト
+"""
+import io
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from PIL import Image, ImageDraw
+
+from app.services.vision_cache import VisionAnalysisCache, color_distance, hamming_distance, perceptual_hash
+
+
+def _image(image_format: str = "PNG", size: tuple[int, int] = (256, 256), flip: bool = False) -> bytes:
+    """左上から右下へのグラデーション画像"""
+    img = Image.new("RGB", size)
+    width, height = size
+    img.putdata([
+        (x * 255 // width, y * 255 // height, (x + y) * 127 // (width + height))
+        for y in range(height)
+        for x in range(width)
+    ])
+    if flip:
+        img = img.transpose(Image.Transpose.FLIP_LEFT_RIGHT)
+    buffer = io.BytesIO()
+    img.save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+def _ellipse(color: tuple[int, int, int]) -> bytes:
+    """白地に楕円を描いた画像"""
+    img = Image.new("RGB", (256, 256), (255, 255, 255))
+    ImageDraw.Draw(img).ellipse((48, 64, 208, 192), fill=color)
+    buffer = io.BytesIO()
+    img.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def r2(fake_r2):
+    with patch("app.services.vision_cache.get_r2_client", return_value=fake_r2):
+        yield fake_r2
+
+
+@pytest.fixture
+def images():
+    """URL → 画像バイト列（fetch_image_bytes の代わり）"""
+    store: dict[str, bytes] = {}
+    fetch = AsyncMock(side_effect=lambda url: store[url])
+    with patch("app.services.vision_cache.fetch_image_bytes", fetch):
+        yield store, fetch
+
+
+def _cache(**kwargs) -> VisionAnalysisCache:
+    options = dict(enabled=True, ttl_seconds=60, max_memory_entries=10, phash_distance=4, persistent=True)
+    options.update(kwargs)
+    return VisionAnalysisCache(**options)
+
+
+class TestPerceptualHash:
+    """perceptual_hashのテスト"""
+
+    def test_stable_across_reencoding(self):
+        """再エンコード・リサイズしても近く、別の画像とは離れる"""
+        original = perceptual_hash(_image("PNG"))
+        copy = perceptual_hash(_image("JPEG", size=(200, 200)))
+
+        assert hamming_distance(original, copy) <= 4
+        assert color_distance(original, copy) <= 32
+        assert hamming_distance(original, perceptual_hash(_image("PNG", flip=True))) > 4
+
+    def test_distinguishes_colors(self):
+        """形が同じでも色が違う画像は平均色で区別する"""
+        red = perceptual_hash(_ellipse((220, 30, 30)))
+        blue = perceptual_hash(_ellipse((30, 30, 220)))
+
+        assert color_distance(red, blue) > 32
+
+
+class TestVisionAnalysisCache:
+    """VisionAnalysisCacheのテスト"""
+
+    @pytest.mark.asyncio
+    async def test_same_url_skips_analysis(self, r2, images):
+        """分析済みの画像は分析しない"""
+        store, fetch = images
+        store["https://example.com/a.png"] = _image()
+        cache = _cache()
+        analyze = AsyncMock(return_value=["story"])
+
+        first = await cache.get_or_analyze("story_suggestions:v1", "https://example.com/a.png", analyze)
+        second = await cache.get_or_analyze("story_suggestions:v1", "https://example.com/a.png", analyze)
+
+        assert first == second == ["story"]
+        assert analyze.await_count == 1
+        assert cache.stats()["memory_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_replaced_content_at_same_url(self, r2, images):
+        """URLの内容が差し替えられた場合は分析し直す"""
+        store, fetch = images
+        store["https://example.com/a.png"] = _ellipse((220, 30, 30))
+        cache = _cache()
+        analyze = AsyncMock(side_effect=["red", "blue"])
+
+        first = await cache.get_or_analyze("base_prompt:v1", "https://example.com/a.png", analyze)
+        store["https://example.com/a.png"] = _ellipse((30, 30, 220))
+        second = await cache.get_or_analyze("base_prompt:v1", "https://example.com/a.png", analyze)
+
+        assert (first, second) == ("red", "blue")
+        assert fetch.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_same_content_at_another_url(self, r2, images):
+        """同じ内容の画像は別のURLでも分析しない（種類が違えば別の結果）"""
+        store, _ = images
+        store["https://example.com/a.png"] = store["https://example.com/copy.png"] = _image()
+        cache = _cache()
+        analyze = AsyncMock(return_value="description")
+
+        await cache.get_or_analyze("base_prompt:v1", "https://example.com/a.png", analyze)
+        await cache.get_or_analyze("base_prompt:v1", "https://example.com/copy.png", analyze)
+        await cache.get_or_analyze("story_suggestions:v1", "https://example.com/copy.png", analyze)
+
+        assert analyze.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_reencoded_copy_matches_by_perceptual_hash(self, r2, images):
+        """再エンコードされたコピーは知覚ハッシュで見つける"""
+        store, _ = images
+        store["https://example.com/a.png"] = _image("PNG")
+        store["https://example.com/a.jpg"] = _image("JPEG", size=(200, 200))
+        store["https://example.com/other.png"] = _image("PNG", flip=True)
+        cache = _cache()
+        analyze = AsyncMock(return_value="description")
+
+        await cache.get_or_analyze("story_suggestions:v1", "https://example.com/a.png", analyze)
+        await cache.get_or_analyze("story_suggestions:v1", "https://example.com/a.jpg", analyze)
+        assert analyze.await_count == 1
+        assert cache.stats()["phash_hits"] == 1
+
+        await cache.get_or_analyze("story_suggestions:v1", "https://example.com/other.png", analyze)
+        assert analyze.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_different_color_is_not_reused(self, r2, images):
+        """形が同じでも色が違う画像の結果は使わない"""
+        store, _ = images
+        store["https://example.com/red.png"] = _ellipse((220, 30, 30))
+        store["https://example.com/blue.png"] = _ellipse((30, 30, 220))
+        cache = _cache()
+        analyze = AsyncMock(side_effect=[["red"], ["blue"]])
+
+        await cache.get_or_analyze("story_suggestions:v1", "https://example.com/red.png", analyze)
+        result = await cache.get_or_analyze("story_suggestions:v1", "https://example.com/blue.png", analyze)
+
+        assert result == ["blue"]
+        assert cache.stats()["phash_hits"] == 0
+
+    @pytest.mark.asyncio
+    async def test_exact_match_only(self, r2, images):
+        """near_duplicates=False の分析は再エンコードされたコピーにも結果を使わない"""
+        store, _ = images
+        store["https://example.com/a.png"] = _image("PNG")
+        store["https://example.com/a.jpg"] = _image("JPEG", size=(200, 200))
+        cache = _cache()
+        analyze = AsyncMock(return_value="description")
+
+        await cache.get_or_analyze("base_prompt:v1", "https://example.com/a.png", analyze, near_duplicates=False)
+        await cache.get_or_analyze("base_prompt:v1", "https://example.com/a.jpg", analyze, near_duplicates=False)
+
+        assert analyze.await_count == 2
+        assert cache.stats()["phash_hits"] == 0
+
+    @pytest.mark.asyncio
+    async def test_persistent_hit_across_workers(self, r2, images):
+        """R2に保存した結果は別のワーカー（インスタンス）からも使える"""
+        store, _ = images
+        store["https://example.com/a.png"] = _image()
+        analyze = AsyncMock(return_value=["story"])
+        await _cache().get_or_analyze("story_suggestions:v1", "https://example.com/a.png", analyze)
+
+        other = _cache()
+        result = await other.get_or_analyze("story_suggestions:v1", "https://example.com/a.png", analyze)
+
+        assert result == ["story"]
+        assert analyze.await_count == 1
+        assert other.stats()["persistent_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_analysis_is_not_stored(self, r2, images):
+        """分析が失敗した場合は保存しない"""
+        store, _ = images
+        store["https://example.com/a.png"] = _image()
+        cache = _cache()
+        analyze = AsyncMock(side_effect=[ValueError("bad json"), ["story"]])
+
+        with pytest.raises(ValueError):
+            await cache.get_or_analyze("story_suggestions:v1", "https://example.com/a.png", analyze)
+        result = await cache.get_or_analyze("story_suggestions:v1", "https://example.com/a.png", analyze)
+
+        assert result == ["story"]
+        assert r2.objects and analyze.await_count == 2
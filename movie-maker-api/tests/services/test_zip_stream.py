@@ -0,0 +1,56 @@
+"""
+ストリーミングZIP生成のテスト
+"""
+import io
+import zipfile
+
+import pytest
+
+from app.services.zip_stream import stream_zip
+
+
+class TestStreamZip:
+    """stream_zipのテスト"""
+
+    @pytest.mark.asyncio
+    async def test_produces_valid_stored_zip(self, tmp_path):
+        """受け取った順にメンバーを追加した有効なZIP_STOREDを出力"""
+        first = tmp_path / "b.mov"
+        second = tmp_path / "a.mov"
+        first.write_bytes(b"first" * 1000)
+        second.write_bytes(b"second")
+
+        async def members():
+            yield "02_カット.mov", str(first)
+            yield "01_cut.mov", str(second)
+
+        chunks = [chunk async for chunk in stream_zip(members(), chunk_size=1024)]
+
+        # メンバーの途中からデータが出力される
+        assert len(chunks) > 3
+
+        with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as zf:
+            assert zf.namelist() == ["02_カット.mov", "01_cut.mov"]
+            assert zf.read("02_カット.mov") == b"first" * 1000
+            assert zf.read("01_cut.mov") == b"second"
+            assert all(info.compress_type == zipfile.ZIP_STORED for info in zf.infolist())
+            assert zf.testzip() is None
+
+    @pytest.mark.asyncio
+    async def test_first_member_streamed_before_next_is_ready(self, tmp_path):
+        """次のメンバーを待つ前に、先のメンバーのデータが出力される"""
+        path = tmp_path / "a.mov"
+        path.write_bytes(b"x" * 10)
+        requested = []
+
+        async def members():
+            requested.append(1)
+            yield "a.mov", str(path)
+            requested.append(2)
+
+        stream = stream_zip(members())
+        first_chunk = await anext(stream)
+
+        assert first_chunk
+        assert requested == [1]
+        await stream.aclose()
@@ -1,19 +1,142 @@
-from unittest.mock import patch, MagicMock
-from app.external.gemini_client import get_gemini_client, optimize_prompt
-
-def test_gemini_client_initialization():
-    with patch("app.external.gemini_client.settings") as mock_settings:
-        mock_settings.GOOGLE_API_KEY = "test-key"
-        client = get_gemini_client()
-        assert client is not None
+from unittest.mock import patch, MagicMock, AsyncMock
+from app.external.gemini_client import (
+    optimize_prompt,
+    stream_ad_script,
+    stream_story_suggestions,
+    translate_structured_input_to_english,
+    translate_structured_inputs_to_english,
+)
 
 async def test_optimize_prompt_mock():
-    with patch("app.external.gemini_client.get_gemini_client") as mock_get_client:
-        mock_client = MagicMock()
+    with patch("app.external.gemini_client.get_gemini_gateway") as mock_get_gateway:
+        mock_gateway = MagicMock()
         mock_response = MagicMock()
         mock_response.text = "Optimized prompt"
-        mock_client.models.generate_content.return_value = mock_response
-        mock_get_client.return_value = mock_client
+        mock_gateway.generate_content = AsyncMock(return_value=mock_response)
+        mock_get_gateway.return_value = mock_gateway
         
         result = await optimize_prompt("test prompt")
         assert result == "Optimized prompt"
+
+async def test_optimize_prompt_fallback_on_error():
+    with patch("app.external.gemini_client.get_gemini_gateway") as mock_get_gateway:
+        mock_gateway = MagicMock()
+        mock_gateway.generate_content = AsyncMock(side_effect=TimeoutError("deadline"))
+        mock_get_gateway.return_value = mock_gateway
+
+        result = await optimize_prompt("test prompt")
+        assert result == "test prompt"
+
+
+def _text_response(text):
+    response = MagicMock()
+    response.text = text
+    return response
+
+
+async def test_translate_structured_input_batches_fields():
+    """未翻訳のテキストフィールドは1回のリクエストでまとめて翻訳する"""
+    with patch("app.external.gemini_client.get_gemini_gateway") as mock_get_gateway:
+        mock_gateway = MagicMock()
+        mock_gateway.generate_content = AsyncMock(
+            return_value=_text_response('{"1": "red lipstick", "2": "marble table"}')
+        )
+        mock_get_gateway.return_value = mock_gateway
+
+        result = await translate_structured_input_to_english({
+            "subject": "赤い口紅",
+            "background": "大理石のテーブル",
+            "color_palette": "warm tones",
+            "lighting": "studio",
+        })
+
+        assert result["subject"] == "red lipstick"
+        assert result["background"] == "marble table"
+        assert result["color_palette"] == "warm tones"
+        assert result["lighting"] == "professional studio lighting"
+        assert mock_gateway.generate_content.await_count == 1
+
+
+async def test_translate_structured_inputs_falls_back_per_field():
+    """まとめた翻訳に欠けたテキストだけを個別に翻訳する（シーン間の重複は1回）"""
+    with patch("app.external.gemini_client.get_gemini_gateway") as mock_get_gateway:
+        mock_gateway = MagicMock()
+        mock_gateway.generate_content = AsyncMock(side_effect=[
+            _text_response('{"1": "red lipstick", "2": "大理石"}'),
+            _text_response("marble table"),
+        ])
+        mock_get_gateway.return_value = mock_gateway
+
+        results = await translate_structured_inputs_to_english([
+            {"subject": "赤い口紅", "background": "大理石のテーブル"},
+            {"subject": "赤い口紅"},
+        ])
+
+        assert results == [
+            {"subject": "red lipstick", "background": "marble table"},
+            {"subject": "red lipstick"},
+        ]
+        assert mock_gateway.generate_content.await_count == 2
+        assert "大理石のテーブル" in mock_gateway.generate_content.await_args.kwargs["contents"]
+
+
+def _text_stream(*texts):
+    async def chunks(**kwargs):
+        for text in texts:
+            yield text
+
+    return chunks
+
+
+async def test_stream_ad_script_emits_cuts_with_final_ids():
+    """カットを完成した順に返し、最後の脚本は同じIDのカットで組み立てる"""
+    with patch("app.external.gemini_client.get_gemini_gateway") as mock_get_gateway:
+        mock_gateway = MagicMock()
+        mock_gateway.generate_content_stream = _text_stream(
+            '```json\n{"theory": "PASONA", "theory_label": "PASONA法", "cuts": [',
+            '{"scene_type": "problem", "duration": 4}, ',
+            '{"scene_type": "solution", "duration": 6}]}\n```',
+        )
+        mock_get_gateway.return_value = mock_gateway
+
+        events = [event async for event in stream_ad_script("新商品の広告", target_duration=10)]
+
+    assert [name for name, _ in events] == ["meta", "cut", "cut", "done"]
+    assert events[0][1] == {"theory": "pasona", "theory_label": "PASONA法"}
+    script = events[-1][1]
+    assert script["cuts"] == [events[1][1], events[2][1]]
+    assert script["cuts"][1]["cut_number"] == 2
+    assert script["total_duration"] == 10
+
+
+async def test_stream_ad_script_falls_back_on_invalid_json():
+    """応答全体をパースできない場合はフォールバックの脚本を返す"""
+    with patch("app.external.gemini_client.get_gemini_gateway") as mock_get_gateway:
+        mock_gateway = MagicMock()
+        mock_gateway.generate_content_stream = _text_stream('{"theory": "aida", "cuts": [')
+        mock_get_gateway.return_value = mock_gateway
+
+        events = [event async for event in stream_ad_script("新商品の広告", target_duration=20)]
+
+    assert events[-1][0] == "done"
+    assert events[-1][1]["theory"] == "aida"
+    assert events[-1][1]["total_duration"] == 20
+
+
+async def test_stream_story_suggestions():
+    """ストーリー候補を1件ずつ返す"""
+    with patch("app.external.gemini_client.get_gemini_gateway") as mock_get_gateway, \
+         patch("app.external.gemini_client.fetch_image_bytes", AsyncMock(return_value=b"image")), \
+         patch("app.external.gemini_client.get_llm_media") as mock_get_media:
+        mock_gateway = MagicMock()
+        mock_gateway.generate_content_stream = _text_stream('["手を振る", "笑', 'う"]')
+        mock_get_gateway.return_value = mock_gateway
+        mock_get_media.return_value.image_part = AsyncMock(return_value="image-part")
+
+        events = [event async for event in stream_story_suggestions("https://example.com/a.png")]
+
+    assert events == [
+        ("suggestion", "手を振る"),
+        ("suggestion", "笑う"),
+        ("done", ["手を振る", "笑う"]),
+    ]
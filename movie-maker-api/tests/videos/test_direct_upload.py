@@ -0,0 +1,218 @@
+"""
+R2直接アップロードAPIのテスト
+"""
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from tests.conftest import MOCK_USER
+
+USER_ID = MOCK_USER["user_id"]
+
+
+def _upload(**overrides) -> dict:
+    upload = {
+        "id": "upload-1",
+        "user_id": USER_ID,
+        "kind": "user_video",
+        "r2_key": f"user_videos/{USER_ID}/abc.mp4",
+        "filename": "clip.mp4",
+        "content_type": "video/mp4",
+        "file_size": 1000,
+        "title": None,
+        "status": "awaiting_upload",
+        "error_message": None,
+        "result": None,
+    }
+    upload.update(overrides)
+    return upload
+
+
+class TestCreateDirectUpload:
+    """POST /api/v1/videos/uploads のテスト"""
+
+    def test_issues_presigned_put_url(self, auth_client):
+        """申告サイズ・形式を署名に含めたPUT URLを発行"""
+        mock_supabase = MagicMock()
+        mock_supabase.table.return_value.insert.return_value.execute.return_value.data = [{"id": "upload-1"}]
+
+        with patch("app.videos.router.get_supabase", return_value=mock_supabase), \
+             patch("app.videos.router.generate_presigned_put_url", return_value="https://r2.example.com/put") as presign:
+            response = auth_client.post("/api/v1/videos/uploads", json={
+                "kind": "user_video",
+                "filename": "clip.MP4",
+                "content_type": "video/mp4",
+                "file_size": 1234,
+            })
+
+        assert response.status_code == 201
+        data = response.json()
+        assert data["id"] == "upload-1"
+        assert data["upload_url"] == "https://r2.example.com/put"
+        assert data["method"] == "PUT"
+        assert data["headers"]["Content-Type"] == "video/mp4"
+
+        inserted = mock_supabase.table.return_value.insert.call_args[0][0]
+        assert inserted["status"] == "awaiting_upload"
+        assert inserted["r2_key"].startswith(f"user_videos/{USER_ID}/")
+        assert inserted["r2_key"].endswith(".mp4")
+        assert presign.call_args.kwargs["content_length"] == 1234
+
+    def test_rejects_oversized_file(self, auth_client):
+        """上限を超えるサイズはURLを発行しない"""
+        response = auth_client.post("/api/v1/videos/uploads", json={
+            "kind": "user_video",
+            "filename": "clip.mp4",
+            "content_type": "video/mp4",
+            "file_size": 51 * 1024 * 1024,
+        })
+        assert response.status_code == 400
+        assert "ファイルサイズが大きすぎます" in response.json()["detail"]
+
+    def test_rejects_unsupported_type(self, auth_client):
+        """種類ごとに許可されていない形式は400"""
+        response = auth_client.post("/api/v1/videos/uploads", json={
+            "kind": "image",
+            "filename": "a.gif",
+            "content_type": "image/gif",
+            "file_size": 100,
+        })
+        assert response.status_code == 400
+        assert "対応していないファイル形式" in response.json()["detail"]
+
+
+class TestFinalizeDirectUpload:
+    """POST /api/v1/videos/uploads/{id}/finalize のテスト"""
+
+    def test_queues_ingest(self, auth_client):
+        """アップロード待ちの場合は processing にして取り込みを開始"""
+        mock_supabase = MagicMock()
+        mock_supabase.table.return_value.select.return_value.eq.return_value.eq.return_value \
+            .execute.return_value.data = [_upload()]
+        mock_supabase.table.return_value.update.return_value.eq.return_value.eq.return_value \
+            .execute.return_value.data = [_upload(status="processing")]
+
+        with patch("app.videos.router.get_supabase", return_value=mock_supabase), \
+             patch("app.tasks.direct_upload_processor.start_direct_upload_processing") as start:
+            response = auth_client.post("/api/v1/videos/uploads/upload-1/finalize")
+
+        assert response.status_code == 202
+        assert response.json()["status"] == "processing"
+        start.assert_called_once_with("upload-1")
+
+    def test_failed_upload_can_be_finalized_again(self, auth_client):
+        """一時的なエラーで failed になったアップロードは再度取り込める"""
+        mock_supabase = MagicMock()
+        mock_supabase.table.return_value.select.return_value.eq.return_value.eq.return_value \
+            .execute.return_value.data = [_upload(status="failed", error_message="probe failed")]
+        mock_supabase.table.return_value.update.return_value.eq.return_value.eq.return_value \
+            .execute.return_value.data = [_upload(status="processing")]
+
+        with patch("app.videos.router.get_supabase", return_value=mock_supabase), \
+             patch("app.tasks.direct_upload_processor.start_direct_upload_processing") as start:
+            response = auth_client.post("/api/v1/videos/uploads/upload-1/finalize")
+
+        assert response.json()["status"] == "processing"
+        assert response.json()["error_message"] is None
+        mock_supabase.table.return_value.update.return_value.eq.return_value.eq.assert_called_once_with(
+            "status", "failed"
+        )
+        start.assert_called_once_with("upload-1")
+
+    def test_finalize_twice_returns_current_state(self, auth_client):
+        """取り込み済みの場合は再実行せず現在の状態を返す"""
+        mock_supabase = MagicMock()
+        mock_supabase.table.return_value.select.return_value.eq.return_value.eq.return_value \
+            .execute.return_value.data = [_upload(status="completed", result={"id": "video-1"})]
+
+        with patch("app.videos.router.get_supabase", return_value=mock_supabase), \
+             patch("app.tasks.direct_upload_processor.start_direct_upload_processing") as start:
+            response = auth_client.post("/api/v1/videos/uploads/upload-1/finalize")
+
+        assert response.json()["status"] == "completed"
+        assert response.json()["result"] == {"id": "video-1"}
+        mock_supabase.table.return_value.update.assert_not_called()
+        start.assert_not_called()
+
+
+class TestProcessDirectUpload:
+    """直接アップロード取り込みプロセッサのテスト"""
+
+    def _supabase(self, upload: dict) -> MagicMock:
+        mock_supabase = MagicMock()
+        mock_supabase.table.return_value.select.return_value.eq.return_value.single.return_value \
+            .execute.return_value.data = upload
+        return mock_supabase
+
+    def _last_update(self, mock_supabase) -> dict:
+        return mock_supabase.table.return_value.update.call_args[0][0]
+
+    @pytest.mark.asyncio
+    async def test_registers_user_video(self):
+        """R2上のオブジェクトを検証して登録し、結果を保存"""
+        from app.tasks.direct_upload_processor import process_direct_upload
+
+        mock_supabase = self._supabase(_upload(status="processing"))
+        registered = {"id": "video-1", "video_url": "https://cdn.example.com/v.mp4"}
+
+        with patch("app.tasks.direct_upload_processor.get_supabase", return_value=mock_supabase), \
+             patch("app.tasks.direct_upload_processor.head_object", AsyncMock(return_value={"ContentLength": 1000})), \
+             patch("app.tasks.direct_upload_processor.register_direct_user_video", AsyncMock(return_value=registered)) as register, \
+             patch("app.tasks.direct_upload_processor.delete_file", AsyncMock()) as delete:
+            await process_direct_upload("upload-1")
+
+        assert self._last_update(mock_supabase) == {"status": "completed", "result": registered}
+        assert register.call_args.kwargs["file_size"] == 1000
+        delete.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_rejected_video_is_deleted(self):
+        """長さ・解像度の制限を満たさない動画は削除して failed"""
+        from app.tasks.direct_upload_processor import process_direct_upload
+
+        mock_supabase = self._supabase(_upload(status="processing"))
+
+        with patch("app.tasks.direct_upload_processor.get_supabase", return_value=mock_supabase), \
+             patch("app.tasks.direct_upload_processor.head_object", AsyncMock(return_value={"ContentLength": 1000})), \
+             patch("app.tasks.direct_upload_processor.register_direct_user_video",
+                   AsyncMock(side_effect=ValueError("動画が長すぎます。"))), \
+             patch("app.tasks.direct_upload_processor.delete_file", AsyncMock()) as delete:
+            await process_direct_upload("upload-1")
+
+        assert self._last_update(mock_supabase) == {"status": "failed", "error_message": "動画が長すぎます。"}
+        delete.assert_awaited_once_with(f"user_videos/{USER_ID}/abc.mp4")
+
+    @pytest.mark.asyncio
+    async def test_transient_error_keeps_object(self):
+        """プローブ・通信の一時的なエラーではオブジェクトを削除せず failed"""
+        from app.tasks.direct_upload_processor import process_direct_upload
+
+        mock_supabase = self._supabase(_upload(status="processing"))
+
+        with patch("app.tasks.direct_upload_processor.get_supabase", return_value=mock_supabase), \
+             patch("app.tasks.direct_upload_processor.head_object", AsyncMock(return_value={"ContentLength": 1000})), \
+             patch("app.tasks.direct_upload_processor.register_direct_user_video",
+                   AsyncMock(side_effect=ConnectionError("connection reset"))), \
+             patch("app.tasks.direct_upload_processor.delete_file", AsyncMock()) as delete:
+            await process_direct_upload("upload-1")
+
+        update = self._last_update(mock_supabase)
+        assert update["status"] == "failed"
+        assert "connection reset" in update["error_message"]
+        delete.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_missing_object_fails(self):
+        """オブジェクトがアップロードされていなければ failed"""
+        from app.tasks.direct_upload_processor import process_direct_upload
+
+        mock_supabase = self._supabase(_upload(kind="image", r2_key=f"images/{USER_ID}/a.png"))
+
+        with patch("app.tasks.direct_upload_processor.get_supabase", return_value=mock_supabase), \
+             patch("app.tasks.direct_upload_processor.head_object", AsyncMock(return_value=None)), \
+             patch("app.tasks.direct_upload_processor.delete_file", AsyncMock()):
+            await process_direct_upload("upload-1")
+
+        update = self._last_update(mock_supabase)
+        assert update["status"] == "failed"
+        assert "見つかりません" in update["error_message"]
@@ -0,0 +1,292 @@
+"""
+エクスポートジョブAPIのテスト
+"""
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.core.config import settings
+from app.services import export_jobs
+from tests.conftest import MOCK_USER
+
+USER_ID = MOCK_USER["user_id"]
+
+MATERIALS_REQUEST = {
+    "cuts": [
+        {"cut_number": 1, "label": "オープニング", "video_url": "https://example.com/1.mp4"},
+        {"cut_number": 2, "label": "エンド", "video_url": "https://example.com/2.mp4", "trim_end": 3.0},
+    ],
+    "aspect_ratio": "9:16",
+}
+
+
+def _job(**overrides) -> dict:
+    job = {
+        "id": "job-1",
+        "user_id": USER_ID,
+        "kind": "materials",
+        "status": "completed",
+        "progress": 100,
+        "filename": "materials.zip",
+        "file_size": 10,
+        "artifact_storage": "local",
+        "artifact_key": "job-1/materials.zip",
+        "expires_at": (datetime.now(timezone.utc) + timedelta(hours=1)).isoformat(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    }
+    job.update(overrides)
+    return job
+
+
+@pytest.fixture
+def artifact_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "EXPORT_ARTIFACT_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "EXPORT_ARTIFACT_STORAGE", "local")
+    return tmp_path
+
+
+def _mock_job_lookup(mock_supabase, job: dict | None) -> None:
+    mock_supabase.table.return_value.select.return_value.eq.return_value.eq.return_value \
+        .execute.return_value.data = [job] if job else []
+
+
+class TestRequestReuse:
+    """同一リクエストの判定・再利用のテスト"""
+
+    def test_request_hash_ignores_key_order(self):
+        """パラメータのキー順に依存しない"""
+        a = export_jobs.export_request_hash("materials", {"cuts": [], "aspect_ratio": "16:9"})
+        b = export_jobs.export_request_hash("materials", {"aspect_ratio": "16:9", "cuts": []})
+        assert a == b
+        assert a != export_jobs.export_request_hash("prores", {"cuts": [], "aspect_ratio": "16:9"})
+
+    def test_expired_completed_job_is_not_reused(self):
+        """保持期限切れの完了ジョブは再利用しない"""
+        expired = _job(expires_at=(datetime.now(timezone.utc) - timedelta(minutes=1)).isoformat())
+        mock_supabase = MagicMock()
+        mock_supabase.table.return_value.select.return_value.eq.return_value.eq.return_value \
+            .eq.return_value.in_.return_value.order.return_value.limit.return_value \
+            .execute.return_value.data = [expired]
+
+        with patch("app.services.export_jobs.get_supabase", return_value=mock_supabase):
+            assert export_jobs.find_reusable_job(USER_ID, "materials", "hash") is None
+
+    def test_stalled_job_is_failed_and_not_reused(self):
+        """更新の止まった実行中のジョブは再利用せず失敗にする"""
+        stalled_at = (datetime.now(timezone.utc) - timedelta(hours=2)).isoformat()
+        stalled = _job(status="processing", expires_at=None, created_at=stalled_at, updated_at=stalled_at)
+        mock_supabase = MagicMock()
+        mock_supabase.table.return_value.select.return_value.eq.return_value.eq.return_value \
+            .eq.return_value.in_.return_value.order.return_value.limit.return_value \
+            .execute.return_value.data = [stalled]
+
+        with patch("app.services.export_jobs.get_supabase", return_value=mock_supabase):
+            assert export_jobs.find_reusable_job(USER_ID, "materials", "hash") is None
+
+        update = mock_supabase.table.return_value.update
+        update.assert_called_once()
+        assert update.call_args.args[0]["status"] == "failed"
+        update.return_value.eq.assert_called_once_with("id", "job-1")
+
+    def test_running_job_is_reused(self):
+        """更新が続いている実行中のジョブは再利用する"""
+        running = _job(status="processing", expires_at=None, updated_at=datetime.now(timezone.utc).isoformat())
+        mock_supabase = MagicMock()
+        mock_supabase.table.return_value.select.return_value.eq.return_value.eq.return_value \
+            .eq.return_value.in_.return_value.order.return_value.limit.return_value \
+            .execute.return_value.data = [running]
+
+        with patch("app.services.export_jobs.get_supabase", return_value=mock_supabase):
+            assert export_jobs.find_reusable_job(USER_ID, "materials", "hash") == running
+
+        mock_supabase.table.return_value.update.assert_not_called()
+
+    def test_create_returns_existing_job(self, auth_client):
+        """同一リクエストのジョブがあれば新規作成しない"""
+        existing = _job(status="processing", progress=40, expires_at=None)
+
+        with patch("app.videos.router.export_jobs.find_reusable_job", return_value=existing) as find, \
+             patch("app.videos.router.get_supabase") as mock_get_supabase:
+            response = auth_client.post("/api/v1/videos/exports/materials", json=MATERIALS_REQUEST)
+
+        assert response.status_code == 202
+        data = response.json()
+        assert data["id"] == "job-1"
+        assert data["reused"] is True
+        assert data["progress"] == 40
+        assert data["download_url"] is None
+        find.assert_called_once()
+        mock_get_supabase.return_value.table.return_value.insert.assert_not_called()
+
+    def test_create_new_job(self, auth_client):
+        """再利用できるジョブがなければ pending で作成し、処理を開始"""
+        mock_supabase = MagicMock()
+        mock_supabase.table.return_value.insert.return_value.execute.return_value.data = [
+            _job(status="pending", progress=0, expires_at=None, filename=None, file_size=None)
+        ]
+
+        with patch("app.videos.router.export_jobs.find_reusable_job", return_value=None), \
+             patch("app.videos.router.get_supabase", return_value=mock_supabase), \
+             patch("app.tasks.export_processor.start_export_processing") as start, \
+             patch("app.videos.router.export_jobs.expire_export_jobs"):
+            response = auth_client.post("/api/v1/videos/exports/materials", json=MATERIALS_REQUEST)
+
+        assert response.status_code == 202
+        assert response.json()["status"] == "pending"
+        assert response.json()["reused"] is False
+
+        inserted = mock_supabase.table.return_value.insert.call_args[0][0]
+        assert inserted["kind"] == "materials"
+        assert inserted["request_hash"] == export_jobs.export_request_hash("materials", inserted["params"])
+        start.assert_called_once_with("job-1")
+
+    def test_create_rejects_empty_cuts(self, auth_client):
+        """カットが空の場合は400"""
+        response = auth_client.post("/api/v1/videos/exports/materials", json={"cuts": []})
+        assert response.status_code == 400
+
+
+class TestDownload:
+    """成果物ダウンロードのテスト"""
+
+    def test_range_request_returns_partial_content(self, auth_client, artifact_dir):
+        """Rangeヘッダーで途中から再開できる"""
+        artifact = artifact_dir / "job-1" / "materials.zip"
+        artifact.parent.mkdir()
+        artifact.write_bytes(b"0123456789")
+
+        mock_supabase = MagicMock()
+        _mock_job_lookup(mock_supabase, _job())
+
+        with patch("app.videos.router.get_supabase", return_value=mock_supabase):
+            full = auth_client.get("/api/v1/videos/exports/job-1/download")
+            partial = auth_client.get(
+                "/api/v1/videos/exports/job-1/download",
+                headers={"Range": "bytes=4-"},
+            )
+
+        assert full.status_code == 200
+        assert full.content == b"0123456789"
+        assert full.headers["accept-ranges"] == "bytes"
+        assert partial.status_code == 206
+        assert partial.content == b"456789"
+        assert partial.headers["content-range"] == "bytes 4-9/10"
+
+    def test_r2_artifact_redirects(self, auth_client):
+        """R2の成果物は署名付きURLへリダイレクト"""
+        mock_supabase = MagicMock()
+        _mock_job_lookup(
+            mock_supabase,
+            _job(kind="prores", artifact_storage="r2", artifact_key="videos/render-cache/x.mov"),
+        )
+
+        with patch("app.videos.router.get_supabase", return_value=mock_supabase), \
+             patch("app.services.export_jobs.generate_presigned_url", return_value="https://r2.example.com/signed"):
+            response = auth_client.get("/api/v1/videos/exports/job-1/download", follow_redirects=False)
+
+        assert response.status_code == 307
+        assert response.headers["location"] == "https://r2.example.com/signed"
+
+    def test_expired_artifact_is_gone(self, auth_client, artifact_dir):
+        """保持期限切れは410、ステータスは expired"""
+        mock_supabase = MagicMock()
+        _mock_job_lookup(
+            mock_supabase,
+            _job(expires_at=(datetime.now(timezone.utc) - timedelta(seconds=1)).isoformat()),
+        )
+
+        with patch("app.videos.router.get_supabase", return_value=mock_supabase):
+            download = auth_client.get("/api/v1/videos/exports/job-1/download")
+            status_response = auth_client.get("/api/v1/videos/exports/job-1")
+
+        assert download.status_code == 410
+        assert status_response.json()["status"] == "expired"
+        assert status_response.json()["download_url"] is None
+
+    def test_pending_job_cannot_be_downloaded(self, auth_client):
+        """未完了のジョブは409"""
+        mock_supabase = MagicMock()
+        _mock_job_lookup(mock_supabase, _job(status="processing", expires_at=None))
+
+        with patch("app.videos.router.get_supabase", return_value=mock_supabase):
+            response = auth_client.get("/api/v1/videos/exports/job-1/download")
+
+        assert response.status_code == 409
+
+
+class TestArtifacts:
+    """成果物の保存・削除のテスト"""
+
+    @pytest.mark.asyncio
+    async def test_store_local_and_delete(self, artifact_dir, tmp_path):
+        """ローカル保存先に移動し、削除できる"""
+        source = tmp_path / "out.zip"
+        source.write_bytes(b"zip")
+
+        storage, key, size = await export_jobs.store_artifact("job-9", USER_ID, str(source), "out.zip", "application/zip")
+
+        assert (storage, key, size) == ("local", "job-9/out.zip", 3)
+        assert not source.exists()
+        assert (artifact_dir / "job-9" / "out.zip").read_bytes() == b"zip"
+
+        export_jobs.delete_artifact(storage, key)
+        assert not (artifact_dir / "job-9").exists()
+
+    def test_local_key_cannot_escape_root(self, artifact_dir):
+        """保存先ディレクトリ外を指すキーは拒否"""
+        with pytest.raises(ValueError):
+            export_jobs.local_artifact_path("../etc/passwd")
+
+    def test_render_cache_objects_are_kept(self):
+        """レンダリングキャッシュと共有しているR2オブジェクトは削除しない"""
+        r2 = MagicMock()
+        with patch("app.services.export_jobs.get_r2_client", return_value=r2):
+            export_jobs.delete_artifact("r2", "videos/render-cache/convert_to_prores/abc.mov")
+            export_jobs.delete_artifact("r2", f"exports/{USER_ID}/job-1/materials.zip")
+
+        r2.delete_object.assert_called_once()
+        assert r2.delete_object.call_args.kwargs["Key"] == f"exports/{USER_ID}/job-1/materials.zip"
+
+
+class TestProcessExportJob:
+    """エクスポートジョブプロセッサのテスト"""
+
+    @pytest.mark.asyncio
+    async def test_materials_job_stores_zip_artifact(self, artifact_dir):
+        """変換済みカットをZIPにまとめて保存し、completed にする"""
+        import io
+        import zipfile
+
+        from app.tasks.export_processor import process_export_job
+        from app.videos.schemas import MaterialExportRequest
+
+        job = _job(status="pending", params=MaterialExportRequest(**MATERIALS_REQUEST).model_dump())
+
+        async def fake_convert(cuts, aspect_ratio, workspace, job_id=None):
+            for cut in cuts:
+                path = workspace.file(f"{cut.cut_number:02d}.mov")
+                with open(path, "wb") as f:
+                    f.write(f"cut{cut.cut_number}".encode())
+                yield f"{cut.cut_number:02d}.mov", path
+
+        mock_supabase = MagicMock()
+        mock_supabase.table.return_value.select.return_value.eq.return_value.single.return_value \
+            .execute.return_value.data = job
+
+        with patch("app.tasks.export_processor.get_supabase", return_value=mock_supabase), \
+             patch("app.tasks.export_processor.convert_materials", side_effect=fake_convert):
+            await process_export_job("job-1")
+
+        updates = [c.args[0] for c in mock_supabase.table.return_value.update.call_args_list]
+        final = updates[-1]
+        assert final["status"] == "completed"
+        assert final["artifact_storage"] == "local"
+        assert final["expires_at"]
+        assert [u["progress"] for u in updates[1:3]] == [50, 95]
+
+        artifact = artifact_dir / final["artifact_key"]
+        with zipfile.ZipFile(io.BytesIO(artifact.read_bytes())) as zf:
+            assert sorted(zf.namelist()) == ["01.mov", "02.mov"]
+            assert zf.read("02.mov") == b"cut2"
+        assert final["file_size"] == artifact.stat().st_size
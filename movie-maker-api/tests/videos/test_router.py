@@ -13,7 +13,7 @@ class TestListVideos:
         with patch("app.videos.service.get_supabase") as mock_get_supabase:
             mock_client = MagicMock()
             mock_get_supabase.return_value = mock_client
-            mock_client.table.return_value.select.return_value.eq.return_value.order.return_value.range.return_value.execute.return_value = MagicMock(
+            mock_client.table.return_value.select.return_value.eq.return_value.order.return_value.order.return_value.range.return_value.execute.return_value = MagicMock(
                 data=[]
             )
 
@@ -44,7 +44,7 @@ class TestListVideos:
         with patch("app.videos.service.get_supabase") as mock_get_supabase:
             mock_client = MagicMock()
             mock_get_supabase.return_value = mock_client
-            mock_client.table.return_value.select.return_value.eq.return_value.order.return_value.range.return_value.execute.return_value = MagicMock(
+            mock_client.table.return_value.select.return_value.eq.return_value.order.return_value.order.return_value.range.return_value.execute.return_value = MagicMock(
                 data=mock_videos
             )
 
@@ -53,6 +53,37 @@ class TestListVideos:
             data = response.json()
             assert len(data["videos"]) == 1
             assert data["videos"][0]["id"] == "video-1"
+            assert data["has_next"] is False
+            assert data["next_cursor"] is None
+
+    def test_list_videos_cursor(self, auth_client):
+        """カーソル指定時はOFFSETを使わず、カーソル以降の行を取得する"""
+        from app.services.pagination import encode_cursor
+
+        with patch("app.videos.service.get_supabase") as mock_get_supabase:
+            mock_client = MagicMock()
+            mock_get_supabase.return_value = mock_client
+            query = mock_client.table.return_value.select.return_value.eq.return_value
+            query.or_.return_value.order.return_value.order.return_value.limit.return_value.execute.return_value = MagicMock(
+                data=[]
+            )
+
+            response = auth_client.get(
+                "/api/v1/videos",
+                params={"cursor": encode_cursor("2025-12-22T00:00:00Z", "video-1"), "per_page": 10},
+            )
+
+        assert response.status_code == 200
+        query.or_.assert_called_once_with(
+            'created_at.lt."2025-12-22T00:00:00Z",and(created_at.eq."2025-12-22T00:00:00Z",id.lt.video-1)'
+        )
+        query.or_.return_value.order.return_value.order.return_value.limit.assert_called_once_with(11)
+
+    def test_list_videos_invalid_cursor(self, auth_client):
+        """不正なカーソルは400"""
+        with patch("app.videos.service.get_supabase"):
+            response = auth_client.get("/api/v1/videos", params={"cursor": "not-a-cursor"})
+        assert response.status_code == 400
 
 
 class TestGetVideo:
@@ -304,7 +335,7 @@ class TestUploadVideo:
         video_content = b"\x00" * 1000  # ダミー動画データ
 
         with patch("app.videos.router.get_ffmpeg_service") as mock_ffmpeg, \
-             patch("app.videos.router.upload_video", new_callable=AsyncMock) as mock_upload_video, \
+             patch("app.videos.router.upload_video_file", new_callable=AsyncMock) as mock_upload_video, \
              patch("app.videos.router.upload_image", new_callable=AsyncMock) as mock_upload_image:
 
             # FFmpegサービスのモック
@@ -356,7 +387,7 @@ class TestUploadVideo:
         video_content = b"\x00" * 1000
 
         with patch("app.videos.router.get_ffmpeg_service") as mock_ffmpeg, \
-             patch("app.videos.router.upload_video", new_callable=AsyncMock) as mock_upload_video, \
+             patch("app.videos.router.upload_video_file", new_callable=AsyncMock) as mock_upload_video, \
              patch("app.videos.router.upload_image", new_callable=AsyncMock) as mock_upload_image:
 
             mock_service = MagicMock()
@@ -380,3 +411,219 @@ class TestUploadVideo:
             data = response.json()
             assert data["video_url"] == "https://example.com/video.webm"
             assert data["duration"] == 3.0
+
+
+class TestStreamEndpoints:
+    """SSEで逐次返すエンドポイントのテスト"""
+
+    def test_ad_script_stream(self, auth_client):
+        """カットを完成した順にイベントで返す"""
+        cut = {
+            "id": "cut_1",
+            "cut_number": 1,
+            "scene_type": "attention",
+            "scene_type_label": "注目",
+            "description_ja": "注目",
+            "description_en": "Attention",
+            "duration": 5,
+        }
+
+        async def fake_stream(**kwargs):
+            yield "meta", {"theory": "aida", "theory_label": "AIDA法"}
+            yield "cut", cut
+            yield "done", {
+                "id": "script_1",
+                "theory": "aida",
+                "theory_label": "AIDA法",
+                "total_duration": 5,
+                "cuts": [cut],
+            }
+
+        with patch("app.videos.router.stream_ad_script", fake_stream):
+            response = auth_client.post(
+                "/api/v1/videos/ad-script/generate/stream",
+                json={"description": "新発売のスキンケア商品の広告を作りたい", "target_duration": 15},
+            )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = [block.split("\n") for block in response.text.strip().split("\n\n")]
+        assert [lines[0] for lines in events] == ["event: meta", "event: cut", "event: done"]
+        assert '"cut_number": 1' in events[1][1]
+        assert '"id": "script_1"' in events[2][1]
+
+
+class _RecordingRow(dict):
+    """フォーマッタが読んだカラム名を記録するDBレコード"""
+
+    def __init__(self):
+        super().__init__()
+        self.read: set[str] = set()
+
+    def __getitem__(self, key):
+        self.read.add(key)
+        return "x"
+
+    def get(self, key, default=None):
+        self.read.add(key)
+        return "x"
+
+
+def _columns(columns: str) -> set[str]:
+    return {column.strip() for column in columns.split(",")}
+
+
+class TestListColumns:
+    """一覧で取得するカラムがレスポンスに使うカラムを全て含むことのテスト"""
+
+    def test_video_list_columns(self):
+        """動画一覧のカラムに _format_video_response が読むカラムが全て含まれる"""
+        from app.videos import service
+
+        row = _RecordingRow()
+        service._format_video_response(row)
+
+        assert {"film_grain", "use_lut"} <= row.read
+        assert row.read <= _columns(service.VIDEO_LIST_COLUMNS)
+
+    def test_user_video_list_columns(self):
+        """ユーザー動画一覧のカラムに _format_user_video_response が読むカラムが全て含まれる"""
+        from app.videos import service
+
+        row = _RecordingRow()
+        service._format_user_video_response(row)
+
+        assert {"description", "hls_master_url", "thumbnail_webp_url"} <= row.read
+        assert row.read <= _columns(service.USER_VIDEO_LIST_COLUMNS)
+
+    def test_storyboard_list_columns(self):
+        """ストーリーボード一覧のカラムにレスポンスモデルのフィールドが全て含まれる"""
+        from app.videos.router import STORYBOARD_LIST_COLUMNS, STORYBOARD_SCENE_LIST_COLUMNS
+        from app.videos.schemas import StoryboardResponse, StoryboardSceneResponse
+
+        # scenes は別クエリ、draft_metadata は一覧では返さない
+        storyboard_fields = set(StoryboardResponse.model_fields) - {"scenes", "draft_metadata"}
+        assert storyboard_fields <= _columns(STORYBOARD_LIST_COLUMNS)
+        assert set(StoryboardSceneResponse.model_fields) <= _columns(STORYBOARD_SCENE_LIST_COLUMNS)
+
+    def test_listed_storyboard_keeps_fields(self, auth_client):
+        """一覧のストーリーボード・シーンに派生アセット等の値が返る"""
+        storyboard = {
+            "id": "sb-1",
+            "user_id": "test-user-id",
+            "source_image_url": "https://example.com/source.png",
+            "source_image_webp_url": "https://example.com/source.webp",
+            "theme": "日常",
+            "hls_master_url": "https://example.com/sb/master.m3u8",
+            "status": "completed",
+            "created_at": "2024-01-01T00:00:00+00:00",
+            "updated_at": "2024-01-01T00:00:00+00:00",
+        }
+        scene = {
+            "id": "scene-1",
+            "storyboard_id": "sb-1",
+            "scene_number": 1,
+            "act": "起",
+            "description_ja": "説明",
+            "runway_prompt": "prompt",
+            "generation_seed": 42,
+            "last_frame_url": "https://example.com/last.jpg",
+            "media_metadata": {"duration": 5.0},
+            "status": "completed",
+        }
+        mock_supabase = MagicMock()
+        tables = {"storyboards": [storyboard], "storyboard_scenes": [scene]}
+
+        def table(name):
+            query = MagicMock()
+            for method in ("select", "eq", "in_", "order", "limit", "range", "lt", "or_"):
+                getattr(query, method).return_value = query
+            query.execute.return_value = MagicMock(data=tables.get(name, []), count=1)
+            return query
+
+        mock_supabase.table.side_effect = table
+
+        with patch("app.videos.router.get_supabase", return_value=mock_supabase), \
+             patch("app.videos.router.cached_count", return_value=1):
+            response = auth_client.get("/api/v1/videos/storyboard")
+
+        assert response.status_code == 200
+        listed = response.json()["storyboards"][0]
+        assert listed["source_image_webp_url"] == "https://example.com/source.webp"
+        assert listed["theme"] == "日常"
+        assert listed["hls_master_url"] == "https://example.com/sb/master.m3u8"
+        assert listed["scenes"][0]["generation_seed"] == 42
+        assert listed["scenes"][0]["last_frame_url"] == "https://example.com/last.jpg"
+        assert listed["scenes"][0]["media_metadata"] == {"duration": 5.0}
+
+
+class TestGenerateStoryboardVideos:
+    """POST /api/v1/videos/storyboard/{id}/generate のテスト"""
+
+    def test_reset_clears_derived_assets(self, auth_client):
+        """未完了シーンのリセット時に前の動画の派生アセット（最終フレーム等）も消す"""
+        mock_supabase = MagicMock()
+        storyboards = MagicMock()
+        storyboards.select.return_value.eq.return_value.eq.return_value.single.return_value.execute.return_value = \
+            MagicMock(data={"id": "sb-1", "status": "failed"})
+        scenes = MagicMock()
+        scenes.select.return_value.eq.return_value.execute.return_value = MagicMock(data=[
+            {"id": "scene-1", "status": "completed", "video_url": "https://example.com/1.mp4"},
+            {"id": "scene-2", "status": "failed", "video_url": None},
+        ])
+        mock_supabase.table.side_effect = lambda name: storyboards if name == "storyboards" else scenes
+        storyboard = {
+            "id": "sb-1",
+            "user_id": "test-user-id",
+            "source_image_url": "https://example.com/source.png",
+            "status": "generating",
+        }
+
+        with patch("app.videos.router.get_supabase", return_value=mock_supabase), \
+             patch("app.videos.router._get_storyboard_with_scenes", AsyncMock(return_value=storyboard)), \
+             patch("app.tasks.start_storyboard_processing"):
+            response = auth_client.post("/api/v1/videos/storyboard/sb-1/generate", json={})
+
+        assert response.status_code == 200
+        scenes.update.assert_called_once()
+        update = scenes.update.call_args.args[0]
+        assert update["video_url"] is None
+        assert update["last_frame_url"] is None
+        assert update["first_frame_url"] is None
+        assert update["preview_url"] is None
+        scenes.update.return_value.eq.assert_called_once_with("id", "scene-2")
+
+
+class TestRegenerateSkipsCache:
+    """regenerate=true の場合はLLM応答キャッシュを使わずに生成し直す"""
+
+    @pytest.mark.parametrize("regenerate,use_cache", [(False, True), (True, False)])
+    def test_story_translate(self, auth_client, regenerate, use_cache):
+        """POST /story/translate"""
+        translate = AsyncMock(return_value="A person walks slowly.")
+
+        with patch("app.external.gemini_client.translate_scene_to_runway_prompt", translate):
+            response = auth_client.post("/api/v1/videos/story/translate", json={
+                "description_ja": "人がゆっくり歩く",
+                "regenerate": regenerate,
+            })
+
+        assert response.status_code == 200
+        assert translate.call_args.kwargs["use_cache"] is use_cache
+
+    def test_convert_to_flux_json(self, auth_client):
+        """POST /convert-to-flux-json"""
+        convert = AsyncMock(return_value={
+            "json_prompt": "{}",
+            "negative_prompt_en": "",
+            "preview": {},
+        })
+
+        with patch("app.videos.router.convert_to_flux_json_prompt", convert):
+            response = auth_client.post("/api/v1/videos/convert-to-flux-json", json={
+                "description_ja": "夕焼けの海辺",
+                "regenerate": True,
+            })
+
+        assert response.status_code == 200
+        assert convert.call_args.kwargs["use_cache"] is False
@@ -0,0 +1,148 @@
+"""
+スクリーンショット・スクラブ用プレビューAPIのテスト
+"""
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.services.frame_cache import ExtractedFrame, FrameExtractionError
+from tests.conftest import MOCK_USER
+
+USER_ID = MOCK_USER["user_id"]
+VIDEO_URL = "https://cdn.example.com/v.mp4"
+
+
+def _frame(timestamp: float, hit: bool) -> ExtractedFrame:
+    key = f"videos/render-cache/screenshot_frame/{timestamp}.jpg"
+    return ExtractedFrame(
+        timestamp=timestamp, key=key, url=f"https://cdn.example.com/{key}",
+        width=1080, height=1920, hit=hit,
+    )
+
+
+def _mock_supabase() -> MagicMock:
+    """insert した行に id / created_at を付けて返す"""
+    mock_supabase = MagicMock()
+
+    def insert(rows):
+        inserted = MagicMock()
+        inserted.execute.return_value.data = [
+            {**row, "id": f"ss-{i}", "created_at": datetime.now(timezone.utc).isoformat()}
+            for i, row in enumerate(rows)
+        ]
+        return inserted
+
+    mock_supabase.table.return_value.insert.side_effect = insert
+    return mock_supabase
+
+
+async def _copy(source_key: str, dest_key: str) -> str:
+    return f"https://cdn.example.com/{dest_key}"
+
+
+class TestCreateScreenshots:
+    """スクリーンショット作成のテスト"""
+
+    def test_batch_creates_rows_in_request_order(self, auth_client):
+        """全タイムスタンプのフレームを取得し、個別キーにコピーして一括登録"""
+        frame_cache = MagicMock()
+        frame_cache.get_frames = AsyncMock(return_value=[_frame(2.0, True), _frame(0.5, False)])
+        mock_supabase = _mock_supabase()
+
+        with patch("app.videos.router.get_supabase", return_value=mock_supabase), \
+             patch("app.videos.router.get_frame_cache", return_value=frame_cache), \
+             patch("app.videos.router.copy_object", side_effect=_copy) as copy:
+            response = auth_client.post("/api/v1/videos/screenshots/batch", json={
+                "source_type": "url",
+                "source_url": VIDEO_URL,
+                "timestamps": [2.0, 0.5],
+                "max_width": 720,
+            })
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["cache_hits"] == 1
+        assert [s["timestamp_seconds"] for s in data["screenshots"]] == [2.0, 0.5]
+        assert all(s["source_type"] == "url" for s in data["screenshots"])
+        frame_cache.get_frames.assert_awaited_once_with(VIDEO_URL, [2.0, 0.5], max_width=720)
+
+        rows = mock_supabase.table.return_value.insert.call_args[0][0]
+        assert len(rows) == 2
+        assert all(row["r2_key"].startswith(f"screenshots/{USER_ID}/") for row in rows)
+        # キャッシュのオブジェクトは共有されるため、ユーザーのキーとは別にする
+        assert [c.args[0] for c in copy.call_args_list] == [_frame(2.0, True).key, _frame(0.5, False).key]
+
+    def test_single_endpoint_wraps_batch(self, auth_client):
+        """単体APIは1件のバッチとして処理"""
+        frame_cache = MagicMock()
+        frame_cache.get_frames = AsyncMock(return_value=[_frame(1.5, False)])
+
+        with patch("app.videos.router.get_supabase", return_value=_mock_supabase()), \
+             patch("app.videos.router.get_frame_cache", return_value=frame_cache), \
+             patch("app.videos.router.copy_object", side_effect=_copy):
+            response = auth_client.post("/api/v1/videos/screenshots", json={
+                "source_type": "url",
+                "source_url": VIDEO_URL,
+                "timestamp_seconds": 1.5,
+                "title": "scene",
+            })
+
+        assert response.status_code == 200
+        assert response.json()["timestamp_seconds"] == 1.5
+        assert response.json()["title"] == "scene"
+        frame_cache.get_frames.assert_awaited_once_with(VIDEO_URL, [1.5], max_width=None)
+
+    def test_out_of_range_timestamp_is_400(self, auth_client):
+        """動画の長さを超える場合は400"""
+        frame_cache = MagicMock()
+        frame_cache.get_frames = AsyncMock(
+            side_effect=FrameExtractionError("Timestamp (12.0s) exceeds video duration (10.0s)")
+        )
+
+        with patch("app.videos.router.get_supabase", return_value=_mock_supabase()), \
+             patch("app.videos.router.get_frame_cache", return_value=frame_cache):
+            response = auth_client.post("/api/v1/videos/screenshots/batch", json={
+                "source_type": "url",
+                "source_url": VIDEO_URL,
+                "timestamps": [12.0],
+            })
+
+        assert response.status_code == 400
+        assert "exceeds video duration" in response.json()["detail"]
+
+    def test_batch_validates_timestamps(self, auth_client):
+        """タイムスタンプは1件以上・負の値は不可"""
+        for timestamps in ([], [-1.0]):
+            response = auth_client.post("/api/v1/videos/screenshots/batch", json={
+                "source_type": "url",
+                "source_url": VIDEO_URL,
+                "timestamps": timestamps,
+            })
+            assert response.status_code == 422
+
+
+class TestScrubTrack:
+    """スクラブ用スプライトシートAPIのテスト"""
+
+    def test_returns_track(self, auth_client):
+        """作成したトラックのURLとコマの配置を返す"""
+        from app.services.scrub_track import ScrubTrack
+
+        track = ScrubTrack(
+            vtt_url="https://cdn.example.com/v.scrub/1000ms_jpg/thumbnails.vtt",
+            sprite_urls=["https://cdn.example.com/v.scrub/1000ms_jpg/sheet_000.jpg"],
+            interval_seconds=1.0, columns=10, rows=10, tile_width=160, tile_height=284, cached=False,
+        )
+        with patch("app.videos.router.get_or_create_scrub_track", AsyncMock(return_value=track)) as create:
+            response = auth_client.post("/api/v1/videos/scrub-track", json={"video_url": VIDEO_URL})
+
+        assert response.status_code == 200
+        assert response.json()["vtt_url"] == track.vtt_url
+        assert response.json()["tile_height"] == 284
+        create.assert_awaited_once_with(VIDEO_URL, interval_seconds=1.0, image_format="jpg")
+
+    def test_rejects_too_small_interval(self, auth_client):
+        """間隔の下限"""
+        response = auth_client.post(
+            "/api/v1/videos/scrub-track", json={"video_url": VIDEO_URL, "interval_seconds": 0.1}
+        )
+        assert response.status_code == 422